@@ -0,0 +1,247 @@
+"""
+Log de Actividad con Escritura Diferida (write-behind)
+Simulador BIC Lankamar
+
+Los logins y otros eventos de usuario se encolan en memoria y un hilo
+en segundo plano los escribe en lote:
+- activity_events: log append-only
+- activity_period_users / activity_rollups: usuarios activos por día
+  y por semana, actualizados incrementalmente en cada lote
+- users.last_login_at: un UPDATE por usuario y por lote (no por login)
+
+Así el login no espera ninguna escritura en SQLite.
+"""
+
+import atexit
+import queue
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from db import ensure_schema, get_conn, run_with_busy_retry
+
+
+# ============================================================
+# CONFIGURACIÓN
+# ============================================================
+
+FLUSH_INTERVAL_S = 2.0   # Máxima espera antes de escribir un lote
+MAX_BATCH_SIZE = 500     # Eventos por transacción
+
+_queue: "queue.Queue[tuple]" = queue.Queue()
+_writer_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_writer: Optional[threading.Thread] = None
+_stop = threading.Event()
+
+
+# ============================================================
+# PRODUCTORES
+# ============================================================
+
+def record_event(user_id: int, event: str = "login", occurred_at: Optional[datetime] = None):
+    """
+    Encola un evento de actividad (no bloquea ni toca la base)
+
+    Args:
+        user_id: ID del usuario
+        event: Tipo de evento ("login", "search", ...)
+        occurred_at: Momento del evento en UTC (default: ahora)
+    """
+    when = (occurred_at or datetime.utcnow()).isoformat()
+    _queue.put((user_id, event, when))
+    _ensure_writer()
+
+
+def record_login(user_id: int):
+    """Encola un evento de login"""
+    record_event(user_id, "login")
+
+
+# ============================================================
+# ESCRITOR EN LOTE
+# ============================================================
+
+def _ensure_writer():
+    global _writer
+    if _writer is not None and _writer.is_alive():
+        return
+    with _writer_lock:
+        if _writer is not None and _writer.is_alive():
+            return
+        _stop.clear()
+        _writer = threading.Thread(target=_writer_loop, name="activity-log-writer", daemon=True)
+        _writer.start()
+
+
+def _writer_loop():
+    while not _stop.is_set():
+        _stop.wait(FLUSH_INTERVAL_S)
+        try:
+            flush()
+        except Exception as e:  # El hilo no debe morir por un lote fallido
+            print(f"[!] activity_log: error al escribir lote: {e}")
+
+
+def _drain(limit: int) -> List[tuple]:
+    batch = []
+    while len(batch) < limit:
+        try:
+            batch.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def _period_starts(occurred_at: str) -> Dict[str, str]:
+    day = datetime.fromisoformat(occurred_at).date()
+    week = day - timedelta(days=day.weekday())
+    return {"day": day.isoformat(), "week": week.isoformat()}
+
+
+def _write_batch(batch: List[tuple]):
+    ensure_schema()
+    last_login: Dict[int, str] = {}
+    events_per_period: Dict[tuple, int] = {}
+    period_users = set()
+
+    for user_id, event, occurred_at in batch:
+        if event == "login" and occurred_at > last_login.get(user_id, ""):
+            last_login[user_id] = occurred_at
+        for period, start in _period_starts(occurred_at).items():
+            events_per_period[(period, start)] = events_per_period.get((period, start), 0) + 1
+            period_users.add((period, start, user_id))
+
+    def _tx():
+        with get_conn() as conn:
+            conn.executemany(
+                "INSERT INTO activity_events (user_id, event, occurred_at) VALUES (?, ?, ?)",
+                batch
+            )
+
+            # Usuarios nuevos en cada período: solo esos suman al rollup
+            new_users: Dict[tuple, int] = {}
+            for period, start, user_id in period_users:
+                cursor = conn.execute(
+                    """INSERT OR IGNORE INTO activity_period_users (period, period_start, user_id)
+                       VALUES (?, ?, ?)""",
+                    (period, start, user_id)
+                )
+                if cursor.rowcount:
+                    new_users[(period, start)] = new_users.get((period, start), 0) + 1
+
+            conn.executemany(
+                """INSERT INTO activity_rollups (period, period_start, active_users, events)
+                   VALUES (?, ?, ?, ?)
+                   ON CONFLICT(period, period_start) DO UPDATE SET
+                       active_users = active_users + excluded.active_users,
+                       events = events + excluded.events""",
+                [
+                    (period, start, new_users.get((period, start), 0), count)
+                    for (period, start), count in events_per_period.items()
+                ]
+            )
+
+            conn.executemany(
+                """UPDATE users SET last_login_at = ?
+                   WHERE id = ? AND (last_login_at IS NULL OR last_login_at < ?)""",
+                [(when, user_id, when) for user_id, when in last_login.items()]
+            )
+
+    run_with_busy_retry(_tx)
+
+
+def flush() -> int:
+    """
+    Escribe todos los eventos encolados
+
+    Returns:
+        Cantidad de eventos escritos
+    """
+    written = 0
+    with _flush_lock:
+        while True:
+            batch = _drain(MAX_BATCH_SIZE)
+            if not batch:
+                return written
+            try:
+                _write_batch(batch)
+            except Exception:
+                # Devolver el lote a la cola para el próximo intento
+                for item in batch:
+                    _queue.put(item)
+                raise
+            written += len(batch)
+
+
+def pending_events() -> int:
+    """Eventos encolados aún no escritos"""
+    return _queue.qsize()
+
+
+def stop_writer(timeout: float = 5.0):
+    """Detiene el hilo escritor y escribe lo pendiente"""
+    _stop.set()
+    if _writer is not None:
+        _writer.join(timeout)
+    flush()
+
+
+def _stop_at_exit():
+    # Al salir la base puede ya no existir (p. ej. un directorio temporal):
+    # los eventos pendientes se pierden, pero la salida no debe fallar
+    try:
+        stop_writer()
+    except sqlite3.Error as e:
+        print(f"[!] activity_log: {pending_events()} eventos sin escribir al salir: {e}")
+
+
+atexit.register(_stop_at_exit)
+
+
+# ============================================================
+# CONSULTAS
+# ============================================================
+
+def get_active_user_rollups(period: str = "day", limit: int = 14) -> List[Dict]:
+    """
+    Usuarios activos por período, del más reciente al más antiguo
+
+    Lee el rollup precalculado: el costo depende de la cantidad de
+    períodos pedidos, no del tamaño del log.
+
+    Args:
+        period: "day" (DAU) o "week" (WAU)
+        limit: Cantidad de períodos a devolver
+
+    Returns:
+        Lista de dicts {period_start, active_users, events}
+    """
+    if period not in ("day", "week"):
+        raise ValueError("period debe ser 'day' o 'week'")
+
+    ensure_schema()
+    with get_conn() as conn:
+        cursor = conn.execute(
+            """SELECT period_start, active_users, events FROM activity_rollups
+               WHERE period = ? ORDER BY period_start DESC LIMIT ?""",
+            (period, limit)
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+
+def get_activity_summary() -> Dict:
+    """DAU de hoy y WAU de la semana actual (UTC)"""
+    starts = _period_starts(datetime.utcnow().isoformat())
+
+    ensure_schema()
+    with get_conn() as conn:
+        def active(period: str) -> int:
+            row = conn.execute(
+                "SELECT active_users FROM activity_rollups WHERE period = ? AND period_start = ?",
+                (period, starts[period])
+            ).fetchone()
+            return row[0] if row else 0
+
+        return {"dau": active("day"), "wau": active("week"), "pending": pending_events()}
@@ -9,7 +9,7 @@ v2.0 - Autenticación con SQLite
 
 import streamlit as st
 import json
-from datetime import datetime
+import time
 from pathlib import Path
 
 # Imports del sistema de autenticación SQLite
@@ -21,6 +21,16 @@ from invites_service import (
 )
 from db import get_db_stats, DB_PATH, init_db, get_conn
 from auth_service import create_user, get_user_by_email
+from activity_log import record_login, get_active_user_rollups, get_activity_summary
+from catalog import get_catalog
+from alarm_analytics import get_top_alarms, get_alarm_rollup, list_wards, list_ingests
+from battery_model import get_battery_table
+from pump_matrix import get_pump_matrix
+from validation_engine import validate_catalog
+from reference_index import get_reference_index
+from search_view import PAGE_SIZE, page_html
+from catalog_export import TABLES as EXPORT_TABLES, available_formats, export_filename, export_mime, get_export
+from content_store import add_video, content_revision, delete_video, list_videos, video_stats
 import sqlite3
 
 # Configuración de página
@@ -40,51 +50,66 @@ DEFAULT_CEO_NAME = "Marcelo (CEO)"
 # Rutas de archivos (usando ruta absoluta para evitar problemas de directorio de trabajo)
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 PUMPS_DB_PATH = DATA_DIR / "pumps_db.json"
-CONTENT_MANIFEST_PATH = DATA_DIR / "content_manifest.json"
 
+# Segundos que las vistas de los videos pueden mostrarse desactualizadas
+# (las reproducciones no cambian la revisión de contenido)
+VIDEO_VIEWS_TTL_S = 30
 
-def load_pumps():
-    """Carga la base de datos de bombas"""
-    try:
-        with open(PUMPS_DB_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        st.error(f"No se encontró {PUMPS_DB_PATH}")
-        return []
 
+# ============================================================
+# DATOS CACHEADOS (compartidos entre sesiones y reruns)
+# ============================================================
 
-def load_content_manifest():
-    """Carga el manifest de contenido (videos)"""
-    try:
-        with open(CONTENT_MANIFEST_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {"videos": [], "last_updated": None}
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _cached_catalog(path: str, stamp: tuple):
+    """Catálogo parseado una vez por (mtime, tamaño) del archivo; no se copia por sesión"""
+    return get_catalog(Path(path))
 
 
-def save_content_manifest(manifest):
-    """Guarda el manifest de contenido"""
-    manifest["last_updated"] = datetime.now().isoformat()
-    with open(CONTENT_MANIFEST_PATH, "w", encoding="utf-8") as f:
-        json.dump(manifest, f, indent=2, ensure_ascii=False)
+@st.cache_data(max_entries=4, ttl=VIDEO_VIEWS_TTL_S, show_spinner=False)
+def _cached_videos(revision: int):
+    """Videos y totales por revisión de contenido (cada alta o baja la sube)"""
+    return {"videos": list_videos(), "stats": video_stats()}
 
 
-def get_all_errors(pumps):
-    """Extrae todos los errores de todas las bombas"""
-    errors = []
-    for pump in pumps:
-        for error in pump.get("errores_y_alarmas", []):
-            errors.append({
-                "pump_id": pump["id"],
-                "pump_name": f"{pump['marca']} {pump['modelo']}",
-                "codigo": error["codigo_pantalla"],
-                "video_tag": error["video_tag"],
-                "significado": error["significado"],
-                "prioridad": error.get("prioridad", "media"),
-                "categoria": error.get("categoria", "general"),
-                "accion_correctiva": error.get("accion_correctiva", "")
-            })
-    return errors
+@st.cache_data(max_entries=2, show_spinner=False)
+def _cached_error_counts(version: str, _errors):
+    """Conteos para los gráficos de estadísticas, una vez por versión del catálogo"""
+    by_pump, by_category = {}, {}
+    for e in _errors:
+        by_pump[e["pump_name"]] = by_pump.get(e["pump_name"], 0) + 1
+        by_category[e["categoria"]] = by_category.get(e["categoria"], 0) + 1
+    return by_pump, by_category
+
+
+def load_catalog():
+    """
+    Catálogo de bombas compartido (None si no se puede leer)
+
+    Cada rerun solo hace un stat() del archivo: el JSON se parsea de nuevo
+    únicamente si cambian su mtime o su tamaño. Los registros con JSON
+    inválido quedan en cuarentena: se avisa y se muestran las demás bombas.
+    """
+    try:
+        stat = PUMPS_DB_PATH.stat()
+        catalog = _cached_catalog(str(PUMPS_DB_PATH), (stat.st_mtime_ns, stat.st_size))
+    except FileNotFoundError:
+        st.error(f"No se encontró {PUMPS_DB_PATH}")
+        return None
+    except ValueError as e:
+        st.error(f"pumps_db.json ilegible: {e}")
+        return None
+    for q in catalog.quarantine:
+        st.warning(
+            f"⚠️ Bomba #{q['index']} en cuarentena ({PUMPS_DB_PATH.name}:{q['line']}:{q['column']}): "
+            f"{q['message']}"
+        )
+    return catalog
+
+
+def load_videos():
+    """{"videos", "stats"} de la revisión de contenido vigente"""
+    return _cached_videos(content_revision())
 
 
 def inject_mobile_detection_script():
@@ -163,6 +188,13 @@ def main():
         # Usuario logueado
         role = get_user_role(username, credentials)
         display_name = get_user_display_name(username, credentials)
+
+        # Registrar el login una sola vez por sesión (escritura diferida)
+        if st.session_state.get("login_recorded_for") != username:
+            user = get_user_by_email(username)
+            if user:
+                record_login(user["id"])
+            st.session_state["login_recorded_for"] = username
         
         # Header
         st.title("💉 SiBIC - Simulador de Bombas de Infusión Continua")
@@ -181,9 +213,12 @@ def main():
         opciones = get_menu_options(role)
 
         # Cargar datos
-        pumps = load_pumps()
-        manifest = load_content_manifest()
-        all_errors = get_all_errors(pumps)
+        catalog = load_catalog()
+        pumps = catalog.pumps if catalog else []
+        all_errors = catalog.errors if catalog else []
+
+        # Los filtros de las secciones que no se dibujan en este rerun
+        keep_section_state()
 
         if is_mobile:
             # Estilos para mobile: botones más grandes, evitar sidebar
@@ -197,26 +232,11 @@ def main():
                 unsafe_allow_html=True,
             )
 
-            # Usar tabs en la parte superior para navegación mobile
-            tabs = st.tabs(opciones)
-            # renderizar cada tab en orden
-            for i, tab in enumerate(tabs):
-                with tab:
-                    sel = opciones[i]
-                    if sel == "🔍 Buscar Errores":
-                        render_search_section(all_errors)
-                    elif sel == "📹 Videos":
-                        render_videos_section(pumps, manifest, all_errors)
-                    elif sel == "📊 Estadísticas":
-                        render_stats_section(manifest, pumps, all_errors)
-                    elif sel == "📥 Exportar":
-                        render_export_section(pumps, all_errors)
-                    elif sel == "🔧 Validación":
-                        render_validation_section(pumps)
-                    elif sel == "👥 Usuarios":
-                        render_users_section()
-                    elif sel == "🎫 Invitaciones":
-                        render_invites_section()
+            # Navegación mobile: solo se ejecuta la sección elegida (las
+            # demás no consultan la base ni arman CSVs)
+            section = st.radio("Sección", opciones, horizontal=True,
+                               key="mobile_section", label_visibility="collapsed")
+            render_section(section, pumps, all_errors)
 
             # Compartir link rápido en mobile (instrucción)
             st.markdown("---")
@@ -244,20 +264,7 @@ def main():
                     st.metric("Invitaciones pendientes", inv_stats["pendientes"])
 
             # Routing según menú
-            if menu == "🔍 Buscar Errores":
-                render_search_section(all_errors)
-            elif menu == "📹 Videos":
-                render_videos_section(pumps, manifest, all_errors)
-            elif menu == "📊 Estadísticas":
-                render_stats_section(manifest, pumps, all_errors)
-            elif menu == "📥 Exportar":
-                render_export_section(pumps, all_errors)
-            elif menu == "🔧 Validación":
-                render_validation_section(pumps)
-            elif menu == "👥 Usuarios":
-                render_users_section()
-            elif menu == "🎫 Invitaciones":
-                render_invites_section()
+            render_section(menu, pumps, all_errors)
     
     elif authentication_status is False:
         st.error("❌ Usuario o contraseña incorrectos")
@@ -270,91 +277,114 @@ def main():
         render_invite_redemption()
 
 
+# ============================================================
+# NAVEGACIÓN
+# ============================================================
+
+# Prefijo de las keys de widgets cuyo valor sobrevive a cambiar de sección
+KEEP_STATE_PREFIX = "keep_"
+
+
+def keep_section_state():
+    """
+    Conserva el estado de los widgets con key KEEP_STATE_PREFIX*
+
+    Streamlit descarta el valor de un widget que no se dibuja en un rerun;
+    reasignarlo en session_state lo mantiene mientras su sección está oculta.
+    """
+    for key in list(st.session_state.keys()):
+        if isinstance(key, str) and key.startswith(KEEP_STATE_PREFIX):
+            st.session_state[key] = st.session_state[key]
+
+
+def render_section(section, pumps, all_errors):
+    """Dibuja una sola sección del menú (mobile y desktop)"""
+    if section == "🔍 Buscar Errores":
+        render_search_section(all_errors)
+    elif section == "📹 Videos":
+        render_videos_section(pumps, all_errors)
+    elif section == "📊 Estadísticas":
+        render_stats_section(pumps, all_errors)
+    elif section == "🚨 Alarmas en Sala":
+        render_alarm_analytics_section()
+    elif section == "🔋 Autonomía":
+        render_battery_section()
+    elif section == "⚖️ Comparativa":
+        render_comparison_section()
+    elif section == "📥 Exportar":
+        render_export_section(pumps, all_errors)
+    elif section == "🔧 Validación":
+        render_validation_section(pumps)
+    elif section == "👥 Usuarios":
+        render_users_section()
+    elif section == "🎫 Invitaciones":
+        render_invites_section()
+
+
+def _load_more_results():
+    st.session_state["search_pages"] += 1
+
+
 def render_search_section(all_errors):
-    """Sección de búsqueda de errores"""
+    """Sección de búsqueda de errores (paginada: se dibuja una página por vez)"""
     st.header("🔍 Buscar Errores y Alarmas")
-    
-    # Sistema de iconos y colores por CATEGORÍA (basado en UX/gamificación)
-    CATEGORY_STYLE = {
-        "oclusion": {"icon": "🚫", "color": "#E53935", "nombre": "Oclusión"},
-        "aire": {"icon": "🫧", "color": "#90CAF9", "nombre": "Aire en Línea"},
-        "flujo": {"icon": "💧", "color": "#3949AB", "nombre": "Flujo"},
-        "energia": {"icon": "🪫", "color": "#FFB300", "nombre": "Energía/Batería"},
-        "sistema": {"icon": "⚙️", "color": "#8D6E63", "nombre": "Sistema"},
-        "set": {"icon": "⚙️", "color": "#43A047", "nombre": "Configuración"},
-        "medicacion": {"icon": "💊", "color": "#D81B60", "nombre": "Medicación"},
-        "general": {"icon": "⚠️", "color": "#607D8B", "nombre": "General"},
-        "volumen": {"icon": "📊", "color": "#5C6BC0", "nombre": "Volumen"},
-        "mecanica": {"icon": "🔧", "color": "#795548", "nombre": "Mecánica"},
-    }
+    started = time.perf_counter()
+
+    if not all_errors:
+        st.info("No hay alarmas cargadas")
+        return
+    catalog = get_catalog(PUMPS_DB_PATH)
     
     # Filtros
     col1, col2, col3 = st.columns(3)
     with col1:
-        search_term = st.text_input("🔎 Buscar por código o descripción", "")
+        search_term = st.text_input("🔎 Buscar por código o descripción", "", key="keep_search_term")
     with col2:
-        pumps_list = list(set(e["pump_name"] for e in all_errors))
-        selected_pump = st.selectbox("Bomba", ["Todas"] + sorted(pumps_list))
+        pump_ids = {f"{p['marca']} {p['modelo']}": p["id"] for p in catalog.pumps}
+        selected_pump = st.selectbox("Bomba", ["Todas"] + sorted(pump_ids), key="keep_search_pump")
     with col3:
         categories = list(set(e["categoria"] for e in all_errors))
-        selected_cat = st.selectbox("Categoría", ["Todas"] + sorted(categories))
-    
-    # Filtrar
-    filtered = all_errors
-    if search_term:
-        search_lower = search_term.lower()
-        filtered = [e for e in filtered if search_lower in e["codigo"].lower() 
-                   or search_lower in e["significado"].lower()]
-    if selected_pump != "Todas":
-        filtered = [e for e in filtered if e["pump_name"] == selected_pump]
-    if selected_cat != "Todas":
-        filtered = [e for e in filtered if e["categoria"] == selected_cat]
-    
-    st.markdown(f"**{len(filtered)} resultados encontrados**")
+        selected_cat = st.selectbox("Categoría", ["Todas"] + sorted(categories), key="keep_search_category")
+
+    # Páginas cargadas: vuelve a una al cambiar cualquier filtro
+    filters = (search_term, selected_pump, selected_cat, catalog.version)
+    if st.session_state.get("search_filters") != filters:
+        st.session_state["search_filters"] = filters
+        st.session_state["search_pages"] = 1
+    pages = st.session_state["search_pages"]
+
+    # Filtrar (agrupado por categoría) y traer solo las páginas visibles
+    result = catalog.search_page(
+        search_term,
+        pump_id=pump_ids.get(selected_pump),
+        categoria=None if selected_cat == "Todas" else selected_cat,
+        limit=pages * PAGE_SIZE
+    )
+    total, shown = result["total"], result["results"]
+
+    st.markdown(f"**{total} resultados encontrados**")
     st.markdown("---")
-    
-    # Agrupar por CATEGORÍA
-    from collections import defaultdict
-    grouped = defaultdict(list)
-    for error in filtered:
-        grouped[error["categoria"]].append(error)
-    
-    # Mostrar agrupado por categoría con iconos
-    for categoria in sorted(grouped.keys()):
-        errors = grouped[categoria]
-        # Obtener estilo de la categoría
-        style = CATEGORY_STYLE.get(categoria, CATEGORY_STYLE["general"])
-        icon = style["icon"]
-        color = style["color"]
-        nombre = style["nombre"]
-        
-        # Header de categoría con color e icono
-        st.markdown(f"""
-        <div style="background: linear-gradient(90deg, {color}22, transparent); 
-                    padding: 12px 18px; border-left: 5px solid {color}; 
-                    border-radius: 0 10px 10px 0; margin: 20px 0 12px 0;
-                    display: flex; align-items: center;">
-            <span style="font-size: 28px; margin-right: 12px;">{icon}</span>
-            <div>
-                <strong style="color: {color}; font-size: 18px;">{nombre.upper()}</strong>
-                <span style="color: #666; margin-left: 10px; font-size: 14px;">({len(errors)} errores)</span>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Errores de esta categoría
-        for error in errors:
-            priority_icon = {"critica": "🔴", "alta": "🟠", "media": "🟡", "informativa": "🟢"}
-            p_icon = priority_icon.get(error["prioridad"], "⚪")
-            
-            with st.expander(f"{p_icon} {error['codigo']} — {error['pump_name']}"):
-                st.markdown(f"**Significado:** {error['significado']}")
-                st.markdown(f"**Acción correctiva:** {error['accion_correctiva']}")
-                st.markdown(f"**Bomba:** `{error['pump_name']}` | **Prioridad:** `{error['prioridad']}`")
-                st.markdown(f"**Video tag:** `{error['video_tag']}`")
+
+    # Un bloque HTML por página: las ya dibujadas no cambian al cargar más
+    previous = None
+    for offset in range(0, len(shown), PAGE_SIZE):
+        page = shown[offset:offset + PAGE_SIZE]
+        st.markdown(page_html(page, result["by_category"], previous), unsafe_allow_html=True)
+        previous = page[-1]["categoria"]
+        if offset == 0:
+            first_ms = (time.perf_counter() - started) * 1000
+
+    if shown:
+        st.caption(f"Mostrando {len(shown)} de {total} · primeros resultados en {first_ms:.0f} ms")
+    if len(shown) < total:
+        st.button(
+            f"⬇️ Cargar {min(PAGE_SIZE, total - len(shown))} más",
+            on_click=_load_more_results,
+            use_container_width=True
+        )
 
 
-def render_videos_section(pumps, manifest, all_errors):
+def render_videos_section(pumps, all_errors):
     """Sección de gestión de videos"""
     st.header("📹 Gestión de Videos")
     
@@ -396,25 +426,16 @@ def render_videos_section(pumps, manifest, all_errors):
             submitted = st.form_submit_button("➕ Agregar Video", use_container_width=True)
             
             if submitted and video_url and video_tag:
-                new_video = {
-                    "video_tag": video_tag,
-                    "pump_id": selected_pump_id,
-                    "url": video_url,
-                    "platform": platform,
-                    "notes": notes,
-                    "views_count": 0,
-                    "added_at": datetime.now().isoformat()
-                }
-                manifest["videos"].append(new_video)
-                save_content_manifest(manifest)
+                add_video(video_tag, video_url, pump_id=selected_pump_id, platform=platform, notes=notes)
                 st.success(f"✅ Video agregado para: {video_tag}")
                 st.rerun()
     
     with col2:
         st.subheader("Videos Registrados")
         
-        if manifest["videos"]:
-            for i, video in enumerate(manifest["videos"]):
+        videos = load_videos()["videos"]
+        if videos:
+            for video in videos:
                 with st.expander(f"🎬 {video['video_tag']} ({video['platform']})"):
                     col_a, col_b = st.columns([3, 1])
                     with col_a:
@@ -424,23 +445,24 @@ def render_videos_section(pumps, manifest, all_errors):
                         if video.get("notes"):
                             st.info(video["notes"])
                     with col_b:
-                        if st.button("🗑️ Eliminar", key=f"del_{i}"):
-                            manifest["videos"].pop(i)
-                            save_content_manifest(manifest)
+                        if st.button("🗑️ Eliminar", key=f"del_{video['id']}"):
+                            # Por id: si otra sesión ya lo borró, no borra otro video
+                            delete_video(video["id"])
                             st.rerun()
         else:
             st.info("No hay videos registrados aún. Agregá uno desde el formulario.")
 
 
-def render_stats_section(manifest, pumps, all_errors):
+def render_stats_section(pumps, all_errors):
     """Sección de estadísticas con gráficos"""
     st.header("📊 Estadísticas de Uso")
     
     # Métricas generales
     col1, col2, col3, col4 = st.columns(4)
     
-    total_videos = len(manifest.get("videos", []))
-    total_views = sum(v.get("views_count", 0) for v in manifest.get("videos", []))
+    video_totals = load_videos()["stats"]
+    total_videos = video_totals["videos"]
+    total_views = video_totals["views"]
     total_pumps = len(pumps)
     total_errors = len(all_errors)
     
@@ -454,110 +476,182 @@ def render_stats_section(manifest, pumps, all_errors):
     # Gráficos
     col_chart1, col_chart2 = st.columns(2)
     
+    catalog_version = get_catalog(PUMPS_DB_PATH).version if pumps else ""
+    pump_counts, cat_counts = _cached_error_counts(catalog_version, all_errors)
+
     with col_chart1:
         st.subheader("Errores por Bomba")
-        pump_counts = {}
-        for e in all_errors:
-            pump_counts[e["pump_name"]] = pump_counts.get(e["pump_name"], 0) + 1
         st.bar_chart(pump_counts)
     
     with col_chart2:
         st.subheader("Errores por Categoría")
-        cat_counts = {}
-        for e in all_errors:
-            cat_counts[e["categoria"]] = cat_counts.get(e["categoria"], 0) + 1
         st.bar_chart(cat_counts)
     
     st.markdown("---")
     
-    # Cobertura por bomba
+    # Cobertura por bomba (índice de referencias, una vez por versión)
     st.subheader("Cobertura de Videos por Bomba")
+    index = get_reference_index()
     for pump in pumps:
-        errors = pump.get("errores_y_alarmas", [])
-        covered = sum(1 for e in errors 
-                     if any(v["video_tag"] == e["video_tag"] for v in manifest.get("videos", [])))
-        total = len(errors)
-        
-        progress = covered / total if total > 0 else 0
-        st.markdown(f"**{pump['marca']} {pump['modelo']}**")
-        st.progress(progress, f"{covered}/{total} errores con video")
+        coverage = index.coverage.get(pump["id"])
+        if coverage is None:
+            continue
+        st.markdown(f"**{coverage['pump_name']}**")
+        st.progress(coverage["coverage"], f"{coverage['with_video']}/{coverage['alarms']} errores con video")
+
+    if index.orphan_videos or index.dangling:
+        with st.expander(f"🔗 Referencias rotas ({len(index.dangling)})"):
+            for ref in index.dangling:
+                st.markdown(f"- `{ref['source']}` → {ref['ref_type']} `{ref['ref']}`: {ref['detail']}")
+
+
+def render_alarm_analytics_section():
+    """Sección de alarmas reales registradas en las salas (logs de bombas)"""
+    st.header("🚨 Alarmas en Sala")
+    st.caption("Ocurrencias agregadas de los logs de las bombas. "
+               "Ingerir logs con: `python backend/alarm_analytics.py <log.csv|log.jsonl>`")
+
+    col_days, col_ward = st.columns(2)
+    days = col_days.selectbox("Período", [1, 7, 30, 90], index=1,
+                              format_func=lambda d: f"Últimos {d} días", key="keep_alarms_days")
+    ward = col_ward.selectbox("Sala", ["Todas"] + list_wards(), key="keep_alarms_ward")
+    ward = None if ward == "Todas" else ward
+
+    top = get_top_alarms(days=days, limit=15, ward=ward)
+    if not top:
+        st.info("No hay alarmas registradas en el período. Ingerí un log para ver datos.")
+        return
+
+    by_priority = get_alarm_rollup("prioridad", days=days, ward=ward)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Alarmas", f"{sum(by_priority.values()):,}")
+    col2.metric("Críticas", f"{by_priority.get('critica', 0):,}")
+    col3.metric("Sin resolver", f"{by_priority.get('desconocida', 0):,}")
+
+    st.subheader(f"🔝 Top alarmas - últimos {days} días")
+    st.dataframe(
+        [
+            {
+                "Ocurrencias": row["occurrences"],
+                "Bomba": row["pump_name"],
+                "Código": row["codigo"],
+                "Significado": row["significado"],
+                "Prioridad": row["prioridad"],
+                "Categoría": row["categoria"],
+            }
+            for row in top
+        ],
+        use_container_width=True,
+        hide_index=True
+    )
 
+    col_chart1, col_chart2 = st.columns(2)
+    with col_chart1:
+        st.subheader("Por Categoría")
+        st.bar_chart(get_alarm_rollup("categoria", days=days, ward=ward))
+    with col_chart2:
+        st.subheader("Por Sala" if ward is None else "Por Bomba")
+        st.bar_chart(get_alarm_rollup("ward" if ward is None else "pump_id", days=days, ward=ward))
 
-def render_validation_section(pumps):
-    """Sección de validación de datos"""
-    st.header("🔧 Validación de Datos")
-    
-    issues = []
-    
-    for pump in pumps:
-        pump_name = f"{pump['marca']} {pump['modelo']}"
-        
-        # Verificar campos obligatorios
-        required_fields = ["id", "marca", "modelo", "tipo", "specs_tecnicas", "errores_y_alarmas"]
-        for field in required_fields:
-            if field not in pump:
-                issues.append(f"❌ **{pump_name}**: Falta campo `{field}`")
-        
-        # Verificar specs técnicas
-        specs = pump.get("specs_tecnicas", {})
-        required_specs = ["rango_flujo", "volumen_max", "tipo_set", "bateria"]
-        for spec in required_specs:
-            if spec not in specs:
-                issues.append(f"⚠️ **{pump_name}**: Falta spec `{spec}`")
-        
-        # Verificar errores
-        for error in pump.get("errores_y_alarmas", []):
-            if not error.get("video_tag"):
-                issues.append(
-                    f"⚠️ **{pump_name}**: Error `{error.get('codigo_pantalla')}` sin video_tag"
-                )
-    
-    if issues:
-        st.warning(f"Se encontraron {len(issues)} problemas:")
-        for issue in issues:
-            st.markdown(issue)
-    else:
-        st.success("✅ Todos los datos están completos y validados")
-    
-    # Mostrar estructura JSON
-    st.subheader("Vista de Datos")
-    selected_pump = st.selectbox(
-        "Ver datos de bomba:",
-        [f"{p['marca']} {p['modelo']}" for p in pumps]
+    st.subheader("Por Hora del Día")
+    st.bar_chart(get_alarm_rollup("hour_of_day", days=days, ward=ward))
+
+    st.subheader("Por Día")
+    st.line_chart(get_alarm_rollup("day", days=days, ward=ward))
+
+    with st.expander("📂 Logs ingeridos"):
+        st.dataframe(list_ingests(), use_container_width=True, hide_index=True)
+
+
+def render_battery_section():
+    """Sección de autonomía de batería: ¿la bomba aguanta el traslado?"""
+    st.header("🔋 Autonomía de Batería")
+    st.caption("Estimación conservadora a partir de la autonomía declarada por el fabricante")
+
+    col1, col2, col3 = st.columns(3)
+    rate = col1.number_input("Flujo (ml/h)", min_value=0.1, max_value=1800.0, value=125.0, step=1.0,
+                             key="keep_battery_rate")
+    charge = col2.slider("Carga actual (%)", 0, 100, 100, key="keep_battery_charge") / 100
+    minutes = col3.number_input("Duración del traslado (min)", min_value=0, max_value=24 * 60, value=60, step=5,
+                                key="keep_battery_minutes")
+
+    rows = get_battery_table().lookup_all(rate, charge, minutes)
+    st.dataframe(
+        [
+            {
+                "Bomba": row["pump_id"],
+                "Dura": "—" if row["lasts"] is None else ("✅" if row["lasts"] else "❌"),
+                "Autonomía (h)": row["runtime_h"],
+                "Hasta batería baja (h)": row["until_low_h"],
+                "Batería": row["model"]["chemistry"],
+                "Recarga (h)": row["model"]["recharge_h"],
+            }
+            for row in rows
+        ],
+        use_container_width=True,
+        hide_index=True
+    )
+    out_of_range = [row["pump_id"] for row in rows if not row["in_range"]]
+    if out_of_range:
+        st.warning(f"Flujo fuera de rango para: {', '.join(out_of_range)}")
+
+    with st.expander("ℹ️ Datos no especificados por el fabricante"):
+        for row in rows:
+            for issue in row["issues"]:
+                st.markdown(f"- **{row['pump_id']}**: {issue}")
+
+
+def render_comparison_section():
+    """Sección de comparativa de bombas (matriz compartida con la API y el PDF)"""
+    st.header("⚖️ Comparativa de Bombas")
+    matrix = get_pump_matrix()
+    labels = {
+        name: f"{label} ({unit})" if unit else label
+        for name, (label, unit) in matrix.attributes.items()
+    }
+
+    col1, col2 = st.columns([2, 1])
+    conditions = col1.text_area(
+        "Filtros (uno por línea)",
+        placeholder="rate_min<=0.1\npressure_max>=500",
+        help=f"Columnas: {', '.join(list(matrix.text) + list(matrix.columns))}",
+        key="keep_compare_where"
+    )
+    sort_column = col2.selectbox("Ordenar por", list(labels), format_func=labels.get,
+                                 index=list(labels).index("autonomy_h"), key="keep_compare_sort")
+    descending = col2.checkbox("Mayor a menor", value=True, key="keep_compare_desc")
+
+    where = [line for line in conditions.splitlines() if line.strip()]
+    try:
+        rows = matrix.query(where, sort=f"-{sort_column}" if descending else sort_column)
+    except ValueError as e:
+        st.error(str(e))
+        return
+
+    st.caption(f"{len(rows)} de {len(matrix.pump_ids)} bombas")
+    st.dataframe(
+        [{"Bomba": row["name"], **{labels[name]: row[name] for name in labels}} for row in rows],
+        use_container_width=True,
+        hide_index=True
     )
-    idx = [f"{p['marca']} {p['modelo']}" for p in pumps].index(selected_pump)
-    st.json(pumps[idx])
 
 
 def render_validation_section(pumps):
-    """Sección de validación de datos"""
+    """Sección de validación de datos (motor incremental compartido con la CLI)"""
     st.header("🔧 Validación de Datos")
     
-    issues = []
-    
-    for pump in pumps:
-        pump_name = f"{pump['marca']} {pump['modelo']}"
-        
-        # Verificar campos obligatorios
-        required_fields = ["id", "marca", "modelo", "tipo", "specs_tecnicas", "errores_y_alarmas"]
-        for field in required_fields:
-            if field not in pump:
-                issues.append(f"❌ **{pump_name}**: Falta campo `{field}`")
-        
-        # Verificar specs técnicas
-        specs = pump.get("specs_tecnicas", {})
-        required_specs = ["rango_flujo", "volumen_max", "tipo_set", "bateria"]
-        for spec in required_specs:
-            if spec not in specs:
-                issues.append(f"⚠️ **{pump_name}**: Falta spec `{spec}`")
-        
-        # Verificar errores
-        for error in pump.get("errores_y_alarmas", []):
-            if not error.get("video_tag"):
-                issues.append(
-                    f"⚠️ **{pump_name}**: Error `{error.get('codigo_pantalla')}` sin video_tag"
-                )
+    report = validate_catalog()
+    stats = report["stats"]
+    st.caption(
+        f"Caché: {stats['hit_rate']:.0%} de {stats['records']:,} registros · "
+        f"{stats['revalidated']:,} revalidados · {stats['elapsed_ms']:.1f} ms"
+    )
     
+    issues = (
+        [f"❌ {e}" for e in report["errors"]]
+        + report["warnings"]
+        + report["suggestions"]
+    )
     if issues:
         st.warning(f"Se encontraron {len(issues)} problemas:")
         for issue in issues:
@@ -576,58 +670,59 @@ def render_validation_section(pumps):
 
 
 def render_export_section(pumps, all_errors):
-    """Sección de exportación de datos"""
+    """Sección de exportación de datos (se genera solo lo que se pide, una vez por versión)"""
     st.header("📥 Exportar Datos")
     
-    st.markdown("Descargá los datos en formato CSV para análisis externo.")
-    
-    col1, col2 = st.columns(2)
+    st.markdown("Descargá los datos para análisis externo.")
+    if not pumps:
+        st.info("No hay bombas cargadas")
+        return
     
-    with col1:
-        st.subheader("Errores y Alarmas")
-        # Crear CSV de errores
-        csv_errors = "Bomba,Código,Significado,Categoría,Prioridad,Acción Correctiva,Video Tag\n"
-        for e in all_errors:
-            csv_errors += f'"{e["pump_name"]}","{e["codigo"]}","{e["significado"]}","{e["categoria"]}","{e["prioridad"]}","{e["accion_correctiva"]}","{e["video_tag"]}"\n'
-        
+    col1, col2, col3 = st.columns(3)
+    table = col1.selectbox(
+        "Datos", list(EXPORT_TABLES),
+        format_func=lambda t: f"Errores y Alarmas ({len(all_errors)})" if t == "errores" else f"Bombas ({len(pumps)})"
+    )
+    fmt = col2.selectbox("Formato", available_formats(), format_func=str.upper)
+    compress = col3.checkbox("Comprimir (gzip)", value=False)
+
+    # El archivo se arma al pedirlo (y queda cacheado por versión del catálogo)
+    request = (table, fmt, compress)
+    if st.button("⚙️ Preparar archivo", use_container_width=True):
+        st.session_state["export_request"] = request
+    if st.session_state.get("export_request") == request:
+        try:
+            data = get_export(table, fmt, compress)
+        except ValueError as e:
+            st.error(str(e))
+            return
         st.download_button(
-            label="📥 Descargar Errores (CSV)",
-            data=csv_errors,
-            file_name="sibic_errores.csv",
-            mime="text/csv",
+            label=f"📥 Descargar {export_filename(table, fmt, compress)} ({len(data) / 1024:,.0f} KB)",
+            data=data,
+            file_name=export_filename(table, fmt, compress),
+            mime=export_mime(fmt, compress),
             use_container_width=True
         )
-        st.caption(f"{len(all_errors)} errores en total")
+
+    st.markdown("---")
+    st.subheader("JSON Completo")
     
-    with col2:
-        st.subheader("Datos de Bombas")
-        # Crear CSV de bombas
-        csv_pumps = "ID,Marca,Modelo,Tipo,Rango Flujo,Batería,Cantidad Errores\n"
-        for p in pumps:
-            specs = p.get("specs_tecnicas", {})
-            n_errors = len(p.get("errores_y_alarmas", []))
-            csv_pumps += f'"{p["id"]}","{p["marca"]}","{p["modelo"]}","{p["tipo"]}","{specs.get("rango_flujo", "")}","{specs.get("bateria", "")}",{n_errors}\n'
-        
+    if st.button("⚙️ Preparar base completa (JSON)", use_container_width=True):
+        st.session_state["export_json"] = True
+    if st.session_state.get("export_json"):
         st.download_button(
-            label="📥 Descargar Bombas (CSV)",
-            data=csv_pumps,
-            file_name="sibic_bombas.csv",
-            mime="text/csv",
+            label="📥 Descargar Base de Datos Completa (JSON)",
+            data=_cached_catalog_json(get_catalog(PUMPS_DB_PATH).version, pumps),
+            file_name="pumps_db_export.json",
+            mime="application/json",
             use_container_width=True
         )
-        st.caption(f"{len(pumps)} bombas en total")
-    
-    st.markdown("---")
-    st.subheader("JSON Completo")
-    
-    import json as json_module
-    st.download_button(
-        label="📥 Descargar Base de Datos Completa (JSON)",
-        data=json_module.dumps(pumps, indent=2, ensure_ascii=False),
-        file_name="pumps_db_export.json",
-        mime="application/json",
-        use_container_width=True
-    )
+
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def _cached_catalog_json(version: str, _pumps):
+    """pumps_db completo en JSON, una vez por versión del catálogo"""
+    return json.dumps(_pumps, indent=2, ensure_ascii=False)
 
 
 # ============================================================
@@ -654,6 +749,25 @@ def render_users_section():
     
     st.markdown("---")
     
+    # Usuarios activos (rollups incrementales del log de actividad)
+    st.subheader("📈 Usuarios Activos")
+    activity = get_activity_summary()
+    col1, col2 = st.columns(2)
+    col1.metric("Activos hoy (DAU)", activity["dau"])
+    col2.metric("Activos esta semana (WAU)", activity["wau"])
+    
+    col_day, col_week = st.columns(2)
+    with col_day:
+        st.caption("Últimos 14 días")
+        daily = get_active_user_rollups("day", limit=14)
+        st.bar_chart({r["period_start"]: r["active_users"] for r in reversed(daily)})
+    with col_week:
+        st.caption("Últimas 8 semanas")
+        weekly = get_active_user_rollups("week", limit=8)
+        st.bar_chart({r["period_start"]: r["active_users"] for r in reversed(weekly)})
+    
+    st.markdown("---")
+    
     # Tabla de usuarios
     st.subheader("📋 Lista de Usuarios")
     
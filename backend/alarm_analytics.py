@@ -0,0 +1,508 @@
+"""
+Analítica de Ocurrencias de Alarmas
+Simulador BIC Lankamar
+
+Ingiere logs de alarmas exportados por las bombas (CSV o JSONL, opcionalmente
+.gz) en streaming, con memoria acotada, y mantiene en SQLite un rollup
+incremental por hora, bomba, código y sala (alarm_hourly). Sobre ese rollup
+se consultan los agregados por bomba, categoría, prioridad, sala y hora.
+
+Formato esperado (una alarma por línea/fila; se aceptan alias de columnas):
+    timestamp  ISO 8601 ("2026-10-19T14:03:11", "...-03:00") o epoch (s/ms)
+    device     ID, nombre o modelo de la bomba ("Plum 360")
+    code       Código crudo de la alarma ("E301", "occ-in")
+    ward       Sala o servicio (opcional)
+
+Todas las horas del rollup están en UTC: los ISO con zona se convierten,
+los ISO sin zona se toman como UTC y los epoch son UTC por definición.
+
+Las líneas se agrupan primero por (hora, dispositivo, código, sala) crudos;
+cada clave distinta se resuelve contra el catálogo una sola vez por lote
+(alarm_resolver.py). El avance de cada archivo se guarda en la misma
+transacción que el rollup: una ingesta interrumpida o un log que sigue
+creciendo se retoma desde el último byte procesado sin contar dos veces.
+
+Uso:
+    python alarm_analytics.py logs/uti_2026-10.jsonl logs/guardia.csv.gz
+"""
+
+import csv
+import gzip
+import io
+import json
+import sys
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from alarm_resolver import get_resolver, normalize_code
+from db import ensure_schema, get_conn, run_with_busy_retry
+
+
+# ============================================================
+# CONFIGURACIÓN
+# ============================================================
+
+# Claves crudas distintas acumuladas antes de escribir un lote
+MAX_PENDING_KEYS = 100_000
+
+# Bytes leídos por bloque de líneas
+BLOCK_BYTES = 1 << 20
+
+# Alias aceptados para cada campo (CSV: encabezado; JSONL: claves)
+TIME_FIELDS = ("timestamp", "ts", "time", "fecha", "datetime")
+DEVICE_FIELDS = ("device", "device_id", "pump", "pump_id", "bomba")
+CODE_FIELDS = ("code", "alarm", "alarm_code", "codigo", "codigo_pantalla")
+WARD_FIELDS = ("ward", "unit", "sala", "servicio", "area")
+
+# Dimensiones consultables → expresión SQL sobre alarm_hourly
+ROLLUP_DIMENSIONS = {
+    "pump_id": "pump_id",
+    "categoria": "categoria",
+    "prioridad": "prioridad",
+    "ward": "ward",
+    "hour": "hour",
+    "day": "substr(hour, 1, 10)",
+    "hour_of_day": "substr(hour, 12, 2)",
+}
+
+UNKNOWN = "desconocida"
+
+Event = Tuple[str, str, str, str]  # (hora, dispositivo, código, sala)
+
+
+# ============================================================
+# LECTURA EN STREAMING
+# ============================================================
+
+def _iso_offset(value: str) -> str:
+    """Zona de un ISO como '+HH:MM' ('Z' → '+00:00'); '' si no tiene"""
+    if value.endswith("Z"):
+        return "+00:00"
+    i = max(value.rfind("+"), value.rfind("-"))
+    if i <= 10:
+        return ""
+    offset = value[i:]
+    return f"{offset[:3]}:{offset[3:]}" if len(offset) == 5 else offset
+
+
+def _iso_hour(value: str) -> Optional[str]:
+    offset = _iso_offset(value)
+    if not offset:  # Sin zona: se toma como UTC
+        return f"{value[:10]}T{value[11:13]}"
+    minutes = value[14:16] if len(value) >= 16 and value[13] == ":" else "00"
+    try:
+        moment = datetime.fromisoformat(f"{value[:10]}T{value[11:13]}:{minutes}{offset}")
+    except ValueError:
+        return None
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H")
+
+
+def hour_bucket(value) -> Optional[str]:
+    """
+    Hora UTC de un timestamp: '2026-10-19 14:03:11-03:00' / epoch →
+    '2026-10-19T17' (ISO sin zona se toma como UTC; None si no se reconoce)
+    """
+    if isinstance(value, str):
+        value = value.strip()
+        if len(value) >= 13 and value[4] == "-" and value[7] == "-" and value[10] in "T ":
+            return _iso_hour(value)
+        try:
+            value = float(value)
+        except ValueError:
+            return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if value > 1e11:  # milisegundos
+            value /= 1000
+        try:
+            return datetime.fromtimestamp(value, timezone.utc).strftime("%Y-%m-%dT%H")
+        except (OverflowError, OSError, ValueError):
+            return None
+    return None
+
+
+def _raw_hour(value) -> Optional[str]:
+    """
+    Clave de hora barata por línea: el prefijo 'YYYY-MM-DD?HH' de un ISO
+    más su zona (y los minutos si la zona no es de horas enteras), que
+    hour_bucket() pasa a UTC después, una vez por clave distinta
+    """
+    if type(value) is str and len(value) >= 13 and value[4] == "-":
+        if len(value) == 19 and value[13] == ":":  # 'YYYY-MM-DDTHH:MM:SS', sin zona
+            return value[:13]
+        tail = value[13:]
+        if "+" not in tail and "-" not in tail and "Z" not in tail:
+            return value[:13]
+        offset = _iso_offset(value)
+        return value[:16 if offset[-2:] != "00" else 13] + offset
+    return hour_bucket(value)
+
+
+def _open_binary(path: Path):
+    return gzip.open(path, "rb") if path.suffix == ".gz" else open(path, "rb")
+
+
+def _log_format(path: Path) -> str:
+    suffixes = [s.lower() for s in path.suffixes if s.lower() != ".gz"]
+    if suffixes and suffixes[-1] == ".csv":
+        return "csv"
+    if suffixes and suffixes[-1] in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    raise ValueError(f"Formato de log no soportado: {path.name} (usar .csv o .jsonl)")
+
+
+def _pick(record: Dict, fields) -> Optional[object]:
+    for field in fields:
+        value = record.get(field)
+        if value is not None:
+            return value
+    return None
+
+
+def _csv_columns(path: Path, header_line: bytes) -> Tuple[int, Optional[int], int, Optional[int]]:
+    header = [h.strip().lower() for h in next(csv.reader([header_line.decode("utf-8-sig")]), [])]
+    t, d, c, w = (
+        next((header.index(a) for a in aliases if a in header), None)
+        for aliases in (TIME_FIELDS, DEVICE_FIELDS, CODE_FIELDS, WARD_FIELDS)
+    )
+    if t is None or c is None:
+        raise ValueError(f"{path.name}: el encabezado no tiene columnas de hora y código")
+    return t, d, c, w
+
+
+def _parse_csv(lines: List[bytes], cols) -> Tuple[List[Event], int]:
+    t, d, c, w = cols
+    width = max(i for i in cols if i is not None)
+    events, rejected = [], 0
+    for row in csv.reader(io.StringIO(b"".join(lines).decode("utf-8", "replace"))):
+        if len(row) <= width:
+            rejected += 1
+            continue
+        hour, code = _raw_hour(row[t]), row[c].strip()
+        if hour is None or not code:
+            rejected += 1
+            continue
+        events.append((
+            hour,
+            row[d].strip() if d is not None else "",
+            code,
+            row[w].strip() if w is not None else "",
+        ))
+    return events, rejected
+
+
+_json_decoder = json.JSONDecoder()
+
+
+def _parse_jsonl(lines: List[bytes], keys: Dict[str, str]) -> Tuple[List[Event], int]:
+    """keys: nombre de campo detectado en el primer registro (se completa al vuelo)"""
+    loads = _json_decoder.decode
+    events, rejected = [], 0
+    for line in b"".join(lines).decode("utf-8", "replace").split("\n"):
+        if not line.strip():
+            continue
+        try:
+            record = loads(line)
+        except ValueError:
+            rejected += 1
+            continue
+        if type(record) is not dict:
+            rejected += 1
+            continue
+        if not keys:
+            for name, aliases in (("time", TIME_FIELDS), ("device", DEVICE_FIELDS),
+                                  ("code", CODE_FIELDS), ("ward", WARD_FIELDS)):
+                keys[name] = next((a for a in aliases if a in record), aliases[0])
+
+        ts = record.get(keys["time"])
+        code = record.get(keys["code"])
+        if ts is None or code is None:  # Registro con otros nombres de campo
+            ts, code = _pick(record, TIME_FIELDS), _pick(record, CODE_FIELDS)
+        hour = _raw_hour(ts)
+        code = str(code).strip() if code is not None else ""
+        if hour is None or not code:
+            rejected += 1
+            continue
+        device = record.get(keys["device"])
+        if device is None:
+            device = _pick(record, DEVICE_FIELDS)
+        ward = record.get(keys["ward"])
+        if ward is None:
+            ward = _pick(record, WARD_FIELDS)
+        events.append((
+            hour,
+            str(device).strip() if device is not None else "",
+            code,
+            str(ward).strip() if ward is not None else "",
+        ))
+    return events, rejected
+
+
+def iter_log_batches(path: Path, start: int = 0,
+                     block_bytes: int = BLOCK_BYTES) -> Iterator[Tuple[int, List[Event], int]]:
+    """
+    Recorre un log de alarmas por bloques, con memoria acotada
+
+    Solo se procesan líneas completas (un registro por línea): una última
+    línea sin salto (el log se está escribiendo) queda para la próxima vez.
+
+    Args:
+        path: Archivo .csv / .jsonl (opcionalmente .gz)
+        start: Byte (sin comprimir) desde donde retomar
+        block_bytes: Tamaño aproximado de cada bloque leído
+
+    Yields:
+        (offset, eventos, rechazadas): offset al final del bloque, eventos
+        (hora cruda, dispositivo, código, sala) y líneas no interpretables
+    """
+    path = Path(path)
+    fmt = _log_format(path)
+
+    with _open_binary(path) as f:
+        if fmt == "csv":
+            header_line = f.readline()
+            cols = _csv_columns(path, header_line)
+            start = max(start, len(header_line))
+        else:
+            keys: Dict[str, str] = {}
+        f.seek(start)
+        offset = start
+
+        while True:
+            lines = f.readlines(block_bytes)
+            if not lines:
+                return
+            at_end = not lines[-1].endswith(b"\n")
+            if at_end:
+                lines.pop()
+            offset += sum(map(len, lines))
+            if fmt == "csv":
+                events, rejected = _parse_csv(lines, cols)
+            else:
+                events, rejected = _parse_jsonl(lines, keys)
+            yield offset, events, rejected
+            if at_end:
+                return
+
+
+# ============================================================
+# INGESTA
+# ============================================================
+
+def _get_ingest(source: str) -> Optional[Dict]:
+    with get_conn() as conn:
+        row = conn.execute("SELECT * FROM alarm_log_ingests WHERE source = ?", (source,)).fetchone()
+    return dict(row) if row else None
+
+
+def _resume_offset(path: Path, previous: Optional[Dict], size: int, mtime_ns: int) -> Optional[int]:
+    """Byte desde donde retomar; None si el archivo ya se ingirió completo y no cambió"""
+    if previous is None:
+        return 0
+    complete = previous["mtime_ns"] != 0
+    if complete and previous["size_bytes"] == size and previous["mtime_ns"] == mtime_ns:
+        return None
+    if path.suffix == ".gz":
+        if complete:
+            raise ValueError(f"{path.name}: el log comprimido cambió desde su ingesta")
+        return previous["offset_bytes"]
+    if size < previous["offset_bytes"]:
+        raise ValueError(f"{path.name}: el log es más corto que lo ya ingerido (¿fue rotado?)")
+    return previous["offset_bytes"]
+
+
+def _write_batch(source: str, pending: Counter, offset: int,
+                 stamp: Tuple[int, int], rejected: int) -> Tuple[int, int, int]:
+    """Resuelve las claves crudas y suma el lote al rollup (una transacción)"""
+    resolver = get_resolver()
+    keys = list(pending)
+    resolved = resolver.resolve_many((device, code) for _, device, code, _ in keys)
+
+    rows: Counter = Counter()
+    unmatched = 0
+    for (raw_hour, device, code, ward), result in zip(keys, resolved):
+        count = pending[(raw_hour, device, code, ward)]
+        hour = hour_bucket(raw_hour)
+        if hour is None:
+            rejected += count
+            continue
+        if result["match"] == "none":
+            unmatched += count
+            pump_id = resolver.resolve_device(device) or ""
+            rows[(hour, pump_id, normalize_code(code), ward, UNKNOWN, UNKNOWN)] += count
+        else:
+            rows[(hour, result["pump_id"], result["codigo"], ward,
+                  result["categoria"], result["prioridad"])] += count
+    events = sum(rows.values())
+
+    def _tx():
+        with get_conn() as conn:
+            conn.executemany(
+                """INSERT INTO alarm_hourly
+                       (hour, pump_id, codigo, ward, categoria, prioridad, occurrences)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(hour, pump_id, codigo, ward) DO UPDATE SET
+                       occurrences = occurrences + excluded.occurrences,
+                       categoria = excluded.categoria,
+                       prioridad = excluded.prioridad""",
+                [key + (count,) for key, count in rows.items()]
+            )
+            conn.execute(
+                """INSERT INTO alarm_log_ingests
+                       (source, offset_bytes, size_bytes, mtime_ns, events, unmatched, rejected)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(source) DO UPDATE SET
+                       offset_bytes = excluded.offset_bytes,
+                       size_bytes = excluded.size_bytes,
+                       mtime_ns = excluded.mtime_ns,
+                       events = events + excluded.events,
+                       unmatched = unmatched + excluded.unmatched,
+                       rejected = rejected + excluded.rejected,
+                       ingested_at = CURRENT_TIMESTAMP""",
+                (source, offset, stamp[0], stamp[1], events, unmatched, rejected)
+            )
+
+    run_with_busy_retry(_tx)
+    return events, unmatched, rejected
+
+
+def ingest_log(path) -> Dict:
+    """
+    Ingiere (o retoma) un log de alarmas y actualiza el rollup
+
+    Returns:
+        Dict {source, skipped, events, unmatched, rejected, bytes}
+    """
+    path = Path(path).resolve()
+    source = str(path)
+    stat = path.stat()
+    ensure_schema()
+
+    start = _resume_offset(path, _get_ingest(source), stat.st_size, stat.st_mtime_ns)
+    summary = {"source": source, "skipped": start is None,
+               "events": 0, "unmatched": 0, "rejected": 0, "bytes": 0}
+    if start is None:
+        return summary
+
+    pending: Counter = Counter()
+    rejected = 0
+    offset = start
+    # Los lotes intermedios se marcan incompletos (mtime 0) para poder retomarlos
+    partial = (0, 0)
+
+    def write(stamp):
+        totals = _write_batch(source, pending, offset, stamp, rejected)
+        for name, value in zip(("events", "unmatched", "rejected"), totals):
+            summary[name] += value
+        pending.clear()
+
+    for offset, events, block_rejected in iter_log_batches(path, start):
+        pending.update(events)
+        rejected += block_rejected
+        if len(pending) >= MAX_PENDING_KEYS:
+            write(partial)
+            rejected = 0
+
+    write((stat.st_size, stat.st_mtime_ns))
+    summary["bytes"] = offset - start
+    return summary
+
+
+# ============================================================
+# CONSULTAS
+# ============================================================
+
+def _since_hour(days: float, now: Optional[datetime] = None) -> str:
+    return ((now or datetime.utcnow()) - timedelta(days=days)).strftime("%Y-%m-%dT%H")
+
+
+def get_top_alarms(days: float = 7, limit: int = 10, ward: Optional[str] = None,
+                   now: Optional[datetime] = None) -> List[Dict]:
+    """
+    Alarmas más frecuentes de los últimos `days` días
+
+    Returns:
+        Lista de dicts {pump_id, pump_name, codigo, significado, categoria,
+        prioridad, occurrences}, de mayor a menor
+    """
+    ensure_schema()
+    sql = """SELECT pump_id, codigo, categoria, prioridad, SUM(occurrences) AS occurrences
+             FROM alarm_hourly WHERE hour >= ?"""
+    params: list = [_since_hour(days, now)]
+    if ward:
+        sql += " AND ward = ?"
+        params.append(ward)
+    sql += " GROUP BY pump_id, codigo ORDER BY occurrences DESC LIMIT ?"
+    params.append(limit)
+
+    with get_conn() as conn:
+        rows = [dict(row) for row in conn.execute(sql, params).fetchall()]
+
+    resolver = get_resolver()
+    for row in rows:
+        pump = resolver.pumps_by_id.get(row["pump_id"])
+        alarm = resolver.codes.get(row["pump_id"], {}).get(normalize_code(row["codigo"]))
+        row["pump_name"] = f"{pump['marca']} {pump['modelo']}" if pump else (row["pump_id"] or UNKNOWN)
+        row["significado"] = alarm["significado"] if alarm else ""
+    return rows
+
+
+def get_alarm_rollup(dimension: str, days: float = 7, ward: Optional[str] = None,
+                     now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Ocurrencias de los últimos `days` días agrupadas por una dimensión
+
+    Args:
+        dimension: pump_id, categoria, prioridad, ward, hour, day u hour_of_day
+
+    Returns:
+        Dict valor → ocurrencias (ordenado por valor)
+    """
+    if dimension not in ROLLUP_DIMENSIONS:
+        raise ValueError(f"Dimensión inválida: {dimension}. Opciones: {', '.join(ROLLUP_DIMENSIONS)}")
+
+    ensure_schema()
+    expr = ROLLUP_DIMENSIONS[dimension]
+    sql = f"SELECT {expr} AS value, SUM(occurrences) FROM alarm_hourly WHERE hour >= ?"
+    params: list = [_since_hour(days, now)]
+    if ward:
+        sql += " AND ward = ?"
+        params.append(ward)
+    sql += " GROUP BY value ORDER BY value"
+
+    with get_conn() as conn:
+        return {row[0]: row[1] for row in conn.execute(sql, params).fetchall()}
+
+
+def list_wards() -> List[str]:
+    """Salas presentes en el rollup"""
+    ensure_schema()
+    with get_conn() as conn:
+        rows = conn.execute("SELECT DISTINCT ward FROM alarm_hourly WHERE ward != '' ORDER BY ward")
+        return [row[0] for row in rows.fetchall()]
+
+
+def list_ingests() -> List[Dict]:
+    """Archivos de log ingeridos, del más reciente al más antiguo"""
+    ensure_schema()
+    with get_conn() as conn:
+        cursor = conn.execute(
+            """SELECT source, events, unmatched, rejected, offset_bytes, mtime_ns != 0 AS complete,
+                      ingested_at
+               FROM alarm_log_ingests ORDER BY ingested_at DESC"""
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python alarm_analytics.py <log.csv|log.jsonl[.gz]> [...]")
+        raise SystemExit(1)
+    for arg in sys.argv[1:]:
+        result = ingest_log(arg)
+        if result["skipped"]:
+            print(f"⏭️  {arg}: sin cambios desde la última ingesta")
+        else:
+            print(f"✅ {arg}: {result['events']} eventos, {result['unmatched']} sin resolver, "
+                  f"{result['rejected']} líneas rechazadas")
@@ -0,0 +1,241 @@
+"""
+Resolución Masiva de Códigos de Alarma
+Simulador BIC Lankamar
+
+Traduce pares (dispositivo, código crudo) de los logs de eventos de las
+bombas ("E301", "N58", "OCC_IN", "DOWNSTREAM OCCLUSION") a significado,
+prioridad, acción correctiva y video tag, usando un índice unificado de
+pumps_db.json y los archivos de alarmas de fabricante.
+
+Orden de resolución para cada par:
+1. exact:     código normalizado del dispositivo
+2. text:      texto de la alarma normalizado (ej: "Low battery")
+3. fuzzy:     código/texto parecido del mismo dispositivo (difflib)
+4. code_only: dispositivo desconocido pero código presente en otro
+5. none:      sin coincidencia
+
+Los resultados se memorizan en dos niveles: por par crudo (en un log los
+mismos códigos se repiten miles de veces y cada repetición cuesta una
+búsqueda en dict) y por (bomba, código normalizado), de modo que
+"Plum 360"/"e301" y "icu_medical_plum360"/"E301" resuelven una sola vez.
+"""
+
+import difflib
+import re
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from catalog import get_catalog, get_device_alarms
+
+# Similitud mínima (0-1) para aceptar una coincidencia aproximada
+FUZZY_CUTOFF = 0.72
+
+# Tope de pares memorizados (los logs pueden traer basura muy variada)
+MAX_CACHE_ENTRIES = 200_000
+
+_NON_ALNUM = re.compile(r"[^A-Z0-9]+")
+
+
+def normalize_code(raw: str) -> str:
+    """'err 1: oclusión' → 'ERR 1 OCLUSION' (sin acentos ni signos)"""
+    text = unicodedata.normalize("NFKD", str(raw)).encode("ascii", "ignore").decode("ascii")
+    return _NON_ALNUM.sub(" ", text.upper()).strip()
+
+
+def _result(alarm: Dict, pump: Dict, match: str, score: float) -> Dict:
+    return {
+        "pump_id": pump["id"],
+        "pump_name": f"{pump['marca']} {pump['modelo']}",
+        "codigo": alarm["codigo_pantalla"],
+        "significado": alarm["significado"],
+        "prioridad": alarm.get("prioridad", "media"),
+        "categoria": alarm.get("categoria", "general"),
+        "accion_correctiva": alarm.get("accion_correctiva", ""),
+        "video_tag": alarm.get("video_tag"),
+        "match": match,
+        "score": score,
+    }
+
+
+_NO_MATCH = {
+    "pump_id": None, "pump_name": None, "codigo": None, "significado": None,
+    "prioridad": None, "categoria": None, "accion_correctiva": None,
+    "video_tag": None, "match": "none", "score": 0.0,
+}
+
+
+class AlarmResolver:
+    """
+    Índice unificado de alarmas para resolución por lotes.
+
+    Los dicts devueltos son compartidos entre llamadas: no modificarlos.
+    """
+
+    def __init__(self, pumps: Sequence[Dict]):
+        self.pumps_by_id: Dict[str, Dict] = {}
+        self.device_aliases: Dict[str, str] = {}
+        self.codes: Dict[str, Dict[str, Dict]] = {}   # pump_id → código norm → alarma
+        self.texts: Dict[str, Dict[str, Dict]] = {}   # pump_id → texto norm → alarma
+        self.global_codes: Dict[str, List[Tuple[Dict, Dict]]] = {}
+        self._cache: Dict[Tuple[str, str], Dict] = {}
+        self._device_cache: Dict[str, Optional[str]] = {}
+        self._norm_cache: Dict[Tuple[Optional[str], str], Dict] = {}
+        self._lock = threading.Lock()
+
+        for pump in pumps:
+            pump_id = pump["id"]
+            if pump_id in self.pumps_by_id:
+                continue  # pumps_db.json tiene prioridad
+            self.pumps_by_id[pump_id] = pump
+            for alias in (pump_id, f"{pump['marca']} {pump['modelo']}", pump["modelo"]):
+                self.device_aliases.setdefault(normalize_code(alias), pump_id)
+
+            codes, texts = {}, {}
+            for alarm in pump.get("errores_y_alarmas", []):
+                code = normalize_code(alarm["codigo_pantalla"])
+                codes.setdefault(code, alarm)
+                texts.setdefault(normalize_code(alarm["significado"]), alarm)
+                self.global_codes.setdefault(code, []).append((alarm, pump))
+            self.codes[pump_id] = codes
+            self.texts[pump_id] = texts
+
+    # ------------------------------------------------------------
+    # Dispositivos
+    # ------------------------------------------------------------
+
+    def resolve_device(self, device: str) -> Optional[str]:
+        """ID de bomba para un nombre/ID de dispositivo (exacto o parcial)"""
+        try:
+            return self._device_cache[device]
+        except KeyError:
+            pump_id = self._device_cache[device] = self._match_device(device)
+            return pump_id
+
+    def _match_device(self, device: str) -> Optional[str]:
+        norm = normalize_code(device)
+        if not norm:
+            return None
+        pump_id = self.device_aliases.get(norm)
+        if pump_id:
+            return pump_id
+        # Parcial: "Alaris" → "BD ALARIS SYSTEM", "Plum 360 LVP" → "PLUM 360"
+        best = None
+        for alias, candidate in self.device_aliases.items():
+            if norm in alias or alias in norm:
+                if best is None or len(alias) > len(best[0]):
+                    best = (alias, candidate)
+        return best[1] if best else None
+
+    # ------------------------------------------------------------
+    # Códigos
+    # ------------------------------------------------------------
+
+    def _resolve_uncached(self, device: str, code: str) -> Dict:
+        pump_id = self.resolve_device(device) if device else None
+        key = (pump_id, normalize_code(code))
+        result = self._norm_cache.get(key)
+        if result is None:
+            result = self._norm_cache[key] = self._resolve_normalized(*key)
+        return result
+
+    def _resolve_normalized(self, pump_id: Optional[str], norm: str) -> Dict:
+        if pump_id:
+            pump = self.pumps_by_id[pump_id]
+            alarm = self.codes[pump_id].get(norm)
+            if alarm:
+                return _result(alarm, pump, "exact", 1.0)
+            alarm = self.texts[pump_id].get(norm)
+            if alarm:
+                return _result(alarm, pump, "text", 1.0)
+            fuzzy = self._fuzzy(pump_id, norm)
+            if fuzzy:
+                return fuzzy
+
+        candidates = self.global_codes.get(norm)
+        if candidates:
+            alarm, pump = candidates[0]
+            return _result(alarm, pump, "code_only", 1.0 / len(candidates))
+
+        return _NO_MATCH
+
+    def _fuzzy(self, pump_id: str, norm: str) -> Optional[Dict]:
+        if not norm:
+            return None
+        pump = self.pumps_by_id[pump_id]
+        keys = {**self.texts[pump_id], **self.codes[pump_id]}
+
+        # Contención: "DOWNSTREAM OCCLUSION DETECTED" ⊃ "DOWNSTREAM OCCLUSION"
+        contained = [k for k in keys if len(k) >= 3 and (k in norm or norm in k)]
+        if contained:
+            key = max(contained, key=len)
+            score = min(len(key), len(norm)) / max(len(key), len(norm))
+            if score >= FUZZY_CUTOFF / 2:
+                return _result(keys[key], pump, "fuzzy", round(score, 3))
+
+        close = difflib.get_close_matches(norm, list(keys), n=1, cutoff=FUZZY_CUTOFF)
+        if close:
+            score = difflib.SequenceMatcher(None, norm, close[0]).ratio()
+            return _result(keys[close[0]], pump, "fuzzy", round(score, 3))
+        return None
+
+    def resolve(self, device: str, code: str) -> Dict:
+        """Resuelve un par (dispositivo, código crudo)"""
+        key = (device, code)
+        result = self._cache.get(key)
+        if result is None:
+            result = self._resolve_uncached(device or "", code or "")
+            with self._lock:
+                if len(self._cache) >= MAX_CACHE_ENTRIES:
+                    self._cache.clear()
+                    self._device_cache.clear()
+                    self._norm_cache.clear()
+                self._cache[key] = result
+        return result
+
+    def resolve_many(self, pairs: Iterable[Tuple[str, str]]) -> List[Dict]:
+        """Resuelve una secuencia de pares en una sola pasada"""
+        cache = self._cache
+        resolve = self.resolve
+        out = []
+        append = out.append
+        for pair in pairs:
+            result = cache.get(pair)
+            append(result if result is not None else resolve(pair[0], pair[1]))
+        return out
+
+
+_resolver_lock = threading.Lock()
+_resolver: Optional[Tuple[tuple, AlarmResolver]] = None
+
+
+def get_resolver() -> AlarmResolver:
+    """Resolver compartido; se reconstruye si cambia el catálogo o los archivos de fabricante"""
+    global _resolver
+    catalog = get_catalog()
+    devices = get_device_alarms()
+    key = (catalog.version, id(devices))
+    if _resolver and _resolver[0] == key:
+        return _resolver[1]
+    with _resolver_lock:
+        if not (_resolver and _resolver[0] == key):
+            _resolver = (key, AlarmResolver(list(catalog.pumps) + list(devices)))
+        return _resolver[1]
+
+
+def resolve_alarm_codes(pairs: Iterable[Tuple[str, str]]) -> List[Dict]:
+    """
+    Resuelve pares (dispositivo, código crudo) contra el catálogo unificado
+
+    Args:
+        pairs: Iterable de tuplas (dispositivo, código). El dispositivo
+               puede ser el ID ("icu_medical_plum360"), el nombre o el
+               modelo ("Plum 360"); vacío si no se conoce.
+
+    Returns:
+        Lista de dicts (mismo orden) con pump_id, codigo, significado,
+        prioridad, categoria, accion_correctiva, video_tag, match y score
+    """
+    return get_resolver().resolve_many(
+        pair if isinstance(pair, tuple) else tuple(pair) for pair in pairs
+    )
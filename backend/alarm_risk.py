@@ -0,0 +1,294 @@
+"""
+Estimador Monte Carlo de Riesgo de Alarmas (oclusión y aire)
+Simulador BIC Lankamar
+
+Compara bombas según cuándo disparan DOWNSTREAM OCCLUSION y AIR IN LINE
+con sus umbrales (umbrales.oclusion_mmhg, umbrales.aire_ml,
+sensibilidad_aire), muestreando condiciones de paciente y línea en arrays:
+
+Oclusión distal completa
+    Tiempo hasta la alarma = (umbral - presión basal) × compliance / flujo.
+    La presión basal depende de la contrapresión del paciente y del flujo;
+    si ya supera el umbral la alarma es inmediata (falsa alarma).
+    También se estima el bolo retenido en la línea al liberar la oclusión.
+
+Aire en línea
+    Burbujas como proceso de Poisson con tasa y tamaño medio por ensayo;
+    alarma por burbuja única >= sensibilidad o por aire acumulado en la
+    ventana del umbral. Sin alarma dentro del horizonte = censurado.
+
+Los ensayos se dividen en bloques con semillas derivadas de una sola
+SeedSequence, de modo que el resultado depende de (seed, trials) y no de
+la cantidad de procesos. Los resultados se guardan en SQLite con clave
+hash de specs + parámetros.
+
+Uso:
+    from alarm_risk import estimate_alarm_risk, compare_pumps
+    estimate_alarm_risk("baxter_sigma_spectrum", occlusion_level=0.5)
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from catalog import get_catalog, pump_specs
+from db import ensure_schema, get_conn, run_with_busy_retry
+from infusion_sim import LINE_RESISTANCE_MMHG_PER_ML_H
+
+
+# ============================================================
+# CONFIGURACIÓN
+# ============================================================
+
+# Cambiar al modificar el modelo: invalida el caché
+MODEL_VERSION = 1
+
+# Ensayos por bloque (unidad de trabajo de cada proceso y de cada semilla)
+CHUNK_TRIALS = 125_000
+
+# Tope de burbujas simuladas por ensayo
+MAX_BUBBLES = 10_000
+
+# Condiciones de paciente y línea (distribuciones de muestreo)
+DEFAULT_CONDITIONS = {
+    "flow_ml_h": [1.0, 500.0],             # log-uniforme [mín, máx], recortado al rango de la bomba
+    "compliance_ul_mmhg": [1.0, 0.5],      # lognormal [mediana, sigma]
+    "back_pressure_mmhg": [10.0, 5.0],     # normal [media, desvío], >= 0
+    "bubble_rate_per_h": [0.5, 1.0],       # lognormal [mediana, sigma]
+    "bubble_ml": [0.02, 0.8],              # lognormal [mediana, sigma] del tamaño medio
+    "horizon_h": 24.0,                     # Horizonte de observación del aire
+}
+
+QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+
+# ============================================================
+# MUESTREO (una llamada por bloque, en el proceso que toque)
+# ============================================================
+
+def _simulate_chunk(specs: Dict, occlusion_threshold: float, conditions: Dict,
+                    trials: int, seed: np.random.SeedSequence) -> Dict[str, np.ndarray]:
+    """Simula un bloque de ensayos; devuelve tiempos en minutos (float32)"""
+    rng = np.random.default_rng(seed)
+
+    # --- Oclusión ---
+    lo, hi = conditions["flow_ml_h"]
+    lo, hi = max(lo, specs["rate_min"]), min(hi, specs["rate_max"])
+    flow = np.exp(rng.uniform(np.log(lo), np.log(hi), trials))
+    median, sigma = conditions["compliance_ul_mmhg"]
+    compliance_ml = rng.lognormal(np.log(median), sigma, trials) / 1000
+    mean, sd = conditions["back_pressure_mmhg"]
+    baseline = np.maximum(rng.normal(mean, sd, trials), 0) + LINE_RESISTANCE_MMHG_PER_ML_H * flow
+
+    headroom = np.maximum(occlusion_threshold - baseline, 0)
+    bolus_ml = headroom * compliance_ml
+    occlusion_min = bolus_ml / flow * 60
+
+    # --- Aire ---
+    median, sigma = conditions["bubble_rate_per_h"]
+    rate_per_s = rng.lognormal(np.log(median), sigma, trials) / 3600
+    median, sigma = conditions["bubble_ml"]
+    mean_bubble = rng.lognormal(np.log(median), sigma, trials)
+    horizon_s = conditions["horizon_h"] * 3600
+
+    air_min = np.full(trials, np.inf)
+    t = np.zeros(trials)
+    accum = np.zeros(trials)
+    active = np.arange(trials)
+    for _ in range(MAX_BUBBLES):
+        if not active.size:
+            break
+        gap = rng.exponential(1 / rate_per_s[active])
+        t[active] += gap
+        size = rng.exponential(mean_bubble[active])
+        accum[active] = accum[active] * np.exp(-gap / specs["air_window_s"]) + size
+        hit = (size >= specs["bubble_ml"]) | (accum[active] >= specs["air_accum_ml"])
+        hit &= t[active] <= horizon_s
+        air_min[active[hit]] = t[active[hit]] / 60
+        active = active[~hit & (t[active] <= horizon_s)]
+
+    return {
+        "occlusion_min": occlusion_min.astype(np.float32),
+        "bolus_ml": bolus_ml.astype(np.float32),
+        "false_alarm": int((headroom == 0).sum()),
+        "air_min": air_min.astype(np.float32),
+    }
+
+
+def _chunks(trials: int, seed: int):
+    sizes = [CHUNK_TRIALS] * (trials // CHUNK_TRIALS)
+    if trials % CHUNK_TRIALS:
+        sizes.append(trials % CHUNK_TRIALS)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    return list(zip(sizes, seeds))
+
+
+def _quantiles(values: np.ndarray) -> Dict[str, Optional[float]]:
+    finite = values[np.isfinite(values)]
+    if not finite.size:
+        return {f"p{int(q * 100):02d}": None for q in QUANTILES}
+    points = np.quantile(finite, QUANTILES)
+    return {f"p{int(q * 100):02d}": round(float(v), 3) for q, v in zip(QUANTILES, points)}
+
+
+# ============================================================
+# CACHÉ
+# ============================================================
+
+def _cache_key(params: Dict) -> str:
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _cache_get(key: str) -> Optional[Dict]:
+    ensure_schema()
+    with get_conn() as conn:
+        row = conn.execute("SELECT result FROM alarm_risk_cache WHERE cache_key = ?", (key,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def _cache_put(key: str, pump_id: str, params: Dict, result: Dict):
+    def _tx():
+        with get_conn() as conn:
+            conn.execute(
+                """INSERT OR REPLACE INTO alarm_risk_cache (cache_key, pump_id, params, result)
+                   VALUES (?, ?, ?, ?)""",
+                (key, pump_id, json.dumps(params, default=str), json.dumps(result))
+            )
+    run_with_busy_retry(_tx)
+
+
+def clear_risk_cache() -> int:
+    """Borra los resultados cacheados; devuelve cuántos había"""
+    ensure_schema()
+    with get_conn() as conn:
+        return conn.execute("DELETE FROM alarm_risk_cache").rowcount
+
+
+# ============================================================
+# API
+# ============================================================
+
+def estimate_alarm_risk(
+    pump_id: str,
+    occlusion_level: float = 0.5,
+    trials: int = 1_000_000,
+    seed: int = 0,
+    conditions: Optional[Dict] = None,
+    workers: Optional[int] = None,
+    use_cache: bool = True,
+) -> Dict:
+    """
+    Distribución del tiempo hasta la alarma de oclusión y de aire
+
+    Args:
+        pump_id: ID de la bomba en pumps_db.json
+        occlusion_level: 0 = umbral de oclusión mínimo configurable, 1 = máximo
+        trials: Cantidad de ensayos
+        seed: Semilla (mismo seed + trials → mismo resultado)
+        conditions: Reemplazos sobre DEFAULT_CONDITIONS
+        workers: Procesos (default: CPUs; 1 = en el proceso actual)
+        use_cache: Leer/escribir el caché de resultados
+
+    Returns:
+        Dict con los umbrales usados, cuantiles en minutos (oclusión, aire),
+        bolo retenido, fracción de falsas alarmas y censurados
+    """
+    if not 0 <= occlusion_level <= 1:
+        raise ValueError("occlusion_level debe estar entre 0 y 1")
+    if trials <= 0:
+        raise ValueError("trials debe ser positivo")
+
+    pump = get_catalog().pumps_by_id.get(pump_id)
+    if pump is None:
+        raise ValueError(f"Bomba no encontrada: {pump_id}")
+    unknown = set(conditions or {}) - set(DEFAULT_CONDITIONS)
+    if unknown:
+        raise ValueError(f"Condiciones desconocidas: {', '.join(sorted(unknown))}")
+
+    specs = pump_specs(pump)
+    conditions = {**DEFAULT_CONDITIONS, **(conditions or {})}
+    lo, hi = conditions["flow_ml_h"]
+    lo, hi = max(lo, specs["rate_min"]), min(hi, specs["rate_max"])
+    if not 0 < lo <= hi:
+        raise ValueError(
+            f"flow_ml_h {conditions['flow_ml_h']} no se superpone con el rango de la bomba "
+            f"({specs['rate_min']:g} - {specs['rate_max']:g} ml/h)"
+        )
+    threshold = specs["occlusion_low"] + occlusion_level * (specs["occlusion_high"] - specs["occlusion_low"])
+
+    params = {
+        "model_version": MODEL_VERSION,
+        "pump_id": pump_id,
+        "specs": specs,
+        "occlusion_level": occlusion_level,
+        "trials": trials,
+        "seed": seed,
+        "chunk_trials": CHUNK_TRIALS,
+        "conditions": conditions,
+    }
+    key = _cache_key(params)
+    if use_cache:
+        cached = _cache_get(key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+    start = time.perf_counter()
+    chunks = _chunks(trials, seed)
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    args = [(specs, threshold, conditions, size, chunk_seed) for size, chunk_seed in chunks]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_simulate_chunk, *zip(*args)))
+    else:
+        parts = [_simulate_chunk(*a) for a in args]
+
+    occlusion = np.concatenate([p["occlusion_min"] for p in parts])
+    bolus = np.concatenate([p["bolus_ml"] for p in parts])
+    air = np.concatenate([p["air_min"] for p in parts])
+    false_alarms = sum(p["false_alarm"] for p in parts)
+
+    result = {
+        "pump_id": pump_id,
+        "pump_name": f"{pump['marca']} {pump['modelo']}",
+        "trials": trials,
+        "seed": seed,
+        "occlusion_level": occlusion_level,
+        "occlusion_threshold_mmhg": round(threshold, 1),
+        "air_bubble_threshold_ml": specs["bubble_ml"],
+        "air_accum_threshold_ml": specs["air_accum_ml"] if np.isfinite(specs["air_accum_ml"]) else None,
+        "occlusion_min": {**_quantiles(occlusion), "mean": round(float(occlusion.mean()), 3)},
+        "occlusion_false_alarm_fraction": false_alarms / trials,
+        "bolus_ml": _quantiles(bolus),
+        "air_min": _quantiles(air),
+        "air_alarm_fraction": float(np.isfinite(air).mean()),
+        "elapsed_s": round(time.perf_counter() - start, 3),
+        "workers": workers,
+    }
+    if use_cache:
+        _cache_put(key, pump_id, params, result)
+    return {**result, "cached": False}
+
+
+def compare_pumps(
+    pump_ids: Optional[Sequence[str]] = None,
+    levels: Sequence[float] = (0.0, 0.5, 1.0),
+    **kwargs
+) -> List[Dict]:
+    """
+    estimate_alarm_risk() para cada bomba y nivel de umbral
+
+    Returns:
+        Lista de resultados (una fila por bomba y nivel)
+    """
+    pump_ids = pump_ids or [p["id"] for p in get_catalog().pumps]
+    return [
+        estimate_alarm_risk(pump_id, occlusion_level=level, **kwargs)
+        for pump_id in pump_ids
+        for level in levels
+    ]
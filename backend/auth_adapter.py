@@ -6,9 +6,12 @@ Este módulo conecta el sistema de auth SQLite con streamlit-authenticator,
 permitiendo usar la librería existente pero con datos desde la base de datos.
 """
 
+import streamlit as st
 import streamlit_authenticator as stauth
-from typing import Tuple, Dict
-from auth_service import list_users, get_user_by_email
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from typing import Tuple, Dict, Optional
+from auth_service import list_users, get_user_by_email, ROLE_MENU_OPTIONS, get_menu_options  # noqa: F401 (re-export)
+from login_throttle import LoginThrottledError, throttle_login, record_login_success
 
 
 def build_credentials_dict() -> Dict:
@@ -48,14 +51,62 @@ def build_credentials_dict() -> Dict:
     return creds
 
 
+def get_client_id() -> Optional[str]:
+    """
+    Identificador del cliente para el límite de intentos por origen
+
+    Usa la primera IP de X-Forwarded-For (el proxy delante de Streamlit);
+    sin proxy cae a la sesión de Streamlit, que un atacante puede renovar
+    reconectándose, así que en ese caso el límite efectivo es el del email.
+    """
+    headers = {}
+    if hasattr(st, "context"):
+        headers = st.context.headers
+    else:
+        try:
+            from streamlit.web.server.websocket_headers import _get_websocket_headers
+            headers = _get_websocket_headers() or {}
+        except ImportError:
+            pass
+    forwarded = headers.get("X-Forwarded-For", "")
+    if forwarded:
+        return "ip:" + forwarded.split(",")[0].strip()
+    ctx = get_script_run_ctx()
+    return f"session:{ctx.session_id}" if ctx else None
+
+
+class ThrottledAuthenticate(stauth.Authenticate):
+    """
+    Authenticate con el limitador de intentos de login_throttle
+
+    streamlit-authenticator verifica bcrypt en _check_credentials; acá se
+    consulta antes el bucket del email y el del cliente, y los intentos
+    en exceso se rechazan sin hashear.
+    """
+
+    def _check_credentials(self, inplace: bool = True) -> bool:
+        try:
+            throttle_login(self.username, get_client_id())
+        except LoginThrottledError as e:
+            st.error(str(e))
+            if inplace:
+                st.session_state["authentication_status"] = False
+            return False
+
+        valid = super()._check_credentials(inplace)
+        if (st.session_state.get("authentication_status") if inplace else valid):
+            record_login_success(self.username)
+        return valid
+
+
 def get_authenticator(
     cookie_name: str = "lankamar_auth",
     cookie_key: str = "lankamar_secret_key_2024_prod",
     cookie_expiry_days: int = 30
-) -> Tuple[stauth.Authenticate, Dict]:
+) -> Tuple[ThrottledAuthenticate, Dict]:
     """
     Crea y retorna el objeto Authenticate de streamlit-authenticator
-    configurado para usar datos de SQLite
+    configurado para usar datos de SQLite y el limitador de intentos
     
     Args:
         cookie_name: Nombre de la cookie de sesión
@@ -67,7 +118,7 @@ def get_authenticator(
     """
     credentials = build_credentials_dict()
     
-    authenticator = stauth.Authenticate(
+    authenticator = ThrottledAuthenticate(
         credentials,
         cookie_name,
         cookie_key,
@@ -98,40 +149,6 @@ def get_user_display_name(username: str, credentials: Dict) -> str:
     return user_data.get("name", username)
 
 
-# Mapeo de roles a opciones de menú
-ROLE_MENU_OPTIONS = {
-    "ceo": [
-        "🔍 Buscar Errores",
-        "📹 Videos",
-        "📊 Estadísticas",
-        "🔧 Validación",
-        "📥 Exportar",
-        "👥 Usuarios",
-        "🎫 Invitaciones"
-    ],
-    "director": [
-        "🔍 Buscar Errores",
-        "📹 Videos",
-        "📊 Estadísticas",
-        "🔧 Validación",
-        "📥 Exportar"
-    ],
-    "jefe_servicio": [
-        "🔍 Buscar Errores",
-        "📊 Estadísticas",
-        "🔧 Validación"
-    ],
-    "usuario": [
-        "🔍 Buscar Errores"
-    ]
-}
-
-
-def get_menu_options(role: str) -> list:
-    """Retorna las opciones de menú disponibles para un rol"""
-    return ROLE_MENU_OPTIONS.get(role, ROLE_MENU_OPTIONS["usuario"])
-
-
 if __name__ == "__main__":
     print("🔌 Test del adaptador de autenticación")
     
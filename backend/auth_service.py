@@ -10,9 +10,16 @@ Funciones para:
 """
 
 import bcrypt
+import sqlite3
+import time
 from datetime import datetime
 from typing import Optional, Dict, List
 from db import get_conn
+from login_throttle import throttle_login, record_login_success, record_hash_cost
+from activity_log import record_login
+
+# Costo de bcrypt (2^rounds iteraciones)
+BCRYPT_ROUNDS = 12
 
 
 # ============================================================
@@ -21,7 +28,7 @@ from db import get_conn
 
 def hash_password(plain: str) -> str:
     """
-    Hashea una contraseña con bcrypt (12 rounds)
+    Hashea una contraseña con bcrypt (BCRYPT_ROUNDS rounds)
     
     Args:
         plain: Contraseña en texto plano
@@ -29,7 +36,7 @@ def hash_password(plain: str) -> str:
     Returns:
         Hash bcrypt como string
     """
-    return bcrypt.hashpw(plain.encode('utf-8'), bcrypt.gensalt(rounds=12)).decode('utf-8')
+    return bcrypt.hashpw(plain.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
 
 
 def verify_password(plain: str, hashed: str) -> bool:
@@ -53,6 +60,30 @@ def verify_password(plain: str, hashed: str) -> bool:
 # FUNCIONES DE USUARIOS
 # ============================================================
 
+def insert_user(
+    conn: sqlite3.Connection,
+    email: str,
+    password_hash: str,
+    role: str = "usuario",
+    name: str = None
+) -> int:
+    """
+    Inserta un usuario usando una conexión ya abierta (sin commit)
+    
+    Permite crear el usuario dentro de una transacción más amplia,
+    por ejemplo al canjear una invitación.
+    
+    Returns:
+        ID del usuario creado
+    """
+    cursor = conn.execute(
+        """INSERT INTO users (email, password_hash, name, role) 
+           VALUES (?, ?, ?, ?)""",
+        (email.lower().strip(), password_hash, name or email.split('@')[0], role)
+    )
+    return cursor.lastrowid
+
+
 def create_user(email: str, password: str, role: str = "usuario", name: str = None) -> int:
     """
     Crea un nuevo usuario con contraseña hasheada
@@ -72,12 +103,7 @@ def create_user(email: str, password: str, role: str = "usuario", name: str = No
     password_hash = hash_password(password)
     
     with get_conn() as conn:
-        cursor = conn.execute(
-            """INSERT INTO users (email, password_hash, name, role) 
-               VALUES (?, ?, ?, ?)""",
-            (email.lower().strip(), password_hash, name or email.split('@')[0], role)
-        )
-        return cursor.lastrowid
+        return insert_user(conn, email, password_hash, role, name)
 
 
 def create_user_with_hash(email: str, password_hash: str, role: str = "usuario", name: str = None) -> int:
@@ -94,12 +120,7 @@ def create_user_with_hash(email: str, password_hash: str, role: str = "usuario",
         ID del usuario creado
     """
     with get_conn() as conn:
-        cursor = conn.execute(
-            """INSERT INTO users (email, password_hash, name, role) 
-               VALUES (?, ?, ?, ?)""",
-            (email.lower().strip(), password_hash, name or email.split('@')[0], role)
-        )
-        return cursor.lastrowid
+        return insert_user(conn, email, password_hash, role, name)
 
 
 def get_user_by_email(email: str) -> Optional[Dict]:
@@ -165,7 +186,11 @@ def update_user_role(user_id: int, new_role: str) -> bool:
 
 
 def update_last_login(user_id: int):
-    """Actualiza la fecha de último login"""
+    """
+    Actualiza la fecha de último login de forma sincrónica
+    
+    El login normal usa activity_log.record_login (escritura diferida).
+    """
     with get_conn() as conn:
         conn.execute(
             "UPDATE users SET last_login_at = ? WHERE id = ?",
@@ -184,28 +209,43 @@ def delete_user(user_id: int) -> bool:
 # FUNCIONES DE AUTENTICACIÓN
 # ============================================================
 
-def authenticate(email: str, password: str) -> Optional[Dict]:
+def authenticate(email: str, password: str, client_id: Optional[str] = None) -> Optional[Dict]:
     """
     Autentica un usuario con email y contraseña
     
+    Antes de verificar bcrypt se consulta el limitador de intentos
+    (login_throttle): los intentos en exceso se rechazan sin hashear.
+    
     Args:
         email: Email del usuario
         password: Contraseña en texto plano
+        client_id: Identificador del cliente (IP, sesión) para el límite por origen
     
     Returns:
         Dict con datos del usuario si las credenciales son válidas,
         None si son inválidas
+    
+    Raises:
+        LoginThrottledError si el email o el cliente excedieron el límite
     """
+    throttle_login(email, client_id)
+    
     user = get_user_by_email(email)
     
     if not user:
         return None
     
-    if not verify_password(password, user["password_hash"]):
+    start = time.process_time()
+    valid = verify_password(password, user["password_hash"])
+    record_hash_cost(time.process_time() - start)
+    
+    if not valid:
         return None
     
-    # Actualizar último login
-    update_last_login(user["id"])
+    record_login_success(email)
+    
+    # Registrar login (escritura diferida: actualiza last_login_at en lote)
+    record_login(user["id"])
     
     # Retornar sin el hash
     del user["password_hash"]
@@ -272,6 +312,50 @@ def user_has_permission(user_role: str, permission: str) -> bool:
     return permission in permisos
 
 
+# Mapeo de roles a opciones de menú
+ROLE_MENU_OPTIONS = {
+    "ceo": [
+        "🔍 Buscar Errores",
+        "📹 Videos",
+        "📊 Estadísticas",
+        "🚨 Alarmas en Sala",
+        "🔋 Autonomía",
+        "⚖️ Comparativa",
+        "🔧 Validación",
+        "📥 Exportar",
+        "👥 Usuarios",
+        "🎫 Invitaciones"
+    ],
+    "director": [
+        "🔍 Buscar Errores",
+        "📹 Videos",
+        "📊 Estadísticas",
+        "🚨 Alarmas en Sala",
+        "🔋 Autonomía",
+        "⚖️ Comparativa",
+        "🔧 Validación",
+        "📥 Exportar"
+    ],
+    "jefe_servicio": [
+        "🔍 Buscar Errores",
+        "📊 Estadísticas",
+        "🔋 Autonomía",
+        "⚖️ Comparativa",
+        "🔧 Validación"
+    ],
+    "usuario": [
+        "🔍 Buscar Errores",
+        "🔋 Autonomía",
+        "⚖️ Comparativa"
+    ]
+}
+
+
+def get_menu_options(role: str) -> list:
+    """Retorna las opciones de menú disponibles para un rol"""
+    return ROLE_MENU_OPTIONS.get(role, ROLE_MENU_OPTIONS["usuario"])
+
+
 if __name__ == "__main__":
     # Test rápido
     print("🔐 Test del servicio de autenticación")
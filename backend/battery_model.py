@@ -0,0 +1,329 @@
+"""
+Modelo de Autonomía de Batería
+Simulador BIC Lankamar
+
+Convierte los textos de energia_bateria de pumps_db.json ("8 horas @ 125
+ml/h", "2-4 horas según carga", "4 horas (0-100%)", "LOW BATTERY") en un
+modelo numérico por bomba y responde la pregunta de enfermería: "¿esta
+bomba aguanta el traslado a 250 ml/h?".
+
+Modelo de consumo
+    La autonomía declarada vale al flujo de referencia (el "@ ml/h" del
+    texto o DEFAULT_REF_RATE_ML_H). El consumo relativo es una parte fija
+    (electrónica, pantalla) más una parte proporcional al flujo (motor):
+
+        consumo(flujo) = BASE_DRAW_FRACTION + (1 - BASE_DRAW_FRACTION) × flujo / ref
+
+    y la autonomía escala con la ley de Peukert según la química:
+
+        horas(flujo, carga) = autonomía × carga × consumo(flujo) ^ -peukert
+
+    Si la autonomía es un rango se toma el mínimo (respuesta conservadora).
+
+Las respuestas salen de una tabla precalculada (bomba × flujo × carga)
+que se arma una vez por versión del catálogo; la consulta es una
+indexación, redondeando el flujo hacia arriba y la carga hacia abajo.
+
+Uso:
+    from battery_model import get_battery_table
+    get_battery_table().lookup("baxter_sigma_spectrum", rate_ml_h=250, charge=0.8)
+"""
+
+import math
+import re
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from alarm_resolver import normalize_code
+from catalog import get_catalog
+
+
+# ============================================================
+# PARÁMETROS DEL MODELO
+# ============================================================
+
+# Flujo al que se asume medida la autonomía si el texto no lo dice
+DEFAULT_REF_RATE_ML_H = 125.0
+
+# Autonomía y recarga si el catálogo no las informa
+DEFAULT_AUTONOMY_H = 4.0
+DEFAULT_RECHARGE_H = 6.0
+
+# Parte del consumo al flujo de referencia que no depende del motor
+BASE_DRAW_FRACTION = 0.6
+
+# Exponente de Peukert por química (más alto = pierde más a alto consumo)
+PEUKERT = {
+    "ion-litio": 1.05,
+    "nimh": 1.15,
+    "plomo-acido": 1.3,
+    "desconocida": 1.15,
+}
+
+# Carga a la que suena la alarma de batería baja
+LOW_BATTERY_FRACTION = 0.2
+
+# Grilla de la tabla precalculada
+RATE_STEP_ML_H = 1.0
+CHARGE_STEPS = 100          # Carga en pasos de 1%
+
+# Palabras clave de alarmas_energia (sobre el texto normalizado)
+ENERGY_ALARM_KEYWORDS = {
+    "empty": ["VERY LOW", "EMPTY", "DEPLETED", "VACIA", "VIDE", "CRIT"],
+    "low": ["LOW", "BAJA", "FAIBLE"],
+    "ac": ["AC", "SECTEUR", "CORRIENTE", "ALIMENTACION", "POWER"],
+}
+
+_HOURS = re.compile(r"(\d+(?:[.,]\d+)?)(?:\s*-\s*(\d+(?:[.,]\d+)?))?\s*h", re.IGNORECASE)
+_REF_RATE = re.compile(r"@\s*(\d+(?:[.,]\d+)?)\s*ml\s*/\s*h", re.IGNORECASE)
+
+
+# ============================================================
+# PARSER
+# ============================================================
+
+def _to_float(text: str) -> float:
+    return float(text.replace(",", "."))
+
+
+def _hours_range(text) -> Optional[Tuple[float, float]]:
+    """'2-4 horas' → (2, 4); '8 horas' → (8, 8); None si no hay horas"""
+    match = _HOURS.search(str(text or ""))
+    if not match:
+        return None
+    low = _to_float(match.group(1))
+    high = _to_float(match.group(2)) if match.group(2) else low
+    return min(low, high), max(low, high)
+
+
+def _chemistry(text: str) -> str:
+    text = normalize_code(text)
+    if "LITIO" in text or "LI ION" in text:
+        return "ion-litio"
+    if "NIMH" in text:
+        return "nimh"
+    if "PLOMO" in text or "SLA" in text.split():
+        return "plomo-acido"
+    return "desconocida"
+
+
+def _classify_energy_alarm(name: str) -> Optional[str]:
+    norm = f" {normalize_code(name)} "
+    for kind, keywords in ENERGY_ALARM_KEYWORDS.items():
+        if any(f" {k} " in norm or (len(k) > 3 and k in norm) for k in keywords):
+            return kind
+    if "BAT" in norm:
+        return "low"
+    return None
+
+
+def parse_battery(pump: Dict) -> Dict:
+    """
+    Modelo numérico de batería de una bomba
+
+    Returns:
+        Dict con pump_id, chemistry, autonomy_h (mínimo declarado),
+        autonomy_max_h, ref_rate_ml_h, recharge_h (máximo declarado),
+        peukert, alarms {low, empty, ac} e issues (campos no
+        interpretados, se usó un valor por defecto)
+    """
+    energy = pump.get("energia_bateria", {}) or {}
+    specs = pump.get("specs_tecnicas", {}) or {}
+    issues = []
+
+    autonomy_text = energy.get("autonomia_declarada") or specs.get("bateria")
+    autonomy = _hours_range(energy.get("autonomia_declarada")) or _hours_range(specs.get("bateria"))
+    if autonomy is None:
+        issues.append(f"autonomia_declarada no interpretable: {autonomy_text!r}")
+        autonomy = (DEFAULT_AUTONOMY_H, DEFAULT_AUTONOMY_H)
+
+    ref = _REF_RATE.search(str(autonomy_text or ""))
+    if ref:
+        ref_rate = _to_float(ref.group(1))
+    else:
+        ref_rate = DEFAULT_REF_RATE_ML_H
+        issues.append(f"autonomía sin flujo de referencia: se asume {ref_rate:g} ml/h")
+
+    recharge = _hours_range(energy.get("tiempo_recarga"))
+    if recharge is None:
+        issues.append(f"tiempo_recarga no interpretable: {energy.get('tiempo_recarga')!r}")
+        recharge = (DEFAULT_RECHARGE_H, DEFAULT_RECHARGE_H)
+
+    chemistry = _chemistry(f"{energy.get('tipo_bateria', '')} {specs.get('bateria', '')}")
+    if chemistry == "desconocida":
+        issues.append(f"química de batería desconocida: {energy.get('tipo_bateria')!r}")
+
+    alarms = {"low": None, "empty": None, "ac": None}
+    for name in energy.get("alarmas_energia", []) or []:
+        kind = _classify_energy_alarm(name)
+        if kind and alarms[kind] is None:
+            alarms[kind] = name
+
+    return {
+        "pump_id": pump.get("id"),
+        "chemistry": chemistry,
+        "autonomy_h": autonomy[0],
+        "autonomy_max_h": autonomy[1],
+        "ref_rate_ml_h": ref_rate,
+        "recharge_h": recharge[1],
+        "peukert": PEUKERT[chemistry],
+        "alarms": alarms,
+        "issues": issues,
+    }
+
+
+# ============================================================
+# ESTIMADOR VECTORIZADO
+# ============================================================
+
+def runtime_h(model: Dict, rate_ml_h, charge=1.0):
+    """Horas hasta agotar la batería (escalares o arrays que se broadcastean)"""
+    rate = np.asarray(rate_ml_h, dtype=np.float64)
+    draw = BASE_DRAW_FRACTION + (1 - BASE_DRAW_FRACTION) * rate / model["ref_rate_ml_h"]
+    return model["autonomy_h"] * np.clip(charge, 0.0, 1.0) * draw ** -model["peukert"]
+
+
+def estimate_runtime_h(rates_ml_h, charge=1.0, pump_ids: Optional[Sequence[str]] = None) -> Tuple[List[str], np.ndarray]:
+    """
+    Autonomía de todas las bombas para arrays de flujos y cargas
+
+    Args:
+        rates_ml_h: Flujos (array)
+        charge: Carga 0-1 (escalar o array broadcasteable con rates_ml_h)
+        pump_ids: Bombas (default: todo el catálogo)
+
+    Returns:
+        (pump_ids, horas) con horas de forma (bombas, *shape del broadcast);
+        NaN donde el flujo está fuera del rango de la bomba
+    """
+    catalog = get_catalog()
+    pump_ids = list(pump_ids or [p["id"] for p in catalog.pumps])
+    missing = [pid for pid in pump_ids if pid not in catalog.pumps_by_id]
+    if missing:
+        raise ValueError(f"Bombas no encontradas en el catálogo: {', '.join(missing)}")
+
+    pumps = [catalog.pumps_by_id[pid] for pid in pump_ids]
+    models = [parse_battery(p) for p in pumps]
+    rate, charge = np.broadcast_arrays(np.asarray(rates_ml_h, dtype=np.float64),
+                                       np.asarray(charge, dtype=np.float64))
+    expand = (slice(None),) + (None,) * rate.ndim
+    column = lambda values: np.array(values, dtype=np.float64)[expand]
+
+    autonomy = column([m["autonomy_h"] for m in models])
+    ref = column([m["ref_rate_ml_h"] for m in models])
+    peukert = column([m["peukert"] for m in models])
+    rate_min = catalog.specs.column("rate_min", pump_ids)[expand]
+    rate_max = catalog.specs.column("rate_max", pump_ids)[expand]
+
+    draw = BASE_DRAW_FRACTION + (1 - BASE_DRAW_FRACTION) * rate / ref
+    hours = autonomy * np.clip(charge, 0.0, 1.0) * draw ** -peukert
+    # Sin rango compilado (NaN) la bomba queda fuera de rango para todo flujo
+    hours[~((rate >= rate_min) & (rate <= rate_max))] = np.nan
+    return pump_ids, hours
+
+
+# ============================================================
+# TABLA PRECALCULADA
+# ============================================================
+
+class BatteryTable:
+    """
+    Autonomía precalculada por bomba, flujo (pasos de RATE_STEP_ML_H) y
+    carga (pasos de 1/CHARGE_STEPS)
+    """
+
+    def __init__(self, pump_ids: Optional[Sequence[str]] = None):
+        catalog = get_catalog()
+        self.version = catalog.version
+        self.pump_ids = list(pump_ids or [p["id"] for p in catalog.pumps])
+        self.index = {pid: i for i, pid in enumerate(self.pump_ids)}
+        self.models = {pid: parse_battery(catalog.pumps_by_id[pid]) for pid in self.pump_ids}
+
+        self.rate_min = catalog.specs.column("rate_min", self.pump_ids)
+        self.rate_max = catalog.specs.column("rate_max", self.pump_ids)
+        # La grilla de flujos cubre las bombas con rango válido (las otras quedan en NaN)
+        known = self.rate_max[np.isfinite(self.rate_max)]
+        top = known.max() if known.size else 0.0
+        self.rates = np.arange(0, math.ceil(top / RATE_STEP_ML_H) + 1) * RATE_STEP_ML_H
+        self.charges = np.arange(CHARGE_STEPS + 1) / CHARGE_STEPS
+
+        _, hours = estimate_runtime_h(self.rates[:, None], self.charges[None, :], self.pump_ids)
+        self.hours = hours.astype(np.float32)
+
+    def _indices(self, rate_ml_h, charge):
+        rate = np.asarray(rate_ml_h, dtype=np.float64)
+        charge = np.clip(np.asarray(charge, dtype=np.float64), 0.0, 1.0)
+        r = np.ceil(rate / RATE_STEP_ML_H - 1e-9).astype(np.int64)
+        c = np.floor(charge * CHARGE_STEPS + 1e-9).astype(np.int64)
+        return r, c
+
+    def runtime(self, rate_ml_h, charge=1.0) -> np.ndarray:
+        """
+        Autonomía en horas de todas las bombas (filas) para flujos y cargas
+        (arrays); NaN fuera del rango de flujo de la bomba
+        """
+        r, c = self._indices(rate_ml_h, charge)
+        valid = (r >= 0) & (r < len(self.rates))
+        out = np.full((len(self.pump_ids),) + np.broadcast(r, c).shape, np.nan, dtype=np.float32)
+        r, c = np.broadcast_arrays(r, c)
+        out[:, valid] = self.hours[:, r[valid], c[valid]]
+        return out
+
+    def lookup(self, pump_id: str, rate_ml_h: float, charge: float = 1.0,
+               minutes: Optional[float] = None) -> Dict:
+        """
+        Respuesta para una bomba
+
+        Returns:
+            Dict con runtime_h (hasta agotarse), until_low_h (hasta la
+            alarma de batería baja), lasts (si se pidió `minutes`), el
+            modelo y los avisos del parser
+        """
+        p = self.index.get(pump_id)
+        if p is None:
+            raise ValueError(f"Bomba no encontrada: {pump_id}")
+        if rate_ml_h < 0:
+            raise ValueError("El flujo no puede ser negativo")
+        if not 0 <= charge <= 1:
+            raise ValueError("charge debe estar entre 0 y 1")
+
+        in_range = self.rate_min[p] <= rate_ml_h <= self.rate_max[p]
+        r, c = self._indices(rate_ml_h, charge)
+        low_steps = int(round(LOW_BATTERY_FRACTION * CHARGE_STEPS))
+        hours = float(self.hours[p, r, c]) if in_range else None
+        until_low = float(self.hours[p, r, c - low_steps]) if in_range and c > low_steps else (0.0 if in_range else None)
+        model = self.models[pump_id]
+        return {
+            "pump_id": pump_id,
+            "rate_ml_h": rate_ml_h,
+            "charge": charge,
+            "in_range": bool(in_range),
+            "runtime_h": round(hours, 2) if hours is not None else None,
+            "until_low_h": round(until_low, 2) if until_low is not None else None,
+            "lasts": (hours * 60 >= minutes) if minutes is not None and hours is not None else None,
+            "model": {k: v for k, v in model.items() if k != "issues"},
+            "issues": model["issues"],
+        }
+
+    def lookup_all(self, rate_ml_h: float, charge: float = 1.0, minutes: Optional[float] = None) -> List[Dict]:
+        """lookup() para todas las bombas, de mayor a menor autonomía"""
+        rows = [self.lookup(pid, rate_ml_h, charge, minutes) for pid in self.pump_ids]
+        return sorted(rows, key=lambda r: -(r["runtime_h"] if r["runtime_h"] is not None else -1))
+
+
+_table_lock = threading.Lock()
+_table: Optional[BatteryTable] = None
+
+
+def get_battery_table() -> BatteryTable:
+    """Tabla compartida; se recalcula si cambia la versión del catálogo"""
+    global _table
+    version = get_catalog().version
+    if _table and _table.version == version:
+        return _table
+    with _table_lock:
+        if not (_table and _table.version == version):
+            _table = BatteryTable()
+        return _table
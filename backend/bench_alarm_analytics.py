@@ -0,0 +1,131 @@
+"""
+Benchmark de la ingesta de logs de alarmas
+Simulador BIC Lankamar
+
+Genera un log sintético de alarmas (JSONL o CSV) del tamaño pedido, lo
+ingiere con alarm_analytics.ingest_log() sobre una base temporal y
+reporta MB/s, eventos/s y memoria máxima del proceso. Verifica además
+que reingerir no suma nada y que un log que crece se retoma.
+
+Ejecutar:
+    python bench_alarm_analytics.py [--gb 2] [--format jsonl|csv] [--seed 42]
+"""
+
+import argparse
+import json
+import random
+import resource
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import db
+from catalog import get_catalog, get_device_alarms
+
+WARDS = ["UTI Adultos", "UCO", "Neonatología", "Pediatría", "Guardia", "Clínica Médica"]
+
+
+def write_synthetic_log(path: Path, target_bytes: int, fmt: str, seed: int) -> int:
+    """Escribe eventos hasta alcanzar target_bytes; devuelve la cantidad de eventos"""
+    rng = random.Random(seed)
+    devices = []
+    for pump in list(get_catalog().pumps) + list(get_device_alarms()):
+        names = [pump["id"], f"{pump['marca']} {pump['modelo']}", pump["modelo"]]
+        codes = [a["codigo_pantalla"] for a in pump.get("errores_y_alarmas", [])]
+        devices.append((names, codes))
+
+    # Pocas alarmas concentran la mayoría de los eventos (distribución tipo Zipf)
+    weights = [1 / (i + 1) for i in range(40)]
+    now = datetime.utcnow()
+    events = 0
+    written = 0
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            written += f.write("timestamp,device,code,ward\n")
+        while written < target_bytes:
+            chunk = []
+            for _ in range(10_000):
+                names, codes = rng.choice(devices)
+                code = codes[rng.choices(range(40), weights)[0] % len(codes)]
+                if rng.random() < 0.02:
+                    code = f"ERR{rng.randrange(100)}"
+                when = (now - timedelta(seconds=rng.randrange(14 * 86400))).isoformat(timespec="seconds")
+                device, ward = rng.choice(names), rng.choice(WARDS)
+                if fmt == "csv":
+                    chunk.append(f'{when},"{device}","{code}",{ward}\n')
+                else:
+                    chunk.append(json.dumps(
+                        {"timestamp": when, "device": device, "code": code, "ward": ward},
+                        ensure_ascii=False
+                    ) + "\n")
+            if rng.random() < 0.01:
+                chunk.append("{línea corrupta\n" if fmt == "jsonl" else "sin,columnas\n")
+            written += f.write("".join(chunk))
+            events += 10_000
+    return events
+
+
+def main(gb: float, fmt: str, seed: int) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = Path(tmp) / "bench.db"
+        db.init_db()
+        import alarm_analytics
+
+        log_path = Path(tmp) / f"alarms.{fmt}"
+        start = time.perf_counter()
+        generated = write_synthetic_log(log_path, int(gb * 1024 ** 3), fmt, seed)
+        size_mb = log_path.stat().st_size / 1024 ** 2
+        print(f"Log sintético: {size_mb:,.0f} MB, {generated:,} eventos "
+              f"({time.perf_counter() - start:.1f} s para generarlo)")
+
+        start = time.perf_counter()
+        cpu = time.process_time()
+        result = alarm_analytics.ingest_log(log_path)
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+        print("\nIngesta:")
+        print(f"  Eventos:          {result['events']:>14,}  (sin resolver: {result['unmatched']:,}, "
+              f"rechazados: {result['rejected']:,})")
+        print(f"  Tiempo:           {elapsed:>14.1f} s  (CPU {cpu:.1f} s)")
+        print(f"  Throughput:       {size_mb / elapsed:>14.1f} MB/s")
+        print(f"                    {result['events'] / elapsed:>14,.0f} eventos/s")
+        print(f"  Memoria máxima:   {peak_mb:>14.0f} MB (RSS del proceso)")
+
+        ok = result["events"] + result["rejected"] > 0
+        again = alarm_analytics.ingest_log(log_path)
+        print(f"\n  {'OK ' if again['skipped'] else 'FALLO'} reingesta del mismo archivo se omite")
+        ok = ok and again["skipped"]
+
+        with open(log_path, "a", encoding="utf-8") as f:
+            when = datetime.utcnow().isoformat(timespec="seconds")
+            if fmt == "csv":
+                f.write(f"{when},Plum 360,E301,UCO\n")
+            else:
+                f.write(json.dumps({"timestamp": when, "device": "Plum 360", "code": "E301", "ward": "UCO"}) + "\n")
+        appended = alarm_analytics.ingest_log(log_path)
+        cond = appended["events"] == 1
+        print(f"  {'OK ' if cond else 'FALLO'} log que creció: se ingiere solo la línea nueva")
+        ok = ok and cond
+
+        start = time.perf_counter()
+        top = alarm_analytics.get_top_alarms(days=7, limit=5)
+        by_ward = alarm_analytics.get_alarm_rollup("ward", days=7)
+        query_ms = (time.perf_counter() - start) * 1000
+        print(f"\nTop 5 alarmas últimos 7 días ({query_ms:.1f} ms incluyendo rollup por sala):")
+        for row in top:
+            print(f"  {row['occurrences']:>10,}  {row['pump_name']:<32} {row['codigo']}")
+        print(f"  Por sala: {by_ward}")
+        return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--gb", type=float, default=2.0)
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    raise SystemExit(main(args.gb, args.format, args.seed))
@@ -0,0 +1,114 @@
+"""
+Benchmark de resolución masiva de códigos de alarma
+Simulador BIC Lankamar
+
+Genera un log sintético de pares (dispositivo, código crudo) con la
+mezcla típica de un export de bombas: códigos exactos con variaciones
+de formato, nombres de dispositivo variados,
+errores de tipeo y basura. Verifica algunos casos conocidos y mide
+códigos/segundo de resolve_alarm_codes() en un solo núcleo.
+
+Ejecutar:
+    python bench_alarm_resolver.py [--pairs 1000000] [--seed 42]
+"""
+
+import argparse
+import random
+import time
+
+from alarm_resolver import AlarmResolver, get_resolver, resolve_alarm_codes
+from catalog import get_catalog, get_device_alarms
+
+TARGET_PER_S = 100_000
+
+
+def check_behaviour() -> bool:
+    """Casos conocidos de los archivos de datos"""
+    ok = True
+
+    def expect(device, code, match, codigo):
+        nonlocal ok
+        result = resolve_alarm_codes([(device, code)])[0]
+        cond = result["match"] == match and result["codigo"] == codigo
+        print(f"  {'OK ' if cond else 'FALLO'} ({device!r}, {code!r}) → "
+              f"{result['match']} {result['codigo']!r} [{result['pump_id']}]")
+        ok = ok and cond
+
+    expect("icu_medical_plum360", "E301", "exact", "E301")
+    expect("Plum 360", "e301", "exact", "E301")
+    expect("ICU Medical Plum 360 LVP", " n58 ", "exact", "N58")
+    expect("Nutricia Flocare Infinity+", "occ-in", "exact", "OCC_IN")
+    expect("BD Alaris", "distal occl", "exact", "DISTAL OCCL")
+    expect("Infusomat Space", "Bateria baja", "exact", "BATERÍA BAJA")
+    expect("Sigma Spectrum", "DOWNSTREAM OCCLUSION DETECTED", "fuzzy", "DOWNSTREAM OCCLUSION")
+    expect("Sigma Spectrum", "AIR IN LIEN", "fuzzy", "AIR IN LINE")
+    expect("", "OCC_OUT", "code_only", "OCC_OUT")
+    expect("desconocido", "ZZZ-999", "none", None)
+    return ok
+
+
+def make_pairs(n: int, seed: int):
+    """Log sintético: ~85% exactos con ruido de formato, ~10% fuzzy, ~5% basura"""
+    rng = random.Random(seed)
+    pumps = list(get_catalog().pumps) + list(get_device_alarms())
+    base = []
+    for pump in pumps:
+        names = [pump["id"], f"{pump['marca']} {pump['modelo']}", pump["modelo"], pump["modelo"].upper()]
+        for alarm in pump.get("errores_y_alarmas", []):
+            code = alarm["codigo_pantalla"]
+            variants = [code, code.lower(), f" {code} ", code.replace(" ", "_"), code.replace("_", "-")]
+            base.append((names, variants, code))
+
+    pairs = []
+    for _ in range(n):
+        names, variants, code = rng.choice(base)
+        roll = rng.random()
+        if roll < 0.85:
+            pairs.append((rng.choice(names), rng.choice(variants)))
+        elif roll < 0.95:
+            pos = rng.randrange(len(code))
+            pairs.append((rng.choice(names), code[:pos] + rng.choice("XYZ01") + code[pos + 1:]))
+        else:
+            pairs.append((rng.choice(names + [""]), f"ERR{rng.randrange(500)}"))
+    return pairs
+
+
+def main(n: int, seed: int) -> int:
+    print("Verificaciones:")
+    ok = check_behaviour()
+
+    pairs = make_pairs(n, seed)
+    print(f"\n{n} pares, {len(set(pairs))} distintos")
+
+    start = time.perf_counter()
+    AlarmResolver(list(get_catalog().pumps) + list(get_device_alarms()))
+    print(f"  Construcción del índice:        {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    resolver = get_resolver()
+    for cache in (resolver._cache, resolver._device_cache, resolver._norm_cache):
+        cache.clear()
+    start = time.process_time()
+    results = resolve_alarm_codes(pairs)
+    cold = time.process_time() - start
+
+    start = time.process_time()
+    resolve_alarm_codes(pairs)
+    warm = time.process_time() - start
+
+    counts = {}
+    for result in results:
+        counts[result["match"]] = counts.get(result["match"], 0) + 1
+    print(f"  Coincidencias: {dict(sorted(counts.items()))}")
+    print(f"  Primera pasada (caché vacía):   {n / cold:10.0f} códigos/s (CPU)")
+    print(f"  Segunda pasada (caché llena):   {n / warm:10.0f} códigos/s (CPU)")
+    print(f"  Objetivo:                       {TARGET_PER_S:10d} códigos/s "
+          f"{'✅' if n / cold >= TARGET_PER_S else '❌'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    raise SystemExit(main(args.pairs, args.seed))
@@ -0,0 +1,67 @@
+"""
+Benchmark del estimador Monte Carlo de riesgo de alarmas
+Simulador BIC Lankamar
+
+Corre 1M de ensayos para una bomba (en el proceso actual y con pool de
+procesos), verifica reproducibilidad y caché, y muestra la comparación
+de todas las bombas del catálogo por nivel de umbral de oclusión.
+
+Ejecutar:
+    python bench_alarm_risk.py [--trials 1000000] [--compare-trials 200000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import db
+
+
+def main(trials: int, compare_trials: int) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = Path(tmp) / "bench.db"
+        from alarm_risk import compare_pumps, estimate_alarm_risk
+
+        pump_id = "baxter_sigma_spectrum"
+        cpus = os.cpu_count() or 1
+        print(f"{trials:,} ensayos para {pump_id} ({cpus} CPU)")
+
+        runs = {}
+        for workers in sorted({1, cpus}):
+            start = time.perf_counter()
+            runs[workers] = estimate_alarm_risk(pump_id, trials=trials, workers=workers, use_cache=False)
+            print(f"  {workers} proceso(s):        {time.perf_counter() - start:8.2f} s")
+
+        first, last = runs[1], runs[max(runs)]
+        same = first["occlusion_min"] == last["occlusion_min"] and first["air_min"] == last["air_min"]
+        print(f"  {'OK ' if same else 'FALLO'} mismo resultado con 1 y {max(runs)} procesos")
+
+        estimate_alarm_risk(pump_id, trials=trials, workers=1)
+        start = time.perf_counter()
+        cached = estimate_alarm_risk(pump_id, trials=trials, workers=1)
+        print(f"  Desde caché:           {(time.perf_counter() - start) * 1000:8.2f} ms "
+              f"({'OK' if cached['cached'] else 'FALLO'})")
+
+        print(f"\nComparación ({compare_trials:,} ensayos por fila; tiempos en minutos)")
+        print(f"  {'Bomba':<28} {'nivel':>5} {'umbral':>7} {'oclus p50':>10} {'p95':>8} "
+              f"{'falsas':>7} {'bolo p95':>9} {'aire p50':>9} {'aire 24h':>9}")
+        start = time.perf_counter()
+        for row in compare_pumps(trials=compare_trials):
+            print(f"  {row['pump_name']:<28} {row['occlusion_level']:>5.1f} "
+                  f"{row['occlusion_threshold_mmhg']:>7.0f} {row['occlusion_min']['p50']:>10.2f} "
+                  f"{row['occlusion_min']['p95']:>8.1f} {row['occlusion_false_alarm_fraction']:>7.1%} "
+                  f"{row['bolus_ml']['p95']:>9.3f} "
+                  f"{row['air_min']['p50'] if row['air_min']['p50'] is not None else float('nan'):>9.0f} "
+                  f"{row['air_alarm_fraction']:>9.1%}")
+        print(f"  ({time.perf_counter() - start:.1f} s)")
+        return 0 if same and cached["cached"] else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trials", type=int, default=1_000_000)
+    parser.add_argument("--compare-trials", type=int, default=200_000)
+    args = parser.parse_args()
+    raise SystemExit(main(args.trials, args.compare_trials))
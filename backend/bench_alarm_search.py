@@ -0,0 +1,107 @@
+"""
+Benchmark de la vista de resultados de búsqueda de alarmas
+Simulador BIC Lankamar
+
+Con un catálogo sintético (las bombas reales replicadas) compara, para
+búsquedas con pocos y muchos resultados, lo que el dashboard manda al
+navegador y cuánto tarda en tener los primeros resultados:
+
+- antes: todos los resultados a la vez (un encabezado por categoría y un
+  st.expander con 4 st.markdown por alarma)
+- después: Catalog.search_page + search_view.page_html de la primera
+  página, en un solo bloque HTML
+
+El tamaño se estima como los bytes de texto de cada elemento; Streamlit
+agrega además un mensaje por elemento, así que la diferencia real es mayor.
+
+Ejecutar:
+    python bench_alarm_search.py [--scale 300]
+"""
+
+import argparse
+import time
+from collections import defaultdict
+
+from catalog import Catalog, get_catalog
+from search_view import PAGE_SIZE, category_header_html, page_html
+
+QUERIES = ["", "oclus", "bater", "pause over"]
+
+
+def render_all(catalog: Catalog, query: str):
+    """Elementos que generaba la versión anterior: (cantidad, bytes)"""
+    needle = query.lower()
+    filtered = [e for e in catalog.errors
+                if needle in e["codigo"].lower() or needle in e["significado"].lower()]
+    grouped = defaultdict(list)
+    for error in filtered:
+        grouped[error["categoria"]].append(error)
+    elements, size = 0, 0
+    for categoria in sorted(grouped):
+        size += len(category_header_html(categoria, len(grouped[categoria])).encode())
+        elements += 1
+        for error in grouped[categoria]:
+            texts = [
+                f"{error['codigo']} — {error['pump_name']}",
+                f"**Significado:** {error['significado']}",
+                f"**Acción correctiva:** {error['accion_correctiva']}",
+                f"**Bomba:** `{error['pump_name']}` | **Prioridad:** `{error['prioridad']}`",
+                f"**Video tag:** `{error['video_tag']}`",
+            ]
+            size += sum(len(t.encode()) for t in texts)
+            elements += len(texts)
+    return len(filtered), elements, size
+
+
+def render_first_page(catalog: Catalog, query: str):
+    result = catalog.search_page(query, limit=PAGE_SIZE)
+    html = page_html(result["results"], result["by_category"])
+    return result["total"], 1, len(html.encode())
+
+
+def timed_ms(func, repeat: int = 5):
+    best, value = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return value, best
+
+
+def main(scale: int) -> int:
+    pumps = get_catalog().pumps
+    replicated = [dict(p, id=f"{p['id']}_{i}") for i in range(scale) for p in pumps]
+    catalog = Catalog(replicated, "bench")
+    print(f"Catálogo sintético: {len(catalog.pumps):,} bombas, {len(catalog.errors):,} alarmas\n")
+    print(f"{'Búsqueda':<10}{'Resultados':>11}{'Antes':>22}{'Después':>22}")
+
+    page_sizes, same_totals, faster = [], True, True
+    for query in QUERIES:
+        (total_before, elements_before, size_before), ms_before = timed_ms(lambda: render_all(catalog, query))
+        (total_after, _, size_after), ms_after = timed_ms(lambda: render_first_page(catalog, query))
+        page_sizes.append(size_after)
+        same_totals &= total_before == total_after
+        if total_before > PAGE_SIZE:
+            faster &= ms_after < ms_before
+        print(f"{query or '(vacía)':<10}{total_before:>11,}"
+              f"{size_before / 1e3:>9,.0f} KB {ms_before:>7.1f} ms"
+              f"{size_after / 1e3:>9,.0f} KB {ms_after:>7.1f} ms"
+              f"   ({elements_before:,} → 1 elementos)")
+
+    checks = [
+        ("la búsqueda paginada cuenta los mismos resultados", same_totals),
+        ("la primera página pesa lo mismo con pocos o muchos resultados",
+         max(page_sizes) < 2 * PAGE_SIZE * 1000),
+        ("primeros resultados más rápido cuando hay más de una página", faster),
+    ]
+    for label, ok in checks:
+        print(f"{'OK ' if ok else 'FALLO'} {label}")
+    return 0 if all(ok for _, ok in checks) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=300)
+    args = parser.parse_args()
+    raise SystemExit(main(args.scale))
@@ -0,0 +1,70 @@
+"""
+Benchmark del modelo de autonomía de batería
+Simulador BIC Lankamar
+
+Mide el estimador vectorizado sobre N pares (flujo, carga) para todas las
+bombas, el armado de la tabla precalculada y la latencia de una consulta,
+y verifica que la tabla nunca sobreestima al estimador.
+
+Ejecutar:
+    python bench_battery_model.py [--n 1000000] [--rate 250] [--minutes 45]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from battery_model import BatteryTable, estimate_runtime_h, get_battery_table
+
+
+def main(n: int, rate: float, minutes: float) -> int:
+    rng = np.random.default_rng(0)
+    rates = rng.uniform(0.1, 1200, n)
+    charges = rng.uniform(0, 1, n)
+
+    start = time.perf_counter()
+    pump_ids, direct = estimate_runtime_h(rates, charges)
+    elapsed = time.perf_counter() - start
+    print(f"Estimador vectorizado: {n:,} pares × {len(pump_ids)} bombas en {elapsed * 1000:.0f} ms "
+          f"({n * len(pump_ids) / elapsed / 1e6:.1f} M estimaciones/s)")
+
+    start = time.perf_counter()
+    table = BatteryTable()
+    print(f"Tabla precalculada:    {table.hours.shape} en {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"({table.hours.nbytes / 1e6:.1f} MB)")
+
+    start = time.perf_counter()
+    from_table = table.runtime(rates, charges)
+    elapsed = time.perf_counter() - start
+    print(f"Tabla vectorizada:     {n:,} pares en {elapsed * 1000:.0f} ms")
+
+    both = np.isfinite(direct) & np.isfinite(from_table)
+    excess = float(np.max(from_table[both] - direct[both]))
+    conservative = excess <= 1e-4
+    print(f"  {'OK ' if conservative else 'FALLO'} la tabla no sobreestima (máx. exceso {excess:.2e} h, "
+          f"diferencia media {float(np.mean(direct[both] - from_table[both])) * 60:.2f} min)")
+
+    shared = get_battery_table()
+    queries = 100_000
+    start = time.perf_counter()
+    for i in range(queries):
+        shared.lookup(shared.pump_ids[i % len(shared.pump_ids)], rate, 0.8, minutes)
+    per_query = (time.perf_counter() - start) / queries * 1e6
+    print(f"Consulta individual:   {per_query:.1f} µs")
+
+    print(f"\n¿Aguanta {minutes:g} min a {rate:g} ml/h con 80% de carga?")
+    for row in shared.lookup_all(rate, 0.8, minutes):
+        status = "fuera de rango" if not row["in_range"] else ("sí" if row["lasts"] else "NO")
+        hours = f"{row['runtime_h']:.2f} h" if row["runtime_h"] is not None else "-"
+        print(f"  {row['pump_id']:<26} {hours:>9}  {status}")
+    return 0 if conservative else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--rate", type=float, default=250)
+    parser.add_argument("--minutes", type=float, default=45)
+    args = parser.parse_args()
+    raise SystemExit(main(args.n, args.rate, args.minutes))
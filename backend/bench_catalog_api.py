@@ -0,0 +1,97 @@
+"""
+Prueba en proceso y benchmark de la API de catálogo
+Simulador BIC Lankamar
+
+Usa el cliente de prueba ASGI de FastAPI (sin red) para verificar ETag,
+304 Not Modified y negociación gzip/brotli, y luego mide requests/s de
+cada endpoint.
+
+Ejecutar:
+    python bench_catalog_api.py [--requests 2000]
+"""
+
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+
+from catalog import get_catalog
+from catalog_api import app, brotli, _bodies
+
+
+def check_behaviour(client: TestClient) -> bool:
+    """Verificaciones funcionales básicas"""
+    ok = True
+    catalog = get_catalog()
+    pump_id = catalog.pumps[0]["id"]
+
+    def expect(cond: bool, label: str):
+        nonlocal ok
+        print(f"  {'OK ' if cond else 'FALLO'} {label}")
+        ok = ok and cond
+
+    r = client.get("/catalog", headers={"Accept-Encoding": "identity"})
+    etag = r.headers.get("etag", "")
+    expect(r.status_code == 200 and len(r.json()) == len(catalog.pumps), "GET /catalog → 200")
+    expect(etag.startswith(f'"{catalog.version}.'), f"ETag fuerte con versión ({etag})")
+
+    r = client.get("/catalog", headers={"If-None-Match": etag})
+    expect(r.status_code == 304 and not r.content, "If-None-Match → 304 sin cuerpo")
+
+    r = client.get("/catalog", headers={"Accept-Encoding": "gzip"})
+    expect(r.headers.get("content-encoding") == "gzip", "Accept-Encoding gzip")
+
+    if brotli is not None:
+        r = client.get("/catalog", headers={"Accept-Encoding": "gzip, br"})
+        expect(r.headers.get("content-encoding") == "br", "Accept-Encoding br preferido")
+
+    r = client.get(f"/pumps/{pump_id}")
+    expect(r.status_code == 200 and r.json()["id"] == pump_id, f"GET /pumps/{pump_id}")
+    r = client.get(f"/pumps/{pump_id}", headers={"If-None-Match": r.headers["etag"]})
+    expect(r.status_code == 304, "detalle de bomba → 304")
+    expect(client.get("/pumps/no_existe").status_code == 404, "bomba inexistente → 404")
+
+    r = client.get("/search", params={"q": "oclus", "limit": 5})
+    body = r.json()
+    expect(r.status_code == 200 and 0 < len(body["results"]) <= 5, f"búsqueda 'oclus' ({body['total']} total)")
+    return ok
+
+
+def bench(client: TestClient, label: str, n: int, path: str, **kwargs) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        client.get(path, **kwargs)
+    elapsed = time.perf_counter() - start
+    rate = n / elapsed
+    print(f"  {label:<40} {rate:8.0f} req/s")
+    return rate
+
+
+def main(n: int) -> int:
+    client = TestClient(app)
+    print("Verificaciones:")
+    ok = check_behaviour(client)
+
+    catalog = get_catalog()
+    pump_id = catalog.pumps[0]["id"]
+    etag = client.get("/catalog").headers["etag"]
+
+    sizes = _bodies.get(catalog, "catalog")
+    print("\nTamaño de /catalog:")
+    for encoding, body in sizes.items():
+        print(f"  {encoding:<9} {len(body):>8} bytes")
+
+    print(f"\nThroughput ({n} requests por caso, cliente ASGI en proceso):")
+    bench(client, "/catalog identity", n, "/catalog", headers={"Accept-Encoding": "identity"})
+    bench(client, "/catalog gzip", n, "/catalog", headers={"Accept-Encoding": "gzip"})
+    bench(client, "/catalog 304 (If-None-Match)", n, "/catalog", headers={"If-None-Match": etag})
+    bench(client, f"/pumps/{pump_id}", n, f"/pumps/{pump_id}")
+    bench(client, "/search?q=aire (LRU)", n, "/search", params={"q": "aire"})
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    raise SystemExit(main(args.requests))
@@ -0,0 +1,121 @@
+"""
+Benchmark del motor de exportación del catálogo
+Simulador BIC Lankamar
+
+Con un catálogo sintético (las bombas reales replicadas, algunas alarmas
+con comillas y comas en el texto) compara el CSV de errores armado como
+antes (concatenando strings) contra catalog_export en streaming, y mide
+cada formato: tiempo, tamaño, memoria pico recorriendo los bloques sin
+acumularlos y un segundo pedido servido desde la caché por versión.
+
+Ejecutar:
+    python bench_catalog_export.py [--scale 300]
+"""
+
+import argparse
+import csv
+import io
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+from xml.etree import ElementTree
+
+from catalog import Catalog, get_catalog
+from catalog_export import available_formats, get_export, iter_export
+
+TRICKY = 'Presión "alta", revisar línea\ny set'
+
+
+def build_catalog(scale: int) -> Catalog:
+    pumps = get_catalog().pumps
+    replicated = []
+    for i in range(scale):
+        for pump in pumps:
+            alarms = [dict(a) for a in pump.get("errores_y_alarmas", [])]
+            if alarms and i % 10 == 0:
+                alarms[0]["significado"] = TRICKY
+            replicated.append(dict(pump, id=f"{pump['id']}_{i}", errores_y_alarmas=alarms))
+    return Catalog(replicated, f"bench-{scale}")
+
+
+def old_csv(errors) -> str:
+    """CSV como lo armaba render_export_section"""
+    csv_errors = "Bomba,Código,Significado,Categoría,Prioridad,Acción Correctiva,Video Tag\n"
+    for e in errors:
+        csv_errors += f'"{e["pump_name"]}","{e["codigo"]}","{e["significado"]}","{e["categoria"]}","{e["prioridad"]}","{e["accion_correctiva"]}","{e["video_tag"]}"\n'
+    return csv_errors
+
+
+def measure(func, memory: bool = True):
+    """(resultado, ms, memoria pico); el pico se mide en otra pasada (tracemalloc frena)"""
+    start = time.perf_counter()
+    result = func()
+    elapsed = (time.perf_counter() - start) * 1000
+    peak = 0
+    if memory:
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def drain(chunks) -> int:
+    return sum(len(chunk) for chunk in chunks)
+
+
+def main(scale: int) -> int:
+    catalog = build_catalog(scale)
+    n = len(catalog.errors)
+    print(f"Catálogo sintético: {len(catalog.pumps):,} bombas, {n:,} alarmas\n")
+
+    old, old_ms, old_peak = measure(lambda: old_csv(catalog.errors))
+    old_rows = list(csv.reader(io.StringIO(old)))
+    print(f"  {'csv (concatenación)':<22}{old_ms:>9.1f} ms {len(old) / 1e6:>8.2f} MB   pico {old_peak / 1e6:>7.1f} MB")
+
+    sizes = {}
+    for fmt in available_formats():
+        size, ms, peak = measure(lambda: drain(iter_export("errores", fmt, catalog=catalog)))
+        sizes[fmt] = size
+        print(f"  {fmt + ' (streaming)':<22}{ms:>9.1f} ms {size / 1e6:>8.2f} MB   pico {peak / 1e6:>7.1f} MB")
+    gz, gz_ms, _ = measure(lambda: drain(iter_export("errores", "csv", compress=True, catalog=catalog)), memory=False)
+    print(f"  {'csv + gzip':<22}{gz_ms:>9.1f} ms {gz / 1e6:>8.2f} MB")
+
+    _, first_ms, _ = measure(lambda: get_export("errores", "csv", catalog=catalog), memory=False)
+    data, cached_ms, _ = measure(lambda: get_export("errores", "csv", catalog=catalog), memory=False)
+    print(f"\n  get_export csv: {first_ms:.1f} ms la primera vez, {cached_ms:.3f} ms desde la caché\n")
+
+    rows = list(csv.reader(io.StringIO(data.decode("utf-8"))))
+    xlsx = zipfile.ZipFile(io.BytesIO(get_export("errores", "xlsx", catalog=catalog)))
+    sheet = ElementTree.fromstring(xlsx.read("xl/worksheets/sheet1.xml"))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "export.db"
+        path.write_bytes(get_export("errores", "sqlite", catalog=catalog))
+        conn = sqlite3.connect(path)
+        db_rows = conn.execute("SELECT COUNT(*) FROM errores").fetchone()[0]
+        db_tricky = conn.execute("SELECT COUNT(*) FROM errores WHERE significado = ?", (TRICKY,)).fetchone()[0]
+        conn.close()
+
+    tricky = sum(1 for e in catalog.errors if e["significado"] == TRICKY)
+    checks = [
+        ("el CSV anterior se rompe con comillas en el texto", len(old_rows) != n + 1),
+        ("el CSV nuevo tiene una fila por alarma y el texto intacto",
+         len(rows) == n + 1 and sum(1 for r in rows if r[2] == TRICKY) == tricky),
+        ("el XLSX es XML válido con una fila por alarma", len(sheet[0]) == n + 1),
+        ("la base SQLite tiene todas las alarmas", db_rows == n and db_tricky == tricky),
+        ("el pedido repetido sale de la caché", cached_ms * 100 < first_ms),
+        ("gzip reduce el CSV", gz < sizes["csv"]),
+    ]
+    for label, ok in checks:
+        print(f"{'OK ' if ok else 'FALLO'} {label}")
+    return 0 if all(ok for _, ok in checks) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=300)
+    args = parser.parse_args()
+    raise SystemExit(main(args.scale))
@@ -0,0 +1,136 @@
+"""
+Benchmark de la carga de datos en cada rerun del dashboard
+Simulador BIC Lankamar
+
+Cada interacción con un widget de Streamlit vuelve a ejecutar main().
+Compara la carga de datos de un rerun:
+
+- antes: json.load de pumps_db.json, flatten_errors, videos y totales
+  desde SQLite y conteos de los gráficos, en cada rerun
+- después: las claves de caché de admin_dashboard (stat del archivo,
+  revisión de contenido, versión del catálogo) y una búsqueda en la
+  caché
+
+Streamlit no hace falta: st.cache_resource / st.cache_data se reemplazan
+por un dict con las mismas claves, que es lo que cuestan en un acierto.
+Controla además que la caché se invalide al cambiar el archivo y al
+agregar un video.
+
+Ejecutar:
+    python bench_dashboard_rerun.py [--scale 200] [--reruns 200]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import db
+import content_store
+from catalog import PUMPS_DB_PATH, flatten_errors, get_catalog
+from content_store import add_video, content_revision, list_videos, video_stats
+
+
+def build_pumps_db(path: Path, scale: int) -> int:
+    """pumps_db.json con las bombas reales replicadas `scale` veces"""
+    pumps = json.loads(PUMPS_DB_PATH.read_text(encoding="utf-8"))
+    replicated = [dict(p, id=f"{p['id']}_{i}") for i in range(scale) for p in pumps]
+    path.write_text(json.dumps(replicated, indent=2, ensure_ascii=False), encoding="utf-8")
+    return len(replicated)
+
+
+def counts(errors):
+    by_pump, by_category = {}, {}
+    for e in errors:
+        by_pump[e["pump_name"]] = by_pump.get(e["pump_name"], 0) + 1
+        by_category[e["categoria"]] = by_category.get(e["categoria"], 0) + 1
+    return by_pump, by_category
+
+
+def rerun_uncached(path: Path):
+    with open(path, encoding="utf-8") as f:
+        pumps = json.load(f)
+    errors = flatten_errors(pumps)
+    return pumps, errors, list_videos(), video_stats(), counts(errors)
+
+
+class Cache:
+    """Sustituto de st.cache_resource / st.cache_data: dict por clave"""
+
+    def __init__(self):
+        self.entries, self.misses = {}, 0
+
+    def get(self, key, build):
+        if key not in self.entries:
+            self.misses += 1
+            self.entries[key] = build()
+        return self.entries[key]
+
+
+def rerun_cached(path: Path, cache: Cache):
+    stat = path.stat()
+    catalog = cache.get(("catalog", stat.st_mtime_ns, stat.st_size), lambda: get_catalog(path))
+    videos = cache.get(("videos", content_revision()), lambda: {"videos": list_videos(), "stats": video_stats()})
+    chart = cache.get(("counts", catalog.version), lambda: counts(catalog.errors))
+    return catalog.pumps, catalog.errors, videos["videos"], videos["stats"], chart
+
+
+def timed(func, reruns: int) -> float:
+    start = time.perf_counter()
+    for _ in range(reruns):
+        func()
+    return (time.perf_counter() - start) / reruns * 1000
+
+
+def main(scale: int, reruns: int) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = Path(tmp) / "bench.db"
+        content_store.MANIFEST_PATH = Path(tmp) / "sin_manifest.json"
+        db.init_db()
+        path = Path(tmp) / "pumps_db.json"
+        n = build_pumps_db(path, scale)
+        for i in range(50):
+            add_video(f"tag_{i}", f"https://videos.local/{i}", pump_id="bench")
+        print(f"pumps_db.json sintético: {n:,} bombas, {path.stat().st_size / 1e6:,.1f} MB\n")
+
+        cache = Cache()
+        before = timed(lambda: rerun_uncached(path), max(1, reruns // 10))
+        rerun_cached(path, cache)  # primer rerun: llena la caché
+        after = timed(lambda: rerun_cached(path, cache), reruns)
+        misses_warm = cache.misses
+        same = rerun_uncached(path)[1] == rerun_cached(path, cache)[1]
+
+        # Invalidación: alta de video → nueva revisión
+        add_video("tag_nuevo", "https://videos.local/nuevo", pump_id="bench")
+        videos_after_add = rerun_cached(path, cache)[2]
+
+        # Invalidación: archivo reescrito → nuevo mtime/tamaño
+        build_pumps_db(path, scale + 1)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        pumps_after_edit = rerun_cached(path, cache)[0]
+
+    print(f"  rerun sin caché   {before:>9.2f} ms")
+    print(f"  rerun con caché   {after:>9.3f} ms   ({before / after:,.0f}x)\n")
+
+    checks = [
+        ("un rerun con la caché llena no recarga nada", misses_warm == 3),
+        ("los errores cacheados coinciden con los recalculados", same),
+        ("agregar un video invalida la lista de videos",
+         any(v["video_tag"] == "tag_nuevo" for v in videos_after_add)),
+        ("reescribir pumps_db.json invalida el catálogo", len(pumps_after_edit) == n + n // scale),
+        ("rerun con caché al menos 10x más rápido", after * 10 < before),
+    ]
+    for label, ok in checks:
+        print(f"{'OK ' if ok else 'FALLO'} {label}")
+    return 0 if all(ok for _, ok in checks) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=200)
+    parser.add_argument("--reruns", type=int, default=200)
+    args = parser.parse_args()
+    raise SystemExit(main(args.scale, args.reruns))
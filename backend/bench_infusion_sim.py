@@ -0,0 +1,60 @@
+"""
+Benchmark del motor de simulación de infusiones
+Simulador BIC Lankamar
+
+Simula N infusiones repartidas entre todas las bombas del catálogo, con
+flujos y VTBI al azar dentro de rangos clínicos, y reporta horas-bomba
+simuladas por segundo para distintos tamaños de lote.
+
+Ejecutar:
+    python bench_infusion_sim.py [--hours 8] [--dt 1] [--sizes 100 1000 10000 50000]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from catalog import get_catalog
+from infusion_sim import InfusionSimulator
+
+
+def build(n: int, seed: int) -> InfusionSimulator:
+    rng = np.random.default_rng(seed)
+    pump_ids = [p["id"] for p in get_catalog().pumps]
+    ids = [pump_ids[i] for i in rng.integers(0, len(pump_ids), n)]
+    rates = rng.choice([5, 21, 42, 83, 125, 250, 500], n).astype(float)
+    vtbi = rng.choice([100, 250, 500, 1000], n).astype(float)
+    return InfusionSimulator.from_catalog(ids, rates, vtbi, seed=seed)
+
+
+def main(sizes, hours: float, dt: float, seed: int) -> int:
+    print(f"Simulación de {hours} h con paso de {dt} s\n")
+    print(f"  {'Infusiones':>10} {'Tiempo (s)':>11} {'horas-bomba/s':>14} {'alarmas':>9} {'completas':>10}")
+    for n in sizes:
+        sim = build(n, seed)
+        start = time.perf_counter()
+        sim.run(hours, dt_s=dt, stop_when_done=False)
+        elapsed = time.perf_counter() - start
+        summary = sim.summary()
+        print(f"  {n:>10,} {elapsed:>11.2f} {n * hours / elapsed:>14,.0f} "
+              f"{sum(summary['alarms'].values()):>9,} {summary['completed']:>10,}")
+
+    print("\nResumen de la última corrida:")
+    for key, value in summary.items():
+        if key != "alarms":
+            print(f"  {key:<18} {value:,.4f}" if isinstance(value, float) else f"  {key:<18} {value:,}")
+    print("  Alarmas más frecuentes:")
+    for code, count in sorted(summary["alarms"].items(), key=lambda kv: -kv[1])[:8]:
+        print(f"    {count:>8,}  {code}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hours", type=float, default=8)
+    parser.add_argument("--dt", type=float, default=1.0)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    raise SystemExit(main(args.sizes, args.hours, args.dt, args.seed))
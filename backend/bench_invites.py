@@ -0,0 +1,128 @@
+"""
+Prueba de carga del canje de invitaciones
+Simulador BIC Lankamar
+
+Lanza N hilos que canjean invitaciones al mismo tiempo contra una base
+SQLite temporal y verifica:
+1. Carrera: N canjeadores sobre UN mismo token → exactamente 1 éxito
+2. Throughput: N canjeadores con tokens distintos → N éxitos, sin locks
+
+Ejecutar:
+    python bench_invites.py [--workers 200]
+"""
+
+import argparse
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import db
+import auth_service
+from invites_service import create_invite, redeem_invite
+
+
+def _run_concurrently(workers: int, target) -> dict:
+    """Ejecuta target(i) en `workers` hilos que arrancan juntos"""
+    barrier = threading.Barrier(workers)
+    results = {"ok": 0, "rejected": 0, "locked": 0, "other": []}
+    lock = threading.Lock()
+
+    def worker(i: int):
+        barrier.wait()
+        try:
+            target(i)
+            outcome = "ok"
+        except ValueError:
+            outcome = "rejected"
+        except sqlite3.OperationalError as e:
+            outcome = "locked" if db.is_busy_error(e) else e
+        except Exception as e:  # noqa: BLE001 - se reporta al final
+            outcome = e
+        with lock:
+            if isinstance(outcome, str):
+                results[outcome] += 1
+            else:
+                results["other"].append(repr(outcome))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    results["elapsed_s"] = time.perf_counter() - start
+    return results
+
+
+def bench_race_single_token(workers: int) -> bool:
+    """N hilos canjean el mismo token abierto con emails distintos"""
+    token = create_invite(role="director")
+    results = _run_concurrently(
+        workers,
+        lambda i: redeem_invite(token, f"race{i}@bench.local", password="bench123")
+    )
+
+    with db.get_conn() as conn:
+        created = conn.execute(
+            "SELECT COUNT(*) FROM users WHERE email LIKE 'race%@bench.local'"
+        ).fetchone()[0]
+
+    ok = results["ok"] == 1 and created == 1 and not results["locked"] and not results["other"]
+    print(f"[carrera] {workers} hilos / 1 token → éxitos={results['ok']} "
+          f"rechazados={results['rejected']} locks={results['locked']} "
+          f"usuarios creados={created} ({results['elapsed_s']:.2f}s) "
+          f"{'OK' if ok else 'FALLO'}")
+    for err in results["other"][:5]:
+        print(f"   ! {err}")
+    return ok
+
+
+def bench_throughput(workers: int) -> bool:
+    """N hilos canjean N tokens distintos (mitad usuarios nuevos, mitad existentes)"""
+    tokens = [create_invite(role="jefe_servicio") for _ in range(workers)]
+    for i in range(0, workers, 2):
+        auth_service.create_user(f"tp{i}@bench.local", "bench123")
+
+    results = _run_concurrently(
+        workers,
+        lambda i: redeem_invite(tokens[i], f"tp{i}@bench.local", password="bench123")
+    )
+
+    with db.get_conn() as conn:
+        used = conn.execute(
+            "SELECT COUNT(*) FROM invites WHERE role = 'jefe_servicio' AND used_at IS NOT NULL"
+        ).fetchone()[0]
+        upgraded = conn.execute(
+            "SELECT COUNT(*) FROM users WHERE email LIKE 'tp%@bench.local' AND role = 'jefe_servicio'"
+        ).fetchone()[0]
+
+    ok = results["ok"] == workers and used == workers and upgraded == workers
+    rate = workers / results["elapsed_s"] if results["elapsed_s"] else 0
+    print(f"[throughput] {workers} hilos / {workers} tokens → éxitos={results['ok']} "
+          f"locks={results['locked']} usadas={used} ({results['elapsed_s']:.2f}s, "
+          f"{rate:.0f} canjes/s) {'OK' if ok else 'FALLO'}")
+    for err in results["other"][:5]:
+        print(f"   ! {err}")
+    return ok
+
+
+def main(workers: int) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = Path(tmp) / "bench_auth.db"
+        # bcrypt barato: se mide la contención de SQLite, no el hash
+        auth_service.BCRYPT_ROUNDS = 4
+        db.init_db()
+
+        ok = bench_race_single_token(workers)
+        ok = bench_throughput(workers) and ok
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=200)
+    args = parser.parse_args()
+    raise SystemExit(main(args.workers))
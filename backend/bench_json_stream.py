@@ -0,0 +1,105 @@
+"""
+Benchmark del lector de arrays JSON en streaming
+Simulador BIC Lankamar
+
+Arma un pumps_db.json sintético de N MB (las bombas reales replicadas),
+le rompe algunos registros y lo lee con json_stream.ArrayStream sin
+acumular los elementos, midiendo tiempo y memoria pico contra json.load
+del archivo sano. Controla que los registros rotos queden en cuarentena
+con su línea y que el resto se lea igual que con json.load.
+
+Ejecutar:
+    python bench_json_stream.py [--mb 200]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from catalog import get_catalog, pump_record_problem
+from json_stream import ArrayStream
+
+# Registros que se rompen (índice → reemplazo en su texto)
+BROKEN = {
+    10: ('"marca":', '"marca"'),           # falta ':'
+    500: ('"modelo": "', '"modelo": '),    # comilla faltante
+}
+
+
+def build_files(path: Path, clean_path: Path, mb: int) -> int:
+    """Escribe el array sintético con y sin registros rotos; devuelve cuántos tiene"""
+    pumps = get_catalog().pumps
+    target = mb * 1024 * 1024
+    written, n = 0, 0
+    with open(path, "w", encoding="utf-8") as f, open(clean_path, "w", encoding="utf-8") as clean:
+        f.write("[\n")
+        clean.write("[\n")
+        while written < target:
+            pump = dict(pumps[n % len(pumps)], id=f"{pumps[n % len(pumps)]['id']}_{n}")
+            text = json.dumps(pump, indent=2, ensure_ascii=False)
+            separator = "" if n == 0 else ",\n"
+            clean.write(separator + text)
+            if n in BROKEN:
+                text = text.replace(*BROKEN[n], 1)
+            f.write(separator + text)
+            written += len(text)
+            n += 1
+        f.write("\n]\n")
+        clean.write("\n]\n")
+    return n
+
+
+def measure(label: str, func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  {label:<28} {elapsed:>7.2f} s   pico {peak / 1e6:>8.1f} MB")
+    return result, peak
+
+
+def main(mb: int) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        path, clean = Path(tmp) / "pumps_db.json", Path(tmp) / "clean.json"
+        n = build_files(path, clean, mb)
+        size = path.stat().st_size
+        print(f"Archivo sintético: {n:,} bombas, {size / 1e6:,.0f} MB, {len(BROKEN)} registros rotos\n")
+
+        stream = ArrayStream(path, check=pump_record_problem)
+
+        def stream_ids():
+            return [pump["id"] for pump in stream]
+
+        ids, stream_peak = measure("ArrayStream (sin acumular)", stream_ids)
+
+        # Referencia: json.load del mismo archivo sin romper
+        def load_clean():
+            with open(clean, encoding="utf-8") as f:
+                return json.load(f)
+
+        data, load_peak = measure("json.load (archivo sano)", load_clean)
+
+    lines = [q["line"] for q in stream.quarantine]
+    checks = [
+        ("los registros rotos quedan en cuarentena",
+         sorted(q["index"] for q in stream.quarantine) == sorted(BROKEN)),
+        ("la cuarentena indica línea y columna", all(line > 1 for line in lines)),
+        ("el resto se lee igual que con json.load",
+         ids == [pump["id"] for i, pump in enumerate(data) if i not in BROKEN]),
+        ("memoria pico < 10% de json.load", stream_peak < 0.1 * load_peak),
+    ]
+    for label, ok in checks:
+        print(f"{'OK ' if ok else 'FALLO'} {label}")
+    return 0 if all(ok for _, ok in checks) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mb", type=int, default=200)
+    args = parser.parse_args()
+    raise SystemExit(main(args.mb))
@@ -0,0 +1,107 @@
+"""
+Benchmark del limitador de login bajo una inundación de credenciales
+Simulador BIC Lankamar
+
+Simula un atacante que envía N contraseñas incorrectas contra una cuenta
+desde varios clientes, con y sin limitador, y mide el tiempo de CPU
+consumido por bcrypt. Al final verifica que una enfermera desde otro
+cliente sigue pudiendo entrar.
+
+Ejecutar:
+    python bench_login_throttle.py [--attempts 100] [--clients 5] [--rounds 10]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import db
+import activity_log
+import auth_service
+import login_throttle
+from login_throttle import LoginThrottledError
+
+VICTIM_EMAIL = "victima@bench.local"
+NURSE_EMAIL = "enfermera@bench.local"
+PASSWORD = "correcta123"
+
+
+def _flood(attempts: int, clients: int) -> dict:
+    """Envía `attempts` logins inválidos repartidos entre `clients` orígenes"""
+    rejected = 0
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for i in range(attempts):
+        try:
+            auth_service.authenticate(VICTIM_EMAIL, f"mala{i}", client_id=f"atacante-{i % clients}")
+        except LoginThrottledError:
+            rejected += 1
+    return {
+        "rejected": rejected,
+        "cpu_s": time.process_time() - cpu_start,
+        "wall_s": time.perf_counter() - wall_start,
+    }
+
+
+def _nurse_login_ms() -> float:
+    start = time.perf_counter()
+    user = auth_service.authenticate(NURSE_EMAIL, PASSWORD, client_id="enfermeria-uti")
+    elapsed = (time.perf_counter() - start) * 1000
+    if not user:
+        raise RuntimeError("La enfermera no pudo iniciar sesión")
+    return elapsed
+
+
+def main(attempts: int, clients: int, rounds: int) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = Path(tmp) / "bench_auth.db"
+        auth_service.BCRYPT_ROUNDS = rounds
+        db.init_db()
+        auth_service.create_user(VICTIM_EMAIL, PASSWORD)
+        auth_service.create_user(NURSE_EMAIL, PASSWORD)
+
+        # Sin limitador: cada intento paga bcrypt completo
+        original = auth_service.throttle_login
+        auth_service.throttle_login = lambda email, client_id=None: None
+        try:
+            baseline = _flood(attempts, clients)
+        finally:
+            auth_service.throttle_login = original
+
+        # Con limitador
+        login_throttle.reset_throttle_metrics()
+        throttled = _flood(attempts, clients)
+        nurse_ms = _nurse_login_ms()
+        metrics = login_throttle.get_throttle_metrics()
+
+        # Persistencia: tras "reiniciar" (vaciar caché) el bloqueo sigue vigente
+        login_throttle._store.clear_cache()
+        try:
+            auth_service.authenticate(VICTIM_EMAIL, "otra", client_id="atacante-0")
+            survives_restart = False
+        except LoginThrottledError:
+            survives_restart = True
+
+        # Escribir los logins encolados mientras la base temporal existe
+        activity_log.stop_writer()
+
+    print(f"Inundación: {attempts} intentos inválidos desde {clients} clientes (bcrypt {rounds} rounds)")
+    print(f"  Sin limitador: CPU {baseline['cpu_s']:.2f}s | pared {baseline['wall_s']:.2f}s")
+    print(f"  Con limitador: CPU {throttled['cpu_s']:.2f}s | pared {throttled['wall_s']:.2f}s | "
+          f"rechazados {throttled['rejected']}/{attempts}")
+    print(f"  Métricas: {metrics}")
+    print(f"  Login de enfermera durante la inundación: {nurse_ms:.0f} ms")
+    print(f"  Bloqueo persiste tras reinicio: {'sí' if survives_restart else 'NO'}")
+
+    ok = throttled["cpu_s"] < baseline["cpu_s"] and survives_restart
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--attempts", type=int, default=100)
+    parser.add_argument("--clients", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+    raise SystemExit(main(args.attempts, args.clients, args.rounds))
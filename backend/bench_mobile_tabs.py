@@ -0,0 +1,230 @@
+"""
+Benchmark de un rerun del dashboard mobile por rol
+Simulador BIC Lankamar
+
+Con st.tabs cada rerun ejecutaba todas las secciones del rol; con la
+navegación por sección solo la elegida. Mide, por rol, lo que cuesta un
+rerun con admin_dashboard.render_section de las dos formas:
+
+- antes: render_section de todas las secciones del menú del rol
+- después: el de una sola sección (promedio y peor caso entre las del rol)
+
+Streamlit no hace falta: `st` se reemplaza por un sustituto que no
+dibuja nada (los widgets devuelven su valor por defecto y st.cache_data /
+st.cache_resource son un dict por argumentos, como en
+bench_dashboard_rerun.py), así que se mide el trabajo de datos de cada
+sección y no el costo de dibujar.
+
+Ejecutar:
+    python bench_mobile_tabs.py [--reruns 20]
+"""
+
+import argparse
+import importlib
+import inspect
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+import db
+import auth_service
+import content_store
+from auth_service import ROLE_MENU_OPTIONS
+from content_store import add_video
+from invites_service import create_invite
+
+
+# ============================================================
+# SUSTITUTO DE STREAMLIT
+# ============================================================
+
+class SessionState(dict):
+    """st.session_state: dict con acceso por atributo"""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+
+class StubStreamlit:
+    """
+    `st` que no dibuja: cualquier elemento devuelve el mismo objeto (sirve
+    de columna, expander, formulario o sidebar) y los widgets su valor por
+    defecto, guardado en session_state si tienen key
+    """
+
+    def __init__(self):
+        self.session_state = SessionState()
+        self.elements = 0
+
+    def __getattr__(self, name):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        self.elements += 1
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def _widget(self, default, key=None):
+        self.elements += 1
+        if key is None:
+            return default
+        return self.session_state.setdefault(key, default)
+
+    def columns(self, spec, **kwargs):
+        return [self] * (spec if isinstance(spec, int) else len(spec))
+
+    def tabs(self, labels):
+        return [self] * len(labels)
+
+    def selectbox(self, label, options, index=0, key=None, **kwargs):
+        options = list(options)
+        return self._widget(options[index] if options else None, key)
+
+    radio = selectbox
+
+    def text_input(self, label, value="", key=None, **kwargs):
+        return self._widget(value, key)
+
+    text_area = text_input
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, step=None, key=None, **kwargs):
+        return self._widget(value if value is not None else (min_value or 0), key)
+
+    def slider(self, label, min_value=None, max_value=None, value=None, step=None, key=None, **kwargs):
+        return self._widget(value if value is not None else min_value, key)
+
+    def checkbox(self, label, value=False, key=None, **kwargs):
+        return self._widget(value, key)
+
+    def button(self, label, key=None, **kwargs):
+        return self._widget(False, key)
+
+    form_submit_button = download_button = button
+
+    def experimental_get_query_params(self):
+        return {}
+
+    @staticmethod
+    def _cache(func=None, **options):
+        def decorate(f):
+            signature = inspect.signature(f)
+            names = [n for n in signature.parameters if not n.startswith("_")]
+            results = {}
+
+            def cached(*args, **kwargs):
+                bound = signature.bind(*args, **kwargs)
+                key = tuple(repr(bound.arguments.get(n)) for n in names)
+                if key not in results:
+                    results[key] = f(*args, **kwargs)
+                return results[key]
+            cached.clear = results.clear
+            return cached
+        return decorate(func) if func else decorate
+
+    cache_data = cache_resource = _cache
+
+
+def load_dashboard(st: StubStreamlit):
+    """Importa admin_dashboard con `st` sustituido (y sin streamlit-authenticator)"""
+    sys.modules["streamlit"] = st
+    sys.modules["streamlit_authenticator"] = types.SimpleNamespace(Authenticate=object)
+    sys.modules["streamlit.runtime.scriptrunner"] = types.SimpleNamespace(get_script_run_ctx=lambda: None)
+    return importlib.import_module("admin_dashboard")
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+
+def timed_ms(func, reruns: int) -> float:
+    start = time.perf_counter()
+    for _ in range(reruns):
+        func()
+    return (time.perf_counter() - start) / reruns * 1000
+
+
+def main(reruns: int) -> int:
+    st = StubStreamlit()
+    dashboard = load_dashboard(st)
+    sections = list(dict.fromkeys(o for options in ROLE_MENU_OPTIONS.values() for o in options))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = Path(tmp) / "bench.db"
+        content_store.MANIFEST_PATH = Path(tmp) / "sin_manifest.json"
+        auth_service.BCRYPT_ROUNDS = 4
+        db.init_db()
+        for i in range(50):
+            auth_service.create_user(f"usuario{i}@bench.local", "clave123")
+            create_invite("usuario", hours_valid=24)
+            add_video(f"tag_{i}", f"https://videos.local/{i}")
+        catalog = dashboard.load_catalog()
+
+        def render(section):
+            dashboard.render_section(section, catalog.pumps, catalog.errors)
+
+        # Primer rerun: llena las cachés compartidas (catálogo, índices)
+        failed = []
+        for section in sections:
+            try:
+                render(section)
+            except Exception as e:
+                failed.append(f"{section}: {e!r}")
+
+        section_ms, section_elements = {}, {}
+        for section in sections:
+            if any(f.startswith(section) for f in failed):
+                continue
+            before = st.elements
+            section_ms[section] = timed_ms(lambda s=section: render(s), reruns)
+            section_elements[section] = (st.elements - before) // reruns
+
+    for failure in failed:
+        print(f"  error al dibujar {failure}")
+    print(f"{'Sección':<22}{'ms':>8}{'Elementos':>11}")
+    for section in sections:
+        if section in section_ms:
+            print(f"{section:<22}{section_ms[section]:>8.2f}{section_elements[section]:>11}")
+
+    print(f"\n{'Rol':<15}{'Secciones':>10}{'Antes (ms)':>13}{'Después prom.':>15}{'Peor':>9}")
+    results = {}
+    for role, options in ROLE_MENU_OPTIONS.items():
+        if not all(o in section_ms for o in options):
+            continue
+        before = sum(section_ms[o] for o in options)
+        average = before / len(options)
+        worst = max(section_ms[o] for o in options)
+        results[role] = (before, average, worst)
+        print(f"{role:<15}{len(options):>10}{before:>13.2f}{average:>15.2f}{worst:>9.2f}")
+
+    checks = [
+        ("todas las secciones de los menús se dibujan sin errores", not failed),
+        ("render_section dibuja algo en cada sección",
+         all(section_elements.get(s, 0) > 0 for s in sections)),
+        ("un rerun del CEO cuesta en promedio menos de la mitad",
+         "ceo" in results and results["ceo"][1] * 2 < results["ceo"][0]),
+        ("ninguna sección sola cuesta más que todas juntas",
+         all(worst <= before for before, _, worst in results.values())),
+    ]
+    for label, ok in checks:
+        print(f"{'OK ' if ok else 'FALLO'} {label}")
+    return 0 if all(ok for _, ok in checks) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+    raise SystemExit(main(args.reruns))
@@ -0,0 +1,114 @@
+"""
+Benchmark de la validación masiva de órdenes de infusión
+Simulador BIC Lankamar
+
+Genera N órdenes sintéticas (drogas de UTI con dosis, concentraciones,
+pesos y bombas realistas, más un porcentaje de errores de carga), las
+valida con reporte a disco y controla algunos casos conocidos.
+
+Ejecutar:
+    python bench_order_validation.py [--orders 100000]
+"""
+
+import argparse
+import csv
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from order_validation import validate_chunk, validate_orders
+
+# (droga, dosis mín, dosis máx, unidad de dosis, concentración, unidad de concentración)
+DRUGS = [
+    ("Noradrenalina", 0.02, 1.0, "mcg/kg/min", 64, "mcg/ml"),
+    ("Dobutamina", 2.0, 20.0, "mcg/kg/min", 2, "mg/ml"),
+    ("Midazolam", 0.02, 0.2, "mg/kg/h", 1, "mg/ml"),
+    ("Fentanilo", 25, 200, "mcg/h", 10, "mcg/ml"),
+    ("Insulina", 0.5, 15, "U/h", 1, "U/ml"),
+    ("Heparina", 12, 25, "U/kg/h", 100, "U/ml"),
+    ("Cloruro de potasio", 5, 20, "mEq/h", 0.4, "mEq/ml"),
+    ("Solución fisiológica", 21, 500, "ml/h", "", ""),
+]
+
+PUMP_NAMES = ["baxter_sigma_spectrum", "Infusomat Space", "Alaris", "Agilia", "MI-20",
+              "BeneFusion SP5", "Samtronic ST670"]
+
+
+def write_orders(path: Path, n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    drug_idx = rng.integers(0, len(DRUGS), n)
+    pump_idx = rng.integers(0, len(PUMP_NAMES), n)
+    weights = rng.normal(75, 15, n).clip(3, 180).round(1)
+    fraction = rng.uniform(0, 1, n)
+    noise = rng.uniform(0, 1, n)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["order_id", "drug", "dose", "dose_unit", "concentration",
+                         "concentration_unit", "weight_kg", "pump", "vtbi_ml"])
+        for i in range(n):
+            name, low, high, unit, conc, conc_unit = DRUGS[drug_idx[i]]
+            dose = round(low + fraction[i] * (high - low), 3)
+            weight = weights[i]
+            pump = PUMP_NAMES[pump_idx[i]]
+            if noise[i] < 0.01:
+                dose *= 1000                 # Error de unidad (mg tipeado como mcg)
+            elif noise[i] < 0.015:
+                weight = ""                  # Peso faltante
+            elif noise[i] < 0.02:
+                pump = "Bomba genérica"      # Bomba desconocida
+            writer.writerow([f"ORD{i:07d}", name, dose, unit, conc, conc_unit, weight, pump, 500])
+
+
+def check_known_cases() -> bool:
+    rows = [
+        # 0.1 mcg/kg/min × 80 kg ÷ 64 mcg/ml = 7.5 ml/h
+        {"dose": "0.1", "dose_unit": "mcg/kg/min", "concentration": "64", "concentration_unit": "mcg/ml",
+         "weight_kg": "80", "pump": "Alaris"},
+        {"dose": "2000", "dose_unit": "ml/h", "pump": "baxter_sigma_spectrum"},
+        {"dose": "5", "dose_unit": "mg/h", "concentration": "1", "concentration_unit": "U/ml", "pump": "Agilia"},
+        {"dose": "1", "dose_unit": "mg/kg/h", "concentration": "1", "concentration_unit": "mg/ml", "pump": "Agilia"},
+        {"dose": "1", "dose_unit": "furlongs", "pump": "Agilia"},
+    ]
+    keys = {key for row in rows for key in row}
+    result = validate_chunk({key: [row.get(key, "") for row in rows] for key in keys})
+    checks = [
+        abs(result["rate_ml_h"][0] - 7.5) < 1e-9 and result["pump_id"][0] == "bd_alaris_system",
+        bool(result["rate_above_max"][1]),
+        bool(result["unit_mismatch"][2]),
+        bool(result["weight_missing"][3]),
+        bool(result["unit_unknown"][4]),
+    ]
+    return all(checks)
+
+
+def main(n: int) -> int:
+    ok = check_known_cases()
+    print(f"{'OK ' if ok else 'FALLO'} casos conocidos (conversión, rango, unidades, peso)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        orders = Path(tmp) / "ordenes.csv"
+        report = Path(tmp) / "observadas.csv"
+        start = time.perf_counter()
+        write_orders(orders, n)
+        print(f"{n:,} órdenes sintéticas ({orders.stat().st_size / 1e6:.1f} MB, "
+              f"{time.perf_counter() - start:.1f} s para generarlas)")
+
+        result = validate_orders(orders, report)
+        print(f"\nValidación: {result['elapsed_s']:.2f} s ({result['orders_per_s']:,} órdenes/s)")
+        print(f"Observadas: {result['flagged']:,} ({result['flagged'] / n:.1%})")
+        for flag, count in result["flags"].items():
+            print(f"  {count:>8,}  {flag}")
+        with open(report, encoding="utf-8") as f:
+            reported = sum(1 for _ in f) - 1
+        streamed = reported == result["flagged"]
+        print(f"{'OK ' if streamed else 'FALLO'} reporte con {reported:,} filas")
+    return 0 if ok and streamed else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, default=100_000)
+    args = parser.parse_args()
+    raise SystemExit(main(args.orders))
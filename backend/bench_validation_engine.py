@@ -0,0 +1,112 @@
+"""
+Benchmark del motor de validación incremental
+Simulador BIC Lankamar
+
+Arma un catálogo sintético de N alarmas (las bombas reales con sus
+alarmas replicadas), lo valida en frío, vuelve a validarlo sin cambios y
+después de editar una sola alarma (con caché en memoria y solo en disco,
+como una corrida nueva de la CLI), y controla que el reporte incremental
+sea idéntico al de una validación completa y que el caché en disco no
+crezca con cada versión.
+
+Ejecutar:
+    python bench_validation_engine.py [--alarms 100000]
+"""
+
+import argparse
+import copy
+import tempfile
+import time
+from pathlib import Path
+
+import db
+import validation_engine
+from catalog import get_catalog
+from validation_engine import validate_pumps
+
+REPORT_KEYS = ("errors", "warnings", "suggestions")
+
+
+def build_catalog(n_alarms: int):
+    pumps = copy.deepcopy(get_catalog().pumps)
+    per_pump = n_alarms // len(pumps)
+    for p, pump in enumerate(pumps):
+        base = pump["errores_y_alarmas"]
+        pump["errores_y_alarmas"] = [
+            {**base[i % len(base)],
+             "codigo_pantalla": f"{base[i % len(base)]['codigo_pantalla']} #{i}",
+             "video_tag": f"{pump['id']}_{i}"}
+            for i in range(per_pump)
+        ]
+    # Algunos problemas reales para que el reporte no esté vacío
+    pumps[0]["errores_y_alarmas"][10]["accion_correctiva"] = ""
+    pumps[1]["specs_tecnicas"]["presion_max"] = "alta"
+    return pumps
+
+
+def run(label: str, pumps, version: str):
+    report = validate_pumps(pumps, version)
+    stats = report["stats"]
+    print(f"  {label:<34} {stats['elapsed_ms']:>9.1f} ms  caché {stats['hit_rate']:>6.1%}  "
+          f"revalidados {stats['revalidated']:>7,}  podadas {stats['pruned']:>7,}")
+    return report
+
+
+def same_report(a, b) -> bool:
+    return all(a[key] == b[key] for key in REPORT_KEYS)
+
+
+def _cache_rows() -> dict:
+    with db.get_conn() as conn:
+        return dict(conn.execute(
+            "SELECT kind, COUNT(*) FROM validation_cache GROUP BY kind"
+        ).fetchall())
+
+
+def main(n_alarms: int) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = Path(tmp) / "bench.db"
+        db.init_db()
+        pumps = build_catalog(n_alarms)
+        print(f"Catálogo sintético: {len(pumps)} bombas, "
+              f"{sum(len(p['errores_y_alarmas']) for p in pumps):,} alarmas\n")
+
+        cold = run("En frío", pumps, "v1")
+        run("Misma versión", pumps, "v1")
+
+        pumps[3]["errores_y_alarmas"][1234]["significado"] += " (editado)"
+        pumps[3]["errores_y_alarmas"][1235]["accion_correctiva"] = "Ver"
+        edited = run("Una línea editada (memoria)", pumps, "v2")
+
+        validation_engine._memory.clear()
+        pumps[3]["errores_y_alarmas"][1235]["accion_correctiva"] = "Ver manual"
+        from_disk = run("Otra edición (solo disco)", pumps, "v3")
+        rows = _cache_rows()
+
+        validation_engine._memory.clear()
+        start = time.perf_counter()
+        full = validate_pumps(pumps, use_disk=False)
+        print(f"  {'Validación completa sin caché':<34} {(time.perf_counter() - start) * 1000:>9.1f} ms")
+        print(f"\n  Filas en validation_cache: {rows}\n")
+
+    checks = [
+        ("el reporte en frío encuentra los problemas sembrados",
+         len(cold["errors"]) == 1 and len(cold["warnings"]) == 2),
+        ("la edición se refleja en el reporte",
+         any("muy corta" in w for w in edited["warnings"])),
+        ("incremental = validación completa", same_report(from_disk, full)),
+        ("una edición revalida a lo sumo un bloque",
+         edited["stats"]["revalidated"] <= validation_engine.BLOCK_SIZE + len(pumps)),
+        ("el caché en disco solo guarda la versión vigente",
+         rows.get("catalog") == 1 and sum(rows.values()) < n_alarms // 10),
+    ]
+    for label, ok in checks:
+        print(f"{'OK ' if ok else 'FALLO'} {label}")
+    return 0 if all(ok for _, ok in checks) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--alarms", type=int, default=100_000)
+    args = parser.parse_args()
+    raise SystemExit(main(args.alarms))
@@ -0,0 +1,115 @@
+"""
+Benchmark del contador de reproducciones con escritura diferida
+Simulador BIC Lankamar
+
+Varios hilos registran reproducciones de un conjunto de videos con
+view_counter.record_view mientras el escritor en segundo plano las baja
+a SQLite. Compara el ritmo contra un UPDATE por reproducción y controla
+que los totales en la base coincidan exactamente con lo registrado.
+
+Ejecutar:
+    python bench_view_counter.py [--views 200000] [--threads 8] [--videos 50]
+"""
+
+import argparse
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import db
+import content_store
+import view_counter
+from db import get_conn
+
+# Reproducciones del camino ingenuo (un UPDATE por vista)
+NAIVE_VIEWS = 2000
+
+
+def _views_in_db() -> dict:
+    with get_conn() as conn:
+        return dict(conn.execute("SELECT id, views_count FROM videos").fetchall())
+
+
+def main(views: int, threads: int, videos: int) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = Path(tmp) / "bench.db"
+        content_store.MANIFEST_PATH = Path(tmp) / "sin_manifest.json"
+        db.init_db()
+        ids = [content_store.add_video(f"tag_{i}", f"https://videos.local/{i}")["id"] for i in range(videos)]
+
+        # Referencia: una transacción por reproducción
+        start = time.perf_counter()
+        for i in range(NAIVE_VIEWS):
+            content_store.add_views({ids[i % videos]: 1})
+        naive_rate = NAIVE_VIEWS / (time.perf_counter() - start)
+        baseline = _views_in_db()
+
+        # Contador en memoria + escritor en lote
+        expected = {video_id: 0 for video_id in ids}
+        expected_lock = threading.Lock()
+        shards_used = set()
+        per_thread = views // threads
+
+        def producer(seed: int):
+            rng = random.Random(seed)
+            local = {}
+            for _ in range(per_thread):
+                video_id = rng.choice(ids)
+                view_counter.record_view(video_id)
+                local[video_id] = local.get(video_id, 0) + 1
+            with expected_lock:
+                shards_used.add(id(view_counter._thread_shard()))
+                for video_id, count in local.items():
+                    expected[video_id] += count
+
+        workers = [threading.Thread(target=producer, args=(seed,)) for seed in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        record_elapsed = time.perf_counter() - start
+        pending_after_record = view_counter.pending_views()
+
+        # El escritor en segundo plano vacía los contadores dentro de la ventana
+        time.sleep(view_counter.FLUSH_INTERVAL_S * 2.5)
+        pending_after_window = view_counter.pending_views()
+        view_counter.stop_writer()
+
+        totals = _views_in_db()
+        stats = content_store.video_stats()
+        revision = content_store.content_revision()
+
+    batched_rate = per_thread * threads / record_elapsed
+    print(f"{per_thread * threads:,} reproducciones, {threads} hilos, {videos} videos\n")
+    print(f"  UPDATE por reproducción   {naive_rate:>12,.0f} vistas/s")
+    print(f"  record_view + lote        {batched_rate:>12,.0f} vistas/s "
+          f"({batched_rate / naive_rate:,.0f}x)")
+    print(f"  pendientes al terminar    {pending_after_record:>12,}")
+    print(f"  pendientes tras la ventana{pending_after_window:>12,}\n")
+
+    checks = [
+        ("los totales en la base coinciden con lo registrado",
+         all(totals[i] - baseline[i] == expected[i] for i in ids)),
+        ("video_stats suma todas las reproducciones",
+         stats["views"] == NAIVE_VIEWS + per_thread * threads),
+        ("el escritor vacía los contadores dentro de la ventana", pending_after_window == 0),
+        ("las reproducciones no cambian la revisión de contenido", revision == videos),
+        ("cada hilo productor usa su propio shard",
+         len(shards_used) == min(threads, view_counter.SHARDS)),
+        ("más de 1.000 vistas/s", batched_rate > 1000),
+    ]
+    for label, ok in checks:
+        print(f"{'OK ' if ok else 'FALLO'} {label}")
+    return 0 if all(ok for _, ok in checks) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--views", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--videos", type=int, default=50)
+    args = parser.parse_args()
+    raise SystemExit(main(args.views, args.threads, args.videos))
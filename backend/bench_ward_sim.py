@@ -0,0 +1,76 @@
+"""
+Benchmark del simulador de sala por eventos discretos
+Simulador BIC Lankamar
+
+Simula 24 h de una UTI de 40 camas con varias semillas (con traza a disco),
+una sala grande durante una semana para medir eventos/s sostenidos, y
+verifica que la traza se ingiere con alarm_analytics.py sin rechazos.
+
+Ejecutar:
+    python bench_ward_sim.py [--beds 40] [--hours 24] [--runs 5]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import db
+
+
+def main(beds: int, hours: float, runs: int, big_beds: int, big_hours: float) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = Path(tmp) / "bench.db"
+        from alarm_analytics import ingest_log
+        from ward_sim import WardSimulator
+
+        trace = Path(tmp) / "traza.csv"
+        print(f"{beds} camas, {hours:g} h, {runs} semillas (traza a disco)")
+        times = []
+        for seed in range(runs):
+            start = time.perf_counter()
+            result = WardSimulator(beds=beds, seed=seed).run(hours, trace_path=trace)
+            times.append(time.perf_counter() - start)
+            print(f"  seed {seed}: {result['events']:>7,} eventos  {result['alarms']:>6,} alarmas  "
+                  f"{times[-1] * 1000:7.1f} ms  ({result['events_per_s']:,} eventos/s)")
+        fast = max(times) < 1.0
+        print(f"  {'OK ' if fast else 'FALLO'} peor corrida {max(times) * 1000:.1f} ms "
+              f"(mediana {statistics.median(times) * 1000:.1f} ms, incluye armado de la sala)")
+
+        again = WardSimulator(beds=beds, seed=runs - 1).run(hours)
+        same = again["by_code"] == result["by_code"]
+        print(f"  {'OK ' if same else 'FALLO'} misma semilla → mismas alarmas")
+
+        stats = ingest_log(trace)
+        ingested = stats["events"] == result["alarms"] and not stats["rejected"] and not stats["unmatched"]
+        print(f"  {'OK ' if ingested else 'FALLO'} traza ingerida: {stats['events']:,} alarmas "
+              f"(sin resolver {stats['unmatched']}, rechazadas {stats['rejected']})")
+
+        print(f"\n{big_beds} camas, {big_hours:g} h (traza completa)")
+        start = time.perf_counter()
+        big = WardSimulator(beds=big_beds, seed=1).run(big_hours, trace_path=trace, full_trace=True)
+        elapsed = time.perf_counter() - start
+        print(f"  {big['events']:,} eventos ({big['stale_events']:,} obsoletos descartados) "
+              f"en {elapsed:.2f} s: {big['events_per_s']:,} eventos/s, "
+              f"traza {trace.stat().st_size / 1e6:.1f} MB")
+
+        print("\nCarga de alarmas de la última corrida chica:")
+        print(f"  {result['alarms_per_bed_h']:.2f} alarmas por cama y hora, "
+              f"máx. {result['max_concurrent_alarms']} simultáneas, "
+              f"respuesta media {result['mean_response_s']:.0f} s")
+        print(f"  Por severidad: {result['by_severity']}")
+        for code, count in list(result["by_code"].items())[:8]:
+            print(f"    {count:>6,}  {code}")
+        return 0 if fast and same and ingested else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--beds", type=int, default=40)
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--big-beds", type=int, default=400)
+    parser.add_argument("--big-hours", type=float, default=24 * 7)
+    args = parser.parse_args()
+    raise SystemExit(main(args.beds, args.hours, args.runs, args.big_beds, args.big_hours))
@@ -0,0 +1,376 @@
+"""
+Catálogo de Bombas en Memoria
+Simulador BIC Lankamar
+
+Carga pumps_db.json una sola vez por versión y expone índices
+compartidos (por bomba, por código, búsqueda de texto) para el
+dashboard, la API y los scripts.
+
+La versión del catálogo es un hash del contenido del archivo: cambia
+si y solo si cambian los datos.
+"""
+
+import hashlib
+import json
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from json_stream import load_array
+from spec_compiler import SpecTable, compile_pump, compile_specs
+
+# Ruta al archivo de datos
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+PUMPS_DB_PATH = DATA_DIR / "pumps_db.json"
+
+# Archivos de alarmas por dispositivo (formato del fabricante, en inglés).
+# El orden importa: ante códigos repetidos gana el primer archivo.
+DEVICE_ALARM_PATHS = [
+    DATA_DIR / "alarms_plum360_complete.json",
+    DATA_DIR / "alarms_plum360_extended.json",
+    DATA_DIR / "alarms_kangaroo_flocare.json",
+]
+
+# Prioridades de los archivos de fabricante → prioridades de pumps_db.json
+PRIORITY_MAP = {
+    "CRITICAL": "critica",
+    "HIGH": "alta",
+    "MEDIUM": "media",
+    "LOW": "baja",
+    "INFO": "informativa",
+}
+
+# Categoría por palabra clave en el código o texto de la alarma
+CATEGORY_KEYWORDS = [
+    ("occlu", "oclusion"),
+    ("air", "aire"),
+    ("bubble", "aire"),
+    ("batt", "energia"),
+    ("power", "energia"),
+    (" ac ", "energia"),
+    ("door", "mecanica"),
+    ("motor", "mecanica"),
+    ("flow", "flujo"),
+    ("feed", "flujo"),
+    ("cassette", "set"),
+    (" set", "set"),
+    ("vtbi", "volumen"),
+    ("volume", "volumen"),
+    ("dose", "medicacion"),
+    ("drug", "medicacion"),
+]
+
+KNOWN_MANUFACTURERS = ["ICU Medical", "Cardinal Health", "Nutricia"]
+
+# Claves sin las cuales una bomba o alarma no se puede indexar
+PUMP_KEYS = ["id", "marca", "modelo"]
+ALARM_KEYS = ["codigo_pantalla", "video_tag", "significado"]
+
+
+def flatten_errors(pumps: List[Dict]) -> List[Dict]:
+    """Extrae todos los errores de todas las bombas (una fila por alarma)"""
+    errors = []
+    for pump in pumps:
+        for error in pump.get("errores_y_alarmas", []):
+            errors.append({
+                "pump_id": pump["id"],
+                "pump_name": f"{pump['marca']} {pump['modelo']}",
+                "codigo": error["codigo_pantalla"],
+                "video_tag": error["video_tag"],
+                "significado": error["significado"],
+                "prioridad": error.get("prioridad", "media"),
+                "categoria": error.get("categoria", "general"),
+                "accion_correctiva": error.get("accion_correctiva", "")
+            })
+    return errors
+
+
+def pump_record_problem(pump) -> Optional[str]:
+    """Motivo por el que un registro de pumps_db.json no se puede indexar (None si está bien)"""
+    if not isinstance(pump, dict):
+        return "el registro no es un objeto"
+    missing = [key for key in PUMP_KEYS if key not in pump]
+    if missing:
+        return f"faltan claves: {', '.join(missing)}"
+    alarms = pump.get("errores_y_alarmas", [])
+    if not isinstance(alarms, list):
+        return "errores_y_alarmas no es una lista"
+    for i, alarm in enumerate(alarms):
+        if not isinstance(alarm, dict):
+            return f"errores_y_alarmas[{i}] no es un objeto"
+        missing = [key for key in ALARM_KEYS if key not in alarm]
+        if missing:
+            return f"errores_y_alarmas[{i}]: faltan claves: {', '.join(missing)}"
+    return None
+
+
+def guess_category(code: str, text: str) -> str:
+    """Categoría aproximada de una alarma de fabricante"""
+    haystack = f" {code.replace('_', ' ')} {text} ".lower()
+    for keyword, category in CATEGORY_KEYWORDS:
+        if keyword in haystack:
+            return category
+    return "sistema"
+
+
+def normalize_device_alarm(device_id: str, alarm: Dict) -> Dict:
+    """
+    Convierte una alarma de archivo de fabricante al formato de pumps_db.json
+
+    Acepta las variantes de los tres archivos (display_text/text/display,
+    probable_cause/cause, nurse_actions/actions, requires_biotech/biotech,
+    severity_level/severity).
+    """
+    code = str(alarm["code"]).strip()
+    text = alarm.get("display_text") or alarm.get("text") or alarm.get("display") or code
+    actions = alarm.get("nurse_actions") or alarm.get("actions") or []
+    return {
+        "codigo_pantalla": code,
+        "significado": text,
+        "accion_correctiva": "; ".join(actions),
+        "video_tag": f"{device_id}_{code.lower()}",
+        "prioridad": PRIORITY_MAP.get(str(alarm.get("priority", "")).upper(), "media"),
+        "categoria": guess_category(code, text),
+        "causa": alarm.get("probable_cause") or alarm.get("cause") or "",
+        "requiere_biotecnico": bool(alarm.get("requires_biotech", alarm.get("biotech", False))),
+        "severidad": alarm.get("severity_level", alarm.get("severity")),
+    }
+
+
+def _split_brand(name: str, manufacturer: Optional[str]) -> tuple:
+    manufacturer = manufacturer or next(
+        (m for m in KNOWN_MANUFACTURERS if name.startswith(m)), name.split(" ")[0]
+    )
+    model = name[len(manufacturer):].strip() if name.startswith(manufacturer) else name
+    return manufacturer, model
+
+
+def iter_device_files(paths: List[Path] = None):
+    """Itera (path, dispositivo crudo) de los archivos de alarmas de fabricante"""
+    for path in paths or DEVICE_ALARM_PATHS:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        devices = data.get("enteral_pumps") if isinstance(data, dict) and "enteral_pumps" in data else [data]
+        for device in devices:
+            yield Path(path), device
+
+
+def load_device_alarms(paths: List[Path] = None) -> List[Dict]:
+    """
+    Dispositivos de los archivos de alarmas de fabricante, normalizados
+
+    Los archivos que describen el mismo dispositivo (Plum 360 completo y
+    extendido) se fusionan: un código aparece una sola vez.
+
+    Returns:
+        Lista de dicts con la forma de una bomba de pumps_db.json
+        (id, marca, modelo, tipo, errores_y_alarmas) más "fuentes"
+    """
+    devices: Dict[str, Dict] = {}
+    for path, raw in iter_device_files(paths):
+        device_id = raw["device_id"]
+        name = raw.get("device_name") or raw.get("name") or device_id
+        device = devices.get(device_id)
+        if device is None:
+            marca, modelo = _split_brand(name, raw.get("manufacturer"))
+            device = devices[device_id] = {
+                "id": device_id,
+                "marca": marca,
+                "modelo": modelo,
+                "tipo": raw.get("device_type") or raw.get("type") or "",
+                "errores_y_alarmas": [],
+                "fuentes": [],
+                "_codes": set(),
+            }
+        device["fuentes"].append(path.name)
+        for alarm in raw.get("alarms", []):
+            normalized = normalize_device_alarm(device_id, alarm)
+            if normalized["codigo_pantalla"] in device["_codes"]:
+                continue
+            device["_codes"].add(normalized["codigo_pantalla"])
+            device["errores_y_alarmas"].append(normalized)
+
+    for device in devices.values():
+        del device["_codes"]
+    return list(devices.values())
+
+
+def content_version(raw: bytes) -> str:
+    """Versión del catálogo: primeros 16 hex del SHA-256 del contenido"""
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+class Catalog:
+    """
+    Snapshot inmutable del catálogo con sus índices.
+
+    No modificar las listas/dicts expuestos: se comparten entre
+    sesiones y requests.
+    """
+
+    def __init__(self, pumps: List[Dict], version: str, quarantine: Optional[List[Dict]] = None):
+        self.pumps = pumps
+        self.version = version
+        # Registros descartados al cargar (ver json_stream.ArrayStream)
+        self.quarantine: List[Dict] = quarantine or []
+        self.pumps_by_id: Dict[str, Dict] = {p["id"]: p for p in pumps}
+        self.errors = flatten_errors(pumps)
+
+        # Specs técnicas compiladas a valores numéricos (una vez por versión)
+        self.specs: SpecTable = compile_specs(pumps)
+
+        self.errors_by_pump: Dict[str, List[Dict]] = defaultdict(list)
+        self.errors_by_code: Dict[str, List[Dict]] = defaultdict(list)
+        for error in self.errors:
+            self.errors_by_pump[error["pump_id"]].append(error)
+            self.errors_by_code[error["codigo"].upper().strip()].append(error)
+
+        # Texto en minúsculas precalculado para búsqueda por substring
+        self._haystacks = [
+            f"{e['codigo']}\n{e['significado']}".lower() for e in self.errors
+        ]
+
+    def search(
+        self,
+        query: str = "",
+        pump_id: Optional[str] = None,
+        categoria: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Busca alarmas por código o significado (substring, sin mayúsculas)
+
+        Args:
+            query: Texto a buscar (vacío = todas)
+            pump_id: Filtrar por bomba
+            categoria: Filtrar por categoría
+            limit: Máximo de resultados
+        """
+        needle = query.lower().strip()
+        candidates = (
+            self.errors_by_pump.get(pump_id, []) if pump_id else self.errors
+        )
+        haystacks = None if pump_id else self._haystacks
+
+        results = []
+        for i, error in enumerate(candidates):
+            if categoria and error["categoria"] != categoria:
+                continue
+            if needle:
+                text = haystacks[i] if haystacks is not None else (
+                    f"{error['codigo']}\n{error['significado']}".lower()
+                )
+                if needle not in text:
+                    continue
+            results.append(error)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def search_page(
+        self,
+        query: str = "",
+        pump_id: Optional[str] = None,
+        categoria: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 50
+    ) -> Dict:
+        """
+        Una página de search() agrupada por categoría
+
+        Los resultados se ordenan por categoría (estable: dentro de cada
+        una, en el orden del catálogo) para que las páginas sucesivas
+        continúen el grupo en curso.
+
+        Returns:
+            {total, offset, results, by_category}; by_category cuenta
+            los resultados de cada categoría en todas las páginas
+        """
+        matches = self.search(query, pump_id=pump_id, categoria=categoria)
+        matches.sort(key=lambda e: e["categoria"])
+        by_category: Dict[str, int] = defaultdict(int)
+        for error in matches:
+            by_category[error["categoria"]] += 1
+        return {
+            "total": len(matches),
+            "offset": offset,
+            "results": matches[offset:offset + limit],
+            "by_category": dict(by_category),
+        }
+
+
+def load_catalog(path: Path = PUMPS_DB_PATH) -> Catalog:
+    """
+    Lee y parsea el archivo de bombas (sin caché)
+
+    Lectura en streaming: una bomba con JSON inválido o sin las claves
+    mínimas queda en catalog.quarantine y el resto del catálogo se sirve
+    igual. ValueError si el archivo no es un array JSON.
+    """
+    pumps, quarantine, version = load_array(path, check=pump_record_problem)
+    return Catalog(pumps, version, quarantine)
+
+
+_cache_lock = threading.Lock()
+_cache: Dict[tuple, tuple] = {}  # (tipo, paths) → (stamp, objeto)
+
+
+def _file_stamp(paths) -> tuple:
+    stamps = []
+    for path in paths:
+        stat = Path(path).stat()
+        stamps.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(stamps)
+
+
+def _get_cached(cache_key: tuple, paths, loader):
+    """Devuelve loader() cacheado mientras no cambien mtime/tamaño de `paths`"""
+    stamp = _file_stamp(paths)
+
+    cached = _cache.get(cache_key)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    with _cache_lock:
+        cached = _cache.get(cache_key)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        value = loader()
+        _cache[cache_key] = (stamp, value)
+        return value
+
+
+def get_catalog(path: Path = PUMPS_DB_PATH) -> Catalog:
+    """
+    Catálogo compartido del proceso
+
+    Se recarga solo si cambia el mtime o el tamaño del archivo; en caso
+    contrario devuelve el mismo objeto (sin releer ni parsear).
+    """
+    path = Path(path)
+    return _get_cached(("catalog", path), [path], lambda: load_catalog(path))
+
+
+def pump_specs(pump: Dict) -> Dict:
+    """
+    Specs compiladas de una bomba
+
+    Devuelve la fila precalculada del catálogo vigente si la bomba
+    pertenece a él; si no (bombas editadas o de prueba), la compila al
+    vuelo. ValueError si rango_flujo no es interpretable.
+    """
+    catalog = get_catalog()
+    if catalog.pumps_by_id.get(pump.get("id")) is pump:
+        return catalog.specs.row(pump["id"])
+    row, issues = compile_pump(pump)
+    errors = [i["message"] for i in issues if i["level"] == "error"]
+    if errors:
+        raise ValueError(f"{pump.get('id')}: {'; '.join(errors)}")
+    return row
+
+
+def get_device_alarms(paths: List[Path] = None) -> List[Dict]:
+    """Dispositivos de fabricante normalizados, cacheados como get_catalog()"""
+    paths = tuple(Path(p) for p in (paths or DEVICE_ALARM_PATHS))
+    return _get_cached(("devices", paths), paths, lambda: load_device_alarms(list(paths)))
@@ -0,0 +1,443 @@
+"""
+API del Catálogo de Bombas (FastAPI)
+Simulador BIC Lankamar
+
+Endpoints de solo lectura sobre el catálogo compartido (catalog.py):
+- GET /catalog              Catálogo completo
+- GET /pumps/{pump_id}      Detalle de una bomba
+- GET /search?q=...         Búsqueda de alarmas (paginada con limit/offset)
+- GET /sync?since=<versión> Delta desde la versión del cliente (catalog_sync.py)
+- POST /alarms/resolve      Resolución masiva de códigos (alarm_resolver.py)
+- GET /battery?rate_ml_h=.. Autonomía de batería por bomba (battery_model.py)
+- GET /compare?where=..     Matriz comparativa filtrada y ordenada (pump_matrix.py)
+- POST /videos/{id}/views   Registra reproducciones de un video (view_counter.py)
+- GET /export/{tabla}?format=csv  Exportación en streaming (catalog_export.py)
+
+Cada respuesta lleva un ETag fuerte derivado de la versión del catálogo.
+Si el cliente envía If-None-Match con ese ETag se responde 304 sin
+cuerpo. Los cuerpos JSON se serializan y comprimen (gzip y, si está
+instalado, brotli) una sola vez por versión del catálogo.
+
+Ejecutar con:
+    uvicorn catalog_api:app --port 8000
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from alarm_resolver import get_resolver
+from battery_model import get_battery_table
+from catalog import Catalog, get_catalog
+from catalog_export import export_filename, export_mime, iter_export
+from catalog_sync import compute_delta
+from pump_matrix import get_pump_matrix
+from reference_index import get_reference_index
+from view_counter import pending_views, record_view
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se ofrece gzip
+    brotli = None
+
+
+app = FastAPI(
+    title="SiBIC - API de Catálogo",
+    description="Catálogo de bombas de infusión y alarmas del Simulador BIC Lankamar",
+    version="1.0"
+)
+
+# Respuestas de búsqueda comprimidas que se conservan por versión
+SEARCH_CACHE_SIZE = 256
+
+# Pares por request en /alarms/resolve
+MAX_RESOLVE_BATCH = 100_000
+
+# Encodings en orden de preferencia → sufijo del ETag
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz", "identity": ""}
+
+
+# ============================================================
+# CUERPOS PRECOMPRIMIDOS
+# ============================================================
+
+def encode_payload(payload) -> Dict[str, bytes]:
+    """Serializa a JSON compacto y genera las variantes comprimidas"""
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    bodies = {
+        "identity": raw,
+        "gzip": gzip.compress(raw, compresslevel=9, mtime=0),
+    }
+    if brotli is not None:
+        bodies["br"] = brotli.compress(raw, quality=11)
+    return bodies
+
+
+class VersionedBodies:
+    """
+    Cuerpos codificados por clave, válidos para una versión del catálogo.
+
+    Al cambiar la versión se descartan todos y se regeneran el catálogo
+    completo y el detalle de cada bomba.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version: Optional[str] = None
+        self._static: Dict[str, Dict[str, bytes]] = {}
+        self._search: "OrderedDict[str, Dict[str, bytes]]" = OrderedDict()
+
+    def _rebuild(self, catalog: Catalog):
+        static = {"catalog": encode_payload(catalog.pumps)}
+        for pump_id, pump in catalog.pumps_by_id.items():
+            static[f"pump:{pump_id}"] = encode_payload(pump)
+        self._static = static
+        self._search = OrderedDict()
+        self.version = catalog.version
+
+    def get(self, catalog: Catalog, key: str, build: Optional[Callable] = None) -> Optional[Dict[str, bytes]]:
+        """
+        Cuerpos para `key` en la versión actual.
+
+        Las claves estáticas ("catalog", "pump:<id>") se generan al cambiar
+        de versión; el resto se construye con build() y queda en un LRU.
+        """
+        with self._lock:
+            if self.version != catalog.version:
+                self._rebuild(catalog)
+            if key in self._static:
+                return self._static[key]
+            if build is None:
+                return None
+            bodies = self._search.get(key)
+            if bodies is not None:
+                self._search.move_to_end(key)
+                return bodies
+
+        bodies = encode_payload(build())
+
+        with self._lock:
+            if self.version == catalog.version:
+                self._search[key] = bodies
+                while len(self._search) > SEARCH_CACHE_SIZE:
+                    self._search.popitem(last=False)
+        return bodies
+
+
+_bodies = VersionedBodies()
+
+
+# ============================================================
+# NEGOCIACIÓN Y ETAGS
+# ============================================================
+
+def negotiate_encoding(accept_encoding: str, available) -> str:
+    """Elige br > gzip > identity según Accept-Encoding y lo disponible"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if token:
+            accepted[token.lower()] = q
+
+    for encoding in ("br", "gzip"):
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return "identity"
+
+
+def make_etag(version: str, key: str) -> str:
+    """ETag base (sin comillas ni sufijo de encoding)"""
+    key_hash = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+    return f"{version}.{key_hash}"
+
+
+def etag_matches(if_none_match: Optional[str], base: str) -> bool:
+    """True si algún ETag de If-None-Match corresponde a `base` (cualquier encoding)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    variants = {base + suffix for suffix in ENCODING_SUFFIXES.values()}
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag.strip('"') in variants:
+            return True
+    return False
+
+
+def versioned_response(
+    request: Request,
+    catalog: Catalog,
+    key: str,
+    build: Optional[Callable] = None
+) -> Response:
+    """Respuesta JSON con ETag fuerte, 304 condicional y cuerpo precomprimido"""
+    base = make_etag(catalog.version, key)
+    bodies = _bodies.get(catalog, key, build)
+    if bodies is None:
+        raise HTTPException(status_code=404, detail="Recurso no encontrado")
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""), bodies)
+    headers = {
+        "ETag": f'"{base}{ENCODING_SUFFIXES[encoding]}"',
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "no-cache",
+        "X-Catalog-Version": catalog.version,
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), base):
+        return Response(status_code=304, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=bodies[encoding],
+        media_type="application/json",
+        headers=headers
+    )
+
+
+# ============================================================
+# ENDPOINTS
+# ============================================================
+
+@app.get("/health")
+def health():
+    """Estado del servicio y versión del catálogo cargado"""
+    catalog = get_catalog()
+    return {
+        "status": "degraded" if catalog.quarantine else "ok",
+        "catalog_version": catalog.version,
+        "pumps": len(catalog.pumps),
+        "alarms": len(catalog.errors),
+        "quarantined": catalog.quarantine,
+        "brotli": brotli is not None,
+    }
+
+
+@app.get("/catalog")
+def get_full_catalog(request: Request):
+    """Catálogo completo de bombas"""
+    return versioned_response(request, get_catalog(), "catalog")
+
+
+@app.get("/pumps/{pump_id}")
+def get_pump(pump_id: str, request: Request):
+    """Detalle de una bomba por ID"""
+    catalog = get_catalog()
+    if pump_id not in catalog.pumps_by_id:
+        raise HTTPException(status_code=404, detail=f"Bomba no encontrada: {pump_id}")
+    return versioned_response(request, catalog, f"pump:{pump_id}")
+
+
+@app.get("/search")
+def search_alarms(
+    request: Request,
+    q: str = "",
+    pump_id: Optional[str] = None,
+    categoria: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
+):
+    """
+    Busca alarmas por código o significado, de a `limit` por página
+
+    Los resultados vienen agrupados por categoría; `total` y
+    `by_category` cuentan todas las páginas.
+    """
+    catalog = get_catalog()
+    key = "search:" + json.dumps([q.lower().strip(), pump_id, categoria, limit, offset])
+
+    def build():
+        page = catalog.search_page(q, pump_id=pump_id, categoria=categoria, offset=offset, limit=limit)
+        return {"query": q, **page}
+
+    return versioned_response(request, catalog, key, build)
+
+
+@app.get("/sync")
+def sync_catalog(request: Request, since: Optional[str] = None):
+    """
+    Cambios del catálogo desde la versión `since` del cliente
+
+    Sin `since` (o con una versión desconocida) devuelve un snapshot
+    completo con "full": true.
+    """
+    catalog = get_catalog()
+    return versioned_response(
+        request, catalog, f"sync:{since or ''}", lambda: compute_delta(since, catalog)
+    )
+
+
+class AlarmCodeItem(BaseModel):
+    device: str = ""
+    code: str
+
+
+class ResolveRequest(BaseModel):
+    items: List[AlarmCodeItem] = Field(..., max_length=MAX_RESOLVE_BATCH)
+
+
+@app.post("/alarms/resolve")
+def resolve_alarms(body: ResolveRequest):
+    """
+    Resuelve un lote de pares (dispositivo, código crudo) de logs de bombas
+
+    Los resultados vienen en el mismo orden que `items`; "match" indica
+    cómo se resolvió cada uno (exact, text, fuzzy, code_only, none).
+    """
+    resolver = get_resolver()
+    results = resolver.resolve_many((item.device, item.code) for item in body.items)
+    return {
+        "catalog_version": get_catalog().version,
+        "total": len(results),
+        "matches": Counter(r["match"] for r in results),
+        "results": [
+            {"device": item.device, "code": item.code, **result}
+            for item, result in zip(body.items, results)
+        ],
+    }
+
+
+@app.get("/battery")
+def battery_runtime(
+    request: Request,
+    rate_ml_h: float = Query(..., ge=0),
+    charge: float = Query(1.0, ge=0, le=1),
+    minutes: Optional[float] = Query(None, ge=0),
+    pump_id: Optional[str] = None
+):
+    """
+    Autonomía de batería al flujo y carga indicados (tabla precalculada)
+
+    Con `minutes` cada fila indica si la bomba dura ese tiempo ("lasts").
+    Sin `pump_id` responde todas las bombas, de mayor a menor autonomía.
+    """
+    catalog = get_catalog()
+    if pump_id is not None and pump_id not in catalog.pumps_by_id:
+        raise HTTPException(status_code=404, detail=f"Bomba no encontrada: {pump_id}")
+    key = "battery:" + json.dumps([rate_ml_h, charge, minutes, pump_id])
+
+    def build():
+        table = get_battery_table()
+        if pump_id is not None:
+            return table.lookup(pump_id, rate_ml_h, charge, minutes)
+        return {"rate_ml_h": rate_ml_h, "charge": charge, "minutes": minutes,
+                "results": table.lookup_all(rate_ml_h, charge, minutes)}
+
+    return versioned_response(request, catalog, key, build)
+
+
+@app.get("/compare")
+def compare_pumps(
+    request: Request,
+    where: List[str] = Query([]),
+    sort: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """
+    Matriz comparativa de bombas (precalculada por versión del catálogo)
+
+    `where` se repite por condición ("rate_min<=0.1", "tipo==...") y se
+    combinan con AND; `sort` acepta "-" adelante para orden descendente.
+    Ej.: /compare?where=rate_min<=0.1&sort=-autonomy_h
+    """
+    catalog = get_catalog()
+    matrix = get_pump_matrix()
+    try:
+        rows = matrix.query(where, sort=sort, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    key = "compare:" + json.dumps([sorted(where), sort, limit])
+
+    def build():
+        return {"attributes": matrix.attributes, "total": len(rows), "results": rows}
+
+    return versioned_response(request, catalog, key, build)
+
+
+@app.get("/references")
+def cross_references(request: Request, pump_id: Optional[str] = None):
+    """
+    Referencias cruzadas entre pumps_db.json, los videos y
+    bombas_especificaciones.json: referencias rotas, videos huérfanos y
+    cobertura de videos por bomba (o solo las de `pump_id`)
+    """
+    catalog = get_catalog()
+    index = get_reference_index()
+    if pump_id is not None and pump_id not in index.coverage:
+        raise HTTPException(status_code=404, detail=f"Bomba no encontrada: {pump_id}")
+    key = f"references:{index.version}:{pump_id or ''}"
+
+    def build():
+        summary = index.summary()
+        if pump_id is None:
+            return summary
+        return {
+            **summary,
+            "dangling": [d for d in index.dangling if d["pump_id"] == pump_id],
+            "orphan_videos": [v for v in index.orphan_videos if v.get("pump_id") == pump_id],
+            "coverage": {pump_id: index.coverage[pump_id]},
+        }
+
+    return versioned_response(request, catalog, key, build)
+
+
+@app.post("/videos/{video_id}/views", status_code=202)
+def count_video_view(video_id: int, count: int = Query(1, ge=1, le=1000)):
+    """
+    Suma reproducciones a un video sin esperar la escritura
+
+    Se acumulan en memoria y se escriben en lote (ver view_counter.py).
+    """
+    record_view(video_id, count)
+    return {"video_id": video_id, "accepted": count, "pending": pending_views()}
+
+
+@app.get("/export/{table}")
+def export_table(
+    request: Request,
+    table: str,
+    fmt: str = Query("csv", alias="format"),
+    compress: bool = Query(False, alias="gzip")
+):
+    """
+    Tabla del catálogo ("errores" o "bombas") en CSV, JSONL, Parquet, XLSX
+    o SQLite, enviada de a bloques; `gzip=true` la comprime
+    """
+    catalog = get_catalog()
+    try:
+        chunks = iter_export(table, fmt, compress=compress, catalog=catalog)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    base = make_etag(catalog.version, f"export:{table}:{fmt}:{compress}")
+    headers = {
+        "ETag": f'"{base}"',
+        "Cache-Control": "no-cache",
+        "X-Catalog-Version": catalog.version,
+        "Content-Disposition": f'attachment; filename="{export_filename(table, fmt, compress)}"',
+    }
+    if etag_matches(request.headers.get("if-none-match"), base):
+        chunks.close()
+        return Response(status_code=304, headers=headers)
+    return StreamingResponse(chunks, media_type=export_mime(fmt, compress), headers=headers)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8000)
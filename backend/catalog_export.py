@@ -0,0 +1,346 @@
+"""
+Motor de Exportación del Catálogo (CSV, JSONL, Parquet, XLSX, SQLite)
+Simulador BIC Lankamar
+
+Recorre las filas del catálogo y las escribe con el writer de cada
+formato, en bloques de CHUNK_BYTES: iter_export() produce el archivo de
+a pedazos sin armarlo entero en memoria (la API lo manda en streaming).
+get_export() devuelve el archivo completo y lo guarda por versión del
+catálogo, así el dashboard lo genera solo cuando se pide y una vez.
+
+Tablas: "errores" (una fila por alarma) y "bombas" (una fila por bomba).
+Con compress=True la salida va en gzip. Parquet requiere pyarrow
+(opcional); los demás formatos usan solo la biblioteca estándar.
+
+Uso:
+    python catalog_export.py errores csv [salida.csv] [--gzip]
+"""
+
+import csv
+import io
+import json
+import sqlite3
+import sys
+import tempfile
+import threading
+import zipfile
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from catalog import Catalog, get_catalog
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pyarrow es opcional: sin él no se ofrece Parquet
+    pyarrow = None
+
+
+# ============================================================
+# CONFIGURACIÓN
+# ============================================================
+
+CHUNK_BYTES = 64 * 1024   # Tamaño de cada bloque producido
+BATCH_ROWS = 1000         # Filas que se escriben juntas
+EXPORT_CACHE_SIZE = 16    # Archivos completos que se conservan por versión
+
+
+def _pump_rows(catalog: Catalog) -> Iterator[Dict]:
+    for pump in catalog.pumps:
+        specs = pump.get("specs_tecnicas", {})
+        yield {
+            "id": pump["id"],
+            "marca": pump["marca"],
+            "modelo": pump["modelo"],
+            "tipo": pump.get("tipo", ""),
+            "rango_flujo": specs.get("rango_flujo", ""),
+            "bateria": specs.get("bateria", ""),
+            "errores": len(pump.get("errores_y_alarmas", [])),
+        }
+
+
+# tabla → (filas del catálogo, [(campo, encabezado)])
+TABLES: Dict[str, Tuple[Callable[[Catalog], Iterable[Dict]], List[Tuple[str, str]]]] = {
+    "errores": (
+        lambda catalog: catalog.errors,
+        [
+            ("pump_name", "Bomba"),
+            ("codigo", "Código"),
+            ("significado", "Significado"),
+            ("categoria", "Categoría"),
+            ("prioridad", "Prioridad"),
+            ("accion_correctiva", "Acción Correctiva"),
+            ("video_tag", "Video Tag"),
+        ],
+    ),
+    "bombas": (
+        _pump_rows,
+        [
+            ("id", "ID"),
+            ("marca", "Marca"),
+            ("modelo", "Modelo"),
+            ("tipo", "Tipo"),
+            ("rango_flujo", "Rango Flujo"),
+            ("bateria", "Batería"),
+            ("errores", "Cantidad Errores"),
+        ],
+    ),
+}
+
+
+# ============================================================
+# WRITERS (cada uno produce bytes de a bloques)
+# ============================================================
+
+def _batches(rows: Iterable[Dict]) -> Iterator[List[Dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_ROWS:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _values(columns: List[Tuple[str, str]]) -> Callable[[Dict], tuple]:
+    """Valores de una fila en el orden de `columns` (faltantes → None)"""
+    fields = [field for field, _ in columns]
+    return lambda row: tuple(row.get(field) for field in fields)
+
+
+def _csv_chunks(rows: Iterable[Dict], columns: List[Tuple[str, str]]) -> Iterator[bytes]:
+    values = _values(columns)
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow([header for _, header in columns])
+    for batch in _batches(rows):
+        writer.writerows(map(values, batch))
+        if buf.tell() >= CHUNK_BYTES:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue().encode("utf-8")
+
+
+def _jsonl_chunks(rows: Iterable[Dict], columns: List[Tuple[str, str]]) -> Iterator[bytes]:
+    fields = [field for field, _ in columns]
+    values = _values(columns)
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    for batch in _batches(rows):
+        yield "".join(dumps(dict(zip(fields, values(row)))) + "\n" for row in batch).encode("utf-8")
+
+
+def _file_chunks(f) -> Iterator[bytes]:
+    f.seek(0)
+    while True:
+        chunk = f.read(CHUNK_BYTES)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _parquet_chunks(rows: Iterable[Dict], columns: List[Tuple[str, str]]) -> Iterator[bytes]:
+    fields = [field for field, _ in columns]
+    values = _values(columns)
+    with tempfile.SpooledTemporaryFile(max_size=8 * CHUNK_BYTES) as f:
+        writer = None
+        for batch in _batches(rows):
+            table = pyarrow.Table.from_pylist([dict(zip(fields, values(row))) for row in batch])
+            if writer is None:
+                writer = pyarrow.parquet.ParquetWriter(f, table.schema)
+            writer.write_table(table)
+        if writer is not None:
+            writer.close()
+        yield from _file_chunks(f)
+
+
+def _xlsx_cell(value) -> str:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    text = escape("" if value is None else str(value))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_chunks(rows: Iterable[Dict], columns: List[Tuple[str, str]], sheet: str) -> Iterator[bytes]:
+    """XLSX mínimo (una hoja, strings en línea) escrito fila por fila en el zip"""
+    workbook = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{escape(sheet)}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    )
+    with tempfile.SpooledTemporaryFile(max_size=8 * CHUNK_BYTES) as f:
+        with zipfile.ZipFile(f, "w", zipfile.ZIP_DEFLATED) as xlsx:
+            for name, content in _XLSX_PARTS.items():
+                xlsx.writestr(name, content)
+            xlsx.writestr("xl/workbook.xml", workbook)
+            with xlsx.open("xl/worksheets/sheet1.xml", "w") as out:
+                out.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                          b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                          b'<sheetData>')
+                header = "".join(_xlsx_cell(h) for _, h in columns)
+                out.write(f"<row>{header}</row>".encode("utf-8"))
+                values = _values(columns)
+                for batch in _batches(rows):
+                    out.write("".join(
+                        "<row>" + "".join(map(_xlsx_cell, values(row))) + "</row>" for row in batch
+                    ).encode("utf-8"))
+                out.write(b"</sheetData></worksheet>")
+        yield from _file_chunks(f)
+
+
+def _sqlite_chunks(rows: Iterable[Dict], columns: List[Tuple[str, str]], table: str) -> Iterator[bytes]:
+    """Base SQLite portable con una tabla `table` (columnas = campos)"""
+    fields = [field for field, _ in columns]
+    values = _values(columns)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "export.db"
+        conn = sqlite3.connect(path)
+        try:
+            conn.execute(f"CREATE TABLE {table} ({', '.join(fields)})")
+            insert = f"INSERT INTO {table} VALUES ({', '.join('?' * len(fields))})"
+            for batch in _batches(rows):
+                conn.executemany(insert, map(values, batch))
+            conn.commit()
+        finally:
+            conn.close()
+        with open(path, "rb") as f:
+            yield from _file_chunks(f)
+
+
+# formato → (extensión, MIME, writer(rows, columns, table))
+FORMATS: Dict[str, Tuple[str, str, Callable]] = {
+    "csv": ("csv", "text/csv", lambda rows, columns, table: _csv_chunks(rows, columns)),
+    "jsonl": ("jsonl", "application/x-ndjson", lambda rows, columns, table: _jsonl_chunks(rows, columns)),
+    "parquet": ("parquet", "application/vnd.apache.parquet",
+                lambda rows, columns, table: _parquet_chunks(rows, columns)),
+    "xlsx": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", _xlsx_chunks),
+    "sqlite": ("db", "application/vnd.sqlite3", _sqlite_chunks),
+}
+
+
+def available_formats() -> List[str]:
+    """Formatos que se pueden generar con las dependencias instaladas"""
+    return [fmt for fmt in FORMATS if fmt != "parquet" or pyarrow is not None]
+
+
+def _gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31)  # wbits 31 = formato gzip
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+# ============================================================
+# API
+# ============================================================
+
+def export_filename(table: str, fmt: str, compress: bool = False) -> str:
+    return f"sibic_{table}.{FORMATS[fmt][0]}" + (".gz" if compress else "")
+
+
+def export_mime(fmt: str, compress: bool = False) -> str:
+    return "application/gzip" if compress else FORMATS[fmt][1]
+
+
+def iter_export(
+    table: str,
+    fmt: str,
+    compress: bool = False,
+    catalog: Optional[Catalog] = None
+) -> Iterator[bytes]:
+    """
+    Archivo exportado de a bloques (se valida todo antes del primer bloque)
+
+    Raises:
+        ValueError: Tabla o formato desconocido, o formato no disponible
+    """
+    if table not in TABLES:
+        raise ValueError(f"Tabla desconocida: {table} (disponibles: {', '.join(TABLES)})")
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato desconocido: {fmt} (disponibles: {', '.join(FORMATS)})")
+    if fmt not in available_formats():
+        raise ValueError(f"El formato {fmt} requiere pyarrow (pip install pyarrow)")
+    catalog = catalog or get_catalog()
+    rows_of, columns = TABLES[table]
+    chunks = (chunk for chunk in FORMATS[fmt][2](rows_of(catalog), columns, table) if chunk)
+    return _gzip(chunks) if compress else chunks
+
+
+_cache_lock = threading.Lock()
+_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+
+
+def get_export(table: str, fmt: str, compress: bool = False, catalog: Optional[Catalog] = None) -> bytes:
+    """Archivo completo, generado una vez por versión del catálogo (LRU)"""
+    catalog = catalog or get_catalog()
+    key = (catalog.version, table, fmt, compress)
+    with _cache_lock:
+        data = _cache.get(key)
+        if data is not None:
+            _cache.move_to_end(key)
+            return data
+
+    data = b"".join(iter_export(table, fmt, compress, catalog))
+
+    with _cache_lock:
+        _cache[key] = data
+        while len(_cache) > EXPORT_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return data
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if a != "--gzip"]
+    compress = "--gzip" in sys.argv
+    if len(args) < 2:
+        print(__doc__)
+        sys.exit(1)
+    table, fmt = args[0], args[1]
+    target = Path(args[2]) if len(args) > 2 else Path(export_filename(table, fmt, compress))
+    try:
+        chunks = iter_export(table, fmt, compress)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    with open(target, "wb") as out:
+        for chunk in chunks:
+            out.write(chunk)
+    print(f"[OK] {table} ({fmt}) exportado a {target}")
@@ -0,0 +1,206 @@
+"""
+Sincronización Delta del Catálogo
+Simulador BIC Lankamar
+
+Guarda en SQLite el historial de versiones del catálogo con un hash de
+contenido por registro (bomba o alarma). Con eso se calcula qué cambió
+entre la versión que tiene un cliente y la actual:
+
+    {
+      "from_version": "...", "to_version": "...", "full": false,
+      "pumps":  {"upserted": [...], "removed": ["id", ...]},
+      "alarms": {"upserted": [...], "removed": ["pump_id/CODIGO", ...]}
+    }
+
+Las bombas viajan sin su lista de alarmas; cada alarma viaja aparte con
+"id" y "pump_id". Si la versión del cliente es desconocida (o fue
+purgada) o el delta no es más chico que el catálogo, se responde con
+un snapshot completo en el mismo formato y "full": true.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from catalog import Catalog, get_catalog
+from db import ensure_schema, get_conn, run_with_busy_retry
+
+# Versiones que se conservan; clientes más viejos reciben snapshot
+MAX_VERSIONS = 50
+
+# Si cambió más de esta fracción de registros, conviene el snapshot
+SNAPSHOT_THRESHOLD = 0.5
+
+RecordKey = Tuple[str, str]  # (kind, record_id)
+
+
+# ============================================================
+# REGISTROS Y HASHES
+# ============================================================
+
+def content_hash(record: Dict) -> str:
+    """Hash estable del contenido de un registro (JSON canónico)"""
+    canonical = json.dumps(record, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def split_records(catalog: Catalog) -> Dict[RecordKey, Dict]:
+    """
+    Descompone el catálogo en registros sincronizables
+
+    Returns:
+        Dict (kind, record_id) → registro compacto
+    """
+    records: Dict[RecordKey, Dict] = {}
+    for pump in catalog.pumps:
+        pump_id = pump["id"]
+        records[("pump", pump_id)] = {
+            k: v for k, v in pump.items() if k != "errores_y_alarmas"
+        }
+        for alarm in pump.get("errores_y_alarmas", []):
+            alarm_id = f"{pump_id}/{alarm['codigo_pantalla']}"
+            n = 2
+            while ("alarm", alarm_id) in records:
+                alarm_id = f"{pump_id}/{alarm['codigo_pantalla']}#{n}"
+                n += 1
+            records[("alarm", alarm_id)] = {"id": alarm_id, "pump_id": pump_id, **alarm}
+    return records
+
+
+_snapshot_lock = threading.Lock()
+_snapshot: Dict[str, tuple] = {}  # version → (records, hashes)
+
+
+def _current_records(catalog: Catalog) -> Tuple[Dict[RecordKey, Dict], Dict[RecordKey, str]]:
+    """Registros y hashes de la versión actual (calculados una vez por versión)"""
+    cached = _snapshot.get(catalog.version)
+    if cached:
+        return cached
+    with _snapshot_lock:
+        records = split_records(catalog)
+        hashes = {key: content_hash(record) for key, record in records.items()}
+        _snapshot.clear()
+        _snapshot[catalog.version] = (records, hashes)
+        return records, hashes
+
+
+# ============================================================
+# HISTORIAL DE VERSIONES
+# ============================================================
+
+_registered = set()  # Versiones ya registradas por este proceso
+
+
+def register_version(catalog: Optional[Catalog] = None) -> bool:
+    """
+    Registra la versión actual del catálogo en el historial (idempotente)
+
+    Returns:
+        True si la versión era nueva
+    """
+    catalog = catalog or get_catalog()
+    if catalog.version in _registered:
+        return False
+    records, hashes = _current_records(catalog)
+    ensure_schema()
+
+    def _tx() -> bool:
+        with get_conn() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO catalog_versions (version, pumps, alarms) VALUES (?, ?, ?)",
+                (
+                    catalog.version,
+                    sum(1 for kind, _ in records if kind == "pump"),
+                    sum(1 for kind, _ in records if kind == "alarm"),
+                )
+            )
+            if not cursor.rowcount:
+                return False
+            conn.executemany(
+                """INSERT INTO catalog_record_hashes (version, kind, record_id, content_hash)
+                   VALUES (?, ?, ?, ?)""",
+                [(catalog.version, kind, rid, h) for (kind, rid), h in hashes.items()]
+            )
+            # Purgar versiones viejas (el FK borra sus hashes en cascada)
+            conn.execute(
+                """DELETE FROM catalog_versions WHERE seq NOT IN (
+                       SELECT seq FROM catalog_versions ORDER BY seq DESC LIMIT ?
+                   )""",
+                (MAX_VERSIONS,)
+            )
+            return True
+
+    is_new = run_with_busy_retry(_tx)
+    _registered.add(catalog.version)
+    return is_new
+
+
+def list_versions() -> List[Dict]:
+    """Versiones registradas, de la más reciente a la más antigua"""
+    ensure_schema()
+    with get_conn() as conn:
+        cursor = conn.execute(
+            "SELECT version, pumps, alarms, created_at FROM catalog_versions ORDER BY seq DESC"
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+
+def _load_hashes(version: str) -> Optional[Dict[RecordKey, str]]:
+    with get_conn() as conn:
+        rows = conn.execute(
+            "SELECT kind, record_id, content_hash FROM catalog_record_hashes WHERE version = ?",
+            (version,)
+        ).fetchall()
+    if not rows:
+        return None
+    return {(row["kind"], row["record_id"]): row["content_hash"] for row in rows}
+
+
+# ============================================================
+# DELTA
+# ============================================================
+
+def _payload(catalog: Catalog, since: Optional[str], full: bool,
+             upserted: List[RecordKey], removed: List[RecordKey],
+             records: Dict[RecordKey, Dict]) -> Dict:
+    out = {
+        "from_version": since,
+        "to_version": catalog.version,
+        "full": full,
+        "pumps": {"upserted": [], "removed": []},
+        "alarms": {"upserted": [], "removed": []},
+    }
+    for kind, rid in sorted(upserted):
+        out[f"{kind}s"]["upserted"].append(records[(kind, rid)])
+    for kind, rid in sorted(removed):
+        out[f"{kind}s"]["removed"].append(rid)
+    return out
+
+
+def compute_delta(since: Optional[str], catalog: Optional[Catalog] = None) -> Dict:
+    """
+    Cambios entre la versión `since` del cliente y la versión actual
+
+    Args:
+        since: Versión que tiene el cliente (None = no tiene nada)
+        catalog: Catálogo actual (default: get_catalog())
+
+    Returns:
+        Dict con el delta (ver docstring del módulo). Si since es la
+        versión actual, las listas vienen vacías.
+    """
+    catalog = catalog or get_catalog()
+    records, current = _current_records(catalog)
+    register_version(catalog)
+
+    previous = _load_hashes(since) if since else None
+    if previous is None:
+        return _payload(catalog, since, True, list(current), [], records)
+
+    upserted = [key for key, h in current.items() if previous.get(key) != h]
+    removed = [key for key in previous if key not in current]
+
+    if len(upserted) > SNAPSHOT_THRESHOLD * len(current):
+        return _payload(catalog, since, True, list(current), [], records)
+    return _payload(catalog, since, False, upserted, removed, records)
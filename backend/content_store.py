@@ -0,0 +1,306 @@
+"""
+Videos Educativos en SQLite
+Simulador BIC Lankamar
+
+Los videos vinculados a alarmas viven en la tabla `videos` (antes en
+data/content_manifest.json). Cada alta, baja o edición es una
+transacción de una fila identificada por su id, así que dos sesiones de
+admin concurrentes no se pisan. Las búsquedas por video_tag y por bomba
+usan índices.
+
+content_manifest.json se importa una única vez (la primera vez que se
+usa el store con ese archivo) y sigue disponible como exportación JSON
+para el bundle de la app:
+
+    python content_store.py export [ruta]   # default: data/content_manifest.json
+    python content_store.py import [ruta]   # reimporta (solo si no se importó)
+"""
+
+import json
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import db
+from db import ensure_schema, get_conn, immediate_transaction, run_with_busy_retry
+
+# Manifest JSON (fuente de la importación inicial y destino de la exportación)
+MANIFEST_PATH = Path(__file__).resolve().parent.parent / "data" / "content_manifest.json"
+
+SCHEMA_VERSION = "1.0"
+DESCRIPTION = "Manifest de contenido educativo - Videos vinculados a errores de bombas"
+
+# Campos editables con update_video()
+EDITABLE_FIELDS = ("video_tag", "pump_id", "url", "platform", "notes")
+
+_COLUMNS = "id, video_tag, pump_id, url, platform, notes, views_count, added_at, updated_at"
+
+_ready_for: Optional[tuple] = None
+
+
+def _ensure_store():
+    """Schema + importación única de content_manifest.json (una vez por proceso y base)"""
+    global _ready_for
+    key = (db.DB_PATH, MANIFEST_PATH)
+    if _ready_for == key:
+        return
+    ensure_schema()
+    if MANIFEST_PATH.exists():
+        import_manifest(MANIFEST_PATH)
+    _ready_for = key
+
+
+def _row(row: sqlite3.Row) -> Dict:
+    return dict(row)
+
+
+# ============================================================
+# IMPORTACIÓN / EXPORTACIÓN
+# ============================================================
+
+def import_manifest(path: Path = MANIFEST_PATH, force: bool = False) -> int:
+    """
+    Importa los videos de un manifest JSON (una sola vez por archivo)
+
+    Args:
+        path: Manifest con formato {"videos": [...]}
+        force: Importar aunque ya se haya importado (agrega, no reemplaza)
+
+    Returns:
+        Videos importados (0 si ya estaba importado)
+
+    Raises:
+        ValueError: Si el manifest no es JSON válido
+    """
+    ensure_schema()
+    source = str(Path(path).resolve())
+    try:
+        manifest = json.loads(Path(path).read_text(encoding="utf-8"))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{Path(path).name}: JSON inválido (línea {e.lineno}, columna {e.colno})")
+    videos = manifest.get("videos", [])
+    for i, v in enumerate(videos):
+        if not v.get("video_tag") or not v.get("url"):
+            raise ValueError(f"{Path(path).name}: el video #{i} no tiene video_tag o url")
+    now = datetime.now().isoformat()
+    rows = [
+        (
+            v["video_tag"], v.get("pump_id"), v["url"], v.get("platform", ""),
+            v.get("notes", ""), int(v.get("views_count", 0)), v.get("added_at") or now,
+        )
+        for v in videos
+    ]
+
+    def _tx():
+        # El registro en content_imports y los INSERT van en la misma
+        # transacción con lock de escritura: de varios importadores
+        # simultáneos solo el primero inserta los videos
+        with immediate_transaction() as conn:
+            claimed = conn.execute(
+                """INSERT INTO content_imports (source, videos) VALUES (?, ?)
+                   ON CONFLICT(source) DO NOTHING""",
+                (source, len(rows))
+            ).rowcount
+            if not claimed:
+                if not force:
+                    return 0
+                conn.execute(
+                    """UPDATE content_imports SET videos = ?, imported_at = CURRENT_TIMESTAMP
+                       WHERE source = ?""",
+                    (len(rows), source)
+                )
+            conn.executemany(
+                """INSERT INTO videos (video_tag, pump_id, url, platform, notes, views_count, added_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                rows
+            )
+            return len(rows)
+
+    return run_with_busy_retry(_tx)
+
+
+def export_manifest() -> Dict:
+    """Videos en el formato de content_manifest.json (para el bundle de la app)"""
+    _ensure_store()
+    with get_conn() as conn:
+        videos = conn.execute(
+            "SELECT video_tag, pump_id, url, platform, notes, views_count, added_at FROM videos ORDER BY id"
+        ).fetchall()
+        state = conn.execute("SELECT last_updated FROM content_state WHERE id = 1").fetchone()
+    return {
+        "videos": [_row(v) for v in videos],
+        "last_updated": state["last_updated"] if state else None,
+        "schema_version": SCHEMA_VERSION,
+        "description": DESCRIPTION,
+    }
+
+
+def write_manifest(path: Path = MANIFEST_PATH) -> int:
+    """Escribe la exportación JSON en `path` (atómico); devuelve cuántos videos"""
+    manifest = export_manifest()
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=4, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+    return len(manifest["videos"])
+
+
+# ============================================================
+# OPERACIONES (una transacción de una fila cada una)
+# ============================================================
+
+def add_video(
+    video_tag: str,
+    url: str,
+    pump_id: Optional[str] = None,
+    platform: str = "",
+    notes: str = ""
+) -> Dict:
+    """Agrega un video y lo devuelve con su id"""
+    if not video_tag or not url:
+        raise ValueError("video_tag y url son obligatorios")
+    _ensure_store()
+
+    def _tx():
+        with get_conn() as conn:
+            cursor = conn.execute(
+                """INSERT INTO videos (video_tag, pump_id, url, platform, notes, added_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (video_tag, pump_id, url, platform, notes, datetime.now().isoformat())
+            )
+            return conn.execute(f"SELECT {_COLUMNS} FROM videos WHERE id = ?", (cursor.lastrowid,)).fetchone()
+
+    return _row(run_with_busy_retry(_tx))
+
+
+def delete_video(video_id: int) -> bool:
+    """Borra un video por id; False si ya no existía"""
+    _ensure_store()
+
+    def _tx():
+        with get_conn() as conn:
+            return conn.execute("DELETE FROM videos WHERE id = ?", (video_id,)).rowcount > 0
+
+    return run_with_busy_retry(_tx)
+
+
+def update_video(video_id: int, **fields) -> Optional[Dict]:
+    """
+    Modifica campos de un video (ver EDITABLE_FIELDS)
+
+    Returns:
+        El video actualizado, o None si no existe
+
+    Raises:
+        ValueError: Si se pasa un campo no editable o se vacía video_tag/url
+    """
+    unknown = set(fields) - set(EDITABLE_FIELDS)
+    if unknown:
+        raise ValueError(f"Campos no editables: {', '.join(sorted(unknown))}")
+    for required in ("video_tag", "url"):
+        if required in fields and not fields[required]:
+            raise ValueError(f"{required} no puede quedar vacío")
+    if not fields:
+        return get_video(video_id)
+    _ensure_store()
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+
+    def _tx():
+        with get_conn() as conn:
+            conn.execute(f"UPDATE videos SET {assignments} WHERE id = ?", (*fields.values(), video_id))
+            return conn.execute(f"SELECT {_COLUMNS} FROM videos WHERE id = ?", (video_id,)).fetchone()
+
+    row = run_with_busy_retry(_tx)
+    return _row(row) if row else None
+
+
+def add_views(deltas: Dict[int, int]):
+    """
+    Suma reproducciones a varios videos en una transacción (video_id → delta)
+
+    No cambia la revisión de contenido; los ids inexistentes se ignoran.
+    Lo usa el escritor en lote de view_counter.py.
+    """
+    _ensure_store()
+
+    def _tx():
+        with get_conn() as conn:
+            conn.executemany(
+                "UPDATE videos SET views_count = views_count + ? WHERE id = ?",
+                [(count, video_id) for video_id, count in deltas.items()]
+            )
+
+    run_with_busy_retry(_tx)
+
+
+# ============================================================
+# CONSULTAS
+# ============================================================
+
+def get_video(video_id: int) -> Optional[Dict]:
+    _ensure_store()
+    with get_conn() as conn:
+        row = conn.execute(f"SELECT {_COLUMNS} FROM videos WHERE id = ?", (video_id,)).fetchone()
+    return _row(row) if row else None
+
+
+def list_videos(pump_id: Optional[str] = None, video_tag: Optional[str] = None) -> List[Dict]:
+    """Videos (todos, de una bomba y/o de un video_tag), en orden de alta"""
+    _ensure_store()
+    conditions, params = [], []
+    if pump_id is not None:
+        conditions.append("pump_id = ?")
+        params.append(pump_id)
+    if video_tag is not None:
+        conditions.append("video_tag = ?")
+        params.append(video_tag)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    with get_conn() as conn:
+        rows = conn.execute(f"SELECT {_COLUMNS} FROM videos {where} ORDER BY id", params).fetchall()
+    return [_row(r) for r in rows]
+
+
+def tags_with_video(tags: Iterable[str]) -> set:
+    """Subconjunto de `tags` que tiene al menos un video (consulta por índice)"""
+    _ensure_store()
+    tags = list(tags)
+    found = set()
+    with get_conn() as conn:
+        for i in range(0, len(tags), 500):
+            batch = tags[i:i + 500]
+            rows = conn.execute(
+                f"SELECT DISTINCT video_tag FROM videos WHERE video_tag IN ({','.join('?' * len(batch))})",
+                batch
+            ).fetchall()
+            found.update(r[0] for r in rows)
+    return found
+
+
+def content_revision() -> int:
+    """Contador de cambios de videos (sube en cada alta, baja o edición)"""
+    _ensure_store()
+    with get_conn() as conn:
+        row = conn.execute("SELECT revision FROM content_state WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+
+def video_stats() -> Dict:
+    """Totales para el tab de estadísticas"""
+    _ensure_store()
+    with get_conn() as conn:
+        row = conn.execute("SELECT COUNT(*), COALESCE(SUM(views_count), 0) FROM videos").fetchone()
+    return {"videos": row[0], "views": row[1]}
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "export"
+    target = Path(sys.argv[2]) if len(sys.argv) > 2 else MANIFEST_PATH
+    if command == "export":
+        print(f"[OK] {write_manifest(target)} videos exportados a {target}")
+    elif command == "import":
+        print(f"[OK] {import_manifest(target)} videos importados de {target}")
+    else:
+        print(__doc__)
+        sys.exit(1)
@@ -0,0 +1,321 @@
+"""
+Esquemas Declarativos de los Archivos de data/
+Simulador BIC Lankamar
+
+Un esquema por archivo JSON, en un subconjunto de JSON Schema que compila
+validate_data_files.py:
+
+- type: "object" | "array" | "string" | "integer" | "number" | "boolean"
+  | "null" (o lista de tipos)
+- object: required (claves obligatorias), properties (esquema por clave)
+- array: items, min_items, max_items, unique (clave que no se repite
+  entre los objetos de la lista)
+- string: enum, min_length
+- integer / number: minimum, maximum
+"""
+
+from typing import Dict
+
+# Prioridades válidas (pumps_db.json y archivos de fabricante, ver catalog.PRIORITY_MAP)
+PRIORIDADES = ["critica", "alta", "media", "baja", "informativa"]
+PRIORITIES = ["CRITICAL", "HIGH", "MEDIUM", "LOW", "INFO"]
+
+TEXT = {"type": "string", "min_length": 1}
+TEXT_LIST = {"type": "array", "items": TEXT, "min_items": 1}
+
+
+# ============================================================
+# pumps_db.json
+# ============================================================
+
+PUMPS_DB = {
+    "type": "array",
+    "min_items": 1,
+    "unique": "id",
+    "items": {
+        "type": "object",
+        "required": ["id", "marca", "modelo", "tipo", "prevalencia_arg",
+                     "specs_tecnicas", "interfaz", "errores_y_alarmas"],
+        "properties": {
+            "id": TEXT,
+            "marca": TEXT,
+            "modelo": TEXT,
+            "tipo": TEXT,
+            "prevalencia_arg": {"type": "string"},
+            "specs_tecnicas": {
+                "type": "object",
+                "required": ["rango_flujo", "volumen_max", "tipo_set", "bateria"],
+                "properties": {
+                    "rango_flujo": TEXT,
+                    "volumen_max": TEXT,
+                    "tipo_set": TEXT,
+                    "bateria": TEXT,
+                    "presion_max": TEXT,
+                    "precision_flujo": TEXT,
+                    "sensibilidad_aire": TEXT,
+                },
+            },
+            "energia_bateria": {
+                "type": "object",
+                "properties": {
+                    "alarmas_energia": {"type": "array", "items": TEXT},
+                    "autonomia_declarada": {"type": "string"},
+                    "tiempo_recarga": {"type": "string"},
+                    "tipo_alimentacion": {"type": "string"},
+                    "tipo_bateria": {"type": "string"},
+                },
+            },
+            "umbrales": {
+                "type": "object",
+                "properties": {
+                    "oclusion_mmhg": {"type": "string"},
+                    "aire_ml": {"type": "string"},
+                },
+            },
+            "interfaz": {
+                "type": "object",
+                "required": ["pantalla", "teclado", "navegacion"],
+                "properties": {
+                    "pantalla": {"type": "string"},
+                    "teclado": {"type": "string"},
+                    "navegacion": {"type": "string"},
+                },
+            },
+            "errores_y_alarmas": {
+                "type": "array",
+                "unique": "video_tag",
+                "items": {
+                    "type": "object",
+                    "required": ["codigo_pantalla", "significado", "accion_correctiva", "video_tag"],
+                    "properties": {
+                        "codigo_pantalla": TEXT,
+                        "significado": TEXT,
+                        "accion_correctiva": TEXT,
+                        "video_tag": TEXT,
+                        "prioridad": {"type": "string", "enum": PRIORIDADES},
+                        "categoria": TEXT,
+                    },
+                },
+            },
+            "datos_incompletos": {"type": "array", "items": {"type": "string"}},
+        },
+    },
+}
+
+
+# ============================================================
+# bombas_especificaciones.json
+# ============================================================
+
+VIEW = {
+    "type": "object",
+    "required": ["description", "image_url"],
+    "properties": {"description": TEXT, "image_url": TEXT},
+}
+
+# Al menos las 7 bombas de pumps_db.json; el archivo documenta además
+# otras (Plum 360, Kangaroo, Flocare), así que no se fija un máximo
+BOMBAS_ESPECIFICACIONES = {
+    "type": "array",
+    "min_items": 7,
+    "unique": "id",
+    "items": {
+        "type": "object",
+        "required": ["id", "name", "manufacturer", "category", "specs", "views", "buttons", "operations"],
+        "properties": {
+            "id": TEXT,
+            "name": TEXT,
+            "manufacturer": TEXT,
+            "category": TEXT,
+            "specs": {
+                "type": "object",
+                "required": ["dimensions", "weight", "battery_type", "display"],
+                "properties": {
+                    "dimensions": TEXT,
+                    "weight": TEXT,
+                    "battery_type": TEXT,
+                    "display": TEXT,
+                },
+            },
+            "views": {
+                "type": "object",
+                "required": ["frontal", "lateral", "trasera"],
+                "properties": {"frontal": VIEW, "lateral": VIEW, "trasera": VIEW},
+            },
+            "buttons": {
+                "type": "array",
+                "min_items": 1,
+                "unique": "id",
+                "items": {
+                    "type": "object",
+                    "required": ["id", "name", "function"],
+                    "properties": {
+                        "id": TEXT,
+                        "name": TEXT,
+                        "location": {"type": "string"},
+                        "function": TEXT,
+                        "related_errors": {"type": "array", "items": {"type": "integer"}},
+                    },
+                },
+            },
+            "operations": {
+                "type": "array",
+                "min_items": 3,
+                "items": {
+                    "type": "object",
+                    "required": ["name", "steps", "video_url"],
+                    "properties": {
+                        "name": TEXT,
+                        "steps": TEXT_LIST,
+                        "video_url": TEXT,
+                        "difficulty": {"type": "string"},
+                    },
+                },
+            },
+        },
+    },
+}
+
+
+# ============================================================
+# ARCHIVOS DE FABRICANTE (formato en inglés)
+# ============================================================
+
+PLUM360_COMPLETE = {
+    "type": "object",
+    "required": ["device_id", "device_name", "manufacturer", "alarms"],
+    "properties": {
+        "device_id": TEXT,
+        "device_name": TEXT,
+        "manufacturer": TEXT,
+        "device_type": TEXT,
+        "total_alarm_codes": {"type": "integer", "minimum": 0},
+        "alarms": {
+            "type": "array",
+            "min_items": 1,
+            "unique": "code",
+            "items": {
+                "type": "object",
+                "required": ["code", "display_text", "priority", "nurse_actions"],
+                "properties": {
+                    "code": TEXT,
+                    "display_text": TEXT,
+                    "priority": {"type": "string", "enum": PRIORITIES},
+                    "probable_cause": {"type": "string"},
+                    "nurse_actions": TEXT_LIST,
+                    "requires_biotech": {"type": "boolean"},
+                    "severity_level": {"type": "integer", "minimum": 0, "maximum": 5},
+                },
+            },
+        },
+    },
+}
+
+PLUM360_EXTENDED = {
+    "type": "object",
+    "required": ["device_id", "device_name", "manufacturer", "alarms"],
+    "properties": {
+        "device_id": TEXT,
+        "device_name": TEXT,
+        "manufacturer": TEXT,
+        "total_codes": {"type": "integer", "minimum": 0},
+        "alarms": {
+            "type": "array",
+            "min_items": 1,
+            "unique": "code",
+            "items": {
+                "type": "object",
+                "required": ["code", "text", "priority", "actions"],
+                "properties": {
+                    "code": TEXT,
+                    "text": TEXT,
+                    "priority": {"type": "string", "enum": PRIORITIES},
+                    "cause": {"type": "string"},
+                    "actions": TEXT_LIST,
+                    "biotech": {"type": "boolean"},
+                },
+            },
+        },
+    },
+}
+
+KANGAROO_FLOCARE = {
+    "type": "object",
+    "required": ["enteral_pumps"],
+    "properties": {
+        "enteral_pumps": {
+            "type": "array",
+            "min_items": 1,
+            "unique": "device_id",
+            "items": {
+                "type": "object",
+                "required": ["device_id", "name", "alarms"],
+                "properties": {
+                    "device_id": TEXT,
+                    "name": TEXT,
+                    "type": TEXT,
+                    "total_alarm_codes": {"type": "integer", "minimum": 0},
+                    "alarms": {
+                        "type": "array",
+                        "min_items": 1,
+                        "unique": "code",
+                        "items": {
+                            "type": "object",
+                            "required": ["code", "display", "priority", "actions"],
+                            "properties": {
+                                "code": TEXT,
+                                "display": TEXT,
+                                "priority": {"type": "string", "enum": PRIORITIES},
+                                "cause": {"type": "string"},
+                                "actions": TEXT_LIST,
+                                "severity": {"type": "integer", "minimum": 0, "maximum": 5},
+                            },
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
+
+
+# ============================================================
+# content_manifest.json
+# ============================================================
+
+CONTENT_MANIFEST = {
+    "type": "object",
+    "required": ["videos"],
+    "properties": {
+        "videos": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["video_tag", "url"],
+                "properties": {
+                    "video_tag": TEXT,
+                    "pump_id": {"type": "string"},
+                    "url": TEXT,
+                    "platform": {"type": "string"},
+                    "notes": {"type": "string"},
+                    "views_count": {"type": "integer", "minimum": 0},
+                    "added_at": {"type": "string"},
+                },
+            },
+        },
+        "last_updated": {"type": ["string", "null"]},
+        "schema_version": TEXT,
+        "description": {"type": "string"},
+    },
+}
+
+
+# Archivo de data/ → esquema (todo *.json de data/ debe figurar acá)
+FILE_SCHEMAS: Dict[str, Dict] = {
+    "pumps_db.json": PUMPS_DB,
+    "bombas_especificaciones.json": BOMBAS_ESPECIFICACIONES,
+    "alarms_plum360_complete.json": PLUM360_COMPLETE,
+    "alarms_plum360_extended.json": PLUM360_EXTENDED,
+    "alarms_kangaroo_flocare.json": KANGAROO_FLOCARE,
+    "content_manifest.json": CONTENT_MANIFEST,
+}
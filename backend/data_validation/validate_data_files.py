@@ -0,0 +1,320 @@
+"""
+Validación de Esquemas de Todos los Archivos de data/
+Simulador BIC Lankamar
+
+Compila los esquemas declarativos de schemas.py y valida cada data/*.json
+contra el suyo. Los errores de parseo y de esquema se reportan con línea
+y columna (formato archivo:línea:columna, clickeable en el editor). Un
+archivo .json sin esquema también es un error.
+
+Los archivos se validan en paralelo en un pool de procesos cuando el
+total supera PARALLEL_MIN_BYTES; por debajo (el caso de hoy, ~100 KB) el
+arranque del pool cuesta más que validar todo en el proceso actual, y la
+corrida entra en unos milisegundos: apta para un hook al guardar.
+
+Ejecutar: python validate_data_files.py [archivos...] [--workers N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from json.decoder import scanstring
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from schemas import FILE_SCHEMAS
+
+# Ruta a los datos
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+
+# Por debajo de este total se valida sin pool de procesos
+PARALLEL_MIN_BYTES = 1_000_000
+
+# Errores de esquema reportados por archivo (el resto se cuenta)
+MAX_ERRORS_PER_FILE = 50
+
+JSON_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "null": type(None),
+}
+
+Path_ = Tuple  # ruta JSON: claves (str) e índices (int)
+Check = Callable[[object, Path_, List[Tuple[Path_, str]]], None]
+
+
+# ============================================================
+# COMPILACIÓN DE ESQUEMAS
+# ============================================================
+
+def _type_check(types: Sequence[str]) -> Callable[[object], bool]:
+    classes = tuple(c for t in types for c in (JSON_TYPES[t] if isinstance(JSON_TYPES[t], tuple) else (JSON_TYPES[t],)))
+    allow_bool = "boolean" in types
+
+    def matches(value) -> bool:
+        # bool es subclase de int: true no es un "integer" válido
+        if isinstance(value, bool) and not allow_bool:
+            return False
+        return isinstance(value, classes)
+    return matches
+
+
+def compile_schema(schema: Dict) -> Check:
+    """
+    Convierte un esquema declarativo en una función check(valor, ruta, errores)
+    que agrega (ruta, mensaje) por cada violación
+    """
+    unknown = set(schema) - {"type", "required", "properties", "items", "min_items", "max_items",
+                             "unique", "enum", "min_length", "minimum", "maximum"}
+    if unknown:
+        raise ValueError(f"Claves de esquema desconocidas: {', '.join(sorted(unknown))}")
+
+    types = schema.get("type")
+    types = [types] if isinstance(types, str) else list(types or [])
+    for t in types:
+        if t not in JSON_TYPES:
+            raise ValueError(f"Tipo de esquema desconocido: {t}")
+    type_ok = _type_check(types) if types else None
+    type_name = " o ".join(types)
+
+    required = schema.get("required", [])
+    properties = {key: compile_schema(sub) for key, sub in schema.get("properties", {}).items()}
+    items = compile_schema(schema["items"]) if "items" in schema else None
+    min_items, max_items = schema.get("min_items"), schema.get("max_items")
+    unique = schema.get("unique")
+    enum = schema.get("enum")
+    min_length = schema.get("min_length")
+    minimum, maximum = schema.get("minimum"), schema.get("maximum")
+
+    def check(value, path: Path_, errors: List[Tuple[Path_, str]]):
+        if type_ok and not type_ok(value):
+            errors.append((path, f"se esperaba {type_name}, hay {_json_type(value)}"))
+            return
+
+        if isinstance(value, dict):
+            for key in required:
+                if key not in value:
+                    errors.append((path, f"falta la clave obligatoria '{key}'"))
+            for key, sub in properties.items():
+                if key in value:
+                    sub(value[key], path + (key,), errors)
+
+        elif isinstance(value, list):
+            if min_items is not None and len(value) < min_items:
+                errors.append((path, f"se esperaban al menos {min_items} elementos, hay {len(value)}"))
+            if max_items is not None and len(value) > max_items:
+                errors.append((path, f"se esperaban como máximo {max_items} elementos, hay {len(value)}"))
+            if items:
+                for i, item in enumerate(value):
+                    items(item, path + (i,), errors)
+            if unique:
+                seen = {}
+                for i, item in enumerate(value):
+                    if isinstance(item, dict) and unique in item:
+                        key = json.dumps(item[unique], sort_keys=True)
+                        if key in seen:
+                            errors.append((path + (i, unique),
+                                           f"'{unique}' repetido: {key} (ya en el elemento {seen[key]})"))
+                        else:
+                            seen[key] = i
+
+        elif isinstance(value, str):
+            if enum is not None and value not in enum:
+                errors.append((path, f"valor '{value}' fuera de {enum}"))
+            if min_length is not None and len(value) < min_length:
+                errors.append((path, "texto vacío" if min_length == 1 else f"texto de menos de {min_length} caracteres"))
+
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            if minimum is not None and value < minimum:
+                errors.append((path, f"{value} < mínimo {minimum}"))
+            if maximum is not None and value > maximum:
+                errors.append((path, f"{value} > máximo {maximum}"))
+
+    return check
+
+
+def _json_type(value) -> str:
+    for name, cls in JSON_TYPES.items():
+        if name in ("integer", "number") and isinstance(value, bool):
+            continue
+        if isinstance(value, cls):
+            return name
+    return type(value).__name__
+
+
+# Esquemas compilados, una vez por proceso (también en cada worker del pool)
+_compiled: Dict[str, Check] = {}
+
+
+def get_check(name: str) -> Optional[Check]:
+    if name not in _compiled and name in FILE_SCHEMAS:
+        _compiled[name] = compile_schema(FILE_SCHEMAS[name])
+    return _compiled.get(name)
+
+
+# ============================================================
+# POSICIONES EN EL TEXTO
+# ============================================================
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def _skip_ws(text: str, i: int) -> int:
+    while i < len(text) and text[i] in _WHITESPACE:
+        i += 1
+    return i
+
+
+def locate(text: str, path: Path_) -> int:
+    """
+    Offset en `text` del valor en `path` (texto JSON válido)
+
+    Recorre solo los contenedores de la ruta; los valores intermedios se
+    saltan con el decodificador en C. Se usa únicamente al reportar errores.
+    """
+    i = _skip_ws(text, 0)
+    for step in path:
+        i = _skip_ws(text, i + 1)  # después de '[' o '{'
+        if isinstance(step, int):
+            for _ in range(step):
+                _, i = _decoder.raw_decode(text, i)
+                i = _skip_ws(text, _skip_ws(text, i) + 1)  # ','
+        else:
+            while text[i] == '"':
+                key, i = scanstring(text, i + 1)
+                i = _skip_ws(text, _skip_ws(text, i) + 1)  # ':'
+                if key == step:
+                    break
+                _, i = _decoder.raw_decode(text, i)
+                i = _skip_ws(text, i)
+                if text[i] == ",":
+                    i = _skip_ws(text, i + 1)
+    return i
+
+
+def line_col(text: str, offset: int) -> Tuple[int, int]:
+    line = text.count("\n", 0, offset) + 1
+    return line, offset - (text.rfind("\n", 0, offset) + 1) + 1
+
+
+def format_path(path: Path_) -> str:
+    return "$" + "".join(f"[{p}]" if isinstance(p, int) else f".{p}" for p in path)
+
+
+# ============================================================
+# VALIDACIÓN
+# ============================================================
+
+def validate_file(path: str) -> Dict:
+    """
+    Valida un archivo contra su esquema
+
+    Returns:
+        Dict con file, ok, errors (lista de {line, column, path, message}),
+        total_errors y elapsed_ms
+    """
+    start = time.perf_counter()
+    path = Path(path)
+    result = {"file": str(path), "ok": False, "errors": [], "total_errors": 0}
+
+    def done():
+        result["total_errors"] = max(result["total_errors"], len(result["errors"]))
+        result["ok"] = result["total_errors"] == 0
+        result["elapsed_ms"] = (time.perf_counter() - start) * 1000
+        return result
+
+    check = get_check(path.name)
+    if check is None:
+        result["errors"].append({"line": 1, "column": 1, "path": "$",
+                                 "message": f"sin esquema en schemas.FILE_SCHEMAS para '{path.name}'"})
+        return done()
+
+    try:
+        text = path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError) as e:
+        result["errors"].append({"line": 1, "column": 1, "path": "$", "message": f"no se pudo leer: {e}"})
+        return done()
+
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        result["errors"].append({"line": e.lineno, "column": e.colno, "path": "",
+                                 "message": f"JSON inválido: {e.msg}"})
+        return done()
+
+    errors: List[Tuple[Path_, str]] = []
+    check(data, (), errors)
+    result["total_errors"] = len(errors)
+    for error_path, message in errors[:MAX_ERRORS_PER_FILE]:
+        line, column = line_col(text, locate(text, error_path))
+        result["errors"].append({"line": line, "column": column,
+                                 "path": format_path(error_path), "message": message})
+    return done()
+
+
+def data_files() -> List[Path]:
+    return sorted(DATA_DIR.glob("*.json"))
+
+
+def validate_files(paths: Optional[Sequence[Path]] = None, workers: Optional[int] = None) -> List[Dict]:
+    """
+    Valida varios archivos, en paralelo si el volumen lo justifica
+
+    Args:
+        paths: Archivos (default: todos los data/*.json)
+        workers: Procesos del pool (default: CPUs si el total supera
+                 PARALLEL_MIN_BYTES, si no 1 = en el proceso actual)
+
+    Returns:
+        Un resultado de validate_file() por archivo, en el orden de `paths`
+    """
+    paths = [str(p) for p in (paths or data_files())]
+    if workers is None:
+        total = sum(os.path.getsize(p) for p in paths if os.path.exists(p))
+        workers = min(len(paths), os.cpu_count() or 1) if total >= PARALLEL_MIN_BYTES else 1
+    if workers <= 1 or len(paths) <= 1:
+        return [validate_file(p) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(validate_file, paths))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*", type=Path, help="Archivos a validar (default: data/*.json)")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos (1 = sin pool)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = validate_files(args.files or None, args.workers)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    failed = 0
+    for result in results:
+        name = Path(result["file"]).name
+        if result["ok"]:
+            print(f"✅ {name} ({result['elapsed_ms']:.1f} ms)")
+            continue
+        failed += 1
+        print(f"❌ {name}: {result['total_errors']} error(es)")
+        for error in result["errors"]:
+            location = f"{result['file']}:{error['line']}:{error['column']}"
+            detail = f" {error['path']}:" if error["path"] else ""
+            print(f"   {location}:{detail} {error['message']}")
+        hidden = result["total_errors"] - len(result["errors"])
+        if hidden > 0:
+            print(f"   ... y {hidden} más")
+
+    print(f"\n📊 {len(results)} archivos, {failed} con errores ({elapsed:.1f} ms)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,15 +3,27 @@ Módulo de conexión a base de datos SQLite
 Simulador BIC Lankamar - Sistema de Autenticación
 """
 
+import random
 import sqlite3
+import time
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
 
 # Ruta de la base de datos (junto a este archivo)
 DB_PATH = Path(__file__).resolve().parent / "auth.db"
 SCHEMA_PATH = Path(__file__).resolve().parent / "schema.sql"
 
+# Espera máxima de SQLite por un lock antes de lanzar "database is locked"
+BUSY_TIMEOUT_S = 5.0
+
+# Reintentos ante "database is locked" / "database is busy"
+BUSY_RETRIES = 6
+BUSY_BASE_DELAY_S = 0.02
+BUSY_MAX_DELAY_S = 0.5
+
 
 @contextmanager
 def get_conn():
@@ -21,7 +33,7 @@ def get_conn():
         with get_conn() as conn:
             conn.execute("SELECT * FROM users")
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT_S)
     conn.row_factory = sqlite3.Row  # Permite acceso por nombre de columna
     conn.execute("PRAGMA foreign_keys = ON")  # Habilitar FK
     try:
@@ -34,6 +46,66 @@ def get_conn():
         conn.close()
 
 
+@contextmanager
+def immediate_transaction():
+    """
+    Transacción explícita con BEGIN IMMEDIATE.
+
+    Toma el lock de escritura al inicio, de modo que todas las lecturas
+    y escrituras del bloque ven un estado consistente y ningún otro
+    escritor puede intercalarse. Hace COMMIT al salir o ROLLBACK si hay
+    excepción.
+
+    Uso:
+        with immediate_transaction() as conn:
+            conn.execute("UPDATE ...")
+    """
+    conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT_S, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def is_busy_error(error: Exception) -> bool:
+    """True si el error es un lock de SQLite (reintentable)"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def run_with_busy_retry(
+    fn: Callable[[], T],
+    retries: int = BUSY_RETRIES,
+    base_delay: float = BUSY_BASE_DELAY_S,
+    max_delay: float = BUSY_MAX_DELAY_S
+) -> T:
+    """
+    Ejecuta fn() reintentando ante errores de lock de SQLite.
+
+    Usa backoff exponencial acotado con jitter. Cualquier otro error
+    se propaga de inmediato; si se agotan los reintentos se propaga
+    el último error de lock.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except sqlite3.OperationalError as e:
+            if not is_busy_error(e) or attempt == retries:
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt))
+            time.sleep(random.uniform(delay / 2, delay))
+
+
 def init_db(force: bool = False):
     """
     Inicializa la base de datos ejecutando schema.sql
@@ -52,10 +124,31 @@ def init_db(force: bool = False):
     
     with get_conn() as conn:
         conn.executescript(schema)
+        # WAL: los lectores no bloquean al escritor (persistente en el archivo)
+        conn.execute("PRAGMA journal_mode = WAL")
     
     print(f"[OK] Base de datos inicializada en: {DB_PATH}")
 
 
+_schema_ensured_for: Optional[Path] = None
+
+
+def ensure_schema():
+    """
+    Aplica schema.sql una vez por proceso (idempotente: IF NOT EXISTS).
+
+    Para módulos que agregan tablas nuevas y pueden correr sobre una
+    base creada con una versión anterior del schema.
+    """
+    global _schema_ensured_for
+    if _schema_ensured_for == DB_PATH:
+        return
+    schema = SCHEMA_PATH.read_text(encoding="utf-8")
+    with get_conn() as conn:
+        conn.executescript(schema)
+    _schema_ensured_for = DB_PATH
+
+
 def get_db_stats() -> dict:
     """Retorna estadísticas de la base de datos"""
     with get_conn() as conn:
@@ -0,0 +1,372 @@
+"""
+Motor de Simulación de Infusiones (vectorizado)
+Simulador BIC Lankamar
+
+Simula miles de infusiones independientes en paralelo con arrays de NumPy:
+cada paso de tiempo avanza todas las bombas a la vez. Los parámetros de
+cada bomba salen de las specs compiladas del catálogo (spec_compiler):
+
+- rango_flujo / volumen_max: límites del flujo y del VTBI programados
+- precision_flujo: sesgo de entrega fijo por set (± precisión)
+- presion_max / umbrales.oclusion_mmhg: umbral de alarma de oclusión
+- sensibilidad_aire / umbrales.aire_ml: umbral de burbuja única y de aire
+  acumulado en ventana
+
+Modelo por infusión:
+- Entrega: flujo programado × (1 + sesgo del set)
+- Oclusión distal: aparece al azar (proceso de Poisson); mientras dura, el
+  volumen bombeado no llega al paciente y presuriza la línea según su
+  compliance hasta cruzar el umbral
+- Aire: burbujas al azar de tamaño exponencial; el acumulado decae con la
+  ventana del umbral
+- Al cruzar un umbral se registra el código de alarma del catálogo y la
+  bomba queda detenida hasta que enfermería responde (RESPONSE_TIME_S)
+
+Uso:
+    sim = InfusionSimulator.from_catalog(["baxter_sigma_spectrum"] * 1000,
+                                         rates_ml_h=125, vtbi_ml=1000, seed=1)
+    sim.run(hours=8)
+    print(sim.summary())
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from catalog import get_catalog, pump_specs
+from alarm_resolver import normalize_code
+
+
+# ============================================================
+# PARÁMETROS DEL MODELO
+# ============================================================
+
+# Presión de línea sin oclusión: base + resistencia × flujo
+BASE_PRESSURE_MMHG = 10.0
+LINE_RESISTANCE_MMHG_PER_ML_H = 0.05
+
+# Compliance del set: ml que absorbe la línea por mmHg de presión
+LINE_COMPLIANCE_ML_PER_MMHG = 0.001
+
+# Tasas de eventos por hora de infusión
+OCCLUSION_RATE_PER_H = 0.05
+AIR_BUBBLE_RATE_PER_H = 0.2
+MEAN_BUBBLE_ML = 0.02
+
+# Tiempo hasta que enfermería resuelve una alarma y la bomba sigue
+RESPONSE_TIME_S = 120.0
+
+# Aviso de fin próximo (segundos restantes)
+NEAR_END_S = 300.0
+
+# Eventos simulados → palabras clave para elegir el código del catálogo
+EVENTS = ["occlusion", "air", "near_end", "vtbi_complete"]
+OCCLUSION, AIR, NEAR_END, VTBI_COMPLETE = range(len(EVENTS))
+
+EVENT_CODE_HINTS = {
+    "occlusion": ("oclusion", ["DOWNSTREAM", "DISTAL", "ABAJO", "AVAL", "OCLU", "OCCLUSION"]),
+    "air": ("aire", ["AIR", "AIRE", "AR"]),
+    "near_end": ("volumen", ["NEAR", "IMMINENTE", "PRE ALAR"]),
+    "vtbi_complete": ("volumen", ["VTBI COMPLETE", "INFUSION COMPLETE", "FIN DE", "END"]),
+}
+
+# Estados de cada infusión
+RUNNING, ALARM, COMPLETE = 0, 1, 2
+
+
+# ============================================================
+# ESPECIFICACIONES
+# ============================================================
+
+def event_codes(pump: Dict) -> List[Optional[str]]:
+    """Código de alarma del catálogo para cada evento simulado (None si la bomba no lo tiene)"""
+    alarms = pump.get("errores_y_alarmas", [])
+    codes = []
+    for event in EVENTS:
+        category, keywords = EVENT_CODE_HINTS[event]
+        candidates = [a for a in alarms if a.get("categoria") == category]
+        chosen = None
+        for keyword in keywords:
+            chosen = next((a for a in candidates if keyword in normalize_code(a["codigo_pantalla"])), None)
+            if chosen:
+                break
+        if chosen is None and event in ("occlusion", "air") and candidates:
+            chosen = candidates[0]
+        codes.append(chosen["codigo_pantalla"] if chosen else None)
+    return codes
+
+
+# ============================================================
+# SIMULADOR
+# ============================================================
+
+class InfusionSimulator:
+    """
+    Estado vectorizado de N infusiones (un elemento por infusión).
+
+    Los eventos aleatorios se muestrean como tiempos de llegada
+    exponenciales, de modo que un paso no genera números aleatorios
+    salvo para las infusiones donde ocurrió algo.
+    """
+
+    def __init__(
+        self,
+        pumps: Sequence[Dict],
+        pump_index: np.ndarray,
+        rates_ml_h,
+        vtbi_ml,
+        occlusion_level: float = 0.5,
+        seed: Optional[int] = None,
+        occlusion_rate_per_h: float = OCCLUSION_RATE_PER_H,
+        air_rate_per_h: float = AIR_BUBBLE_RATE_PER_H,
+    ):
+        """
+        Args:
+            pumps: Bombas del catálogo (una por modelo)
+            pump_index: Índice en `pumps` de cada infusión
+            rates_ml_h: Flujo programado (escalar o array)
+            vtbi_ml: Volumen a infundir (escalar o array)
+            occlusion_level: 0 = umbral mínimo configurable, 1 = máximo
+            seed: Semilla del generador aleatorio
+        """
+        if not 0 <= occlusion_level <= 1:
+            raise ValueError("occlusion_level debe estar entre 0 y 1")
+
+        self.pumps = list(pumps)
+        self.pump_index = np.asarray(pump_index, dtype=np.int32)
+        n = self.n = len(self.pump_index)
+        self.rng = np.random.default_rng(seed)
+        self.occlusion_rate = occlusion_rate_per_h / 3600
+        self.air_rate = air_rate_per_h / 3600
+
+        specs = [pump_specs(p) for p in self.pumps]
+        column = lambda key: np.array([s[key] for s in specs], dtype=np.float64)[self.pump_index]
+
+        requested_rate = np.broadcast_to(np.asarray(rates_ml_h, dtype=np.float64), (n,))
+        requested_vtbi = np.broadcast_to(np.asarray(vtbi_ml, dtype=np.float64), (n,))
+        self.rate = np.clip(requested_rate, column("rate_min"), column("rate_max"))
+        self.vtbi = np.minimum(requested_vtbi, column("vtbi_max"))
+        self.out_of_range = (self.rate != requested_rate) | (self.vtbi != requested_vtbi)
+
+        accuracy = column("accuracy")
+        self.bias = self.rng.uniform(-accuracy, accuracy)
+        self.occlusion_threshold = column("occlusion_low") + occlusion_level * (
+            column("occlusion_high") - column("occlusion_low")
+        )
+        self.bubble_threshold = column("bubble_ml")
+        self.air_threshold = column("air_accum_ml")
+        self.air_window_s = column("air_window_s")
+        self.base_pressure = BASE_PRESSURE_MMHG + LINE_RESISTANCE_MMHG_PER_ML_H * self.rate
+
+        # Flujo real (ml/s); volúmenes a los que se avisa el fin próximo y
+        # se completa (pasan a inf una vez disparados)
+        self.flow_ml_s = self.rate * (1 + self.bias) / 3600
+        self.near_end_volume = self.vtbi - self.flow_ml_s * NEAR_END_S
+        self.complete_volume = self.vtbi.copy()
+
+        # Estado
+        self.t = 0.0
+        self.state = np.zeros(n, dtype=np.int8)
+        self.delivering = self.flow_ml_s.copy()   # ml/s que llegan al paciente (0 si detenida u ocluida)
+        self.delivered = np.zeros(n)
+        self.occluded_ml = np.zeros(n)            # Volumen bombeado contra la línea ocluida
+        self.pressure = self.base_pressure.copy()
+        self.air_accum = np.zeros(n)              # Aire acumulado al momento de air_updated_at
+        self.air_updated_at = np.zeros(n)
+        self.occluded = np.zeros(n, dtype=bool)
+        self.resume_at = np.full(n, np.inf)
+        # Próximos eventos aleatorios (inf mientras la bomba no está en marcha)
+        self.next_occlusion = self._sample(self.occlusion_rate, n)
+        self.next_bubble = self._sample(self.air_rate, n)
+        self._next_resume = np.inf
+        self.completed = 0
+
+        # Tabla (modelo, evento) → código
+        self.codes = [event_codes(p) for p in self.pumps]
+        self._events: List[tuple] = []    # (t, índices, evento)
+        self.alarm_counts = np.zeros((len(self.pumps), len(EVENTS)), dtype=np.int64)
+
+    @classmethod
+    def from_catalog(cls, pump_ids: Sequence[str], rates_ml_h, vtbi_ml, **kwargs) -> "InfusionSimulator":
+        """Crea el simulador tomando las bombas de pumps_db.json por ID"""
+        catalog = get_catalog()
+        unique = sorted(set(pump_ids))
+        missing = [pid for pid in unique if pid not in catalog.pumps_by_id]
+        if missing:
+            raise ValueError(f"Bombas no encontradas en el catálogo: {', '.join(missing)}")
+        position = {pid: i for i, pid in enumerate(unique)}
+        index = np.fromiter((position[pid] for pid in pump_ids), dtype=np.int32, count=len(pump_ids))
+        return cls([catalog.pumps_by_id[pid] for pid in unique], index, rates_ml_h, vtbi_ml, **kwargs)
+
+    def _sample(self, rate_per_s: float, size: int) -> np.ndarray:
+        """Tiempo (desde ahora) hasta el próximo evento de un proceso de Poisson"""
+        if rate_per_s <= 0:
+            return np.full(size, np.inf)
+        return self.t + self.rng.exponential(1 / rate_per_s, size)
+
+    def _stop(self, idx: np.ndarray):
+        """Detiene infusiones: no entregan ni generan eventos aleatorios"""
+        self.delivering[idx] = 0.0
+        self.next_occlusion[idx] = np.inf
+        self.next_bubble[idx] = np.inf
+
+    def _raise(self, idx: np.ndarray, event: int, stop: bool):
+        if not idx.size:
+            return
+        self._events.append((self.t, idx, event))
+        np.add.at(self.alarm_counts[:, event], self.pump_index[idx], 1)
+        if stop:
+            self.state[idx] = ALARM
+            self._stop(idx)
+            self.resume_at[idx] = self.t + RESPONSE_TIME_S
+            self._next_resume = min(self._next_resume, self.t + RESPONSE_TIME_S)
+
+    def _resume(self):
+        """Enfermería resolvió la alarma: se despeja la línea y se reanuda"""
+        idx = np.flatnonzero(self.resume_at <= self.t)
+        self.state[idx] = RUNNING
+        self.delivering[idx] = self.flow_ml_s[idx]
+        self.resume_at[idx] = np.inf
+        self.occluded[idx] = False
+        self.pressure[idx] = self.base_pressure[idx]
+        self.air_accum[idx] = 0.0
+        self.air_updated_at[idx] = self.t
+        self.next_occlusion[idx] = self._sample(self.occlusion_rate, idx.size)
+        self.next_bubble[idx] = self._sample(self.air_rate, idx.size)
+        self._next_resume = self.resume_at.min()
+
+    # ------------------------------------------------------------
+    # Paso de simulación
+    # ------------------------------------------------------------
+
+    def step(self, dt_s: float = 1.0):
+        """
+        Avanza todas las infusiones dt_s segundos
+
+        Sobre los N elementos solo se hacen la entrega y cinco comparaciones
+        (una por tipo de evento); el resto se procesa sobre los índices
+        afectados. Las transiciones de estado mantienen `delivering` y los
+        tiempos de eventos al día para que ninguna máscara de estado haga
+        falta en el camino común.
+        """
+        self.t += dt_s
+        t = self.t
+        if self._next_resume <= t:
+            self._resume()
+
+        # Oclusión: el flujo deja de llegar al paciente y presuriza la línea
+        starts = np.flatnonzero(self.next_occlusion <= t)
+        if starts.size:
+            self.occluded[starts] = True
+            self.delivering[starts] = 0.0
+            self.next_occlusion[starts] = np.inf
+        occluded = np.flatnonzero(self.occluded)
+        if occluded.size:
+            occluded = occluded[self.state[occluded] == RUNNING]
+            pushed = self.flow_ml_s[occluded] * dt_s
+            self.occluded_ml[occluded] += pushed
+            self.pressure[occluded] += pushed / LINE_COMPLIANCE_ML_PER_MMHG
+            hit = occluded[self.pressure[occluded] >= self.occlusion_threshold[occluded]]
+            self._raise(hit, OCCLUSION, stop=True)
+
+        # Aire: el acumulado decae con la ventana del umbral
+        arrivals = np.flatnonzero(self.next_bubble <= t)
+        if arrivals.size:
+            bubble = self.rng.exponential(MEAN_BUBBLE_ML, arrivals.size)
+            decay = np.exp(-(t - self.air_updated_at[arrivals]) / self.air_window_s[arrivals])
+            accum = self.air_accum[arrivals] * decay + bubble
+            self.air_accum[arrivals] = accum
+            self.air_updated_at[arrivals] = t
+            self.next_bubble[arrivals] = self._sample(self.air_rate, arrivals.size)
+            hit = (bubble >= self.bubble_threshold[arrivals]) | (accum >= self.air_threshold[arrivals])
+            self._raise(arrivals[hit], AIR, stop=True)
+
+        # Entrega al paciente
+        self.delivered += self.delivering * dt_s
+
+        near = np.flatnonzero(self.delivered >= self.near_end_volume)
+        if near.size:
+            self.near_end_volume[near] = np.inf
+            self._raise(near, NEAR_END, stop=False)
+
+        done = np.flatnonzero(self.delivered >= self.complete_volume)
+        if done.size:
+            self.delivered[done] = self.vtbi[done]
+            self.complete_volume[done] = np.inf
+            self.state[done] = COMPLETE
+            self._stop(done)
+            self.completed += done.size
+            self._raise(done, VTBI_COMPLETE, stop=False)
+
+    def run(self, hours: float, dt_s: float = 1.0, stop_when_done: bool = True) -> "InfusionSimulator":
+        """Simula `hours` horas (o hasta que terminen todas las infusiones)"""
+        steps = int(round(hours * 3600 / dt_s))
+        for _ in range(steps):
+            self.step(dt_s)
+            if stop_when_done and self.completed == self.n:
+                break
+        return self
+
+    # ------------------------------------------------------------
+    # Resultados
+    # ------------------------------------------------------------
+
+    @property
+    def remaining_time_h(self) -> np.ndarray:
+        """Horas hasta completar el VTBI al flujo real (0 si terminó)"""
+        return np.where(self.state == COMPLETE, 0.0, (self.vtbi - self.delivered) / (self.flow_ml_s * 3600))
+
+    @property
+    def pumped(self) -> np.ndarray:
+        """Volumen movido por el motor (entregado + bombeado contra oclusión)"""
+        return self.delivered + self.occluded_ml
+
+    @property
+    def accuracy_drift(self) -> np.ndarray:
+        """
+        (entregado - esperado) / esperado, con esperado = flujo programado ×
+        tiempo en marcha. Refleja el sesgo del set y el volumen retenido
+        por oclusiones.
+        """
+        expected = self.pumped / (1 + self.bias)
+        return np.divide(self.delivered - expected, expected,
+                         out=np.zeros(self.n), where=expected > 0)
+
+    def alarm_events(self) -> List[Dict]:
+        """Alarmas disparadas en orden de tiempo: {t_s, infusion, pump_id, event, codigo}"""
+        events = []
+        for t, idx, event in self._events:
+            for i in idx.tolist():
+                pump = self.pumps[self.pump_index[i]]
+                events.append({
+                    "t_s": t,
+                    "infusion": i,
+                    "pump_id": pump["id"],
+                    "event": EVENTS[event],
+                    "codigo": self.codes[self.pump_index[i]][event],
+                })
+        return events
+
+    def summary(self) -> Dict:
+        """Resumen agregado de la corrida"""
+        drift = self.accuracy_drift
+        alarms = {}
+        for p, pump in enumerate(self.pumps):
+            for e, event in enumerate(EVENTS):
+                count = int(self.alarm_counts[p, e])
+                if count:
+                    code = self.codes[p][e] or f"({event})"
+                    alarms[f"{pump['id']}:{code}"] = count
+        return {
+            "infusions": self.n,
+            "simulated_h": self.t / 3600,
+            "completed": self.completed,
+            "in_alarm": int((self.state == ALARM).sum()),
+            "out_of_range": int(self.out_of_range.sum()),
+            "delivered_ml": float(self.delivered.sum()),
+            "mean_remaining_h": float(self.remaining_time_h.mean()),
+            "drift_mean": float(drift.mean()),
+            "drift_p05": float(np.percentile(drift, 5)),
+            "drift_p95": float(np.percentile(drift, 95)),
+            "alarms": alarms,
+        }
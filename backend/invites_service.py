@@ -12,8 +12,8 @@ Sistema para:
 import secrets
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List
-from db import get_conn
-from auth_service import create_user, get_user_by_email, ROLES
+from db import get_conn, immediate_transaction, run_with_busy_retry
+from auth_service import insert_user, hash_password, get_user_by_email, ROLES
 
 
 # ============================================================
@@ -77,6 +77,20 @@ def get_invite_by_token(token: str) -> Optional[Dict]:
         return dict(row) if row else None
 
 
+def _check_invite_usable(invite: Optional[Dict], now: str) -> Dict:
+    """Verifica que una invitación exista, no esté usada ni expirada"""
+    if not invite:
+        raise ValueError("Token inválido o no existe")
+    
+    if invite["used_at"]:
+        raise ValueError("Este token ya fue utilizado")
+    
+    if invite["expires_at"] and invite["expires_at"] < now:
+        raise ValueError("Este token ha expirado")
+    
+    return invite
+
+
 def validate_invite(token: str) -> Dict:
     """
     Valida si un token de invitación es válido
@@ -91,18 +105,7 @@ def validate_invite(token: str) -> Dict:
         ValueError si el token es inválido, usado o expirado
     """
     invite = get_invite_by_token(token)
-    
-    if not invite:
-        raise ValueError("Token inválido o no existe")
-    
-    if invite["used_at"]:
-        raise ValueError("Este token ya fue utilizado")
-    
-    now = datetime.utcnow().isoformat()
-    if invite["expires_at"] and invite["expires_at"] < now:
-        raise ValueError("Este token ha expirado")
-    
-    return invite
+    return _check_invite_usable(invite, datetime.utcnow().isoformat())
 
 
 def redeem_invite(token: str, email: str, password: Optional[str] = None) -> Dict:
@@ -112,6 +115,11 @@ def redeem_invite(token: str, email: str, password: Optional[str] = None) -> Dic
     - Si el usuario ya existe: eleva su rol
     - Si no existe: crea usuario nuevo (requiere password)
     
+    Todo el canje (validar token, crear o actualizar usuario y marcar la
+    invitación como usada) ocurre en una única transacción BEGIN IMMEDIATE,
+    por lo que una invitación se canjea exactamente una vez aunque haya
+    canjes concurrentes. Los errores de lock se reintentan con backoff.
+    
     Args:
         token: Token de invitación
         email: Email del usuario
@@ -123,42 +131,75 @@ def redeem_invite(token: str, email: str, password: Optional[str] = None) -> Dic
     Raises:
         ValueError si hay algún problema con el token o datos
     """
-    # Validar el token
-    invite = validate_invite(token)
+    email = email.lower().strip()
     
-    # Verificar que el email coincida si la invitación es específica
-    if invite["email"] and invite["email"].lower() != email.lower().strip():
+    # Validación previa sin lock: evita hashear para tokens inválidos
+    invite = validate_invite(token)
+    if invite["email"] and invite["email"].lower() != email:
         raise ValueError("Este token está destinado a otro email")
     
+    # bcrypt es lento: se calcula fuera de la transacción para no
+    # retener el lock de escritura mientras se hashea
+    password_hash = None
+    if password and not get_user_by_email(email):
+        password_hash = hash_password(password)
+    
+    def _redeem() -> Dict:
+        with immediate_transaction() as conn:
+            return _redeem_in_transaction(conn, token, email, password, password_hash)
+    
+    return run_with_busy_retry(_redeem)
+
+
+def _redeem_in_transaction(
+    conn,
+    token: str,
+    email: str,
+    password: Optional[str],
+    password_hash: Optional[str]
+) -> Dict:
+    """Cuerpo del canje; se ejecuta con el lock de escritura tomado"""
     now = datetime.utcnow().isoformat()
-    email = email.lower().strip()
     
-    # Verificar si el usuario existe
-    existing_user = get_user_by_email(email)
+    # Revalidar dentro de la transacción: otro canje pudo ganar la carrera
+    row = conn.execute("SELECT * FROM invites WHERE token = ?", (token,)).fetchone()
+    invite = _check_invite_usable(dict(row) if row else None, now)
     
-    with get_conn() as conn:
-        if existing_user:
-            # Usuario existe → actualizar rol
-            conn.execute(
-                "UPDATE users SET role = ? WHERE id = ?",
-                (invite["role"], existing_user["id"])
-            )
-            is_new = False
-            message = f"Rol actualizado a: {invite['role']}"
-        else:
-            # Usuario nuevo → crear
-            if not password:
-                raise ValueError("Se requiere contraseña para usuarios nuevos")
-            
-            create_user(email=email, password=password, role=invite["role"])
-            is_new = True
-            message = f"Usuario creado con rol: {invite['role']}"
-        
-        # Marcar invitación como usada
+    if invite["email"] and invite["email"].lower() != email:
+        raise ValueError("Este token está destinado a otro email")
+    
+    existing_user = conn.execute(
+        "SELECT id FROM users WHERE email = ?", (email,)
+    ).fetchone()
+    
+    if existing_user:
+        # Usuario existe → actualizar rol
         conn.execute(
-            "UPDATE invites SET used_at = ? WHERE id = ?",
-            (now, invite["id"])
+            "UPDATE users SET role = ? WHERE id = ?",
+            (invite["role"], existing_user["id"])
         )
+        is_new = False
+        message = f"Rol actualizado a: {invite['role']}"
+    else:
+        # Usuario nuevo → crear
+        if not password:
+            raise ValueError("Se requiere contraseña para usuarios nuevos")
+        
+        # Caso raro: el usuario fue eliminado entre la validación previa y el lock
+        if password_hash is None:
+            password_hash = hash_password(password)
+        
+        insert_user(conn, email=email, password_hash=password_hash, role=invite["role"])
+        is_new = True
+        message = f"Usuario creado con rol: {invite['role']}"
+    
+    # Marcar invitación como usada (condicional: exactamente una vez)
+    cursor = conn.execute(
+        "UPDATE invites SET used_at = ? WHERE id = ? AND used_at IS NULL",
+        (now, invite["id"])
+    )
+    if cursor.rowcount != 1:
+        raise ValueError("Este token ya fue utilizado")
     
     return {
         "success": True,
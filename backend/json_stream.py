@@ -0,0 +1,265 @@
+"""
+Lector de Arrays JSON en Streaming, Tolerante a Errores
+Simulador BIC Lankamar
+
+Lee un archivo cuyo nivel superior es un array JSON elemento por
+elemento, en bloques de CHUNK_SIZE bytes: en memoria solo vive el
+elemento en curso (más un bloque), de modo que un catálogo de cientos de
+MB se carga sin tener todo el texto en memoria.
+
+Cada elemento se decodifica con el decodificador en C de json. Si falla
+(o queda cortado entre dos bloques), un escaneo estructural de strings,
+llaves y corchetes busca el final del elemento, leyendo más si hace
+falta, y el elemento se reintenta entero: si tiene errores de sintaxis
+va a cuarentena con su índice, línea y columna, y la lectura sigue en el
+próximo. Recuperación:
+
+- Un cierre que no corresponde cierra hasta su apertura: una coma de
+  más o un corchete sin cerrar afectan solo a ese registro.
+- Un string no puede contener saltos de línea: una comilla faltante en
+  un archivo con indentación también afecta solo a ese registro.
+- Una llave sin cerrar une el registro con los siguientes hasta el
+  cierre del array: quedan todos en cuarentena.
+
+Uso:
+    stream = ArrayStream(PUMPS_DB_PATH)
+    pumps = list(stream)
+    stream.quarantine   # [{"index", "line", "column", "message", "excerpt"}]
+    stream.version      # catalog.content_version() del archivo completo
+"""
+
+import codecs
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+# Bytes por lectura
+CHUNK_SIZE = 1 << 20
+
+# Caracteres del registro incluidos en cada entrada de cuarentena
+EXCERPT_LENGTH = 80
+
+# String JSON de una línea | comilla sin cerrar | carácter estructural.
+# Lo demás (números, literales, espacios) se saltea.
+_TOKEN = re.compile(r'"(?:[^"\\\n]|\\.)*"|"|[\[\]{},]')
+_SPACES = re.compile(r"[ \t\n\r]*")
+_CLOSERS = {"]": "[", "}": "{"}
+
+_decoder = json.JSONDecoder()
+
+Check = Callable[[object], Optional[str]]
+
+
+class ArrayStream:
+    """
+    Iterador de los elementos de un array JSON de nivel superior
+
+    Después de iterar completo: `quarantine` (elementos descartados y
+    problemas de estructura del array), `count` (elementos válidos) y
+    `version` (hash del contenido, igual a catalog.content_version).
+
+    `check(elemento)` opcional: si devuelve un mensaje, el elemento (JSON
+    válido pero inutilizable, p. ej. sin "id") también va a cuarentena.
+
+    ValueError si el nivel superior no es un array.
+    """
+
+    def __init__(self, path: Union[str, Path], chunk_size: int = CHUNK_SIZE, check: Optional[Check] = None):
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self.check = check
+        self.quarantine: List[Dict] = []
+        self.count = 0
+        self.version: Optional[str] = None
+
+    # --------------------------------------------------------
+    # Buffer
+    # --------------------------------------------------------
+
+    def _read(self) -> bool:
+        """Agrega un bloque al buffer; False al final del archivo"""
+        if self._eof:
+            return False
+        chunk = self._file.read(self.chunk_size)
+        self._sha.update(chunk)
+        self._eof = not chunk
+        self._buf += self._utf8.decode(chunk, final=self._eof)
+        return not self._eof
+
+    def _drop(self, keep: int):
+        """Descarta buf[:keep] manteniendo la línea y columna de buf[0]"""
+        if not keep:
+            return
+        dropped = self._buf[:keep]
+        newlines = dropped.count("\n")
+        if newlines:
+            self._line, self._col = self._line + newlines, keep - dropped.rfind("\n")
+        else:
+            self._col += keep
+        self._buf = self._buf[keep:]
+
+    def _position(self, offset: int) -> Tuple[int, int]:
+        buf = self._buf
+        newlines = buf.count("\n", 0, offset)
+        if newlines:
+            return self._line + newlines, offset - buf.rfind("\n", 0, offset)
+        return self._line, self._col + offset
+
+    def _skip_spaces(self, i: int) -> int:
+        """Primer carácter no blanco desde i (lee más si hace falta)"""
+        while True:
+            i = _SPACES.match(self._buf, i).end()
+            if i < len(self._buf) or not self._read():
+                return i
+
+    # --------------------------------------------------------
+    # Lectura
+    # --------------------------------------------------------
+
+    def __iter__(self) -> Iterator:
+        self.quarantine, self.count, self.version = [], 0, None
+        self._index = 0
+        self._sha = hashlib.sha256()
+        self._utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+        self._buf, self._line, self._col, self._eof = "", 1, 1, False
+
+        with open(self.path, "rb") as self._file:
+            i = self._skip_spaces(0)
+            if i == len(self._buf) or self._buf[i] != "[":
+                where = "" if i == len(self._buf) else ":%d:%d" % self._position(i)
+                raise ValueError(f"{self.path.name}{where}: el nivel superior no es un array JSON")
+
+            i = self._skip_spaces(i + 1)
+            closed = i < len(self._buf) and self._buf[i] == "]"
+            i += closed
+            while not closed:
+                # Se conserva solo desde el elemento en curso
+                if i > self.chunk_size:
+                    self._drop(i)
+                    i = 0
+                i = self._skip_spaces(i)
+                buf = self._buf
+                if i == len(buf):
+                    self._quarantine(i, i, "array sin cerrar al final del archivo")
+                    break
+                if buf[i] in ",]":
+                    self._quarantine(i, i, "elemento vacío (coma de más)")
+                    closed, i = buf[i] == "]", i + 1
+                    continue
+
+                # Camino rápido: el elemento entero en C
+                try:
+                    value, end = _decoder.raw_decode(buf, i)
+                    after = _SPACES.match(buf, end).end()
+                except json.JSONDecodeError:
+                    after = len(buf)
+                if after < len(buf) and buf[after] in ",]":
+                    problem = self.check(value) if self.check else None
+                    if problem:
+                        self._quarantine(i, i, problem, excerpt_end=end, record=True)
+                    else:
+                        self._index += 1
+                        self.count += 1
+                        yield value
+                    closed, i = buf[after] == "]", after + 1
+                    continue
+
+                # Camino lento: delimitar el elemento y reintentarlo entero
+                self._drop(i)
+                end, closer = self._scan_element()
+                try:
+                    value = json.loads(self._buf[:end])
+                    problem = self.check(value) if self.check else None
+                    offset = 0
+                except json.JSONDecodeError as e:
+                    problem, offset = f"JSON inválido: {e.msg}", e.pos
+                if problem:
+                    self._quarantine(offset, 0, problem, excerpt_end=end, record=True)
+                else:
+                    self._index += 1
+                    self.count += 1
+                    yield value
+                if closer is None:
+                    self._quarantine(end, end, "array sin cerrar al final del archivo")
+                    break
+                closed, i = closer == "]", end + 1
+
+            if closed:
+                i = self._skip_spaces(i)
+                if i < len(self._buf):
+                    self._quarantine(i, i, "datos después del cierre del array (ignorados)",
+                                     excerpt_end=len(self._buf))
+            # El resto del archivo solo suma al hash
+            while self._read():
+                self._drop(len(self._buf))
+
+        self.version = self._sha.hexdigest()[:16]
+
+    def _scan_element(self) -> Tuple[int, Optional[str]]:
+        """
+        Fin del elemento que empieza en buf[0]: (posición del ',' o ']' que
+        lo termina, ese carácter), o (len(buf), None) si el archivo termina antes
+        """
+        stack = ["["]
+        pos = 0
+        while True:
+            match = _TOKEN.search(self._buf, pos)
+            if match is None:
+                pos = len(self._buf)
+                if not self._read():
+                    return pos, None
+                continue
+            token = match.group()
+            if token == '"':
+                # string cortado por el bloque: leer más; si ya hay un salto
+                # de línea es una comilla sin cerrar y se saltea
+                if self._buf.find("\n", match.start()) == -1 and self._read():
+                    pos = match.start()
+                    continue
+            elif token in "[{":
+                stack.append(token)
+            elif token in _CLOSERS:
+                opener = _CLOSERS[token]
+                if opener in stack:
+                    # cierra hasta su apertura (las intermedias quedan sin cerrar)
+                    while stack.pop() != opener:
+                        pass
+                # un cierre sin apertura lo detecta json.loads del elemento
+                if not stack:
+                    return match.start(), "]"
+            elif token == "," and len(stack) == 1:
+                return match.start(), ","
+            pos = match.end()
+
+    def _quarantine(self, offset: int, start: int, message: str,
+                    excerpt_end: Optional[int] = None, record: bool = False):
+        """Anota un problema en buf[offset]; `record` = se descartó un elemento"""
+        line, column = self._position(offset)
+        excerpt = self._buf[start:excerpt_end] if excerpt_end is not None else ""
+        self.quarantine.append({
+            "index": self._index,
+            "line": line,
+            "column": column,
+            "message": message,
+            "excerpt": excerpt.strip()[:EXCERPT_LENGTH],
+        })
+        if record:
+            self._index += 1
+
+
+def load_array(
+    path: Union[str, Path],
+    chunk_size: int = CHUNK_SIZE,
+    check: Optional[Check] = None
+) -> Tuple[List, List[Dict], str]:
+    """
+    Lee un array JSON completo tolerando elementos dañados
+
+    Returns:
+        (elementos válidos, cuarentena, versión del contenido)
+    """
+    stream = ArrayStream(path, chunk_size, check)
+    items = list(stream)
+    return items, stream.quarantine, stream.version
@@ -0,0 +1,220 @@
+"""
+Limitador de Intentos de Login (Token Bucket)
+Simulador BIC Lankamar
+
+Cada intento de login consume un token de dos buckets:
+- Uno por email (frena ataques dirigidos a una cuenta)
+- Uno por cliente (frena un origen que prueba muchas cuentas)
+
+Si alguno está vacío el intento se rechaza ANTES de verificar bcrypt,
+que es la operación cara. Los buckets viven en memoria y se persisten
+en SQLite (tabla login_buckets) para sobrevivir reinicios.
+
+El dashboard lo aplica en auth_adapter.ThrottledAuthenticate, con la IP
+del proxy (o la sesión de Streamlit) como cliente.
+
+Riesgo conocido: el bucket por email lo puede vaciar cualquiera que
+conozca la dirección, bloqueando a su dueño mientras dure el ataque
+(como máximo 1 intento por minuto). El bucket por cliente acota cuántas
+cuentas puede bloquear un mismo origen, pero no evita el bloqueo.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from db import ensure_schema, get_conn
+
+
+# ============================================================
+# CONFIGURACIÓN
+# ============================================================
+
+# capacity: ráfaga máxima | refill_per_s: tokens recuperados por segundo
+EMAIL_BUCKET = {"capacity": 5, "refill_per_s": 1 / 60}     # 5 intentos, luego 1/min
+CLIENT_BUCKET = {"capacity": 20, "refill_per_s": 1 / 6}    # 20 intentos, luego 10/min
+
+# Costo inicial estimado de un bcrypt.checkpw (12 rounds) hasta medir el real
+DEFAULT_HASH_COST_S = 0.25
+
+
+class LoginThrottledError(ValueError):
+    """Intento de login rechazado por exceso de intentos"""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(
+            f"Demasiados intentos de login. Reintentá en {int(retry_after) + 1} segundos"
+        )
+
+
+# ============================================================
+# TOKEN BUCKETS
+# ============================================================
+
+class TokenBucketStore:
+    """
+    Buckets en memoria con persistencia write-through en SQLite.
+
+    Un bucket se carga desde SQLite la primera vez que se usa en el
+    proceso. Solo los intentos aceptados escriben en la base: un
+    intento rechazado cuesta una búsqueda en un dict.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[str, List[float]] = {}  # key → [tokens, updated_at]
+        self._lock = threading.Lock()
+
+    def _load(self, key: str, capacity: float, now: float) -> List[float]:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with get_conn() as conn:
+                row = conn.execute(
+                    "SELECT tokens, updated_at FROM login_buckets WHERE bucket_key = ?",
+                    (key,)
+                ).fetchone()
+            bucket = [row["tokens"], row["updated_at"]] if row else [float(capacity), now]
+            self._buckets[key] = bucket
+        return bucket
+
+    @staticmethod
+    def _refill(bucket: List[float], policy: Dict, now: float):
+        elapsed = max(0.0, now - bucket[1])
+        bucket[0] = min(policy["capacity"], bucket[0] + elapsed * policy["refill_per_s"])
+        bucket[1] = now
+
+    def acquire(self, keys: List[Tuple[str, Dict]], now: Optional[float] = None) -> float:
+        """
+        Consume un token de cada bucket si TODOS tienen al menos uno.
+
+        Args:
+            keys: Lista de (bucket_key, policy)
+            now: Epoch actual (inyectable para pruebas)
+
+        Returns:
+            0.0 si se aceptó; si no, segundos hasta que haya token disponible
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            buckets = []
+            retry_after = 0.0
+            for key, policy in keys:
+                bucket = self._load(key, policy["capacity"], now)
+                self._refill(bucket, policy, now)
+                if bucket[0] < 1:
+                    wait = (1 - bucket[0]) / policy["refill_per_s"]
+                    retry_after = max(retry_after, wait)
+                buckets.append((key, bucket))
+
+            if retry_after > 0:
+                return retry_after
+
+            for _, bucket in buckets:
+                bucket[0] -= 1
+            self._persist(buckets)
+            return 0.0
+
+    def reset(self, key: str):
+        """Olvida un bucket (vuelve a capacidad completa)"""
+        with self._lock:
+            self._buckets.pop(key, None)
+            with get_conn() as conn:
+                conn.execute("DELETE FROM login_buckets WHERE bucket_key = ?", (key,))
+
+    def clear_cache(self):
+        """Vacía la caché en memoria (los buckets se recargan desde SQLite)"""
+        with self._lock:
+            self._buckets.clear()
+
+    @staticmethod
+    def _persist(buckets: List[Tuple[str, List[float]]]):
+        with get_conn() as conn:
+            conn.executemany(
+                """INSERT INTO login_buckets (bucket_key, tokens, updated_at)
+                   VALUES (?, ?, ?)
+                   ON CONFLICT(bucket_key) DO UPDATE SET
+                       tokens = excluded.tokens,
+                       updated_at = excluded.updated_at""",
+                [(key, bucket[0], bucket[1]) for key, bucket in buckets]
+            )
+
+
+_store = TokenBucketStore()
+
+_metrics_lock = threading.Lock()
+_metrics = {
+    "allowed": 0,
+    "rejected": 0,
+    "hash_checks": 0,
+    "hash_cpu_s": 0.0,
+}
+
+
+# ============================================================
+# API PÚBLICA
+# ============================================================
+
+def _bucket_keys(email: str, client_id: Optional[str]) -> List[Tuple[str, Dict]]:
+    keys = [(f"email:{email.lower().strip()}", EMAIL_BUCKET)]
+    if client_id:
+        keys.append((f"client:{client_id}", CLIENT_BUCKET))
+    return keys
+
+
+def throttle_login(email: str, client_id: Optional[str] = None):
+    """
+    Registra un intento de login o lo rechaza si excede el límite
+
+    Debe llamarse antes de verificar la contraseña.
+
+    Raises:
+        LoginThrottledError si el email o el cliente agotaron sus intentos
+    """
+    ensure_schema()
+    retry_after = _store.acquire(_bucket_keys(email, client_id))
+    with _metrics_lock:
+        if retry_after:
+            _metrics["rejected"] += 1
+        else:
+            _metrics["allowed"] += 1
+    if retry_after:
+        raise LoginThrottledError(retry_after)
+
+
+def record_login_success(email: str):
+    """Un login exitoso restablece el bucket del email"""
+    _store.reset(f"email:{email.lower().strip()}")
+
+
+def record_hash_cost(cpu_seconds: float):
+    """Registra el tiempo de CPU de una verificación bcrypt"""
+    with _metrics_lock:
+        _metrics["hash_checks"] += 1
+        _metrics["hash_cpu_s"] += cpu_seconds
+
+
+def get_throttle_metrics() -> Dict:
+    """
+    Métricas del limitador
+
+    Returns:
+        Dict con intentos aceptados/rechazados, costo medio de bcrypt y
+        CPU ahorrada (rechazados × costo medio de bcrypt)
+    """
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    avg_cost = (
+        metrics["hash_cpu_s"] / metrics["hash_checks"]
+        if metrics["hash_checks"] else DEFAULT_HASH_COST_S
+    )
+    metrics["avg_hash_cpu_s"] = round(avg_cost, 4)
+    metrics["cpu_saved_s"] = round(metrics["rejected"] * avg_cost, 3)
+    metrics["hash_cpu_s"] = round(metrics["hash_cpu_s"], 3)
+    return metrics
+
+
+def reset_throttle_metrics():
+    """Reinicia los contadores de métricas"""
+    with _metrics_lock:
+        for key in _metrics:
+            _metrics[key] = 0 if isinstance(_metrics[key], int) else 0.0
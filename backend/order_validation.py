@@ -0,0 +1,422 @@
+"""
+Validación Masiva de Órdenes de Infusión
+Simulador BIC Lankamar
+
+Equivalente por lotes de PumpService.isFlowRateValid (app Flutter): toma
+la exportación diaria de farmacia (droga, dosis, concentración, peso,
+modelo de bomba), convierte cada dosis a ml/h y la compara contra el
+rango_flujo / volumen_max de la bomba.
+
+Formato de entrada (CSV, opcionalmente .gz; se aceptan alias de columnas):
+    order_id            Identificador de la orden
+    drug                Droga ("Noradrenalina")
+    dose, dose_unit     20, "mcg/kg/min" | "mg/h" | "U/kg/h" | "ml/h" ...
+    concentration,
+    concentration_unit  0.064, "mg/ml" (no se usa si la dosis está en ml/h)
+    weight_kg           Peso (obligatorio para dosis por kg)
+    pump                ID, nombre o modelo de la bomba ("Alaris", "Agilia")
+    vtbi_ml             Volumen a infundir (opcional)
+
+Las filas se procesan por bloques: las unidades y las bombas se resuelven
+una vez por valor distinto (tabla de conversión cacheada) y la conversión
+a ml/h y los controles de rango se hacen con arrays de NumPy sobre el
+bloque completo. El reporte de órdenes observadas se escribe en streaming.
+
+Uso:
+    python order_validation.py ordenes_2026-10-19.csv --report observadas.csv
+"""
+
+import argparse
+import csv
+import gzip
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from alarm_resolver import get_resolver
+from catalog import get_catalog
+
+
+# ============================================================
+# CONFIGURACIÓN
+# ============================================================
+
+# Órdenes por bloque vectorizado
+CHUNK_ROWS = 50_000
+
+# Alias aceptados para cada columna
+FIELD_ALIASES = {
+    "order_id": ("order_id", "orden", "id", "order"),
+    "drug": ("drug", "droga", "farmaco", "medicamento"),
+    "dose": ("dose", "dosis"),
+    "dose_unit": ("dose_unit", "unidad_dosis", "unit", "unidad"),
+    "concentration": ("concentration", "concentracion"),
+    "concentration_unit": ("concentration_unit", "unidad_concentracion"),
+    "weight_kg": ("weight_kg", "peso_kg", "peso", "weight"),
+    "pump": ("pump", "pump_id", "bomba", "device"),
+    "vtbi_ml": ("vtbi_ml", "vtbi", "volumen_ml"),
+}
+
+# Cantidad → (dimensión, factor a la unidad base de la dimensión)
+AMOUNT_UNITS = {
+    "g": ("masa", 1000.0),
+    "mg": ("masa", 1.0),
+    "mcg": ("masa", 1e-3),
+    "ng": ("masa", 1e-6),
+    "u": ("unidades", 1.0),
+    "ui": ("unidades", 1.0),
+    "iu": ("unidades", 1.0),
+    "mu": ("unidades", 1e-3),
+    "meq": ("meq", 1.0),
+    "mmol": ("mmol", 1.0),
+    "ml": ("volumen", 1.0),
+}
+
+# Tiempo → factor a "por hora"
+TIME_UNITS = {"min": 60.0, "h": 1.0, "d": 1 / 24}
+
+# Observaciones posibles (orden estable en el reporte)
+FLAGS = [
+    "pump_unknown",
+    "pump_without_limits",
+    "unit_unknown",
+    "unit_mismatch",
+    "weight_missing",
+    "invalid_number",
+    "rate_below_min",
+    "rate_above_max",
+    "vtbi_above_max",
+]
+
+REPORT_COLUMNS = [
+    "row", "order_id", "drug", "pump", "pump_id", "dose", "dose_unit",
+    "rate_ml_h", "rate_min", "rate_max", "flags",
+]
+
+_UNIT_SPELLINGS = [
+    (re.compile(r"[µμ]g"), "mcg"),
+    (re.compile(r"\bug\b"), "mcg"),
+    (re.compile(r"\b(unidades|unidad|units|unit)\b"), "u"),
+    (re.compile(r"\b(hora|horas|hr|hs|hour)\b"), "h"),
+    (re.compile(r"\b(minuto|minutos|minute)\b"), "min"),
+    (re.compile(r"\b(dia|día|day|24h)\b"), "d"),
+]
+
+
+# ============================================================
+# TABLA DE CONVERSIÓN DE UNIDADES
+# ============================================================
+
+def _unit_parts(unit: str) -> List[str]:
+    text = str(unit or "").strip().lower()
+    for pattern, replacement in _UNIT_SPELLINGS:
+        text = pattern.sub(replacement, text)
+    return [part.strip() for part in re.split(r"\s*/\s*", text) if part.strip()]
+
+
+@lru_cache(maxsize=4096)
+def parse_dose_unit(unit: str) -> Optional[Tuple[str, float, bool]]:
+    """
+    'mcg/kg/min' → ('masa', 0.06, True): dimensión, factor a unidad base
+    por hora y si es por kg. None si la unidad no se reconoce.
+    """
+    parts = _unit_parts(unit)
+    per_kg = "kg" in parts[1:]
+    parts = [p for i, p in enumerate(parts) if not (i > 0 and p == "kg")]
+    if len(parts) != 2 or parts[0] not in AMOUNT_UNITS or parts[1] not in TIME_UNITS:
+        return None
+    dimension, factor = AMOUNT_UNITS[parts[0]]
+    return dimension, factor * TIME_UNITS[parts[1]], per_kg
+
+
+@lru_cache(maxsize=4096)
+def parse_concentration_unit(unit: str) -> Optional[Tuple[str, float]]:
+    """'mcg/ml' → ('masa', 0.001) por ml. None si no se reconoce."""
+    parts = _unit_parts(unit)
+    volume = {"ml": 1.0, "l": 1000.0}
+    if len(parts) != 2 or parts[0] not in AMOUNT_UNITS or parts[1] not in volume:
+        return None
+    dimension, factor = AMOUNT_UNITS[parts[0]]
+    return dimension, factor / volume[parts[1]]
+
+
+# ============================================================
+# LÍMITES DE BOMBAS
+# ============================================================
+
+class PumpLimits:
+    """rango_flujo y volumen_max compilados del catálogo, por versión"""
+
+    def __init__(self):
+        catalog = get_catalog()
+        self.version = catalog.version
+        rows = catalog.specs.rows
+        self.limits: Dict[str, Tuple[float, float, float]] = {
+            pid: (rows[pid]["rate_min"], rows[pid]["rate_max"], rows[pid]["vtbi_max"])
+            for pid in catalog.specs.valid_ids()
+        }
+
+    def resolve(self, pump: str) -> Optional[str]:
+        """ID de bomba para un ID, nombre o modelo (None si no se reconoce)"""
+        pump = str(pump or "").strip()
+        if pump in self.limits:
+            return pump
+        return get_resolver().resolve_device(pump) if pump else None
+
+
+_limits_lock = threading.Lock()
+_limits: Optional[PumpLimits] = None
+
+
+def get_pump_limits() -> PumpLimits:
+    """Límites compartidos; se recalculan si cambia el catálogo"""
+    global _limits
+    version = get_catalog().version
+    if _limits and _limits.version == version:
+        return _limits
+    with _limits_lock:
+        if not (_limits and _limits.version == version):
+            _limits = PumpLimits()
+        return _limits
+
+
+def is_flow_rate_valid(pump_id: str, rate_ml_h: float) -> bool:
+    """Equivalente de PumpService.isFlowRateValid: flujo dentro de rango_flujo"""
+    limits = get_pump_limits().limits.get(pump_id)
+    if limits is None:
+        return False
+    return limits[0] <= rate_ml_h <= limits[1]
+
+
+# ============================================================
+# VALIDACIÓN POR BLOQUES
+# ============================================================
+
+def _to_floats(values: List[str]) -> np.ndarray:
+    """Strings → float64 (NaN si vacío o inválido); conversión en bloque si se puede"""
+    raw = np.array(values, dtype=object)
+    raw[raw == ""] = "nan"
+    try:
+        return raw.astype(np.float64)
+    except ValueError:
+        pass
+    out = np.full(len(values), np.nan)
+    for i, value in enumerate(values):
+        try:
+            out[i] = float(str(value).replace(",", "."))
+        except (TypeError, ValueError):
+            pass
+    return out
+
+
+def _lookup(values: List[str], resolve) -> Tuple[List, np.ndarray]:
+    """Resuelve cada valor distinto una vez; devuelve (resueltos únicos, índice por fila)"""
+    unique, inverse = np.unique(np.array(values, dtype=object).astype(str), return_inverse=True)
+    return [resolve(u) for u in unique], inverse
+
+
+def validate_chunk(columns: Dict[str, List[str]]) -> Dict[str, np.ndarray]:
+    """
+    Convierte y valida un bloque de órdenes por columnas (claves de
+    FIELD_ALIASES → lista de valores; las columnas ausentes valen "")
+
+    Returns:
+        Dict de arrays por fila: pump_id, rate_ml_h, rate_min, rate_max
+        y una máscara booleana por cada observación de FLAGS
+    """
+    limits = get_pump_limits()
+    n = len(columns["dose"])
+    column = lambda key: columns.get(key) or [""] * n
+
+    dose = _to_floats(column("dose"))
+    concentration = _to_floats(column("concentration"))
+    weight = _to_floats(column("weight_kg"))
+    vtbi = _to_floats(column("vtbi_ml"))
+
+    dose_units, dose_idx = _lookup(column("dose_unit"), parse_dose_unit)
+    conc_units, conc_idx = _lookup(column("concentration_unit"), parse_concentration_unit)
+    pumps, pump_idx = _lookup(column("pump"), limits.resolve)
+
+    # Tablas por valor distinto → arrays por fila
+    dose_known = np.array([u is not None for u in dose_units])[dose_idx]
+    dose_dim = np.array([u[0] if u else "" for u in dose_units], dtype=object)[dose_idx]
+    dose_factor = np.array([u[1] if u else np.nan for u in dose_units])[dose_idx]
+    per_kg = np.array([bool(u and u[2]) for u in dose_units])[dose_idx]
+    conc_known = np.array([u is not None for u in conc_units])[conc_idx]
+    conc_dim = np.array([u[0] if u else "" for u in conc_units], dtype=object)[conc_idx]
+    conc_factor = np.array([u[1] if u else np.nan for u in conc_units])[conc_idx]
+    pump_ids = np.array([p or "" for p in pumps], dtype=object)[pump_idx]
+    pump_limits = np.array([limits.limits.get(p, (np.nan,) * 3) for p in pumps], dtype=np.float64).reshape(-1, 3)
+    rate_min, rate_max, vtbi_max = pump_limits[pump_idx].T
+
+    volume = dose_dim == "volumen"
+    # ml/h directo, o cantidad/h ÷ cantidad/ml
+    amount_per_h = dose * dose_factor * np.where(per_kg, weight, 1.0)
+    rate = np.where(volume, amount_per_h, amount_per_h / (concentration * conc_factor))
+
+    flags = {
+        "pump_unknown": pump_ids == "",
+        "unit_unknown": ~dose_known | (~volume & ~conc_known),
+        "weight_missing": per_kg & ~(weight > 0),
+    }
+    flags["pump_without_limits"] = ~flags["pump_unknown"] & np.isnan(rate_max)
+    flags["unit_mismatch"] = dose_known & conc_known & ~volume & (dose_dim != conc_dim)
+    flags["invalid_number"] = ~(dose > 0) | (~volume & ~(concentration > 0)) | (np.isfinite(vtbi) & ~(vtbi > 0))
+
+    valid_rate = np.isfinite(rate) & (rate > 0) & ~flags["unit_mismatch"] & ~flags["unit_unknown"]
+    rate = np.where(valid_rate, rate, np.nan)
+    with np.errstate(invalid="ignore"):
+        flags["rate_below_min"] = valid_rate & (rate < rate_min)
+        flags["rate_above_max"] = valid_rate & (rate > rate_max)
+        flags["vtbi_above_max"] = np.isfinite(vtbi) & (vtbi > vtbi_max)
+
+    return {
+        "pump_id": pump_ids,
+        "rate_ml_h": rate,
+        "rate_min": rate_min,
+        "rate_max": rate_max,
+        "flagged": np.logical_or.reduce([flags[f] for f in FLAGS]) if n else np.zeros(0, dtype=bool),
+        **flags,
+    }
+
+
+def _open_text(path: Path):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8-sig", newline="")
+    return open(path, "r", encoding="utf-8-sig", newline="")
+
+
+def iter_order_chunks(path: Path, chunk_rows: int = CHUNK_ROWS) -> Iterator[Dict[str, List[str]]]:
+    """Bloques de órdenes por columnas, con las claves de FIELD_ALIASES"""
+    with _open_text(path) as f:
+        reader = csv.reader(f)
+        header = [h.strip().lower() for h in next(reader, [])]
+        columns = {
+            key: next((header.index(a) for a in aliases if a in header), None)
+            for key, aliases in FIELD_ALIASES.items()
+        }
+        missing = [k for k in ("dose", "dose_unit", "pump") if columns[k] is None]
+        if missing:
+            raise ValueError(f"{path.name}: faltan columnas {', '.join(missing)}")
+        present = [(key, i) for key, i in columns.items() if i is not None]
+        width = len(header)
+
+        def to_columns(records):
+            transposed = list(zip(*records))
+            return {key: list(transposed[i]) for key, i in present}
+
+        records = []
+        for record in reader:
+            if len(record) != width:
+                record = (record + [""] * width)[:width]
+            records.append(record)
+            if len(records) >= chunk_rows:
+                yield to_columns(records)
+                records = []
+        if records:
+            yield to_columns(records)
+
+
+def _format(value: float) -> str:
+    return "" if not np.isfinite(value) else f"{value:.3f}".rstrip("0").rstrip(".")
+
+
+def validate_orders(path: Path, report_path: Optional[Path] = None,
+                    include_ok: bool = False, chunk_rows: int = CHUNK_ROWS) -> Dict:
+    """
+    Valida un archivo de órdenes y escribe el reporte en streaming
+
+    Args:
+        path: CSV de órdenes (.csv o .csv.gz)
+        report_path: CSV de salida (None = solo resumen)
+        include_ok: Incluir en el reporte también las órdenes sin observaciones
+        chunk_rows: Órdenes por bloque
+
+    Returns:
+        Dict {orders, flagged, flags: {observación: cantidad}, elapsed_s, orders_per_s}
+    """
+    path = Path(path)
+    start = time.perf_counter()
+    totals = Counter()
+    orders = flagged = 0
+
+    report = open(report_path, "w", encoding="utf-8", newline="") if report_path else None
+    try:
+        writer = csv.writer(report) if report else None
+        if writer:
+            writer.writerow(REPORT_COLUMNS)
+        for chunk in iter_order_chunks(path, chunk_rows):
+            result = validate_chunk(chunk)
+            for flag in FLAGS:
+                totals[flag] += int(result[flag].sum())
+            flagged += int(result["flagged"].sum())
+
+            size = len(chunk["dose"])
+            if writer:
+                rows = range(size) if include_ok else np.flatnonzero(result["flagged"]).tolist()
+                value = lambda key, i: chunk[key][i] if key in chunk else ""
+                for i in rows:
+                    writer.writerow([
+                        orders + i + 1,
+                        value("order_id", i),
+                        value("drug", i),
+                        value("pump", i),
+                        result["pump_id"][i],
+                        value("dose", i),
+                        value("dose_unit", i),
+                        _format(result["rate_ml_h"][i]),
+                        _format(result["rate_min"][i]),
+                        _format(result["rate_max"][i]),
+                        ";".join(f for f in FLAGS if result[f][i]),
+                    ])
+            orders += size
+    finally:
+        if report:
+            report.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "orders": orders,
+        "flagged": flagged,
+        "flags": {f: totals[f] for f in FLAGS if totals[f]},
+        "report": str(report_path) if report_path else None,
+        "elapsed_s": round(elapsed, 3),
+        "orders_per_s": round(orders / elapsed) if elapsed > 0 else None,
+    }
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Valida órdenes de infusión contra los límites de las bombas")
+    parser.add_argument("orders", type=Path, help="CSV de órdenes de farmacia")
+    parser.add_argument("--report", type=Path, help="CSV de salida con las órdenes observadas")
+    parser.add_argument("--all", action="store_true", help="Incluir también las órdenes sin observaciones")
+    args = parser.parse_args(argv)
+
+    try:
+        result = validate_orders(args.orders, args.report, include_ok=args.all)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}")
+        return 1
+
+    print(f"Órdenes: {result['orders']:,} ({result['orders_per_s']:,}/s)")
+    print(f"Observadas: {result['flagged']:,}")
+    for flag, count in result["flags"].items():
+        print(f"  {count:>8,}  {flag}")
+    if result["report"]:
+        print(f"Reporte: {result['report']}")
+    return 0 if not result["flagged"] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+Matriz Comparativa de Bombas
+Simulador BIC Lankamar
+
+Matriz bomba × atributo precalculada una vez por versión del catálogo a
+partir de las specs compiladas (spec_compiler), el modelo de batería y
+las alarmas por categoría. El dashboard, el PDF y la API renderizan
+desde la misma matriz compartida.
+
+Consultas: filtros "columna op valor" y orden por columna, por ejemplo
+bombas con flujo mínimo ≤ 0.1 ml/h ordenadas por autonomía:
+
+    from pump_matrix import get_pump_matrix
+    get_pump_matrix().query(["rate_min<=0.1"], sort="-autonomy_h")
+"""
+
+import math
+import operator
+import re
+import threading
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from battery_model import parse_battery
+from catalog import get_catalog
+from spec_compiler import COLUMNS as SPEC_COLUMNS
+
+
+# ============================================================
+# ATRIBUTOS
+# ============================================================
+
+# Columna numérica → (etiqueta, unidad); las de alarmas se agregan por categoría
+ATTRIBUTES = {
+    "rate_min": ("Flujo mínimo", "ml/h"),
+    "rate_max": ("Flujo máximo", "ml/h"),
+    "vtbi_max": ("Volumen máximo", "ml"),
+    "pressure_max": ("Presión máxima", "mmHg"),
+    "accuracy": ("Precisión", "%"),
+    "bubble_ml": ("Sensibilidad de aire", "µl"),
+    "occlusion_low": ("Oclusión mínima", "mmHg"),
+    "occlusion_high": ("Oclusión máxima", "mmHg"),
+    "autonomy_h": ("Autonomía", "h"),
+    "recharge_h": ("Recarga", "h"),
+    "alarms_total": ("Alarmas", ""),
+}
+
+# Columnas de texto (solo admiten == y !=)
+TEXT_COLUMNS = ["name", "marca", "modelo", "tipo"]
+
+# Conversión de la unidad compilada a la de visualización
+DISPLAY_FACTORS = {"accuracy": 100.0, "bubble_ml": 1000.0}
+
+OPERATORS = {
+    "<=": operator.le,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+}
+
+_CONDITION = re.compile(r"^\s*(\w+)\s*(<=|>=|==|!=|<|>)\s*(.+?)\s*$")
+
+
+def parse_condition(text: str) -> tuple:
+    """'rate_min<=0.1' → ('rate_min', '<=', '0.1')"""
+    match = _CONDITION.match(text)
+    if not match:
+        raise ValueError(f"Condición no interpretable: '{text}' (esperado: 'columna<=valor')")
+    return match.groups()
+
+
+# ============================================================
+# MATRIZ
+# ============================================================
+
+class PumpMatrix:
+    """
+    Atributos de todas las bombas en columnas NumPy (una fila por bomba,
+    en el orden del catálogo). Los valores numéricos están en las unidades
+    de visualización de ATTRIBUTES.
+    """
+
+    def __init__(self):
+        catalog = get_catalog()
+        self.version = catalog.version
+        self.pump_ids = [p["id"] for p in catalog.pumps]
+        self.index = {pid: i for i, pid in enumerate(self.pump_ids)}
+
+        self.text: Dict[str, List[str]] = {
+            "name": [f"{p['marca']} {p['modelo']}" for p in catalog.pumps],
+            "marca": [p.get("marca", "") for p in catalog.pumps],
+            "modelo": [p.get("modelo", "") for p in catalog.pumps],
+            "tipo": [p.get("tipo", "") for p in catalog.pumps],
+        }
+
+        # Specs compiladas; los valores por defecto del compilador (dato no
+        # especificado por el fabricante) se muestran como faltantes
+        self.columns: Dict[str, np.ndarray] = {}
+        for name in ["rate_min", "rate_max", "vtbi_max", "pressure_max", "accuracy",
+                     "bubble_ml", "occlusion_low", "occlusion_high"]:
+            self.columns[name] = catalog.specs.column(name) * DISPLAY_FACTORS.get(name, 1.0)
+        for issue in catalog.specs.issues:
+            for name, (_, source) in SPEC_COLUMNS.items():
+                if name in self.columns and source.endswith("." + issue["field"]):
+                    self.columns[name][self.index[issue["pump_id"]]] = np.nan
+        batteries = [parse_battery(p) for p in catalog.pumps]
+        self.columns["autonomy_h"] = np.array([b["autonomy_h"] for b in batteries], dtype=np.float64)
+        self.columns["recharge_h"] = np.array([b["recharge_h"] for b in batteries], dtype=np.float64)
+
+        self.attributes = dict(ATTRIBUTES)
+        categories = sorted({e["categoria"] for e in catalog.errors})
+        counts = np.zeros((len(self.pump_ids), len(categories)), dtype=np.int64)
+        position = {c: j for j, c in enumerate(categories)}
+        for error in catalog.errors:
+            counts[self.index[error["pump_id"]], position[error["categoria"]]] += 1
+        for category, j in position.items():
+            self.columns[f"alarms_{category}"] = counts[:, j]
+            self.attributes[f"alarms_{category}"] = (f"Alarmas de {category}", "")
+        self.columns["alarms_total"] = counts.sum(axis=1)
+
+    def _mask(self, column: str, op: str, value) -> np.ndarray:
+        compare = OPERATORS.get(op)
+        if compare is None:
+            raise ValueError(f"Operador desconocido: {op}")
+        if column in self.text:
+            if op not in ("==", "!="):
+                raise ValueError(f"La columna {column} solo admite == y !=")
+            values = np.array([v.lower() for v in self.text[column]])
+            return compare(values, str(value).lower())
+        if column not in self.columns:
+            raise ValueError(f"Columna desconocida: {column}")
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Valor no numérico para {column}: {value}")
+        return compare(self.columns[column], value)
+
+    def query(
+        self,
+        where: Sequence[Union[str, tuple]] = (),
+        sort: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Filtra y ordena la matriz
+
+        Args:
+            where: Condiciones "columna op valor" o tuplas (columna, op, valor),
+                   combinadas con AND
+            sort: Columna de orden; con "-" adelante, descendente. Los valores
+                  faltantes (NaN) van siempre al final
+            limit: Máximo de filas
+
+        Returns:
+            Filas (ver row()) que cumplen todas las condiciones
+        """
+        mask = np.ones(len(self.pump_ids), dtype=bool)
+        for condition in where:
+            column, op, value = parse_condition(condition) if isinstance(condition, str) else condition
+            mask &= self._mask(column, op, value)
+        selected = np.flatnonzero(mask)
+
+        if sort:
+            descending = sort.startswith("-")
+            column = sort.lstrip("-")
+            if column in self.text:
+                keys = [self.text[column][i].lower() for i in selected]
+                selected = selected[sorted(range(len(selected)), key=keys.__getitem__, reverse=descending)]
+            elif column in self.columns:
+                values = self.columns[column][selected].astype(np.float64)
+                keys = np.where(np.isnan(values), np.inf, -values if descending else values)
+                selected = selected[np.argsort(keys, kind="stable")]
+            else:
+                raise ValueError(f"Columna de orden desconocida: {column}")
+
+        if limit is not None:
+            selected = selected[:limit]
+        return [self.row(self.pump_ids[i]) for i in selected]
+
+    def row(self, pump_id: str) -> Dict:
+        """Atributos de una bomba (None donde el valor no es finito)"""
+        i = self.index[pump_id]
+        row = {"pump_id": pump_id, **{name: values[i] for name, values in self.text.items()}}
+        for name, values in self.columns.items():
+            value = values[i].item()
+            row[name] = value if math.isfinite(value) else None
+        return row
+
+    def rows(self) -> List[Dict]:
+        return [self.row(pid) for pid in self.pump_ids]
+
+
+_matrix_lock = threading.Lock()
+_matrix: Optional[PumpMatrix] = None
+
+
+def get_pump_matrix() -> PumpMatrix:
+    """Matriz compartida; se recalcula si cambia la versión del catálogo"""
+    global _matrix
+    version = get_catalog().version
+    if _matrix and _matrix.version == version:
+        return _matrix
+    with _matrix_lock:
+        if not (_matrix and _matrix.version == version):
+            _matrix = PumpMatrix()
+        return _matrix
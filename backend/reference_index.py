@@ -0,0 +1,209 @@
+"""
+Índice de Referencias Cruzadas entre Archivos de data/
+Simulador BIC Lankamar
+
+Resuelve con hash joins (dicts armados una sola vez) las referencias
+entre pumps_db.json, los videos (content_store) y bombas_especificaciones.json:
+
+- video_tag de cada alarma ↔ videos (cobertura por bomba, videos
+  huérfanos)
+- pump_id de cada video ↔ bombas del catálogo (y ↔ bomba de la alarma)
+- id de cada bomba de especificaciones ↔ bombas del catálogo
+- related_errors de cada botón ↔ códigos de alarma de su bomba
+
+El índice se recalcula solo si cambia la versión del catálogo, la
+revisión de los videos o las especificaciones; lo comparten el tab de estadísticas,
+la validación de pumps_db.json y la API.
+
+Uso:
+    from reference_index import get_reference_index
+    index = get_reference_index()
+    index.dangling, index.orphan_videos, index.coverage["baxter_sigma_spectrum"]
+"""
+
+import hashlib
+import re
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from catalog import DATA_DIR, Catalog, get_catalog
+from content_store import content_revision, export_manifest
+from json_stream import load_array
+
+SPECS_PATH = DATA_DIR / "bombas_especificaciones.json"
+
+_DIGITS = re.compile(r"\d+")
+
+
+def code_keys(code) -> Set[str]:
+    """
+    Claves por las que se puede referenciar un código de alarma: el código
+    normalizado y, si tiene, su parte numérica ("E-101" → {"E-101", "101"})
+    """
+    code = str(code).strip().upper()
+    return {code, *_DIGITS.findall(code)}
+
+
+def _file_stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+# ============================================================
+# ÍNDICE
+# ============================================================
+
+class ReferenceIndex:
+    """
+    Referencias resueltas para un catálogo, unos videos y unas
+    especificaciones dados. Todos los resultados se calculan en __init__
+    (O(total de registros)) y no se modifican después.
+
+    Atributos:
+        version: Hash de las tres fuentes (para ETags)
+        dangling: Referencias que no resuelven, cada una
+                  {source, ref_type, ref, pump_id, detail}
+        orphan_videos: Videos sin alarma con su video_tag
+        coverage: pump_id → {pump_name, alarms, with_video, coverage,
+                  has_specs, buttons, related_errors, related_resolved}
+        videos_by_tag: video_tag → videos
+        problems: Archivos que no se pudieron leer completos
+    """
+
+    def __init__(self, catalog: Catalog, manifest: Dict, spec_pumps: List[Dict], version: str):
+        self.version = version
+        self.problems: List[str] = []
+        self.dangling: List[Dict] = []
+
+        videos = manifest.get("videos", [])
+
+        # Tablas hash de cada lado del join
+        alarm_by_tag: Dict[str, Dict] = {e["video_tag"]: e for e in catalog.errors}
+        self.videos_by_tag: Dict[str, List[Dict]] = defaultdict(list)
+        for video in videos:
+            self.videos_by_tag[video.get("video_tag")].append(video)
+        codes_by_pump: Dict[str, Set[str]] = defaultdict(set)
+        for error in catalog.errors:
+            codes_by_pump[error["pump_id"]] |= code_keys(error["codigo"])
+        specs_by_id = {p.get("id"): p for p in spec_pumps}
+
+        # Videos → alarmas y bombas
+        self.orphan_videos: List[Dict] = []
+        for video in videos:
+            tag, pump_id = video.get("video_tag"), video.get("pump_id")
+            alarm = alarm_by_tag.get(tag)
+            if alarm is None:
+                self.orphan_videos.append(video)
+                self._dangle("videos", "video_tag", tag, pump_id,
+                             "ninguna alarma usa este video_tag")
+            elif pump_id and pump_id != alarm["pump_id"]:
+                self._dangle("videos", "pump_id", pump_id, alarm["pump_id"],
+                             f"el video_tag '{tag}' es de {alarm['pump_id']}")
+            if pump_id and pump_id not in catalog.pumps_by_id:
+                self._dangle("videos", "pump_id", pump_id, None,
+                             "bomba inexistente en pumps_db.json")
+
+        # Especificaciones → catálogo, botones → códigos de alarma
+        related = defaultdict(lambda: [0, 0])  # pump_id → [referencias, resueltas]
+        buttons: Dict[str, int] = defaultdict(int)
+        for spec in spec_pumps:
+            pump_id = spec.get("id")
+            if pump_id not in catalog.pumps_by_id:
+                self._dangle("bombas_especificaciones.json", "pump_id", pump_id, None,
+                             "bomba inexistente en pumps_db.json")
+            codes = codes_by_pump.get(pump_id, set())
+            for button in spec.get("buttons", []):
+                buttons[pump_id] += 1
+                for ref in button.get("related_errors", []):
+                    related[pump_id][0] += 1
+                    if code_keys(ref) & codes:
+                        related[pump_id][1] += 1
+                    else:
+                        self._dangle("bombas_especificaciones.json", "related_errors", ref, pump_id,
+                                     f"el botón '{button.get('id')}' referencia un código que la bomba no tiene")
+
+        # Cobertura por bomba
+        with_video: Dict[str, int] = defaultdict(int)
+        for error in catalog.errors:
+            if error["video_tag"] in self.videos_by_tag:
+                with_video[error["pump_id"]] += 1
+        self.coverage: Dict[str, Dict] = {}
+        for pump in catalog.pumps:
+            pump_id = pump["id"]
+            alarms = len(catalog.errors_by_pump.get(pump_id, []))
+            self.coverage[pump_id] = {
+                "pump_name": f"{pump['marca']} {pump['modelo']}",
+                "alarms": alarms,
+                "with_video": with_video[pump_id],
+                "coverage": with_video[pump_id] / alarms if alarms else 0.0,
+                "has_specs": pump_id in specs_by_id,
+                "buttons": buttons[pump_id],
+                "related_errors": related[pump_id][0],
+                "related_resolved": related[pump_id][1],
+            }
+
+    def _dangle(self, source: str, ref_type: str, ref, pump_id: Optional[str], detail: str):
+        self.dangling.append({
+            "source": source,
+            "ref_type": ref_type,
+            "ref": ref,
+            "pump_id": pump_id,
+            "detail": detail,
+        })
+
+    def summary(self) -> Dict:
+        """Resumen serializable para la API"""
+        return {
+            "version": self.version,
+            "dangling": self.dangling,
+            "orphan_videos": self.orphan_videos,
+            "coverage": self.coverage,
+            "problems": self.problems,
+        }
+
+
+def build_reference_index(catalog: Optional[Catalog] = None) -> ReferenceIndex:
+    """Lee los videos y las especificaciones y arma el índice (sin caché)"""
+    catalog = catalog or get_catalog()
+    problems = []
+    revision = content_revision()
+    manifest = export_manifest()
+
+    try:
+        spec_pumps, quarantine, specs_version = load_array(SPECS_PATH)
+    except FileNotFoundError:
+        spec_pumps, quarantine, specs_version = [], [], ""
+    except ValueError as e:
+        spec_pumps, quarantine, specs_version = [], [], ""
+        problems.append(str(e))
+    for q in quarantine:
+        problems.append(f"{SPECS_PATH.name}:{q['line']}:{q['column']}: {q['message']} "
+                        f"(registro #{q['index']} omitido)")
+
+    sources = f"{catalog.version}|{revision}|{specs_version}"
+    version = hashlib.sha256(sources.encode("utf-8")).hexdigest()[:16]
+    index = ReferenceIndex(catalog, manifest, spec_pumps, version)
+    index.problems = problems
+    return index
+
+
+_index_lock = threading.Lock()
+_index: Optional[Tuple[tuple, ReferenceIndex]] = None
+
+
+def get_reference_index() -> ReferenceIndex:
+    """Índice compartido; se recalcula si cambia el catálogo, los videos o las especificaciones"""
+    global _index
+    catalog = get_catalog()
+    key = (catalog.version, content_revision(), _file_stamp(SPECS_PATH))
+    if _index and _index[0] == key:
+        return _index[1]
+    with _index_lock:
+        if not (_index and _index[0] == key):
+            _index = (key, build_reference_index(catalog))
+        return _index[1]
@@ -42,9 +42,149 @@ CREATE TABLE IF NOT EXISTS sessions (
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
+-- Buckets del limitador de intentos de login (token bucket)
+CREATE TABLE IF NOT EXISTS login_buckets (
+    bucket_key TEXT PRIMARY KEY,         -- "email:<email>" o "client:<id>"
+    tokens REAL NOT NULL,                -- Tokens disponibles
+    updated_at REAL NOT NULL             -- Epoch (segundos) de la última recarga
+);
+
+-- Log de actividad append-only (logins y otros eventos de usuario)
+CREATE TABLE IF NOT EXISTS activity_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    event TEXT NOT NULL DEFAULT 'login',
+    occurred_at TEXT NOT NULL            -- Fecha ISO (UTC)
+);
+
+-- Usuarios activos por período ('day' = YYYY-MM-DD, 'week' = lunes YYYY-MM-DD)
+CREATE TABLE IF NOT EXISTS activity_period_users (
+    period TEXT NOT NULL,
+    period_start TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    PRIMARY KEY (period, period_start, user_id)
+) WITHOUT ROWID;
+
+-- Rollup incremental de usuarios activos (DAU/WAU)
+CREATE TABLE IF NOT EXISTS activity_rollups (
+    period TEXT NOT NULL,
+    period_start TEXT NOT NULL,
+    active_users INTEGER NOT NULL DEFAULT 0,
+    events INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, period_start)
+) WITHOUT ROWID;
+
+-- Historial de versiones del catálogo (para sincronización delta)
+CREATE TABLE IF NOT EXISTS catalog_versions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    version TEXT NOT NULL UNIQUE,        -- Hash de contenido de pumps_db.json
+    pumps INTEGER NOT NULL,
+    alarms INTEGER NOT NULL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Hash de contenido de cada registro en cada versión
+CREATE TABLE IF NOT EXISTS catalog_record_hashes (
+    version TEXT NOT NULL,
+    kind TEXT NOT NULL,                  -- 'pump' | 'alarm'
+    record_id TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    PRIMARY KEY (version, kind, record_id),
+    FOREIGN KEY (version) REFERENCES catalog_versions(version) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- Ocurrencias de alarmas por hora, agregadas de logs de bombas
+-- (rollup incremental: cada ingesta suma a las filas existentes)
+CREATE TABLE IF NOT EXISTS alarm_hourly (
+    hour TEXT NOT NULL,                  -- 'YYYY-MM-DDTHH' (hora del log)
+    pump_id TEXT NOT NULL,               -- '' si el dispositivo no se reconoció
+    codigo TEXT NOT NULL,                -- Código del catálogo (o crudo si no se resolvió)
+    ward TEXT NOT NULL DEFAULT '',
+    categoria TEXT NOT NULL,
+    prioridad TEXT NOT NULL,
+    occurrences INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (hour, pump_id, codigo, ward)
+) WITHOUT ROWID;
+
+-- Archivos de log ingeridos (permite retomar un log que sigue creciendo)
+CREATE TABLE IF NOT EXISTS alarm_log_ingests (
+    source TEXT PRIMARY KEY,             -- Ruta absoluta del archivo
+    offset_bytes INTEGER NOT NULL DEFAULT 0,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    mtime_ns INTEGER NOT NULL DEFAULT 0,
+    events INTEGER NOT NULL DEFAULT 0,
+    unmatched INTEGER NOT NULL DEFAULT 0,
+    rejected INTEGER NOT NULL DEFAULT 0,
+    ingested_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Resultados de Monte Carlo de riesgo de alarma, por hash de parámetros
+CREATE TABLE IF NOT EXISTS alarm_risk_cache (
+    cache_key TEXT PRIMARY KEY,          -- SHA-256 de specs + parámetros + versión del modelo
+    pump_id TEXT NOT NULL,
+    params TEXT NOT NULL,                -- JSON
+    result TEXT NOT NULL,                -- JSON
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Resultados de reglas de validación de pumps_db.json, por hash de contenido
+CREATE TABLE IF NOT EXISTS validation_cache (
+    record_hash TEXT PRIMARY KEY,        -- blake2b de versión de reglas + tipo + contenido
+    kind TEXT NOT NULL,                  -- catalog, pump, block, alarm
+    issues TEXT NOT NULL,                -- JSON
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+) WITHOUT ROWID;
+
+-- Videos educativos vinculados a alarmas (antes content_manifest.json)
+CREATE TABLE IF NOT EXISTS videos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    video_tag TEXT NOT NULL,             -- video_tag de la alarma en pumps_db.json
+    pump_id TEXT,
+    url TEXT NOT NULL,
+    platform TEXT NOT NULL DEFAULT '',
+    notes TEXT NOT NULL DEFAULT '',
+    views_count INTEGER NOT NULL DEFAULT 0,
+    added_at TEXT NOT NULL,              -- Fecha ISO
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Contador de cambios del contenido (clave de caché de quienes leen videos)
+CREATE TABLE IF NOT EXISTS content_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    revision INTEGER NOT NULL DEFAULT 0,
+    last_updated TEXT
+);
+INSERT OR IGNORE INTO content_state (id, revision) VALUES (1, 0);
+
+-- Manifests JSON ya importados (la importación es única)
+CREATE TABLE IF NOT EXISTS content_imports (
+    source TEXT PRIMARY KEY,             -- Ruta absoluta del manifest
+    videos INTEGER NOT NULL,
+    imported_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Cada alta, baja o edición de un video sube la revisión
+-- (views_count no cuenta: las vistas no cambian el contenido)
+CREATE TRIGGER IF NOT EXISTS trg_videos_insert AFTER INSERT ON videos
+BEGIN
+    UPDATE content_state SET revision = revision + 1, last_updated = CURRENT_TIMESTAMP WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_videos_delete AFTER DELETE ON videos
+BEGIN
+    UPDATE content_state SET revision = revision + 1, last_updated = CURRENT_TIMESTAMP WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_videos_update
+AFTER UPDATE OF video_tag, pump_id, url, platform, notes ON videos
+BEGIN
+    UPDATE videos SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+    UPDATE content_state SET revision = revision + 1, last_updated = CURRENT_TIMESTAMP WHERE id = 1;
+END;
+
 -- Trigger para actualizar updated_at automáticamente
+-- (last_login_at no cuenta como modificación del perfil)
+DROP TRIGGER IF EXISTS trg_users_updated_at;
 CREATE TRIGGER IF NOT EXISTS trg_users_updated_at
-AFTER UPDATE ON users
+AFTER UPDATE OF email, password_hash, name, role, email_verified ON users
 BEGIN
     UPDATE users SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
 END;
@@ -55,3 +195,6 @@ CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);
 CREATE INDEX IF NOT EXISTS idx_invites_token ON invites(token);
 CREATE INDEX IF NOT EXISTS idx_invites_email ON invites(email);
 CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions(user_id);
+CREATE INDEX IF NOT EXISTS idx_activity_events_user ON activity_events(user_id, occurred_at);
+CREATE INDEX IF NOT EXISTS idx_videos_tag ON videos(video_tag);
+CREATE INDEX IF NOT EXISTS idx_videos_pump ON videos(pump_id, video_tag);
@@ -0,0 +1,80 @@
+"""
+Vista Paginada de Resultados de Búsqueda de Alarmas
+Simulador BIC Lankamar
+
+Arma el HTML de una página de resultados (Catalog.search_page) en un
+solo bloque: encabezado por categoría y un <details> por alarma. El
+dashboard lo dibuja con un único st.markdown por página, así que el
+tamaño del mensaje al navegador depende de PAGE_SIZE y no de cuántas
+alarmas coinciden con la búsqueda.
+"""
+
+from html import escape
+from typing import Dict, List, Optional
+
+# Alarmas por página ("Cargar más" agrega otra)
+PAGE_SIZE = 50
+
+# Sistema de iconos y colores por CATEGORÍA (basado en UX/gamificación)
+CATEGORY_STYLE = {
+    "oclusion": {"icon": "🚫", "color": "#E53935", "nombre": "Oclusión"},
+    "aire": {"icon": "🫧", "color": "#90CAF9", "nombre": "Aire en Línea"},
+    "flujo": {"icon": "💧", "color": "#3949AB", "nombre": "Flujo"},
+    "energia": {"icon": "🪫", "color": "#FFB300", "nombre": "Energía/Batería"},
+    "sistema": {"icon": "⚙️", "color": "#8D6E63", "nombre": "Sistema"},
+    "set": {"icon": "⚙️", "color": "#43A047", "nombre": "Configuración"},
+    "medicacion": {"icon": "💊", "color": "#D81B60", "nombre": "Medicación"},
+    "general": {"icon": "⚠️", "color": "#607D8B", "nombre": "General"},
+    "volumen": {"icon": "📊", "color": "#5C6BC0", "nombre": "Volumen"},
+    "mecanica": {"icon": "🔧", "color": "#795548", "nombre": "Mecánica"},
+}
+
+PRIORITY_ICONS = {"critica": "🔴", "alta": "🟠", "media": "🟡", "informativa": "🟢"}
+
+
+def category_header_html(categoria: str, count: int) -> str:
+    """Encabezado de categoría con color e icono"""
+    style = CATEGORY_STYLE.get(categoria, CATEGORY_STYLE["general"])
+    color = style["color"]
+    return (
+        f'<div style="background: linear-gradient(90deg, {color}22, transparent); '
+        f'padding: 12px 18px; border-left: 5px solid {color}; '
+        f'border-radius: 0 10px 10px 0; margin: 20px 0 12px 0; display: flex; align-items: center;">'
+        f'<span style="font-size: 28px; margin-right: 12px;">{style["icon"]}</span>'
+        f'<div><strong style="color: {color}; font-size: 18px;">{escape(style["nombre"].upper())}</strong>'
+        f'<span style="color: #666; margin-left: 10px; font-size: 14px;">({count} errores)</span></div>'
+        f'</div>'
+    )
+
+
+def alarm_html(error: Dict) -> str:
+    """Una alarma desplegable (equivale al st.expander anterior)"""
+    icon = PRIORITY_ICONS.get(error["prioridad"], "⚪")
+    return (
+        f'<details style="border: 1px solid #ddd; border-radius: 6px; padding: 8px 12px; margin: 6px 0;">'
+        f'<summary>{icon} {escape(error["codigo"])} — {escape(error["pump_name"])}</summary>'
+        f'<p><strong>Significado:</strong> {escape(error["significado"])}</p>'
+        f'<p><strong>Acción correctiva:</strong> {escape(error["accion_correctiva"])}</p>'
+        f'<p><strong>Bomba:</strong> <code>{escape(error["pump_name"])}</code> | '
+        f'<strong>Prioridad:</strong> <code>{escape(error["prioridad"])}</code></p>'
+        f'<p><strong>Video tag:</strong> <code>{escape(error["video_tag"])}</code></p>'
+        f'</details>'
+    )
+
+
+def page_html(results: List[Dict], by_category: Dict[str, int], previous_category: Optional[str] = None) -> str:
+    """
+    HTML de una página de resultados ordenados por categoría
+
+    `previous_category` es la última categoría de la página anterior: si
+    la página continúa ese grupo no repite el encabezado.
+    """
+    parts = []
+    current = previous_category
+    for error in results:
+        if error["categoria"] != current:
+            current = error["categoria"]
+            parts.append(category_header_html(current, by_category.get(current, 0)))
+        parts.append(alarm_html(error))
+    # Sin saltos de línea: para markdown es un solo bloque HTML
+    return "".join(parts)
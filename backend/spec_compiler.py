@@ -0,0 +1,270 @@
+"""
+Compilador de Especificaciones Técnicas
+Simulador BIC Lankamar
+
+Convierte una sola vez, al armar el catálogo, los textos libres de
+specs_tecnicas y umbrales ("0.5 - 999 ml/h", "150 mmHg (fijo)", "+/- 5%",
+"50 µl", ">1 ml acumulado en 15 min") en columnas numéricas tipadas con
+unidad fija. La validación, las tablas comparativas, los simuladores y
+los controles de rango leen estas columnas en lugar de volver a aplicar
+expresiones regulares sobre el texto.
+
+Cada valor que no se pudo interpretar queda registrado como issue
+(error si el campo es obligatorio, advertencia si se usó un valor por
+defecto). Una bomba con errores no tiene fila utilizable.
+
+Uso:
+    from catalog import get_catalog
+    specs = get_catalog().specs
+    specs.row("baxter_sigma_spectrum")["rate_max"]      # 999.0
+    specs.column("rate_max")                            # array por bomba
+"""
+
+import math
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# ============================================================
+# COLUMNAS
+# ============================================================
+
+# Columna → (unidad, campo de origen)
+COLUMNS = {
+    "rate_min": ("ml/h", "specs_tecnicas.rango_flujo"),
+    "rate_max": ("ml/h", "specs_tecnicas.rango_flujo"),
+    "vtbi_max": ("ml", "specs_tecnicas.volumen_max"),
+    "pressure_max": ("mmHg", "specs_tecnicas.presion_max"),
+    "pressure_fixed": ("bool", "specs_tecnicas.presion_max"),
+    "accuracy": ("fracción", "specs_tecnicas.precision_flujo"),
+    "bubble_ml": ("ml", "specs_tecnicas.sensibilidad_aire"),
+    "occlusion_low": ("mmHg", "umbrales.oclusion_mmhg"),
+    "occlusion_high": ("mmHg", "umbrales.oclusion_mmhg"),
+    "occlusion_configurable": ("bool", "umbrales.oclusion_mmhg"),
+    "air_accum_ml": ("ml", "umbrales.aire_ml"),
+    "air_window_s": ("s", "umbrales.aire_ml"),
+}
+
+# Valores por defecto cuando el campo falta o no se interpreta
+DEFAULT_ACCURACY = 0.05
+DEFAULT_BUBBLE_ML = 0.5
+DEFAULT_PRESSURE_MMHG = 300.0
+DEFAULT_AIR_WINDOW_MIN = 15.0
+
+# Umbral de advertencia de flujo máximo
+MAX_PLAUSIBLE_RATE_ML_H = 2000.0
+
+# Factores a la unidad de cada columna
+FLOW_UNITS = {"ml/h": 1.0, "ml/hr": 1.0, "ml/min": 60.0, "l/h": 1000.0}
+VOLUME_UNITS = {"ml": 1.0, "l": 1000.0, "µl": 1e-3, "ul": 1e-3, "μl": 1e-3}
+PRESSURE_UNITS = {"mmhg": 1.0, "kpa": 7.50062, "psi": 51.7149, "bar": 750.062}
+
+_NUMBER = r"(\d+(?:[.,]\d+)?)"
+_RANGE = re.compile(rf"{_NUMBER}\s*(?:-|–|a)\s*{_NUMBER}")
+_SINGLE = re.compile(_NUMBER)
+_UNIT = re.compile(r"\s*([a-zµμ]+(?:/[a-z]+)?)", re.IGNORECASE)
+_WINDOW = re.compile(r"en\s+(\d+(?:[.,]\d+)?)\s*min", re.IGNORECASE)
+
+
+# ============================================================
+# PARSERS DE CANTIDADES
+# ============================================================
+
+def _to_float(text: str) -> float:
+    return float(text.replace(",", "."))
+
+
+def _unit_factor(text: str, end: int, units: Dict[str, float], default: str) -> float:
+    """
+    Factor de la unidad escrita después del número; si lo que sigue no es
+    una unidad conocida ("configurable", "acumulado") se asume `default`
+    """
+    match = _UNIT.match(text, end)
+    if match and match.group(1).lower() in units:
+        return units[match.group(1).lower()]
+    return units[default]
+
+
+def parse_range(text: str, units: Dict[str, float], default: str) -> Optional[Tuple[float, float]]:
+    """'0.5 - 999 ml/h' → (0.5, 999.0) en la unidad de la columna"""
+    match = _RANGE.search(text)
+    if not match:
+        return None
+    factor = _unit_factor(text, match.end(2), units, default)
+    return _to_float(match.group(1)) * factor, _to_float(match.group(2)) * factor
+
+
+def parse_quantity(text: str, units: Dict[str, float], default: str) -> Optional[float]:
+    """'50 µl' → 0.05 (ml); sin unidad se asume `default`"""
+    match = _SINGLE.search(text)
+    if not match:
+        return None
+    return _to_float(match.group(1)) * _unit_factor(text, match.end(1), units, default)
+
+
+def parse_percentage(text: str) -> Optional[float]:
+    """'+/- 5%' → 0.05"""
+    match = re.search(rf"{_NUMBER}\s*%", text)
+    return _to_float(match.group(1)) / 100 if match else None
+
+
+def format_range(low, high, unit: str = "") -> str:
+    """(0.5, 999, 'ml/h') → '0.5 - 999 ml/h'; '-' si falta algún extremo"""
+    try:
+        low, high = float(low), float(high)
+    except (TypeError, ValueError):
+        return "-"
+    if not (math.isfinite(low) and math.isfinite(high)):
+        return "-"
+    text = f"{low:g} - {high:g}"
+    return f"{text} {unit}" if unit else text
+
+
+# ============================================================
+# COMPILACIÓN POR BOMBA
+# ============================================================
+
+def compile_pump(pump: Dict) -> Tuple[Dict, List[Dict]]:
+    """
+    Compila las specs de una bomba
+
+    Returns:
+        (fila con una clave por columna de COLUMNS, lista de issues
+        {pump_id, field, raw, message, level})
+    """
+    pump_id = pump.get("id", "?")
+    specs = pump.get("specs_tecnicas", {}) or {}
+    umbrales = pump.get("umbrales", {}) or {}
+    issues: List[Dict] = []
+
+    def issue(field: str, raw, message: str, level: str = "warning"):
+        issues.append({"pump_id": pump_id, "field": field, "raw": raw, "message": message, "level": level})
+
+    row: Dict = {}
+
+    # --- Flujo (obligatorio) ---
+    raw = specs.get("rango_flujo")
+    rate = parse_range(str(raw), FLOW_UNITS, "ml/h") if raw else None
+    if rate is None:
+        issue("rango_flujo", raw, "Formato de rango_flujo inválido (esperado: 'X - Y ml/h')", "error")
+        rate = (math.nan, math.nan)
+    elif rate[0] >= rate[1]:
+        issue("rango_flujo", raw, f"Rango de flujo ilógico: min ({rate[0]:g}) >= max ({rate[1]:g})", "error")
+    elif rate[1] > MAX_PLAUSIBLE_RATE_ML_H:
+        issue("rango_flujo", raw, f"Flujo máximo muy alto ({rate[1]:g} ml/h) - verificar")
+    row["rate_min"], row["rate_max"] = rate
+
+    # --- Volumen ---
+    raw = specs.get("volumen_max")
+    vtbi = parse_quantity(str(raw), VOLUME_UNITS, "ml") if raw else None
+    if vtbi is None:
+        issue("volumen_max", raw, "volumen_max no interpretable: sin límite de VTBI")
+    row["vtbi_max"] = vtbi if vtbi is not None else math.inf
+
+    # --- Presión ---
+    raw = specs.get("presion_max")
+    pressure = parse_quantity(str(raw), PRESSURE_UNITS, "mmhg") if raw else None
+    if pressure is None:
+        issue("presion_max", raw, f"presion_max no interpretable: se asume {DEFAULT_PRESSURE_MMHG:g} mmHg")
+    row["pressure_max"] = pressure if pressure is not None else DEFAULT_PRESSURE_MMHG
+    row["pressure_fixed"] = "fijo" in str(raw or "").lower()
+
+    # --- Precisión ---
+    raw = specs.get("precision_flujo")
+    accuracy = parse_percentage(str(raw)) if raw else None
+    if accuracy is None:
+        issue("precision_flujo", raw, f"precision_flujo no interpretable: se asume {DEFAULT_ACCURACY:.0%}")
+    row["accuracy"] = accuracy if accuracy is not None else DEFAULT_ACCURACY
+
+    # --- Sensor de aire ---
+    raw = specs.get("sensibilidad_aire")
+    bubble = parse_quantity(str(raw), VOLUME_UNITS, "µl") if raw else None
+    if bubble is None:
+        issue("sensibilidad_aire", raw, f"sensibilidad_aire no interpretable: se asume {DEFAULT_BUBBLE_ML:g} ml")
+    row["bubble_ml"] = bubble if bubble is not None else DEFAULT_BUBBLE_ML
+
+    # --- Umbral de oclusión (acotado por la presión máxima) ---
+    raw = umbrales.get("oclusion_mmhg")
+    text = str(raw or "")
+    occlusion = parse_range(text, PRESSURE_UNITS, "mmhg")
+    if occlusion is None:
+        single = parse_quantity(text, PRESSURE_UNITS, "mmhg")
+        occlusion = (single, single) if single is not None else None
+    if occlusion is None:
+        issue("oclusion_mmhg", raw, "umbral de oclusión no interpretable: se usa presion_max")
+        occlusion = (row["pressure_max"], row["pressure_max"])
+    high = min(occlusion[1], row["pressure_max"])
+    row["occlusion_low"], row["occlusion_high"] = min(occlusion[0], high), high
+    lowered = text.lower()
+    row["occlusion_configurable"] = "configurable" in lowered and "no configurable" not in lowered
+
+    # --- Aire acumulado ---
+    raw = umbrales.get("aire_ml")
+    text = str(raw or "")
+    accum = parse_quantity(text, VOLUME_UNITS, "ml") if "acumulado" in text.lower() else None
+    if accum is None and "acumulado" in text.lower():
+        issue("aire_ml", raw, "aire acumulado no interpretable: sin umbral acumulado")
+    row["air_accum_ml"] = accum if accum is not None else math.inf
+    window = _WINDOW.search(text)
+    row["air_window_s"] = (_to_float(window.group(1)) if window else DEFAULT_AIR_WINDOW_MIN) * 60
+
+    return row, issues
+
+
+# ============================================================
+# TABLA
+# ============================================================
+
+class SpecTable:
+    """
+    Specs compiladas de todas las bombas: filas por ID y columnas NumPy
+    (mismo orden que `pump_ids`). Inmutable, como el Catalog que la contiene.
+    """
+
+    def __init__(self, pumps: Sequence[Dict]):
+        self.pump_ids: List[str] = []
+        self.rows: Dict[str, Dict] = {}
+        self.issues: List[Dict] = []
+        self.invalid = set()
+        for pump in pumps:
+            row, issues = compile_pump(pump)
+            self.pump_ids.append(pump.get("id"))
+            self.rows[pump.get("id")] = row
+            self.issues.extend(issues)
+            if any(i["level"] == "error" for i in issues):
+                self.invalid.add(pump.get("id"))
+        self.index = {pid: i for i, pid in enumerate(self.pump_ids)}
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.array([self.rows[pid][name] for pid in self.pump_ids],
+                           dtype=bool if unit == "bool" else np.float64)
+            for name, (unit, _) in COLUMNS.items()
+        }
+
+    def row(self, pump_id: str) -> Dict:
+        """Fila compilada; ValueError si la bomba no existe o tiene errores"""
+        if pump_id not in self.rows:
+            raise ValueError(f"Bomba no encontrada: {pump_id}")
+        if pump_id in self.invalid:
+            messages = "; ".join(i["message"] for i in self.issues_for(pump_id) if i["level"] == "error")
+            raise ValueError(f"{pump_id}: {messages}")
+        return self.rows[pump_id]
+
+    def column(self, name: str, pump_ids: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Columna completa o en el orden de `pump_ids`"""
+        values = self.columns[name]
+        if pump_ids is None:
+            return values
+        return values[[self.index[pid] for pid in pump_ids]]
+
+    def issues_for(self, pump_id: str) -> List[Dict]:
+        return [i for i in self.issues if i["pump_id"] == pump_id]
+
+    def valid_ids(self) -> List[str]:
+        return [pid for pid in self.pump_ids if pid not in self.invalid]
+
+
+def compile_specs(pumps: Sequence[Dict]) -> SpecTable:
+    """Compila las specs de una lista de bombas de pumps_db.json"""
+    return SpecTable(pumps)
@@ -0,0 +1,369 @@
+"""
+Motor de Validación Incremental de pumps_db.json
+Simulador BIC Lankamar
+
+Valida bombas y alarmas con reglas por registro y cachea el resultado de
+cada registro por hash de su contenido (memoria del proceso + SQLite), de
+modo que después de editar una línea solo se revalida lo que cambió.
+
+Jerarquía de hashes (de más grueso a más fino):
+- Reporte completo por versión del archivo (hash de su contenido)
+- Cabecera de cada bomba (todo menos errores_y_alarmas)
+- Bloques de BLOCK_SIZE alarmas consecutivas
+- Cada alarma, solo dentro de los bloques que cambiaron (solo en
+  memoria: revalidar las alarmas de un bloque es más barato que leerlas
+  de SQLite)
+
+Todos los hashes incluyen RULES_VERSION: al cambiar una regla se sube la
+versión y el caché anterior deja de usarse. La única regla entre
+registros (video_tag duplicado dentro de una bomba) se cachea por bomba
+con la cabecera y los hashes de sus bloques: solo se recalcula en las
+bombas editadas.
+
+Al validar una versión nueva del archivo se podan del caché (memoria y
+SQLite) los registros que esa versión no usa, así la tabla no crece con
+cada edición.
+
+Lo usan la CLI data_validation/validate_pumps_db.py y la sección de
+validación del dashboard.
+
+Uso:
+    from validation_engine import validate_catalog
+    report = validate_catalog()
+    report["errors"], report["warnings"], report["stats"]["hit_rate"]
+"""
+
+import hashlib
+import json
+import marshal
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from catalog import Catalog, get_catalog
+from db import ensure_schema, get_conn, run_with_busy_retry
+from spec_compiler import compile_pump
+
+
+# ============================================================
+# CONFIGURACIÓN
+# ============================================================
+
+# Subir al modificar cualquier regla (invalida el caché)
+RULES_VERSION = 1
+
+# Alarmas por bloque hasheado en conjunto
+BLOCK_SIZE = 256
+
+# Hashes por consulta IN (...) a SQLite
+QUERY_BATCH = 500
+
+REQUIRED_FIELDS = {
+    "root": ["id", "marca", "modelo", "tipo", "prevalencia_arg",
+             "specs_tecnicas", "interfaz", "errores_y_alarmas"],
+    "specs_tecnicas": ["rango_flujo", "volumen_max", "tipo_set", "bateria"],
+    "interfaz": ["pantalla", "teclado", "navegacion"],
+}
+
+REQUIRED_ALARM_FIELDS = ["codigo_pantalla", "significado", "accion_correctiva", "video_tag"]
+
+# Campos clínicos sugeridos (no obligatorios pero útiles para simular)
+SUGGESTED_SPECS = {
+    "presion_max": "Presión máxima de oclusión (ej: '300 mmHg')",
+    "precision_flujo": "Precisión del flujo (ej: '+/- 5%')",
+    "sensibilidad_aire": "Sensibilidad del detector de aire (ej: '50 µl')",
+}
+
+MIN_ACTION_LENGTH = 10
+
+# Niveles de issue → clave del reporte
+LEVELS = {"error": "errors", "warning": "warnings", "suggestion": "suggestions"}
+
+Issue = Tuple[str, str]  # (nivel, mensaje)
+
+
+# ============================================================
+# REGLAS POR REGISTRO
+# ============================================================
+
+def pump_rules(pump: Dict) -> List[Issue]:
+    """Reglas sobre la cabecera de una bomba (sin mirar cada alarma)"""
+    issues: List[Issue] = []
+
+    for field in REQUIRED_FIELDS["root"]:
+        if field not in pump:
+            issues.append(("error", f"Falta campo obligatorio: `{field}`"))
+    specs = pump.get("specs_tecnicas", {})
+    for field in REQUIRED_FIELDS["specs_tecnicas"]:
+        if field not in specs:
+            issues.append(("error", f"Falta spec técnica: `{field}`"))
+    interfaz = pump.get("interfaz", {})
+    for field in REQUIRED_FIELDS["interfaz"]:
+        if field not in interfaz:
+            issues.append(("error", f"Falta campo de interfaz: `{field}`"))
+
+    # Specs no interpretables (mismo compilador que el catálogo); los
+    # campos ausentes ya se reportan como obligatorios o sugeridos
+    for issue in compile_pump(pump)[1]:
+        if issue["level"] == "error":
+            issues.append(("error", f"{issue['message']}: '{issue['raw'] or ''}'"))
+        elif issue["raw"]:
+            issues.append(("warning", f"⚠️ {issue['message']}: '{issue['raw']}'"))
+
+    if not pump.get("errores_y_alarmas"):
+        issues.append(("warning", "⚠️ No tiene errores documentados"))
+
+    for field, description in SUGGESTED_SPECS.items():
+        if field not in specs:
+            issues.append(("suggestion", f"💡 Campo sugerido faltante: `{field}` - {description}"))
+    return issues
+
+
+def alarm_rules(alarm: Dict) -> List[Issue]:
+    """Reglas sobre una alarma; el mensaje se completa con el código al reportar"""
+    issues: List[Issue] = []
+    for field in REQUIRED_ALARM_FIELDS:
+        if not alarm.get(field):
+            issues.append(("error", f"falta: `{field}`"))
+    if len(alarm.get("accion_correctiva", "")) < MIN_ACTION_LENGTH:
+        issues.append(("warning", "acción correctiva muy corta"))
+    return issues
+
+
+def duplicate_tag_issues(alarms: Sequence[Dict]) -> List[Issue]:
+    """video_tag repetido dentro de una bomba (regla entre registros, cacheada por bomba)"""
+    counts = Counter(a.get("video_tag") for a in alarms)
+    return [
+        ("warning", f"⚠️ Video tag duplicado: '{tag}'")
+        for tag, n in counts.items() if tag and n > 1
+    ]
+
+
+# ============================================================
+# CACHÉ
+# ============================================================
+
+# hash → resultado; persiste entre reruns del dashboard
+_memory: Dict[str, object] = {}
+
+
+def record_hash(kind: str, content) -> str:
+    """Hash del contenido de un registro (o bloque) para las reglas vigentes"""
+    raw = marshal.dumps((RULES_VERSION, kind, content))
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def _pump_header(pump: Dict) -> Dict:
+    header = {k: v for k, v in pump.items() if k != "errores_y_alarmas"}
+    header["errores_y_alarmas"] = bool(pump.get("errores_y_alarmas"))
+    return header
+
+
+def _load(keys: List[str], use_disk: bool) -> Dict[str, object]:
+    """Resultados cacheados para `keys` (memoria y, si falta, SQLite)"""
+    found = {k: _memory[k] for k in keys if k in _memory}
+    missing = [k for k in keys if k not in found]
+    if missing and use_disk:
+        ensure_schema()
+        with get_conn() as conn:
+            for i in range(0, len(missing), QUERY_BATCH):
+                batch = missing[i:i + QUERY_BATCH]
+                rows = conn.execute(
+                    f"SELECT record_hash, issues FROM validation_cache "
+                    f"WHERE record_hash IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                for key, issues in rows:
+                    found[key] = _memory[key] = json.loads(issues)
+    return found
+
+
+def _store(entries: List[Tuple[str, str, object]], use_disk: bool):
+    """Guarda (hash, tipo, resultado) en memoria y en SQLite"""
+    for key, _, value in entries:
+        _memory[key] = value
+    if not entries or not use_disk:
+        return
+
+    def _tx():
+        with get_conn() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO validation_cache (record_hash, kind, issues) VALUES (?, ?, ?)",
+                [(key, kind, json.dumps(value, ensure_ascii=False)) for key, kind, value in entries]
+            )
+    run_with_busy_retry(_tx)
+
+
+def _prune(keep: Set[str], use_disk: bool) -> int:
+    """Borra del caché todo lo que no esté en `keep`; devuelve las filas borradas de SQLite"""
+    for key in [k for k in _memory if k not in keep]:
+        del _memory[key]
+    if not use_disk:
+        return 0
+
+    def _tx():
+        with get_conn() as conn:
+            conn.execute("CREATE TEMP TABLE validation_keep (record_hash TEXT PRIMARY KEY)")
+            conn.executemany("INSERT OR IGNORE INTO validation_keep VALUES (?)", [(k,) for k in keep])
+            return conn.execute(
+                "DELETE FROM validation_cache "
+                "WHERE record_hash NOT IN (SELECT record_hash FROM validation_keep)"
+            ).rowcount
+    return run_with_busy_retry(_tx)
+
+
+def clear_validation_cache() -> int:
+    """Borra el caché de memoria y de disco; devuelve cuántas filas había"""
+    _memory.clear()
+    ensure_schema()
+    with get_conn() as conn:
+        return conn.execute("DELETE FROM validation_cache").rowcount
+
+
+# ============================================================
+# VALIDACIÓN
+# ============================================================
+
+def _validate_records(pumps: Sequence[Dict], use_disk: bool, used: Optional[Set[str]] = None) -> Dict:
+    """
+    Valida registro por registro, revalidando solo los que cambiaron
+
+    Si se pasa `used`, se le agregan los hashes que usó esta validación.
+    """
+    start = time.perf_counter()
+    used = set() if used is None else used
+
+    # 1. Hashes de cabeceras, bloques y video_tags por bomba
+    plan = []  # (bomba, alarmas, hash de cabecera, [(inicio, hash de bloque)], hash de tags)
+    for pump in pumps:
+        alarms = pump.get("errores_y_alarmas") or []
+        blocks = [
+            (i, record_hash("block", alarms[i:i + BLOCK_SIZE]))
+            for i in range(0, len(alarms), BLOCK_SIZE)
+        ]
+        header = record_hash("pump", _pump_header(pump))
+        tags = record_hash("tags", (header, [b for _, b in blocks]))
+        plan.append((pump, alarms, header, blocks, tags))
+
+    keys = [h for _, _, header, blocks, tags in plan
+            for h in [header, tags] + [b for _, b in blocks]]
+    used.update(keys)
+    cached = _load(keys, use_disk)
+
+    # 2. Revalidar lo que no está en caché
+    new_entries: List[Tuple[str, str, object]] = []
+    alarm_entries: List[Tuple[str, str, object]] = []
+    stats = Counter()
+    for pump, alarms, header, blocks, tags in plan:
+        stats["records"] += 1 + len(alarms)
+        stats["blocks"] += len(blocks)
+        if header in cached:
+            stats["cached"] += 1
+        else:
+            cached[header] = pump_rules(pump)
+            new_entries.append((header, "pump", cached[header]))
+        if tags not in cached:
+            cached[tags] = duplicate_tag_issues(alarms)
+            new_entries.append((tags, "tags", cached[tags]))
+
+        for offset, block in blocks:
+            size = min(BLOCK_SIZE, len(alarms) - offset)
+            if block in cached:
+                stats["cached"] += size
+                stats["blocks_cached"] += 1
+                continue
+            chunk = alarms[offset:offset + size]
+            alarm_keys = [record_hash("alarm", a) for a in chunk]
+            used.update(alarm_keys)
+            found = _load(alarm_keys, use_disk=False)
+            result = []
+            for j, (alarm, key) in enumerate(zip(chunk, alarm_keys)):
+                if key in found:
+                    stats["cached"] += 1
+                else:
+                    found[key] = alarm_rules(alarm)
+                    alarm_entries.append((key, "alarm", found[key]))
+                result.extend([j, level, message] for level, message in found[key])
+            cached[block] = result
+            new_entries.append((block, "block", result))
+
+    _store(new_entries, use_disk)
+    _store(alarm_entries, use_disk=False)
+
+    # 3. Armar el reporte
+    report = {"errors": [], "warnings": [], "suggestions": []}
+    for pump, alarms, header, blocks, tags in plan:
+        pump_name = f"{pump.get('marca', '?')} {pump.get('modelo', '?')}"
+        for level, message in cached[header]:
+            report[LEVELS[level]].append(f"[{pump_name}] {message}")
+        for offset, block in blocks:
+            for j, level, message in cached[block]:
+                alarm = alarms[offset + j]
+                error_id = alarm.get("codigo_pantalla") or f"Error #{offset + j}"
+                report[LEVELS[level]].append(f"[{pump_name}] Error '{error_id}' - {message}")
+        for level, message in cached[tags]:
+            report[LEVELS[level]].append(f"[{pump_name}] {message}")
+
+    records = stats["records"]
+    report["stats"] = {
+        "records": records,
+        "cached": stats["cached"],
+        "revalidated": records - stats["cached"],
+        "hit_rate": stats["cached"] / records if records else 1.0,
+        "blocks": stats["blocks"],
+        "blocks_cached": stats["blocks_cached"],
+        "pruned": 0,
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+    }
+    return report
+
+
+def validate_pumps(pumps: Sequence[Dict], version: Optional[str] = None, use_disk: bool = True) -> Dict:
+    """
+    Valida una lista de bombas revalidando solo los registros cambiados
+
+    Args:
+        pumps: Bombas de pumps_db.json
+        version: Hash del contenido del archivo (catalog.content_version);
+                 si ya se validó esa versión se reutiliza el reporte completo,
+                 si no se valida y se poda el caché de las versiones anteriores
+        use_disk: Leer/escribir el caché en SQLite (además del de memoria)
+
+    Returns:
+        Dict con errors, warnings y suggestions (mensajes "[Marca Modelo] ...")
+        y stats: records, cached, revalidated, hit_rate, blocks, blocks_cached,
+        pruned (filas borradas del caché en disco) y elapsed_ms
+    """
+    if version is None:
+        return _validate_records(pumps, use_disk)
+
+    start = time.perf_counter()
+    key = record_hash("catalog", version)
+    cached = _load([key], use_disk).get(key)
+    if cached is None:
+        used = {key}
+        report = _validate_records(pumps, use_disk, used)
+        report["stats"]["pruned"] = _prune(used, use_disk)
+        report["stats"]["elapsed_ms"] = (time.perf_counter() - start) * 1000
+        _store([(key, "catalog", report)], use_disk)
+        return report
+
+    stats = cached["stats"]
+    return {
+        **cached,
+        "stats": {
+            **stats,
+            "cached": stats["records"],
+            "revalidated": 0,
+            "hit_rate": 1.0,
+            "blocks_cached": stats["blocks"],
+            "pruned": 0,
+            "elapsed_ms": (time.perf_counter() - start) * 1000,
+        },
+    }
+
+
+def validate_catalog(catalog: Optional[Catalog] = None, use_disk: bool = True) -> Dict:
+    """Reporte del catálogo compartido (o de `catalog`), cacheado por versión"""
+    catalog = catalog or get_catalog()
+    return validate_pumps(catalog.pumps, catalog.version, use_disk)
@@ -0,0 +1,177 @@
+"""
+Contador de Reproducciones de Videos con Escritura Diferida (write-behind)
+Simulador BIC Lankamar
+
+Cada reproducción suma 1 en un contador en memoria repartido en SHARDS
+shards, cada uno con su lock. Cada hilo productor usa siempre el mismo
+shard, asignado en round-robin la primera vez que registra una vista,
+así que hasta SHARDS hilos concurrentes no se bloquean entre sí. Un hilo en segundo plano
+junta los deltas de todos los shards cada FLUSH_INTERVAL_S y los escribe
+en una sola transacción: un UPDATE videos.views_count por video, no uno
+por reproducción.
+
+Pérdida acotada: si el proceso muere sin pasar por atexit se pierden a
+lo sumo las reproducciones de los últimos FLUSH_INTERVAL_S segundos (o
+MAX_PENDING, que fuerza una escritura antes). Un lote que falla vuelve a
+los contadores y se reintenta en el próximo ciclo.
+
+Uso:
+    from view_counter import record_view
+    record_view(video_id)
+"""
+
+import atexit
+import itertools
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+from content_store import add_views
+
+
+# ============================================================
+# CONFIGURACIÓN
+# ============================================================
+
+FLUSH_INTERVAL_S = 1.0   # Máxima espera antes de escribir (ventana de pérdida)
+MAX_PENDING = 50_000     # Reproducciones acumuladas que adelantan la escritura
+SHARDS = 16              # Contadores independientes (menos contención entre hilos)
+
+
+class _Shard:
+    __slots__ = ("lock", "counts", "pending")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts: Dict[int, int] = {}
+        self.pending = 0
+
+
+_shards: List[_Shard] = [_Shard() for _ in range(SHARDS)]
+_next_shard = itertools.count()
+_local = threading.local()
+_writer_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_writer: Optional[threading.Thread] = None
+_stop = threading.Event()
+_wake = threading.Event()
+
+
+# ============================================================
+# PRODUCTORES
+# ============================================================
+
+def record_view(video_id: int, count: int = 1):
+    """
+    Suma `count` reproducciones a un video (no bloquea ni toca la base)
+
+    Los ids inexistentes se descartan al escribir el lote.
+    """
+    if count <= 0:
+        return
+    shard = _thread_shard()
+    with shard.lock:
+        shard.counts[video_id] = shard.counts.get(video_id, 0) + count
+        shard.pending += count
+    if pending_views() >= MAX_PENDING:
+        _wake.set()
+    _ensure_writer()
+
+
+def _thread_shard() -> _Shard:
+    """Shard del hilo actual, asignado en round-robin la primera vez"""
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = _shards[next(_next_shard) % SHARDS]
+    return shard
+
+
+# ============================================================
+# ESCRITOR EN LOTE
+# ============================================================
+
+def _ensure_writer():
+    global _writer
+    if _writer is not None and _writer.is_alive():
+        return
+    with _writer_lock:
+        if _writer is not None and _writer.is_alive():
+            return
+        _stop.clear()
+        _writer = threading.Thread(target=_writer_loop, name="view-counter-writer", daemon=True)
+        _writer.start()
+
+
+def _writer_loop():
+    while not _stop.is_set():
+        _wake.wait(FLUSH_INTERVAL_S)
+        _wake.clear()
+        try:
+            flush()
+        except Exception as e:  # El hilo no debe morir por un lote fallido
+            print(f"[!] view_counter: error al escribir lote: {e}")
+
+
+def _drain() -> Dict[int, int]:
+    """Vacía todos los shards y devuelve los deltas sumados por video"""
+    deltas: Dict[int, int] = {}
+    for shard in _shards:
+        with shard.lock:
+            counts, shard.counts, shard.pending = shard.counts, {}, 0
+        for video_id, count in counts.items():
+            deltas[video_id] = deltas.get(video_id, 0) + count
+    return deltas
+
+
+def _restore(deltas: Dict[int, int]):
+    """Devuelve un lote no escrito a los contadores"""
+    shard = _shards[0]
+    with shard.lock:
+        for video_id, count in deltas.items():
+            shard.counts[video_id] = shard.counts.get(video_id, 0) + count
+            shard.pending += count
+
+
+def flush() -> int:
+    """
+    Escribe todas las reproducciones acumuladas en una transacción
+
+    Returns:
+        Cantidad de reproducciones escritas
+    """
+    with _flush_lock:
+        deltas = _drain()
+        if not deltas:
+            return 0
+        try:
+            add_views(deltas)
+        except Exception:
+            _restore(deltas)
+            raise
+        return sum(deltas.values())
+
+
+def pending_views() -> int:
+    """Reproducciones acumuladas aún no escritas (lectura sin locks, aproximada)"""
+    return sum(shard.pending for shard in _shards)
+
+
+def stop_writer(timeout: float = 5.0):
+    """Detiene el hilo escritor y escribe lo pendiente"""
+    _stop.set()
+    _wake.set()
+    if _writer is not None:
+        _writer.join(timeout)
+    flush()
+
+
+def _stop_at_exit():
+    # Al salir la base puede ya no existir (p. ej. un directorio temporal):
+    # las vistas pendientes se pierden, pero la salida no debe fallar
+    try:
+        stop_writer()
+    except sqlite3.Error as e:
+        print(f"[!] view_counter: {pending_views()} vistas sin escribir al salir: {e}")
+
+
+atexit.register(_stop_at_exit)
@@ -0,0 +1,623 @@
+"""
+Simulador de Sala de Terapia Intensiva (eventos discretos)
+Simulador BIC Lankamar
+
+Genera la carga de alarmas de una sala completa para entrenar la fatiga de
+alarmas: N camas, cada una con una o más bombas del catálogo, infusiones que
+terminan, se ocluyen, detectan aire o se quedan sin batería, y enfermería
+que responde con demoras según la severidad.
+
+A diferencia de infusion_sim.py (pasos de tiempo fijos sobre arrays), acá
+cada evento se agenda con su tiempo exacto en un heap y el reloj salta de
+un evento al siguiente: el costo depende de la cantidad de eventos, no de
+la duración ni de la resolución temporal.
+
+Modelo por canal (bomba):
+- Infusión: flujo y VTBI al azar dentro del rango de la bomba; al terminar,
+  la siguiente se cuelga tras una pausa
+- Oclusión distal: aparece como proceso de Poisson; la alarma suena cuando
+  la presión cruza el umbral (mismos parámetros que infusion_sim.py)
+- Aire: burbujas al azar contra sensibilidad_aire / umbrales.aire_ml
+- Batería: traslados que desenchufan la bomba; si nadie la vuelve a
+  enchufar suena batería baja (20%) y luego batería agotada, con la
+  autonomía al flujo del momento según battery_model.py
+- Severidad de cada alarma: nivel del código equivalente de
+  alarms_plum360_complete.json
+
+Los eventos agendados que quedan obsoletos (p. ej. el fin de infusión de
+una bomba que se detuvo) no se borran del heap: cada canal lleva una
+época que se incrementa al detenerse, y el evento se descarta al salir.
+
+La traza se escribe en streaming a CSV (timestamp, ward, bed, pump_id,
+code, ...) compatible con alarm_analytics.py.
+
+Uso:
+    python ward_sim.py --beds 40 --hours 24 --trace traza_uti.csv
+"""
+
+import argparse
+import csv
+import heapq
+import math
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from alarm_resolver import normalize_code
+from battery_model import LOW_BATTERY_FRACTION, parse_battery, runtime_h
+from catalog import DATA_DIR, get_catalog, get_device_alarms, pump_specs
+from infusion_sim import (
+    AIR_BUBBLE_RATE_PER_H,
+    BASE_PRESSURE_MMHG,
+    LINE_COMPLIANCE_ML_PER_MMHG,
+    LINE_RESISTANCE_MMHG_PER_ML_H,
+    MEAN_BUBBLE_ML,
+    NEAR_END_S,
+    OCCLUSION_RATE_PER_H,
+    event_codes,
+)
+
+
+# ============================================================
+# PARÁMETROS DEL MODELO
+# ============================================================
+
+DEFAULT_BEDS = 40
+DEFAULT_WARD = "UTI Adultos"
+
+# Instante 0 por defecto: fijo, para que la misma semilla dé la misma traza
+DEFAULT_START = datetime(2026, 1, 1)
+
+# Bombas por cama (mínimo, máximo)
+PUMPS_PER_BED = (1, 4)
+
+# Prescripciones habituales
+CLINICAL_RATES_ML_H = [5, 10, 21, 42, 63, 83, 125, 250]
+CLINICAL_VTBI_ML = [50, 100, 250, 500, 1000]
+
+# Minutos (media) entre el fin de una infusión y la siguiente
+IDLE_GAP_MIN = 30.0
+
+# Traslados/estudios que desenchufan la bomba
+UNPLUG_RATE_PER_H = 0.05
+UNPLUGGED_MEDIAN_MIN = 40.0
+FORGOTTEN_PLUG_PROB = 0.15     # Nadie la vuelve a enchufar al regresar
+LOW_BATTERY_PLUG_PROB = 0.7    # Ante batería baja, se enchufa (si no, se silencia)
+
+# Archivo de referencia de severidades y código equivalente por evento
+SEVERITY_SOURCE = DATA_DIR / "alarms_plum360_complete.json"
+SEVERITY_REFERENCE_CODES = {
+    "occlusion": "OCCLUSION_DISTAL",
+    "air": "DISTAL_AIR",
+    "near_end": "E313",
+    "vtbi_complete": "E324",
+    "low_battery": "N58",
+    "battery_depleted": "N59",
+}
+
+# Demora de respuesta de enfermería (mediana en segundos) por severidad;
+# lognormal con RESPONSE_SIGMA
+RESPONSE_MEDIAN_S = {5: 30, 4: 60, 3: 120, 2: 240, 1: 480, 0: 600}
+RESPONSE_SIGMA = 0.6
+
+# Alarmas simuladas
+ALARMS = ["occlusion", "air", "near_end", "vtbi_complete", "low_battery", "battery_depleted"]
+OCCLUSION, AIR, NEAR_END, VTBI_COMPLETE, LOW_BATTERY, BATTERY_DEPLETED = range(len(ALARMS))
+
+# Alarmas que detienen la infusión hasta que enfermería responde
+STOPPING = {OCCLUSION, AIR, BATTERY_DEPLETED}
+
+# Tipos de evento del heap (las alarmas usan su índice en ALARMS)
+START, NEAR_END_DUE, COMPLETE_DUE, OCCLUSION_ONSET, OCCLUSION_DUE, BUBBLE, \
+    UNPLUG, REPLUG, LOW_BATTERY_DUE, DEPLETED_DUE, RESPONSE = range(11)
+
+EVENT_NAMES = [
+    "infusion_start", "near_end", "vtbi_complete", "occlusion_onset", "occlusion",
+    "bubble", "unplug", "replug", "low_battery", "battery_depleted", "response",
+]
+
+# Marca de oclusión en curso que todavía no alarmó
+PENDING = -1
+
+TRACE_COLUMNS = ["timestamp", "ward", "bed", "channel", "pump_id", "event", "code", "prioridad", "severidad"]
+
+
+# ============================================================
+# CATÁLOGO
+# ============================================================
+
+def severity_levels(path: Path = SEVERITY_SOURCE) -> Dict[str, int]:
+    """
+    Severidad (0-5) de cada alarma simulada según el código equivalente
+    del archivo de referencia
+
+    Si el código no tiene severidad, se usa la mediana de las severidades
+    de su misma prioridad (o de prioridad media si el código no existe).
+    """
+    device = get_device_alarms([path])[0]
+    by_code = {a["codigo_pantalla"]: a for a in device["errores_y_alarmas"]}
+    by_priority: Dict[str, List[int]] = {}
+    for alarm in device["errores_y_alarmas"]:
+        if alarm.get("severidad") is not None:
+            by_priority.setdefault(alarm["prioridad"], []).append(int(alarm["severidad"]))
+
+    levels = {}
+    for alarm, code in SEVERITY_REFERENCE_CODES.items():
+        ref = by_code.get(code)
+        if ref is not None and ref.get("severidad") is not None:
+            levels[alarm] = int(ref["severidad"])
+        else:
+            values = sorted(by_priority.get(ref["prioridad"] if ref else "media", [2]))
+            levels[alarm] = values[len(values) // 2]
+    return levels
+
+
+def energy_codes(pump: Dict) -> List[Optional[str]]:
+    """Códigos de batería baja y batería agotada de la bomba (None si no tiene)"""
+    energy = [a for a in pump.get("errores_y_alarmas", []) if a.get("categoria") == "energia"]
+    battery = [a for a in energy if any(k in normalize_code(a["codigo_pantalla"]) for k in ("BAT",))]
+    low = next((a for a in battery if a.get("prioridad") != "critica"), None)
+    depleted = next((a for a in battery if a.get("prioridad") == "critica"), None)
+    return [a["codigo_pantalla"] if a else None for a in (low, depleted)]
+
+
+class _PumpModel:
+    """Parámetros de un modelo de bomba, compartidos por sus canales"""
+
+    __slots__ = ("id", "specs", "codes", "priorities", "battery", "recharge_s", "occlusion_threshold")
+
+    def __init__(self, pump: Dict, occlusion_level: float):
+        self.id = pump["id"]
+        self.specs = pump_specs(pump)
+        self.codes = event_codes(pump) + energy_codes(pump)
+        priorities = {a["codigo_pantalla"]: a.get("prioridad", "") for a in pump.get("errores_y_alarmas", [])}
+        self.priorities = [priorities.get(code, "") for code in self.codes]
+        self.battery = parse_battery(pump)
+        self.recharge_s = self.battery["recharge_h"] * 3600
+        self.occlusion_threshold = self.specs["occlusion_low"] + occlusion_level * (
+            self.specs["occlusion_high"] - self.specs["occlusion_low"]
+        )
+
+
+class _Channel:
+    """Estado de una bomba en una cama"""
+
+    __slots__ = (
+        "bed", "index", "model", "epoch", "battery_epoch",
+        "active", "running", "dead", "stop", "since", "delivered", "vtbi", "flow",
+        "near_end_fired", "air_accum", "air_t", "level", "level_t", "plugged", "drain_s",
+    )
+
+    def __init__(self, bed: int, index: int, model: _PumpModel):
+        self.bed, self.index, self.model = bed, index, model
+        self.epoch = self.battery_epoch = 0
+        self.active = self.running = self.dead = False
+        self.stop = None            # Alarma que detuvo la infusión (o PENDING)
+        self.since = self.delivered = self.vtbi = self.flow = 0.0
+        self.near_end_fired = False
+        self.air_accum = self.air_t = 0.0
+        self.level, self.level_t, self.plugged = 1.0, 0.0, True
+        self.drain_s = math.inf      # Segundos de batería llena al consumo actual
+
+
+# ============================================================
+# SIMULADOR
+# ============================================================
+
+class WardSimulator:
+    """
+    Sala de N camas simulada por eventos discretos.
+
+    Cada evento agendado es una tupla (t, tipo, canal, dato) en un heap;
+    `dato` es la época del canal (infusión o batería) o, en las
+    respuestas de enfermería, la alarma respondida.
+    """
+
+    def __init__(
+        self,
+        beds: int = DEFAULT_BEDS,
+        pump_ids: Optional[Sequence[str]] = None,
+        pumps_per_bed: Sequence[int] = PUMPS_PER_BED,
+        ward: str = DEFAULT_WARD,
+        occlusion_level: float = 0.5,
+        seed: Optional[int] = None,
+        start: Optional[datetime] = None,
+    ):
+        """
+        Args:
+            beds: Cantidad de camas
+            pump_ids: Modelos disponibles (default: todo el catálogo); cada
+                cama usa un solo modelo, como en la práctica
+            pumps_per_bed: (mínimo, máximo) de bombas por cama
+            ward: Nombre de la sala (columna ward de la traza)
+            occlusion_level: 0 = umbral mínimo configurable, 1 = máximo
+            seed: Semilla (misma semilla → misma traza)
+            start: Fecha y hora del instante 0 (default: DEFAULT_START)
+        """
+        if beds <= 0:
+            raise ValueError("beds debe ser positivo")
+        if not 0 <= occlusion_level <= 1:
+            raise ValueError("occlusion_level debe estar entre 0 y 1")
+        low, high = pumps_per_bed
+        if not 1 <= low <= high:
+            raise ValueError("pumps_per_bed debe ser (mínimo, máximo) con 1 <= mínimo <= máximo")
+
+        catalog = get_catalog()
+        pump_ids = list(pump_ids or [p["id"] for p in catalog.pumps])
+        missing = [pid for pid in pump_ids if pid not in catalog.pumps_by_id]
+        if missing:
+            raise ValueError(f"Bombas no encontradas en el catálogo: {', '.join(missing)}")
+
+        self.ward = ward
+        self.beds = beds
+        self.rng = random.Random(seed)
+        self.start = start or DEFAULT_START
+        self.models = [_PumpModel(catalog.pumps_by_id[pid], occlusion_level) for pid in pump_ids]
+        levels = severity_levels()
+        self.severity = [levels[name] for name in ALARMS]
+
+        self.channels: List[_Channel] = []
+        for bed in range(1, beds + 1):
+            model = self.rng.choice(self.models)
+            for index in range(self.rng.randint(low, high)):
+                self.channels.append(_Channel(bed, index + 1, model))
+
+        self.t = 0.0
+        self._heap: List[tuple] = []
+        self._trace = None
+        self._full_trace = False
+        self.processed = 0
+        self.stale = 0
+        self.event_counts = Counter()
+        self.alarm_counts = Counter()      # (pump_id, alarma) → ocurrencias
+        self.sounding = 0
+        self.max_sounding = 0
+        self.alarm_seconds = 0.0
+        self.responses = 0
+
+        for ch in range(len(self.channels)):
+            self._push(self.rng.expovariate(1 / (IDLE_GAP_MIN * 60)), START, ch, 0)
+            self._push(self.rng.expovariate(UNPLUG_RATE_PER_H / 3600), UNPLUG, ch, 0)
+
+    # ------------------------------------------------------------
+    # Heap y traza
+    # ------------------------------------------------------------
+
+    def _push(self, t: float, kind: int, ch: int, data: int):
+        heapq.heappush(self._heap, (t, kind, ch, data))
+
+    def _write(self, channel: _Channel, event: str, alarm: Optional[int] = None):
+        if alarm is None:
+            code = priority = severity = ""
+        else:
+            code = channel.model.codes[alarm]
+            priority = channel.model.priorities[alarm]
+            severity = self.severity[alarm]
+        ts = (self.start + timedelta(seconds=self.t)).isoformat(timespec="seconds")
+        self._trace.writerow(
+            (ts, self.ward, channel.bed, channel.index, channel.model.id, event, code, priority, severity)
+        )
+
+    # ------------------------------------------------------------
+    # Infusión
+    # ------------------------------------------------------------
+
+    def _start_infusion(self, ch: int, channel: _Channel):
+        rng, specs = self.rng, channel.model.specs
+        rate = min(max(rng.choice(CLINICAL_RATES_ML_H), specs["rate_min"]), specs["rate_max"])
+        bias = rng.uniform(-specs["accuracy"], specs["accuracy"])
+        channel.flow = rate * (1 + bias) / 3600
+        channel.vtbi = min(rng.choice(CLINICAL_VTBI_ML), specs["vtbi_max"])
+        channel.delivered = 0.0
+        channel.near_end_fired = False
+        channel.active = True
+        channel.stop = None
+        self._resume(ch, channel)
+
+    def _pause(self, channel: _Channel):
+        """Detiene la entrega e invalida los eventos de infusión agendados"""
+        if channel.running:
+            channel.delivered += (self.t - channel.since) * channel.flow
+            channel.running = False
+        channel.epoch += 1
+
+    def _resume(self, ch: int, channel: _Channel):
+        """Reanuda (si nada la detiene) y agenda fin, oclusión y burbuja"""
+        if not channel.active or channel.dead or channel.stop is not None or channel.running:
+            return
+        t, rng, flow = self.t, self.rng, channel.flow
+        channel.running = True
+        channel.since = t
+        channel.epoch += 1
+        channel.air_accum = 0.0
+        channel.air_t = t
+        epoch = channel.epoch
+        remaining = channel.vtbi - channel.delivered
+        if not channel.near_end_fired:
+            self._push(t + max(remaining / flow - NEAR_END_S, 0.0), NEAR_END_DUE, ch, epoch)
+        self._push(t + remaining / flow, COMPLETE_DUE, ch, epoch)
+        self._push(t + rng.expovariate(OCCLUSION_RATE_PER_H / 3600), OCCLUSION_ONSET, ch, epoch)
+        self._push(t + rng.expovariate(AIR_BUBBLE_RATE_PER_H / 3600), BUBBLE, ch, epoch)
+
+    # ------------------------------------------------------------
+    # Batería
+    # ------------------------------------------------------------
+
+    def _update_level(self, channel: _Channel):
+        elapsed = self.t - channel.level_t
+        if channel.plugged:
+            channel.level = min(1.0, channel.level + elapsed / channel.model.recharge_s)
+        else:
+            channel.level = max(0.0, channel.level - elapsed / channel.drain_s)
+        channel.level_t = self.t
+
+    def _plug(self, ch: int, channel: _Channel):
+        self._update_level(channel)
+        channel.plugged = True
+        channel.battery_epoch += 1
+        self._push(self.t + self.rng.expovariate(UNPLUG_RATE_PER_H / 3600), UNPLUG, ch, channel.battery_epoch)
+
+    def _unplug(self, ch: int, channel: _Channel):
+        self._update_level(channel)
+        channel.plugged = False
+        channel.battery_epoch += 1
+        epoch, t, level = channel.battery_epoch, self.t, channel.level
+        # Consumo fijado al flujo del momento del desenchufe (0 si no infunde)
+        rate_ml_h = channel.flow * 3600 if channel.running else 0.0
+        battery_s = channel.drain_s = float(runtime_h(channel.model.battery, rate_ml_h)) * 3600
+        if level > LOW_BATTERY_FRACTION:
+            self._push(t + (level - LOW_BATTERY_FRACTION) * battery_s, LOW_BATTERY_DUE, ch, epoch)
+        self._push(t + level * battery_s, DEPLETED_DUE, ch, epoch)
+        if self.rng.random() >= FORGOTTEN_PLUG_PROB:
+            away = self.rng.lognormvariate(math.log(UNPLUGGED_MEDIAN_MIN * 60), 0.5)
+            self._push(t + away, REPLUG, ch, epoch)
+
+    # ------------------------------------------------------------
+    # Alarmas y respuesta
+    # ------------------------------------------------------------
+
+    def _alarm(self, ch: int, channel: _Channel, alarm: int):
+        if alarm in STOPPING:
+            channel.stop = alarm
+        if channel.model.codes[alarm] is None:
+            # La bomba no tiene código para este evento: no suena, pero la
+            # infusión sigue su curso (se reanuda o se cuelga la siguiente)
+            if alarm in STOPPING or alarm == VTBI_COMPLETE:
+                self._push(self.t, RESPONSE, ch, alarm)
+            return
+        self.alarm_counts[(channel.model.id, alarm)] += 1
+        self.sounding += 1
+        self.max_sounding = max(self.max_sounding, self.sounding)
+        median = RESPONSE_MEDIAN_S.get(self.severity[alarm], RESPONSE_MEDIAN_S[2])
+        delay = self.rng.lognormvariate(math.log(median), RESPONSE_SIGMA)
+        self.alarm_seconds += delay
+        self._push(self.t + delay, RESPONSE, ch, alarm)
+        if self._trace is not None:
+            self._write(channel, ALARMS[alarm], alarm)
+
+    def _respond(self, ch: int, channel: _Channel, alarm: int):
+        silent = channel.model.codes[alarm] is None
+        if not silent:
+            self.sounding -= 1
+            self.responses += 1
+        if alarm == VTBI_COMPLETE:
+            self._push(self.t + self.rng.expovariate(1 / (IDLE_GAP_MIN * 60)), START, ch, 0)
+        elif alarm == LOW_BATTERY:
+            if not silent and not channel.plugged and self.rng.random() < LOW_BATTERY_PLUG_PROB:
+                self._plug(ch, channel)
+        elif alarm == BATTERY_DEPLETED:
+            self._plug(ch, channel)
+            channel.dead = False
+            if channel.stop == BATTERY_DEPLETED:
+                channel.stop = None
+            self._resume(ch, channel)
+        elif alarm in (OCCLUSION, AIR):
+            if channel.stop == alarm:
+                channel.stop = None
+            self._resume(ch, channel)
+
+    # ------------------------------------------------------------
+    # Bucle principal
+    # ------------------------------------------------------------
+
+    def _dispatch(self, kind: int, ch: int, data: int) -> bool:
+        """Procesa un evento; False si quedó obsoleto"""
+        channel = self.channels[ch]
+
+        if kind == RESPONSE:
+            self._respond(ch, channel, data)
+        elif kind == START:
+            if channel.active:
+                return False
+            self._start_infusion(ch, channel)
+        elif kind <= BUBBLE:
+            if data != channel.epoch:
+                return False
+            if kind == BUBBLE:
+                size = self.rng.expovariate(1 / MEAN_BUBBLE_ML)
+                specs = channel.model.specs
+                decay = math.exp(-(self.t - channel.air_t) / specs["air_window_s"])
+                channel.air_accum = channel.air_accum * decay + size
+                channel.air_t = self.t
+                if size >= specs["bubble_ml"] or channel.air_accum >= specs["air_accum_ml"]:
+                    self._pause(channel)
+                    self._alarm(ch, channel, AIR)
+                else:
+                    self._push(self.t + self.rng.expovariate(AIR_BUBBLE_RATE_PER_H / 3600), BUBBLE, ch, data)
+            elif kind == NEAR_END_DUE:
+                channel.near_end_fired = True
+                self._alarm(ch, channel, NEAR_END)
+            elif kind == COMPLETE_DUE:
+                self._pause(channel)
+                channel.delivered = channel.vtbi
+                channel.active = False
+                self._alarm(ch, channel, VTBI_COMPLETE)
+            elif kind == OCCLUSION_ONSET:
+                # La entrega se corta; la alarma suena al cruzar el umbral
+                model = channel.model
+                rate_ml_h = channel.flow * 3600
+                headroom = max(model.occlusion_threshold - BASE_PRESSURE_MMHG
+                               - LINE_RESISTANCE_MMHG_PER_ML_H * rate_ml_h, 0.0)
+                self._pause(channel)
+                channel.stop = PENDING
+                self._push(self.t + headroom * LINE_COMPLIANCE_ML_PER_MMHG / channel.flow,
+                           OCCLUSION_DUE, ch, channel.epoch)
+            else:  # OCCLUSION_DUE
+                self._alarm(ch, channel, OCCLUSION)
+        else:
+            if data != channel.battery_epoch:
+                return False
+            if kind == UNPLUG:
+                self._unplug(ch, channel)
+            elif kind == REPLUG:
+                self._plug(ch, channel)
+            elif kind == LOW_BATTERY_DUE:
+                self._alarm(ch, channel, LOW_BATTERY)
+            else:  # DEPLETED_DUE
+                self._update_level(channel)
+                self._pause(channel)
+                channel.dead = True
+                if channel.stop == PENDING:
+                    channel.stop = None
+                channel.battery_epoch += 1   # Descarta un REPLUG pendiente: la revive la respuesta
+                self._alarm(ch, channel, BATTERY_DEPLETED)
+
+        if self._full_trace:
+            self._write(channel, EVENT_NAMES[kind])
+        return True
+
+    def run(self, hours: float = 24.0, trace_path: Optional[Path] = None, full_trace: bool = False) -> Dict:
+        """
+        Simula `hours` horas desde el estado actual
+
+        Args:
+            hours: Horas a simular
+            trace_path: CSV donde escribir la traza (se sobrescribe); None = sin traza
+            full_trace: Incluir en la traza todos los eventos, no solo las alarmas
+
+        Returns:
+            summary() de la corrida más elapsed_s y events_per_s
+        """
+        if hours <= 0:
+            raise ValueError("hours debe ser positivo")
+        end = self.t + hours * 3600
+        heap, pop, dispatch = self._heap, heapq.heappop, self._dispatch
+        processed = stale = 0
+
+        trace = open(trace_path, "w", encoding="utf-8", newline="", buffering=1 << 20) if trace_path else None
+        self._trace = csv.writer(trace, lineterminator="\n") if trace else None
+        self._full_trace = bool(trace and full_trace)
+        start = time.perf_counter()
+        try:
+            if trace is not None:
+                self._trace.writerow(TRACE_COLUMNS)
+            while heap and heap[0][0] <= end:
+                t, kind, ch, data = pop(heap)
+                self.t = t
+                if dispatch(kind, ch, data):
+                    processed += 1
+                    self.event_counts[EVENT_NAMES[kind]] += 1
+                else:
+                    stale += 1
+        finally:
+            elapsed = time.perf_counter() - start
+            if trace is not None:
+                trace.close()
+            self._trace, self._full_trace = None, False
+
+        self.t = end
+        self.processed += processed
+        self.stale += stale
+        return {
+            **self.summary(),
+            "trace": str(trace_path) if trace_path else None,
+            "elapsed_s": round(elapsed, 4),
+            "events_per_s": round(processed / elapsed) if elapsed > 0 else None,
+        }
+
+    # ------------------------------------------------------------
+    # Resultados
+    # ------------------------------------------------------------
+
+    def summary(self) -> Dict:
+        """Carga de alarmas acumulada desde el inicio"""
+        hours = self.t / 3600 or 1.0
+        by_alarm, by_code, by_severity = Counter(), Counter(), Counter()
+        models = {m.id: m for m in self.models}
+        for (pump_id, alarm), count in self.alarm_counts.items():
+            by_alarm[ALARMS[alarm]] += count
+            by_code[f"{pump_id}:{models[pump_id].codes[alarm]}"] += count
+            by_severity[self.severity[alarm]] += count
+        total = sum(by_alarm.values())
+        return {
+            "ward": self.ward,
+            "beds": self.beds,
+            "channels": len(self.channels),
+            "simulated_h": self.t / 3600,
+            "events": self.processed,
+            "stale_events": self.stale,
+            "alarms": total,
+            "alarms_per_bed_h": total / self.beds / hours,
+            "max_concurrent_alarms": self.max_sounding,
+            "mean_response_s": self.alarm_seconds / total if total else 0.0,
+            "by_alarm": dict(by_alarm.most_common()),
+            "by_severity": dict(sorted(by_severity.items(), reverse=True)),
+            "by_code": dict(by_code.most_common()),
+            "events_by_type": dict(self.event_counts.most_common()),
+        }
+
+
+def simulate_ward(hours: float = 24.0, trace_path: Optional[Path] = None,
+                  full_trace: bool = False, **kwargs) -> Dict:
+    """WardSimulator(**kwargs).run(hours, trace_path, full_trace)"""
+    return WardSimulator(**kwargs).run(hours, trace_path=trace_path, full_trace=full_trace)
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Simula la carga de alarmas de una sala de terapia intensiva")
+    parser.add_argument("--beds", type=int, default=DEFAULT_BEDS)
+    parser.add_argument("--hours", type=float, default=24.0)
+    parser.add_argument("--ward", default=DEFAULT_WARD)
+    parser.add_argument("--pumps", nargs="+", help="IDs de bombas (default: todo el catálogo)")
+    parser.add_argument("--occlusion-level", type=float, default=0.5)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--start", type=datetime.fromisoformat,
+                        help="Fecha y hora del instante 0, ISO 8601 (default: 2026-01-01T00:00)")
+    parser.add_argument("--trace", type=Path, help="CSV de salida")
+    parser.add_argument("--full-trace", action="store_true", help="Incluir eventos que no son alarmas")
+    args = parser.parse_args(argv)
+
+    try:
+        result = simulate_ward(
+            args.hours, trace_path=args.trace, full_trace=args.full_trace,
+            beds=args.beds, pump_ids=args.pumps, ward=args.ward,
+            occlusion_level=args.occlusion_level, seed=args.seed, start=args.start,
+        )
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return 1
+
+    print(f"{result['ward']}: {result['beds']} camas, {result['channels']} bombas, {result['simulated_h']:.1f} h")
+    print(f"  Eventos:           {result['events']:,} ({result['events_per_s']:,} eventos/s, "
+          f"{result['elapsed_s'] * 1000:.1f} ms)")
+    print(f"  Alarmas:           {result['alarms']:,} ({result['alarms_per_bed_h']:.2f} por cama y hora)")
+    print(f"  Simultáneas (máx): {result['max_concurrent_alarms']}")
+    print(f"  Respuesta media:   {result['mean_response_s']:.0f} s")
+    print(f"  Por severidad:     {result['by_severity']}")
+    for name, count in result["by_alarm"].items():
+        print(f"    {count:>7,}  {name}")
+    if result["trace"]:
+        print(f"  Traza: {result['trace']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
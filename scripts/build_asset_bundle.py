@@ -0,0 +1,219 @@
+"""
+Constructor del bundle de datos para la app Flutter
+Simulador BIC Lankamar
+
+Compila pumps_db.json, los archivos de alarmas de fabricante y
+bombas_especificaciones.json en shards por bomba:
+- JSON minificado, con nombre direccionado por contenido
+  (<pump_id>.<hash>.json) y su variante .json.gz
+- bundle_manifest.json con hash, tamaños y metadatos de cada shard,
+  para que la app cargue al inicio solo el manifest y pida cada shard
+  cuando lo necesita
+
+El build es reproducible (mismo input → mismos bytes) e incremental:
+un shard cuyo contenido no cambió no se vuelve a escribir ni comprimir.
+
+Ejecutar:
+    python scripts/build_asset_bundle.py [--out assets/data/bundle]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+
+from catalog import DATA_DIR, PUMPS_DB_PATH, load_device_alarms  # noqa: E402
+
+SPECS_PATH = DATA_DIR / "bombas_especificaciones.json"
+DEFAULT_OUT = ROOT / "assets" / "data" / "bundle"
+MANIFEST_NAME = "bundle_manifest.json"
+BUNDLE_SCHEMA_VERSION = 1
+
+# Nombre de un shard generado: <pump_id>.<12 hex>.json[.gz]
+SHARD_NAME = re.compile(r"^[\w-]+\.[0-9a-f]{12}\.json(\.gz)?$")
+
+
+def minify(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dedupe_alarms(alarms):
+    """Elimina alarmas repetidas (mismo contenido) conservando el orden"""
+    seen = set()
+    unique = []
+    for alarm in alarms:
+        key = minify(alarm)
+        if key not in seen:
+            seen.add(key)
+            unique.append(alarm)
+    return unique
+
+
+def load_specs():
+    """bombas_especificaciones.json por id; {} si no se puede parsear"""
+    try:
+        data = json.loads(SPECS_PATH.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}, None
+    except json.JSONDecodeError as e:
+        return {}, f"{SPECS_PATH.name}: JSON inválido (línea {e.lineno}, columna {e.colno}) - se omite"
+    items = data.get("bombas", []) if isinstance(data, dict) else data
+    return {item["id"]: item for item in items if isinstance(item, dict) and "id" in item}, None
+
+
+def collect_shards():
+    """Contenido de cada shard: pump_id → (payload, fuentes)"""
+    pumps = json.loads(PUMPS_DB_PATH.read_text(encoding="utf-8"))
+    specs, warning = load_specs()
+    shards = {}
+
+    for pump in pumps:
+        pump = dict(pump)
+        pump["errores_y_alarmas"] = dedupe_alarms(pump.get("errores_y_alarmas", []))
+        payload = {"pump": pump}
+        sources = [PUMPS_DB_PATH.name]
+        if pump["id"] in specs:
+            payload["especificaciones"] = specs[pump["id"]]
+            sources.append(SPECS_PATH.name)
+        shards[pump["id"]] = (payload, sources)
+
+    for device in load_device_alarms():
+        device = dict(device)
+        sources = device.pop("fuentes")
+        device["errores_y_alarmas"] = dedupe_alarms(device["errores_y_alarmas"])
+        if device["id"] in shards:
+            continue  # pumps_db.json tiene prioridad sobre archivos de fabricante
+        shards[device["id"]] = ({"pump": device}, sources)
+
+    return shards, warning
+
+
+def load_previous_manifest(out_dir: Path) -> dict:
+    try:
+        return json.loads((out_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def build(out_dir: Path) -> dict:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    previous = load_previous_manifest(out_dir).get("shards", {})
+    shards, warning = collect_shards()
+
+    entries = {}
+    stats = {"rebuilt": [], "unchanged": [], "removed": [], "warning": warning}
+
+    for pump_id in sorted(shards):
+        payload, sources = shards[pump_id]
+        body = minify(payload)
+        digest = hashlib.sha256(body).hexdigest()
+        file_name = f"{pump_id}.{digest[:12]}.json"
+        gz_name = f"{file_name}.gz"
+
+        old = previous.get(pump_id)
+        if old and old.get("sha256") == digest and (out_dir / file_name).exists() \
+                and (out_dir / gz_name).exists():
+            entries[pump_id] = old
+            stats["unchanged"].append(pump_id)
+            continue
+
+        gz_body = gzip.compress(body, compresslevel=9, mtime=0)
+        (out_dir / file_name).write_bytes(body)
+        (out_dir / gz_name).write_bytes(gz_body)
+
+        pump = payload["pump"]
+        entries[pump_id] = {
+            "file": file_name,
+            "gzip_file": gz_name,
+            "sha256": digest,
+            "bytes": len(body),
+            "gzip_bytes": len(gz_body),
+            "marca": pump.get("marca", ""),
+            "modelo": pump.get("modelo", ""),
+            "tipo": pump.get("tipo", ""),
+            "alarmas": len(pump.get("errores_y_alarmas", [])),
+            "fuentes": sources,
+        }
+        stats["rebuilt"].append(pump_id)
+
+    manifest = {
+        "schema_version": BUNDLE_SCHEMA_VERSION,
+        "bundle_hash": hashlib.sha256(minify(
+            {pid: e["sha256"] for pid, e in entries.items()}
+        )).hexdigest()[:16],
+        "shards": entries,
+    }
+    (out_dir / MANIFEST_NAME).write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8"
+    )
+
+    # Borrar shards que ya no están en el manifest (solo archivos con
+    # nombre de shard: cualquier otro archivo del directorio se respeta)
+    referenced = set()
+    for entry in entries.values():
+        referenced.update((entry["file"], entry["gzip_file"]))
+    for path in out_dir.iterdir():
+        if path.is_file() and SHARD_NAME.match(path.name) and path.name not in referenced:
+            path.unlink()
+            stats["removed"].append(path.name)
+
+    stats["manifest"] = manifest
+    return stats
+
+
+def _time_parse(data: bytes, repeat: int = 200) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        json.loads(data)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def report(out_dir: Path, stats: dict):
+    manifest = stats["manifest"]
+    entries = manifest["shards"]
+    if stats["warning"]:
+        print(f"⚠️  {stats['warning']}")
+    print(f"📦 Bundle {manifest['bundle_hash']} en {out_dir}")
+    print(f"   Shards reconstruidos: {len(stats['rebuilt'])} | sin cambios: {len(stats['unchanged'])}"
+          f" | archivos eliminados: {len(stats['removed'])}")
+
+    legacy_bytes = PUMPS_DB_PATH.read_bytes()
+    manifest_bytes = (out_dir / MANIFEST_NAME).read_bytes()
+    from_db = [e for e in entries.values() if PUMPS_DB_PATH.name in e["fuentes"]]
+    extra = [e for e in entries.values() if PUMPS_DB_PATH.name not in e["fuentes"]]
+
+    print("\n📏 Tamaños")
+    print(f"   pumps_db.json (pretty):            {len(legacy_bytes):>8} bytes")
+    print(f"   Sus {len(from_db)} shards (minificados):     {sum(e['bytes'] for e in from_db):>8} bytes")
+    print(f"   Sus {len(from_db)} shards (gzip):            {sum(e['gzip_bytes'] for e in from_db):>8} bytes")
+    print(f"   {len(extra)} dispositivos extra (gzip):      {sum(e['gzip_bytes'] for e in extra):>8} bytes")
+    print(f"   Manifest:                          {len(manifest_bytes):>8} bytes")
+
+    typical = max(from_db or list(entries.values()), key=lambda e: e["bytes"])
+    shard_bytes = (out_dir / typical["file"]).read_bytes()
+    full_ms = _time_parse(legacy_bytes)
+    startup_ms = _time_parse(manifest_bytes) + _time_parse(shard_bytes)
+    print("\n⏱️  Parseo al iniciar (promedio)")
+    print(f"   Catálogo completo:                 {full_ms:.3f} ms")
+    print(f"   Manifest + 1 shard:                {startup_ms:.3f} ms  ({typical['file']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construye el bundle de datos para la app")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT)
+    args = parser.parse_args()
+
+    stats = build(args.out)
+    report(args.out, stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-import json
+import sys
 from datetime import date
 from pathlib import Path
 
@@ -10,12 +10,27 @@ from reportlab.lib.units import inch
 from reportlab.platypus import (Paragraph, SimpleDocTemplate, Spacer, Table,
                                 TableStyle, PageBreak)
 
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "backend"))
+
+from json_stream import load_array  # noqa: E402
+from pump_matrix import get_pump_matrix  # noqa: E402
+from spec_compiler import format_range  # noqa: E402
+
+
+def range_text(rango, unit=""):
+    """[min, max] → 'min - max unit' con el mismo formato que el catálogo"""
+    return format_range(*rango, unit) if isinstance(rango, list) and len(rango) == 2 else "-"
+
 
 def load_bombas():
-    data_path = Path(__file__).resolve().parent.parent / "data" / "bombas_especificaciones.json"
-    with open(data_path, encoding="utf-8") as fp:
-        payload = json.load(fp)
-    return payload.get("bombas", [])
+    """Bombas de bombas_especificaciones.json; los registros dañados se informan y se omiten"""
+    data_path = ROOT / "data" / "bombas_especificaciones.json"
+    bombas, quarantine, _ = load_array(data_path)
+    for q in quarantine:
+        print(f"⚠️  {data_path.name}:{q['line']}:{q['column']}: {q['message']} "
+              f"(registro #{q['index']} omitido)")
+    return bombas
 
 
 def build_cover(story, styles):
@@ -32,10 +47,16 @@ def build_cover(story, styles):
     story.append(PageBreak())
 
 
+def bomb_title(bomba):
+    """Título de la sección de la bomba (también su fila en la tabla comparativa)"""
+    contenido_es = bomba.get("contenido", {}).get("es", {})
+    return (contenido_es.get("titulo_pdf") or contenido_es.get("nombre_comercial")
+            or bomba.get("name") or bomba.get("modelo", "Sin nombre"))
+
+
 def add_bomb_section(story, styles, bomba):
     contenido_es = bomba.get("contenido", {}).get("es", {})
-    titulo = contenido_es.get("titulo_pdf") or contenido_es.get("nombre_comercial") or bomba.get("modelo", "Sin nombre")
-    story.append(Paragraph(titulo, styles["Heading2"]))
+    story.append(Paragraph(bomb_title(bomba), styles["Heading2"]))
     fabricante = bomba.get("fabricante_id", "")
     modelo = bomba.get("modelo", "").strip()
     tipo = bomba.get("tipo", "-")
@@ -44,7 +65,7 @@ def add_bomb_section(story, styles, bomba):
 
     parametros = bomba.get("parametros_tecnicos", {})
     rango = parametros.get("rango_infusion_ml_h")
-    rango_text = f"{rango[0]} - {rango[1]} ml/h" if isinstance(rango, list) and len(rango) == 2 else "-"
+    rango_text = range_text(rango, "ml/h")
     precision = parametros.get("precision_porcentaje", "-")
     volumen_max = parametros.get("volumen_max_ml", "-")
     presion_max = parametros.get("presion_max_psi", "-")
@@ -96,33 +117,47 @@ def add_bomb_section(story, styles, bomba):
     story.append(PageBreak())
 
 
-def build_comparison_table(story, bombas, styles):
+def build_comparison_table(story, styles, bombas):
+    """
+    Una fila por sección del PDF, con los datos de la matriz comparativa
+
+    Las bombas de bombas_especificaciones.json que no están en el catálogo
+    (pumps_db.json) se listan igual, con "-" en las columnas sin datos.
+    """
     story.append(Paragraph("Tabla comparativa", styles["Heading1"]))
-    headers = ["Nombre", "Tipo", "Rango", "Precisión"]
+    headers = ["Nombre", "Tipo", "Rango", "Presión máx.", "Autonomía", "Alarmas"]
     rows = [headers]
 
-    def format_range_value(rango):
-        if isinstance(rango, list) and len(rango) == 2:
-            return f"{rango[0]} - {rango[1]}"
-        return "-"
+    def number_text(value, unit):
+        return f"{value:g} {unit}" if value is not None else "-"
+
+    matrix_rows = get_pump_matrix().rows()
+    by_id = {row["pump_id"]: row for row in matrix_rows}
+    by_name = {row["name"].lower(): row for row in matrix_rows}
 
     for bomba in bombas:
-        contenido_es = bomba.get("contenido", {}).get("es", {})
-        nombre = contenido_es.get("nombre_comercial") or contenido_es.get("titulo_pdf") or bomba.get("modelo", "-")
-        tipo = bomba.get("tipo", "-")
-        parametros = bomba.get("parametros_tecnicos", {})
-        rango_text = format_range_value(parametros.get("rango_infusion_ml_h"))
-        precision = parametros.get("precision_porcentaje")
-        precision_text = f"{precision} %" if isinstance(precision, (int, float)) else "-"
-        rows.append([nombre, tipo, rango_text, precision_text])
-
-    table = Table(rows, repeatRows=1, colWidths=[2.6 * inch, 1.4 * inch, 2.2 * inch, 1.4 * inch])
+        titulo = bomb_title(bomba)
+        row = by_id.get(bomba.get("id")) or by_name.get(str(bomba.get("name", titulo)).lower())
+        if row is None:
+            rows.append([titulo, bomba.get("tipo", "-"), "-", "-", "-", "-"])
+            continue
+        rows.append([
+            titulo,
+            row["tipo"],
+            format_range(row["rate_min"], row["rate_max"], "ml/h"),
+            number_text(row["pressure_max"], "mmHg"),
+            number_text(row["autonomy_h"], "h"),
+            str(row["alarms_total"]),
+        ])
+
+    table = Table(rows, repeatRows=1, colWidths=[1.6 * inch, 1.6 * inch, 1.2 * inch, 0.9 * inch, 0.8 * inch, 0.6 * inch])
     table.setStyle(TableStyle([
         ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#0b4f6c")),
         ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
         ("BACKGROUND", (0, 1), (-1, -1), colors.whitesmoke),
         ("GRID", (0, 0), (-1, -1), 0.4, colors.gray),
         ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
     ]))
     story.append(table)
     story.append(PageBreak())
@@ -227,7 +262,7 @@ def build_pdf():
     build_cover(story, styles)
     for bomba in bombas:
         add_bomb_section(story, styles, bomba)
-    build_comparison_table(story, bombas, styles)
+    build_comparison_table(story, styles, bombas)
     build_appendix(story, styles, bombas)
 
     doc.build(story)